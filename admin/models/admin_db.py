@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Accès à la base SQLite de l'administration pour Vynal Docs Automator
+Les connexions (mode WAL) sont ouvertes une fois puis réutilisées via un pool;
+les requêtes sont des chaînes constantes paramétrées, gardées compilées dans le
+cache d'instructions de chaque connexion. Les journaux système sont mis en
+tampon et écrits par lots par un thread d'écriture en arrière-plan.
+"""
+
+import os
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger("VynalDocsAutomator.Admin.Database")
+
+# Paramètres par défaut de la couche d'accès
+ADMIN_DB_CONFIG = {
+    "pool_size": 4,             # Connexions ouvertes au maximum
+    "pool_timeout": 30,         # Attente maximale d'une connexion libre (secondes)
+    "statement_cache": 128,     # Requêtes compilées conservées par connexion
+    "log_flush_interval": 1.0,  # Délai maximal avant l'écriture des journaux (secondes)
+    "log_batch_size": 500,      # Écriture immédiate à partir de ce nombre de journaux en attente
+    "log_max_buffer": 20000,    # Au-delà, l'appelant écrit lui-même le tampon
+    "metrics_retention_days": 7,  # Conservation des relevés bruts (les agrégats restent)
+}
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS system_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        level TEXT NOT NULL,
+        source TEXT NOT NULL,
+        message TEXT NOT NULL,
+        details TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS system_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        cpu_usage REAL,
+        memory_usage REAL,
+        disk_usage REAL,
+        active_users INTEGER,
+        response_time REAL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS admin_actions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        action_type TEXT NOT NULL,
+        details TEXT,
+        ip_address TEXT
+    )
+    """,
+)
+
+# Index des colonnes filtrées et triées par l'interface d'administration
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_system_logs_timestamp ON system_logs(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_system_logs_level ON system_logs(level, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_system_logs_source ON system_logs(source, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_system_metrics_timestamp ON system_metrics(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_admin_actions_timestamp ON admin_actions(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_admin_actions_user ON admin_actions(user_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_admin_actions_type ON admin_actions(action_type, timestamp)",
+)
+
+INSERT_LOG_SQL = (
+    "INSERT INTO system_logs (timestamp, level, source, message, details) VALUES (?, ?, ?, ?, ?)"
+)
+INSERT_METRICS_SQL = (
+    "INSERT INTO system_metrics (timestamp, cpu_usage, memory_usage, disk_usage, active_users, response_time) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+INSERT_ACTION_SQL = (
+    "INSERT INTO admin_actions (timestamp, user_id, action_type, details, ip_address) VALUES (?, ?, ?, ?, ?)"
+)
+COUNT_ACTIONS_SINCE_SQL = "SELECT COUNT(*) FROM admin_actions WHERE action_type = ? AND timestamp >= ?"
+COUNT_ERRORS_SINCE_SQL = (
+    "SELECT COUNT(*) FROM system_logs WHERE level IN ('ERROR', 'CRITICAL') AND timestamp >= ?"
+)
+
+
+def _select(table: str, clauses: Sequence[str]) -> str:
+    """
+    Construit une requête filtrée à partir de clauses fixes
+
+    Les clauses ne contiennent que des paramètres: le nombre de requêtes
+    distinctes reste borné et chacune est réutilisée depuis le cache
+    d'instructions de la connexion.
+    """
+    where = "".join(f" AND {clause}" for clause in clauses)
+    return f"SELECT * FROM {table} WHERE 1=1{where} ORDER BY timestamp DESC LIMIT ?"
+
+
+class AdminDatabase:
+    """
+    Base SQLite de l'administration: journaux système, métriques et actions d'audit
+    """
+
+    def __init__(self, db_path: str, **options):
+        """
+        Initialise la base et crée le schéma et les index
+
+        Args:
+            db_path: Chemin du fichier SQLite
+            **options: Valeurs remplaçant celles d'ADMIN_DB_CONFIG
+        """
+        self.db_path = db_path
+        self.config = dict(ADMIN_DB_CONFIG, **options)
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        # Pool de connexions, ouvertes au premier besoin
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._pool_lock = threading.Lock()
+        self._opened = 0
+
+        # Tampon des journaux système et thread d'écriture
+        self._log_buffer: List[tuple] = []
+        self._log_condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._init_schema()
+        atexit.register(self.close)
+
+    # ----- Pool de connexions -----
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ouvre une connexion configurée pour le pool"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.config["pool_timeout"],
+            check_same_thread=False,
+            cached_statements=self.config["statement_cache"]
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Prend une connexion libre, en ouvre une nouvelle ou attend qu'une se libère"""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._pool_lock:
+            can_open = self._opened < self.config["pool_size"]
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return self._connect()
+            except sqlite3.Error:
+                with self._pool_lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            return self._pool.get(timeout=self.config["pool_timeout"])
+        except queue.Empty:
+            raise sqlite3.OperationalError("Aucune connexion disponible dans le pool")
+
+    def _release(self, conn: sqlite3.Connection):
+        """Rend une connexion au pool"""
+        if conn.in_transaction:
+            conn.rollback()
+        self._pool.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Prête une connexion du pool le temps d'un bloc with
+
+        Yields:
+            sqlite3.Connection: Connexion (lignes sqlite3.Row)
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def release_connections(self):
+        """
+        Ferme les connexions inactives du pool (avant de remplacer le fichier
+        de la base, par exemple); elles seront rouvertes au besoin
+        """
+        self.flush()
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            with self._pool_lock:
+                self._opened -= 1
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Erreur lors de la fermeture d'une connexion: {e}")
+
+    def _init_schema(self):
+        """Crée les tables et les index s'ils n'existent pas"""
+        with self.connection() as conn, conn:
+            for statement in SCHEMA + INDEXES:
+                conn.execute(statement)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """
+        Exécute une requête d'écriture dans sa propre transaction
+
+        Returns:
+            int: Nombre de lignes modifiées
+        """
+        with self.connection() as conn, conn:
+            return conn.execute(sql, params).rowcount
+
+    def fetch_all(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """Exécute une requête de lecture et retourne les lignes sous forme de dictionnaires"""
+        with self.connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+    def fetch_value(self, sql: str, params: Sequence[Any] = ()) -> Any:
+        """Exécute une requête de lecture et retourne la première colonne de la première ligne"""
+        with self.connection() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    # ----- Journaux système -----
+
+    def add_log(self, level: str, source: str, message: str, details: Optional[str] = None,
+                timestamp: Optional[str] = None):
+        """
+        Ajoute un journal système au tampon d'écriture
+
+        Args:
+            level: Niveau du journal
+            source: Source du journal
+            message: Message
+            details: Détails supplémentaires
+            timestamp: Horodatage ISO (maintenant par défaut)
+        """
+        row = (timestamp or datetime.now().isoformat(), level, source, message, details)
+        with self._log_condition:
+            self._log_buffer.append(row)
+            pending = len(self._log_buffer)
+            if self._writer is None and not self._closed:
+                self._writer = threading.Thread(target=self._write_logs, name="AdminLogWriter", daemon=True)
+                self._writer.start()
+            elif pending >= self.config["log_batch_size"]:
+                self._log_condition.notify()
+
+        # Tampon saturé (écritures plus rapides que le disque) ou base fermée: écrire tout de suite
+        if self._closed or pending >= self.config["log_max_buffer"]:
+            self.flush()
+
+    def _write_logs(self):
+        """Boucle du thread d'écriture: vide le tampon par lots"""
+        interval = self.config["log_flush_interval"]
+        batch_size = self.config["log_batch_size"]
+        while True:
+            with self._log_condition:
+                self._log_condition.wait_for(
+                    lambda: self._closed or len(self._log_buffer) >= batch_size, timeout=interval
+                )
+                stopping = self._closed
+            self.flush()
+            if stopping:
+                return
+
+    def flush(self) -> int:
+        """
+        Écrit les journaux en attente en une seule transaction
+
+        Returns:
+            int: Nombre de journaux écrits
+        """
+        with self._flush_lock:
+            with self._log_condition:
+                rows, self._log_buffer = self._log_buffer, []
+            if not rows:
+                return 0
+            try:
+                with self.connection() as conn, conn:
+                    conn.executemany(INSERT_LOG_SQL, rows)
+                return len(rows)
+            except sqlite3.Error as e:
+                logger.error(f"Erreur lors de l'écriture de {len(rows)} journaux système: {e}")
+                # Conserver les journaux pour la prochaine écriture, dans la limite du tampon
+                with self._log_condition:
+                    self._log_buffer[:0] = rows
+                    del self._log_buffer[:-self.config["log_max_buffer"]]
+                return 0
+
+    def pending_logs(self) -> int:
+        """Nombre de journaux en attente d'écriture"""
+        with self._log_condition:
+            return len(self._log_buffer)
+
+    def get_logs(self, level: Optional[str] = None, source: Optional[str] = None,
+                 date_from: Optional[str] = None, date_to: Optional[str] = None,
+                 search_text: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Récupère les journaux système, les plus récents d'abord
+
+        Args:
+            level: Niveau à filtrer
+            source: Source à filtrer
+            date_from: Date de début (ISO)
+            date_to: Date de fin (ISO)
+            search_text: Texte recherché dans le message ou les détails
+            limit: Nombre maximum de journaux
+
+        Returns:
+            List[Dict[str, Any]]: Journaux
+        """
+        self.flush()
+        clauses, params = [], []
+        if level:
+            clauses.append("level = ?")
+            params.append(level)
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if date_from:
+            clauses.append("timestamp >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("timestamp <= ?")
+            params.append(date_to)
+        if search_text:
+            clauses.append("(message LIKE ? OR details LIKE ?)")
+            params.extend([f"%{search_text}%", f"%{search_text}%"])
+        params.append(limit)
+        return self.fetch_all(_select("system_logs", clauses), params)
+
+    def count_errors_since(self, since: str) -> int:
+        """Nombre de journaux ERROR ou CRITICAL depuis une date (ISO)"""
+        self.flush()
+        return self.fetch_value(COUNT_ERRORS_SINCE_SQL, (since,)) or 0
+
+    # ----- Métriques système -----
+
+    def add_metrics(self, timestamp: str, cpu_usage: float, memory_usage: float, disk_usage: float,
+                    active_users: int, response_time: float):
+        """Enregistre un relevé de métriques système"""
+        self.execute(INSERT_METRICS_SQL,
+                     (timestamp, cpu_usage, memory_usage, disk_usage, active_users, response_time))
+
+    def iter_metrics(self, batch_size: int = 5000) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt tous les relevés bruts par ordre chronologique, par lots
+
+        Yields:
+            Dict[str, Any]: Relevé
+        """
+        for rows in self.iter_metric_batches(batch_size=batch_size):
+            yield from rows
+
+    def iter_metric_batches(self, after_id: int = 0, until_id: Optional[int] = None,
+                            batch_size: int = 5000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Parcourt les relevés bruts par lots, par ID croissant
+
+        Args:
+            after_id: Ne parcourir que les relevés d'ID supérieur
+            until_id: ID maximal inclus (tous les relevés si None)
+            batch_size: Taille des lots
+
+        Yields:
+            List[Dict[str, Any]]: Lot de relevés
+        """
+        sql = "SELECT * FROM system_metrics WHERE id > ?"
+        if until_id is not None:
+            sql += " AND id <= ?"
+        sql += " ORDER BY id LIMIT ?"
+
+        last_id = after_id
+        while True:
+            params = (last_id, until_id, batch_size) if until_id is not None else (last_id, batch_size)
+            rows = self.fetch_all(sql, params)
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
+
+    def delete_metrics_before(self, before: str) -> int:
+        """
+        Supprime les relevés bruts antérieurs à une date
+
+        Args:
+            before: Date limite (ISO)
+
+        Returns:
+            int: Nombre de relevés supprimés
+        """
+        return self.execute("DELETE FROM system_metrics WHERE timestamp < ?", (before,))
+
+    # ----- Actions administratives -----
+
+    def add_action(self, user_id: str, action_type: str, details: Optional[str] = None,
+                   ip_address: Optional[str] = None, timestamp: Optional[str] = None):
+        """Enregistre une action administrative (audit), écrite immédiatement"""
+        self.execute(INSERT_ACTION_SQL,
+                     (timestamp or datetime.now().isoformat(), user_id, action_type, details, ip_address))
+
+    def get_actions(self, user_id: Optional[str] = None, action_type: Optional[str] = None,
+                    start_date: Optional[str] = None, end_date: Optional[str] = None,
+                    limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Récupère les actions administratives, les plus récentes d'abord
+
+        Args:
+            user_id: Utilisateur à filtrer
+            action_type: Type d'action à filtrer
+            start_date: Date de début (ISO)
+            end_date: Date de fin (ISO)
+            limit: Nombre maximum d'actions
+
+        Returns:
+            List[Dict[str, Any]]: Actions
+        """
+        clauses, params = [], []
+        if user_id:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if action_type:
+            clauses.append("action_type = ?")
+            params.append(action_type)
+        if start_date:
+            clauses.append("timestamp >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("timestamp <= ?")
+            params.append(end_date)
+        params.append(limit)
+        return self.fetch_all(_select("admin_actions", clauses), params)
+
+    def count_actions_since(self, action_type: str, since: str) -> int:
+        """Nombre d'actions d'un type depuis une date (ISO)"""
+        return self.fetch_value(COUNT_ACTIONS_SINCE_SQL, (action_type, since)) or 0
+
+    # ----- Maintenance -----
+
+    def list_tables(self) -> List[str]:
+        """Noms des tables de la base"""
+        with self.connection() as conn:
+            return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+
+    def integrity_check(self) -> str:
+        """Résultat de PRAGMA integrity_check ("ok" si la base est saine)"""
+        self.flush()
+        return self.fetch_value("PRAGMA integrity_check")
+
+    def optimize(self):
+        """Compacte la base et reconstruit les index"""
+        self.flush()
+        with self.connection() as conn:
+            conn.execute("VACUUM")
+            conn.execute("REINDEX")
+            conn.execute("PRAGMA optimize")
+
+    def close(self):
+        """Écrit les journaux en attente et ferme les connexions"""
+        with self._log_condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._log_condition.notify_all()
+            writer = self._writer
+        if writer is not None:
+            writer.join(timeout=self.config["pool_timeout"])
+
+        self.flush()
+        try:
+            with self.connection() as conn:
+                conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        self.release_connections()
+        atexit.unregister(self.close)
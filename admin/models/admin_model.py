@@ -11,10 +11,27 @@ import shutil
 import hashlib
 import threading
 import sqlite3
+import zipfile
 from datetime import datetime, timedelta
 import psutil
 import platform
 
+from admin.models.admin_db import AdminDatabase
+from admin.models.log_index import LogIndex
+from monitoring.rollups import MetricRollups
+from utils.backup_store import BackupStore
+
+# Métriques système agrégées pour les graphiques
+SYSTEM_METRICS = ("cpu_usage", "memory_usage", "disk_usage", "active_users", "response_time")
+
+# Résolution des agrégats affichés pour chaque période
+METRICS_PERIODS = {
+    "hour": (timedelta(hours=1), "minute"),
+    "day": (timedelta(days=1), "hour"),
+    "week": (timedelta(weeks=1), "hour"),
+    "month": (timedelta(days=30), "day"),
+}
+
 logger = logging.getLogger("VynalDocsAutomator.Admin.Model")
 
 class AdminModel:
@@ -74,6 +91,15 @@ class AdminModel:
         # Modèle de licences
         self._license_model = None
         
+        # Base SQLite (journaux, métriques, audit), initialisée par _init_database
+        self.db = None
+        self._log_index = None
+        self.metric_rollups = None
+        self._last_metrics_retention = None
+        
+        # Dépôt des sauvegardes dédupliquées (lazy-loading)
+        self._backup_store = None
+        
         # Initialisation
         self._init_directories()
         self._init_data_files()
@@ -470,17 +496,10 @@ class AdminModel:
         Returns:
             bool: True si l'ajout a réussi
         """
+        if self.db is None:
+            return False
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "INSERT INTO admin_actions (timestamp, user_id, action_type, details, ip_address) VALUES (?, ?, ?, ?, ?)",
-                (datetime.now().isoformat(), user_id, action_type, details, ip_address)
-            )
-            
-            conn.commit()
-            conn.close()
+            self.db.add_action(user_id, action_type, details, ip_address)
             return True
         except sqlite3.Error as e:
             logger.error(f"Erreur lors de l'ajout d'une action administrative: {e}")
@@ -500,48 +519,23 @@ class AdminModel:
         Returns:
             list: Liste des actions administratives
         """
+        if self.db is None:
+            return []
         try:
-            conn = sqlite3.connect(self.db_file)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            query = "SELECT * FROM admin_actions WHERE 1=1"
-            params = []
-            
-            if user_id:
-                query += " AND user_id = ?"
-                params.append(user_id)
-            
-            if action_type:
-                query += " AND action_type = ?"
-                params.append(action_type)
-            
-            if start_date:
-                query += " AND timestamp >= ?"
-                params.append(start_date.isoformat())
-            
-            if end_date:
-                query += " AND timestamp <= ?"
-                params.append(end_date.isoformat())
-            
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            # Convertir en liste de dictionnaires
-            result = [dict(row) for row in rows]
-            
-            conn.close()
-            return result
+            return self.db.get_actions(
+                user_id=user_id,
+                action_type=action_type,
+                start_date=start_date.isoformat() if start_date else None,
+                end_date=end_date.isoformat() if end_date else None,
+                limit=limit
+            )
         except sqlite3.Error as e:
             logger.error(f"Erreur lors de la récupération des actions administratives: {e}")
             return []
     
     def add_system_log(self, level, source, message, details=None):
         """
-        Ajoute une entrée au journal système
+        Ajoute une entrée au journal système (écrite par lot en arrière-plan)
         
         Args:
             level: Niveau de log ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
@@ -552,17 +546,10 @@ class AdminModel:
         Returns:
             bool: True si l'ajout a réussi
         """
+        if self.db is None:
+            return False
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "INSERT INTO system_logs (timestamp, level, source, message, details) VALUES (?, ?, ?, ?, ?)",
-                (datetime.now().isoformat(), level, source, message, details)
-            )
-            
-            conn.commit()
-            conn.close()
+            self.db.add_log(level, source, message, details)
             return True
         except sqlite3.Error as e:
             logger.error(f"Erreur lors de l'ajout d'un log système: {e}")
@@ -577,51 +564,37 @@ class AdminModel:
             source: Source à filtrer
             date_from: Date de début
             date_to: Date de fin
-            search_text: Texte à rechercher
+            search_text: Texte à rechercher (chaque mot par préfixe lorsque l'index
+                         des journaux est disponible, sinon par sous-chaîne)
             limit: Nombre maximum de logs à récupérer
             
         Returns:
             list: Liste des logs système
         """
+        if self.db is None:
+            return []
         try:
-            conn = sqlite3.connect(self.db_file)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            query = "SELECT * FROM system_logs WHERE 1=1"
-            params = []
-            
-            if level:
-                query += " AND level = ?"
-                params.append(level)
-            
-            if source:
-                query += " AND source = ?"
-                params.append(source)
-            
-            if date_from:
-                query += " AND timestamp >= ?"
-                params.append(date_from.isoformat())
-            
-            if date_to:
-                query += " AND timestamp <= ?"
-                params.append(date_to.isoformat())
-            
-            if search_text:
-                query += " AND (message LIKE ? OR details LIKE ?)"
-                params.extend([f"%{search_text}%", f"%{search_text}%"])
-            
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            # Convertir en liste de dictionnaires
-            result = [dict(row) for row in rows]
-            
-            conn.close()
-            return result
+            if search_text and self.log_index is not None:
+                # Recherche plein texte classée par pertinence (mots cherchés par préfixe,
+                # voir LogIndex.search_database)
+                return self.log_index.search_database(
+                    search_text,
+                    level=level,
+                    source=source,
+                    date_from=date_from.isoformat() if date_from else None,
+                    date_to=date_to.isoformat() if date_to else None,
+                    order="rank",
+                    limit=limit
+                )["entries"]
+            
+            return self.db.get_logs(
+                level=level,
+                source=source,
+                date_from=date_from.isoformat() if date_from else None,
+                date_to=date_to.isoformat() if date_to else None,
+                search_text=search_text,
+                limit=limit
+            )
         except sqlite3.Error as e:
             logger.error(f"Erreur lors de la récupération des logs système: {e}")
             return []
@@ -750,6 +723,8 @@ class AdminModel:
         Returns:
             dict: Métriques enregistrées
         """
+        if self.db is None or self.metric_rollups is None:
+            return None
         try:
             # Récupérer les métriques
             cpu_usage = psutil.cpu_percent(interval=0.1)
@@ -765,20 +740,12 @@ class AdminModel:
             response_time = 0.2  # Remplacer par une vraie valeur
             
             # Enregistrer dans la base de données
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "INSERT INTO system_metrics (timestamp, cpu_usage, memory_usage, disk_usage, active_users, response_time) VALUES (?, ?, ?, ?, ?, ?)",
-                (datetime.now().isoformat(), cpu_usage, memory_usage, disk_usage, active_users, response_time)
-            )
-            
-            conn.commit()
-            conn.close()
+            timestamp = datetime.now().isoformat()
+            self.db.add_metrics(timestamp, cpu_usage, memory_usage, disk_usage, active_users, response_time)
             
             # Retourner les métriques
             metrics = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": timestamp,
                 "cpu_usage": cpu_usage,
                 "memory_usage": memory_usage,
                 "disk_usage": disk_usage,
@@ -786,6 +753,10 @@ class AdminModel:
                 "response_time": response_time
             }
             
+            # Mettre à jour les agrégats servant aux graphiques
+            self.metric_rollups.add(timestamp, {name: metrics[name] for name in SYSTEM_METRICS})
+            self._apply_metrics_retention()
+            
             # Vérifier les seuils critiques
             self.check_critical_thresholds(metrics)
             
@@ -846,71 +817,34 @@ class AdminModel:
         Returns:
             list: Liste des métriques
         """
+        if self.metric_rollups is None:
+            return []
         try:
-            # Déterminer la date de début
-            now = datetime.now()
-            if period == "hour":
-                start_date = now - timedelta(hours=1)
-            elif period == "day":
-                start_date = now - timedelta(days=1)
-            elif period == "week":
-                start_date = now - timedelta(weeks=1)
-            elif period == "month":
-                start_date = now - timedelta(days=30)
-            else:
-                start_date = now - timedelta(days=1)  # Par défaut: 1 jour
-            
-            conn = sqlite3.connect(self.db_file)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Limiter le nombre de points pour éviter de surcharger l'interface
-            if period == "hour":
-                interval = "5 minutes"
-                max_points = 12
-            elif period == "day":
-                interval = "1 hour"
-                max_points = 24
-            elif period == "week":
-                interval = "4 hours"
-                max_points = 42
-            else:  # month
-                interval = "1 day"
-                max_points = 30
-            
-            # Requête avec échantillonnage
-            query = f"""
-            WITH numbered_rows AS (
-                SELECT
-                    timestamp,
-                    cpu_usage,
-                    memory_usage,
-                    disk_usage,
-                    active_users,
-                    response_time,
-                    ROW_NUMBER() OVER (ORDER BY timestamp DESC) as row_num
-                FROM
-                    system_metrics
-                WHERE
-                    timestamp >= ?
-            )
-            SELECT * FROM numbered_rows
-            WHERE (row_num - 1) % (CAST((SELECT COUNT(*) FROM numbered_rows) AS REAL) / ? + 1) < 1
-            ORDER BY timestamp
-            """
+            # Par défaut: 1 jour
+            duration, resolution = METRICS_PERIODS.get(period, METRICS_PERIODS["day"])
             
-            cursor.execute(query, (start_date.isoformat(), max_points))
-            rows = cursor.fetchall()
-            
-            # Convertir en liste de dictionnaires
-            result = [dict(row) for row in rows]
-            
-            conn.close()
-            return result
+            # Un point agrégé (moyenne, min, max, p95) par intervalle de la période
+            return self.metric_rollups.series(SYSTEM_METRICS, resolution, datetime.now() - duration)
         except sqlite3.Error as e:
             logger.error(f"Erreur lors de la récupération des métriques système: {e}")
             return []
     
+    def _apply_metrics_retention(self):
+        """
+        Supprime (au plus une fois par heure) les relevés bruts et les agrégats
+        dépassant leur durée de conservation
+        """
+        now = datetime.now()
+        if self._last_metrics_retention and now - self._last_metrics_retention < timedelta(hours=1):
+            return
+        self._last_metrics_retention = now
+        
+        retention = timedelta(days=self.db.config["metrics_retention_days"])
+        removed = self.db.delete_metrics_before((now - retention).isoformat())
+        removed += self.metric_rollups.apply_retention(now)
+        if removed:
+            logger.info(f"{removed} relevé(s) et agrégat(s) de métriques expirés supprimés")
+    
     def get_system_info(self):
         """
         Récupère les informations système actuelles
@@ -957,56 +891,43 @@ class AdminModel:
     
     def perform_backup(self, backup_type="full"):
         """
-        Effectue une sauvegarde des données
+        Effectue une sauvegarde des données dans le dépôt dédupliqué: seuls les
+        blocs modifiés depuis les sauvegardes précédentes sont écrits
         
         Args:
-            backup_type: Type de sauvegarde ('full', 'incremental')
+            backup_type: Type de sauvegarde ('full': tous les fichiers sont relus,
+                         'incremental': les fichiers dont la taille et la date de
+                         modification n'ont pas changé ne sont pas relus)
             
         Returns:
             dict: Informations sur la sauvegarde effectuée
         """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"backup_{backup_type}_{timestamp}.zip"
-            backup_path = os.path.join(self.backup_dir, backup_filename)
-            
-            # Créer un fichier zip
-            with shutil.ZipFile(backup_path, 'w', shutil.ZIP_DEFLATED) as zipf:
-                # Ajouter les fichiers de données
-                data_files = [self.users_file, self.activities_file, self.alerts_file, self.stats_file]
-                for file in data_files:
-                    if os.path.exists(file):
-                        zipf.write(file, os.path.basename(file))
-                
-                # Ajouter la base de données
-                if os.path.exists(self.db_file):
-                    conn = sqlite3.connect(self.db_file)
-                    # Créer une sauvegarde de la base de données
-                    backup_db = os.path.join(self.temp_dir, "admin_backup.db")
-                    with open(backup_db, 'wb') as f:
-                        for line in conn.iterdump():
-                            f.write(f"{line}\n".encode('utf-8'))
-                    conn.close()
-                    
-                    # Ajouter la sauvegarde au zip
-                    zipf.write(backup_db, "admin.db")
-                    
-                    # Supprimer le fichier temporaire
-                    os.remove(backup_db)
-                
-                # Si c'est une sauvegarde complète, ajouter d'autres dossiers
-                if backup_type == "full" and hasattr(self.app_model, 'data_dir'):
-                    app_data_dir = self.app_model.data_dir
-                    
-                    # Parcourir le répertoire des données de l'application
-                    for root, dirs, files in os.walk(app_data_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            # Exclure les très gros fichiers ou les fichiers temporaires
-                            if os.path.getsize(file_path) < 100 * 1024 * 1024:  # 100 Mo max
-                                # Chemin relatif dans le zip
-                                rel_path = os.path.relpath(file_path, os.path.dirname(app_data_dir))
-                                zipf.write(file_path, os.path.join("app_data", rel_path))
+            sources = {
+                os.path.basename(path): path
+                for path in (self.users_file, self.activities_file, self.alerts_file, self.stats_file)
+            }
+            databases = {}
+            excludes = []
+            
+            # Base d'administration, copiée avec l'API de sauvegarde en ligne
+            if self.db is not None and os.path.exists(self.db_file):
+                self.db.flush()
+                databases["admin.db"] = self.db_file
+            
+            # Données de l'application (documents, modèles, base SQLite)
+            if hasattr(self.app_model, 'data_dir'):
+                sources["app_data"] = self.app_model.data_dir
+                store = getattr(self.app_model, 'store', None)
+                if store is not None and hasattr(store, 'db_path'):
+                    databases["app_data.db"] = store.db_path
+                paths = getattr(self.app_model, 'paths', {})
+                if 'backup' in paths:
+                    excludes.append(paths['backup'])
+            
+            snapshot = self.backup_store.create_snapshot(
+                sources, databases, full=(backup_type == "full"), label=backup_type, excludes=excludes
+            )
             
             # Mettre à jour la date de dernière sauvegarde
             self.last_backup_time = datetime.now()
@@ -1015,15 +936,21 @@ class AdminModel:
             # Nettoyer les anciennes sauvegardes
             self.cleanup_old_backups()
             
+            stats = snapshot["stats"]
             # Journaliser
-            self.add_activity("Sauvegarde effectuée", f"Type: {backup_type}, Fichier: {backup_filename}")
+            self.add_activity(
+                "Sauvegarde effectuée",
+                f"Type: {backup_type}, Sauvegarde: {snapshot['id']}, "
+                f"{stats['files']} fichiers, {self.format_size(stats['stored_bytes'])} écrits"
+            )
             
             return {
                 "type": backup_type,
-                "file": backup_filename,
-                "path": backup_path,
-                "size": os.path.getsize(backup_path),
-                "timestamp": datetime.now().isoformat()
+                "file": snapshot["id"],
+                "path": snapshot["path"],
+                "size": stats["size"],
+                "stored": stats["stored_bytes"],
+                "timestamp": snapshot["created"]
             }
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde: {e}")
@@ -1034,80 +961,64 @@ class AdminModel:
             )
             return None
     
-    def restore_backup(self, backup_file):
+    def restore_backup(self, backup_file, paths=None):
         """
         Restaure une sauvegarde
         
         Args:
-            backup_file: Chemin du fichier de sauvegarde
+            backup_file: Identifiant de la sauvegarde, chemin de son manifeste
+                         ou chemin d'une ancienne sauvegarde ZIP
+            paths: Fichiers ou dossiers à restaurer sous leur nom dans la sauvegarde
+                   (par exemple "app_data/documents/contrat.pdf"); tout par défaut
             
         Returns:
             bool: True si la restauration a réussi
         """
         try:
-            # Vérifier que le fichier existe
-            if not os.path.exists(backup_file):
-                logger.error(f"Fichier de sauvegarde non trouvé: {backup_file}")
-                return False
+            if backup_file.endswith(".zip"):
+                return self._restore_zip_backup(backup_file)
             
-            # Créer un répertoire temporaire pour la restauration
-            restore_dir = os.path.join(self.temp_dir, f"restore_{int(time.time())}")
-            os.makedirs(restore_dir, exist_ok=True)
+            manifest = self.backup_store.load_snapshot(backup_file)
+            if manifest is None:
+                logger.error(f"Sauvegarde non trouvée: {backup_file}")
+                return False
             
-            # Extraire la sauvegarde
-            with shutil.ZipFile(backup_file, 'r') as zipf:
-                zipf.extractall(restore_dir)
+            def selected(name):
+                return paths is None or any(
+                    name == path.strip("/") or name.startswith(path.strip("/") + "/") for path in paths
+                )
             
-            # Restaurer les fichiers de données
-            data_files = {
-                "users.json": self.users_file,
-                "activities.json": self.activities_file,
-                "alerts.json": self.alerts_file,
-                "statistics.json": self.stats_file
-            }
+            restore_admin_db = "admin.db" in manifest["files"] and selected("admin.db")
+            restore_app_db = "app_data.db" in manifest["files"] and selected("app_data.db")
+            app_store = getattr(self.app_model, 'store', None)
             
-            for src_name, dest_path in data_files.items():
-                src_path = os.path.join(restore_dir, src_name)
-                if os.path.exists(src_path):
-                    # Créer le répertoire de destination si nécessaire
-                    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-                    # Copier le fichier
-                    shutil.copy2(src_path, dest_path)
-            
-            # Restaurer la base de données
-            db_backup = os.path.join(restore_dir, "admin.db")
-            if os.path.exists(db_backup):
-                # Sauvegarder la base de données actuelle
+            # Fermer les connexions avant de remplacer les fichiers des bases
+            if restore_admin_db and self.db is not None:
+                self.db.flush()
+                self.db.release_connections()
                 if os.path.exists(self.db_file):
                     shutil.copy2(self.db_file, f"{self.db_file}.bak")
-                
-                # Restaurer depuis la sauvegarde
-                shutil.copy2(db_backup, self.db_file)
+            if restore_app_db and app_store is not None:
+                app_store.close()
             
-            # Restaurer les données de l'application si présentes
-            app_data_dir = os.path.join(restore_dir, "app_data")
-            if os.path.exists(app_data_dir) and hasattr(self.app_model, 'data_dir'):
-                # Parcourir les fichiers restaurés
-                for root, dirs, files in os.walk(app_data_dir):
-                    rel_path = os.path.relpath(root, app_data_dir)
-                    # Créer les répertoires nécessaires
-                    if rel_path != '.':
-                        os.makedirs(os.path.join(self.app_model.data_dir, rel_path), exist_ok=True)
-                    
-                    # Copier les fichiers
-                    for file in files:
-                        src_file = os.path.join(root, file)
-                        dest_file = os.path.join(self.app_model.data_dir, rel_path, file)
-                        shutil.copy2(src_file, dest_file)
+            try:
+                restored = self.backup_store.restore(manifest["id"], paths=paths)
+            finally:
+                if restore_app_db and hasattr(self.app_model, 'reopen_store'):
+                    self.app_model.reopen_store()
+            
+            # La base n'avait pas pu être ouverte au démarrage: réessayer avec la copie restaurée
+            if restore_admin_db and self.db is None:
+                self._init_database()
             
             # Recharger les données
             self._load_data()
             
-            # Nettoyer le répertoire temporaire
-            shutil.rmtree(restore_dir)
-            
             # Journaliser
-            self.add_activity("Sauvegarde restaurée", f"Fichier: {os.path.basename(backup_file)}")
+            self.add_activity(
+                "Sauvegarde restaurée",
+                f"Sauvegarde: {manifest['id']}, {len(restored)} fichier(s)"
+            )
             
             return True
         except Exception as e:
@@ -1119,9 +1030,107 @@ class AdminModel:
             )
             return False
     
+    def _restore_zip_backup(self, backup_file):
+        """
+        Restaure une ancienne sauvegarde ZIP (antérieure au dépôt dédupliqué)
+        
+        Args:
+            backup_file: Chemin du fichier de sauvegarde
+            
+        Returns:
+            bool: True si la restauration a réussi
+        """
+        # Vérifier que le fichier existe
+        if not os.path.exists(backup_file):
+            logger.error(f"Fichier de sauvegarde non trouvé: {backup_file}")
+            return False
+        
+        # Créer un répertoire temporaire pour la restauration
+        restore_dir = os.path.join(self.temp_dir, f"restore_{int(time.time())}")
+        os.makedirs(restore_dir, exist_ok=True)
+        
+        # Extraire la sauvegarde
+        with zipfile.ZipFile(backup_file, 'r') as zipf:
+            zipf.extractall(restore_dir)
+        
+        # Restaurer les fichiers de données
+        data_files = {
+            "users.json": self.users_file,
+            "activities.json": self.activities_file,
+            "alerts.json": self.alerts_file,
+            "statistics.json": self.stats_file
+        }
+        
+        for src_name, dest_path in data_files.items():
+            src_path = os.path.join(restore_dir, src_name)
+            if os.path.exists(src_path):
+                # Créer le répertoire de destination si nécessaire
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                # Copier le fichier
+                shutil.copy2(src_path, dest_path)
+        
+        # Restaurer la base de données
+        db_backup = os.path.join(restore_dir, "admin.db")
+        if os.path.exists(db_backup):
+            # Fermer les connexions du pool avant de remplacer le fichier
+            if self.db is not None:
+                self.db.release_connections()
+            
+            # Sauvegarder la base de données actuelle
+            if os.path.exists(self.db_file):
+                shutil.copy2(self.db_file, f"{self.db_file}.bak")
+            
+            with open(db_backup, 'rb') as f:
+                is_database = f.read(16) == b"SQLite format 3\x00"
+            if is_database:
+                shutil.copy2(db_backup, self.db_file)
+            else:
+                # Les anciennes sauvegardes contiennent un export SQL (iterdump)
+                if os.path.exists(self.db_file):
+                    os.remove(self.db_file)
+                with open(db_backup, 'r', encoding='utf-8') as f:
+                    script = f.read()
+                conn = sqlite3.connect(self.db_file)
+                try:
+                    conn.executescript(script)
+                finally:
+                    conn.close()
+            
+            # La base n'avait pas pu être ouverte au démarrage: réessayer avec la copie restaurée
+            if self.db is None:
+                self._init_database()
+        
+        # Restaurer les données de l'application si présentes
+        app_data_dir = os.path.join(restore_dir, "app_data")
+        if os.path.exists(app_data_dir) and hasattr(self.app_model, 'data_dir'):
+            # Parcourir les fichiers restaurés
+            for root, dirs, files in os.walk(app_data_dir):
+                rel_path = os.path.relpath(root, app_data_dir)
+                # Créer les répertoires nécessaires
+                if rel_path != '.':
+                    os.makedirs(os.path.join(self.app_model.data_dir, rel_path), exist_ok=True)
+                
+                # Copier les fichiers
+                for file in files:
+                    src_file = os.path.join(root, file)
+                    dest_file = os.path.join(self.app_model.data_dir, rel_path, file)
+                    shutil.copy2(src_file, dest_file)
+        
+        # Recharger les données
+        self._load_data()
+        
+        # Nettoyer le répertoire temporaire
+        shutil.rmtree(restore_dir)
+        
+        # Journaliser
+        self.add_activity("Sauvegarde restaurée", f"Fichier: {os.path.basename(backup_file)}")
+        
+        return True
+    
     def cleanup_old_backups(self):
         """
         Nettoie les anciennes sauvegardes en fonction des paramètres
+        (les blocs qui ne servent plus à aucune sauvegarde sont supprimés)
         
         Returns:
             int: Nombre de sauvegardes supprimées
@@ -1136,7 +1145,9 @@ class AdminModel:
                 except ValueError:
                     pass
             
-            # Lister toutes les sauvegardes
+            deleted_count = self.backup_store.prune(max_backups)
+            
+            # Anciennes sauvegardes ZIP
             backup_files = []
             for file in os.listdir(self.backup_dir):
                 if file.startswith("backup_") and file.endswith(".zip"):
@@ -1147,7 +1158,6 @@ class AdminModel:
             backup_files.sort(key=lambda x: x[1])
             
             # Supprimer les plus anciennes
-            deleted_count = 0
             if len(backup_files) > max_backups:
                 for file_path, _ in backup_files[:-max_backups]:
                     os.remove(file_path)
@@ -1167,6 +1177,17 @@ class AdminModel:
         """
         try:
             backups = []
+            for snapshot in self.backup_store.list_snapshots():
+                backups.append({
+                    "filename": snapshot["id"],
+                    "type": snapshot["type"],
+                    "date": snapshot["created"],
+                    "size": snapshot["stats"]["size"],
+                    "stored": snapshot["stats"]["stored_bytes"],
+                    "path": snapshot["path"]
+                })
+            
+            # Anciennes sauvegardes ZIP
             for file in os.listdir(self.backup_dir):
                 if file.startswith("backup_") and file.endswith(".zip"):
                     file_path = os.path.join(self.backup_dir, file)
@@ -1229,28 +1250,24 @@ class AdminModel:
                     issues.append(f"Fichier JSON corrompu: {label} ({e})")
             
             # Vérifier la base de données
-            try:
-                conn = sqlite3.connect(self.db_file)
-                cursor = conn.cursor()
-                
-                # Vérifier les tables
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-                tables = [row[0] for row in cursor.fetchall()]
-                
-                expected_tables = ["system_logs", "system_metrics", "admin_actions"]
-                for table in expected_tables:
-                    if table not in tables:
-                        issues.append(f"Table manquante dans la base de données: {table}")
-                
-                # Vérifier PRAGMA integrity_check
-                cursor.execute("PRAGMA integrity_check;")
-                integrity_result = cursor.fetchone()[0]
-                if integrity_result != "ok":
-                    issues.append(f"Intégrité de la base de données compromise: {integrity_result}")
-                
-                conn.close()
-            except sqlite3.Error as e:
-                issues.append(f"Erreur de base de données: {e}")
+            if self.db is None:
+                issues.append("Base de données indisponible")
+            else:
+                try:
+                    # Vérifier les tables
+                    tables = self.db.list_tables()
+                    
+                    expected_tables = ["system_logs", "system_metrics", "admin_actions"]
+                    for table in expected_tables:
+                        if table not in tables:
+                            issues.append(f"Table manquante dans la base de données: {table}")
+                    
+                    # Vérifier PRAGMA integrity_check
+                    integrity_result = self.db.integrity_check()
+                    if integrity_result != "ok":
+                        issues.append(f"Intégrité de la base de données compromise: {integrity_result}")
+                except sqlite3.Error as e:
+                    issues.append(f"Erreur de base de données: {e}")
             
             # Vérifier les références entre utilisateurs et activités
             try:
@@ -1296,18 +1313,11 @@ class AdminModel:
         Returns:
             bool: True si l'optimisation a réussi
         """
+        if self.db is None:
+            return False
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # Exécuter VACUUM pour compacter la base de données
-            cursor.execute("VACUUM;")
-            
-            # Reconstruire les index
-            cursor.execute("REINDEX;")
-            
-            conn.commit()
-            conn.close()
+            # VACUUM pour compacter la base de données, puis reconstruction des index
+            self.db.optimize()
             
             # Mettre à jour les statistiques
             self.update_statistics("last_optimization", datetime.now().isoformat())
@@ -1441,27 +1451,15 @@ class AdminModel:
                     results["users"] += 1
             
             # Connexions (depuis les actions admin)
-            try:
-                conn = sqlite3.connect(self.db_file)
-                cursor = conn.cursor()
-                
-                # Compter les connexions
-                cursor.execute(
-                    "SELECT COUNT(*) FROM admin_actions WHERE action_type = 'login' AND timestamp >= ?",
-                    (start_date_str,)
-                )
-                results["logins"] = cursor.fetchone()[0]
-                
-                # Compter les erreurs
-                cursor.execute(
-                    "SELECT COUNT(*) FROM system_logs WHERE level IN ('ERROR', 'CRITICAL') AND timestamp >= ?",
-                    (start_date_str,)
-                )
-                results["errors"] = cursor.fetchone()[0]
-                
-                conn.close()
-            except sqlite3.Error as e:
-                logger.error(f"Erreur lors de la récupération des statistiques de connexion: {e}")
+            if self.db is not None:
+                try:
+                    # Compter les connexions
+                    results["logins"] = self.db.count_actions_since("login", start_date_str)
+                    
+                    # Compter les erreurs
+                    results["errors"] = self.db.count_errors_since(start_date_str)
+                except sqlite3.Error as e:
+                    logger.error(f"Erreur lors de la récupération des statistiques de connexion: {e}")
             
             # Données pour graphique (activités par jour)
             if len(recent_activities) > 0:
@@ -1898,6 +1896,37 @@ class AdminModel:
         if self.main_view and hasattr(self.main_view, 'show_password_reset_view'):
             self.main_view.show_password_reset_view()
     
+    @property
+    def log_index(self):
+        """
+        Récupère l'index de recherche des journaux (lazy-loading)
+        
+        Returns:
+            LogIndex: Index des journaux système et des fichiers de log
+        """
+        if self._log_index is None and self.db is not None:
+            try:
+                self._log_index = LogIndex(self.db)
+                # Journaux existants indexés hors du thread de l'interface
+                self._log_index.start_database_build()
+                logger.info("Index des journaux initialisé")
+            except Exception as e:
+                logger.error(f"Erreur lors de l'initialisation de l'index des journaux: {e}")
+                self._log_index = None
+        return self._log_index
+    
+    @property
+    def backup_store(self):
+        """
+        Récupère le dépôt des sauvegardes (lazy-loading)
+        
+        Returns:
+            BackupStore: Dépôt adressé par contenu des sauvegardes
+        """
+        if self._backup_store is None:
+            self._backup_store = BackupStore(os.path.join(self.backup_dir, "store"))
+        return self._backup_store
+    
     # Méthodes de gestion des licences
     
     @property
@@ -2340,55 +2369,51 @@ class AdminModel:
     def _init_database(self):
         """
         Initialise la base de données SQLite pour les données complexes ou volumineuses
+        (journaux système, métriques et actions administratives, avec leurs index)
         """
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # Table des journaux système (pour une meilleure performance avec de grands volumes)
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS system_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                level TEXT NOT NULL,
-                source TEXT NOT NULL,
-                message TEXT NOT NULL,
-                details TEXT
-            )
-            ''')
-            
-            # Table des métriques système (pour les statistiques historiques)
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS system_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                cpu_usage REAL,
-                memory_usage REAL,
-                disk_usage REAL,
-                active_users INTEGER,
-                response_time REAL
-            )
-            ''')
-            
-            # Table des actions administratives (pour audit)
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admin_actions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                user_id TEXT NOT NULL,
-                action_type TEXT NOT NULL,
-                details TEXT,
-                ip_address TEXT
-            )
-            ''')
+            self.db = AdminDatabase(self.db_file)
             
-            conn.commit()
-            conn.close()
+            # Agrégats des métriques; les relevés existants sont agrégés en arrière-plan
+            self.metric_rollups = MetricRollups(self.db, name="system_metrics")
+            pending = self.metric_rollups.backfill_range(
+                self.db.fetch_value("SELECT COALESCE(MAX(id), 0) FROM system_metrics")
+            )
+            if pending:
+                threading.Thread(target=self._backfill_metric_rollups, args=pending,
+                                 name="MetricRollupsBackfill", daemon=True).start()
             
             logger.info("Base de données initialisée")
-        except sqlite3.Error as e:
+        except (sqlite3.Error, OSError) as e:
             logger.error(f"Erreur lors de l'initialisation de la base de données: {e}")
-            # Continuer malgré l'erreur pour ne pas bloquer l'application
+            # Continuer malgré l'erreur pour ne pas bloquer l'application: les méthodes
+            # qui utilisent la base (self.db ou self.metric_rollups à None) se désactivent
+    
+    def _backfill_metric_rollups(self, after_id: int, until_id: int):
+        """
+        Agrège les relevés de métriques antérieurs aux agrégats, par lots chronologiques
+        
+        Args:
+            after_id: ID du dernier relevé déjà agrégé
+            until_id: ID du dernier relevé à agréger
+        """
+        try:
+            count = self.metric_rollups.backfill(
+                [(row["id"], row["timestamp"], {name: row[name] for name in SYSTEM_METRICS})
+                 for row in rows]
+                for rows in self.db.iter_metric_batches(after_id, until_id)
+            )
+            if count:
+                logger.info(f"{count} relevé(s) de métriques agrégé(s)")
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lors de l'agrégation des relevés de métriques: {e}")
+    
+    def close(self):
+        """
+        Écrit les journaux en attente et ferme la base de données
+        """
+        if self.db is not None:
+            self.db.close()
     
     def _load_data(self):
         """
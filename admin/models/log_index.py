@@ -0,0 +1,691 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Index de recherche des journaux pour Vynal Docs Automator
+La table system_logs est indexée en place par un index plein texte FTS5 à
+contenu externe, tenu à jour par déclencheurs: aucune ligne n'est copiée et
+les suppressions de journaux s'appliquent aussi à l'index. Les journaux
+antérieurs à la création de l'index sont indexés par lots en arrière-plan
+(build_database_index); d'ici là, la recherche dans system_logs se fait par LIKE.
+Les lignes des fichiers de log sont copiées au fil de l'eau dans une table
+indexée doublée d'un index FTS5. Chaque fichier retient sa position (décalage
+en octets): seules les nouvelles lignes sont lues à chaque mise à jour. Un
+fichier est reconnu par l'empreinte de sa première ligne, ce qui permet de le
+suivre lorsqu'il est renommé par la rotation des logs.
+"""
+
+import os
+import re
+import hashlib
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("VynalDocsAutomator.Admin.LogIndex")
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# Source des copies de system_logs faites par les versions précédentes de l'index
+DATABASE_ORIGIN = "database"
+
+# Nombre de lignes insérées par transaction lors de l'indexation
+INDEX_BATCH_SIZE = 2000
+
+# Longueur maximale de la première ligne servant d'empreinte à un fichier
+FINGERPRINT_BYTES = 4096
+
+TIMESTAMP_PATTERN = re.compile(
+    r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:[,.]\d{3})?|\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2})'
+)
+TIMESTAMP_FORMATS = ("%Y-%m-%d %H:%M:%S,%f", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S")
+
+# Format des journaux de l'application: "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+STANDARD_LINE_PATTERN = re.compile(
+    r'^\s*-\s*(?P<name>\S.*?)\s+-\s+(?P<level>' + "|".join(LOG_LEVELS) + r')\s+-\s?'
+)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS log_origins (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fingerprint TEXT NOT NULL UNIQUE,
+        path TEXT,
+        position INTEGER NOT NULL DEFAULT 0,
+        last_timestamp TEXT,
+        last_level TEXT,
+        last_source TEXT,
+        updated_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS log_entries (
+        id INTEGER PRIMARY KEY,
+        origin_id INTEGER NOT NULL,
+        ref INTEGER,
+        timestamp TEXT NOT NULL,
+        level TEXT,
+        source TEXT,
+        message TEXT NOT NULL,
+        details TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_log_entries_timestamp ON log_entries(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_log_entries_level ON log_entries(level, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_log_entries_source ON log_entries(source, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_log_entries_origin ON log_entries(origin_id, timestamp)",
+    """
+    CREATE TABLE IF NOT EXISTS log_index_state (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """,
+    # Avancement de l'indexation des journaux antérieurs à l'index de system_logs:
+    # les identifiants compris entre indexed (exclu) et end (inclus) restent à indexer
+    "INSERT OR IGNORE INTO log_index_state (name, value) VALUES ('system_logs_indexed', 0)",
+    "INSERT OR IGNORE INTO log_index_state (name, value) VALUES ('system_logs_end', 0)",
+)
+
+# Index plein texte à contenu externe, tenu à jour par déclencheurs
+FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS log_entries_fts USING fts5(
+        message, details, content='log_entries', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS log_entries_ai AFTER INSERT ON log_entries BEGIN
+        INSERT INTO log_entries_fts(rowid, message, details) VALUES (new.id, new.message, new.details);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS log_entries_ad AFTER DELETE ON log_entries BEGIN
+        INSERT INTO log_entries_fts(log_entries_fts, rowid, message, details)
+        VALUES ('delete', old.id, old.message, old.details);
+    END
+    """,
+)
+
+# Index plein texte de system_logs, sans copie des journaux
+DATABASE_FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS system_logs_fts USING fts5(
+        message, details, content='system_logs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS system_logs_ai AFTER INSERT ON system_logs BEGIN
+        INSERT INTO system_logs_fts(rowid, message, details) VALUES (new.id, new.message, new.details);
+    END
+    """,
+    # Une ligne pas encore indexée par build_database_index ne doit pas être retirée de l'index
+    """
+    CREATE TRIGGER IF NOT EXISTS system_logs_ad AFTER DELETE ON system_logs
+    WHEN old.id <= (SELECT value FROM log_index_state WHERE name = 'system_logs_indexed')
+        OR old.id > (SELECT value FROM log_index_state WHERE name = 'system_logs_end') BEGIN
+        INSERT INTO system_logs_fts(system_logs_fts, rowid, message, details)
+        VALUES ('delete', old.id, old.message, old.details);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS system_logs_au AFTER UPDATE ON system_logs
+    WHEN old.id <= (SELECT value FROM log_index_state WHERE name = 'system_logs_indexed')
+        OR old.id > (SELECT value FROM log_index_state WHERE name = 'system_logs_end') BEGIN
+        INSERT INTO system_logs_fts(system_logs_fts, rowid, message, details)
+        VALUES ('delete', old.id, old.message, old.details);
+        INSERT INTO system_logs_fts(rowid, message, details) VALUES (new.id, new.message, new.details);
+    END
+    """,
+)
+
+# Tables interrogées pour chaque source: (table, index plein texte)
+FILE_TABLES = ("log_entries", "log_entries_fts")
+DATABASE_TABLES = ("system_logs", "system_logs_fts")
+
+INSERT_ENTRY_SQL = (
+    "INSERT INTO log_entries (origin_id, ref, timestamp, level, source, message, details) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+UPDATE_ORIGIN_SQL = (
+    "UPDATE log_origins SET position = ?, last_timestamp = ?, last_level = ?, last_source = ?, "
+    "updated_at = ? WHERE id = ?"
+)
+
+# Ordres de tri: (clause ORDER BY, comparaison de la pagination par clé)
+ORDERS = {
+    "rank": ("score, id", ">"),
+    "recent": ("timestamp DESC, id DESC", "<"),
+    "oldest": ("timestamp, id", ">"),
+}
+
+
+def parse_timestamp(value: str) -> Optional[str]:
+    """
+    Convertit l'horodatage d'une ligne de log au format ISO
+
+    Args:
+        value: Horodatage tel qu'écrit dans le fichier
+
+    Returns:
+        Optional[str]: Horodatage ISO, ou None s'il n'est pas reconnu
+    """
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_log_line(line: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Analyse une ligne de fichier de log
+
+    Args:
+        line: Ligne (sans retour à la ligne)
+
+    Returns:
+        tuple: (horodatage ISO, niveau, source), chaque élément pouvant être None
+    """
+    timestamp = level = source = None
+    rest = line
+    match = TIMESTAMP_PATTERN.match(line)
+    if match:
+        timestamp = parse_timestamp(match.group(1))
+        rest = line[match.end():]
+        standard = STANDARD_LINE_PATTERN.match(rest)
+        if standard:
+            return timestamp, standard.group("level"), standard.group("name")
+
+    for candidate in LOG_LEVELS:
+        if f"[{candidate}]" in rest or f" {candidate} " in rest or rest.lstrip().startswith(candidate):
+            level = candidate
+            break
+    return timestamp, level, source
+
+
+def match_expression(text: str) -> str:
+    """
+    Transforme un texte saisi en requête FTS5: chaque mot est cherché comme
+    préfixe, tous les mots doivent être présents
+
+    Args:
+        text: Texte recherché
+
+    Returns:
+        str: Expression MATCH
+    """
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class LogIndex:
+    """
+    Index de recherche des journaux système (base de données et fichiers)
+    """
+
+    def __init__(self, db):
+        """
+        Initialise l'index dans la base de l'administration
+
+        Args:
+            db: Base de l'administration (AdminDatabase)
+        """
+        self.db = db
+        self._sync_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.fts_available = True
+        self._database_ready = False
+
+        with db.connection() as conn, conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            try:
+                for statement in FTS_SCHEMA:
+                    conn.execute(statement)
+                self._create_database_index(conn)
+            except sqlite3.OperationalError as e:
+                # SQLite compilé sans FTS5: recherche par LIKE
+                logger.warning(f"FTS5 non disponible, recherche plein texte limitée: {e}")
+                self.fts_available = False
+
+    # ----- Alimentation de l'index -----
+
+    def _get_origin(self, conn: sqlite3.Connection, fingerprint: str, path: Optional[str]) -> sqlite3.Row:
+        """Retourne (en la créant au besoin) la source correspondant à une empreinte"""
+        row = conn.execute("SELECT * FROM log_origins WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        if row is None:
+            conn.execute("INSERT INTO log_origins (fingerprint, path, updated_at) VALUES (?, ?, ?)",
+                         (fingerprint, path, datetime.now().isoformat()))
+            row = conn.execute("SELECT * FROM log_origins WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        return row
+
+    @staticmethod
+    def _create_database_index(conn: sqlite3.Connection):
+        """
+        Crée l'index plein texte de system_logs; les journaux déjà présents sont
+        laissés à build_database_index (les nouveaux sont indexés par déclencheur)
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'system_logs_fts'"
+        ).fetchone()
+        if not exists:
+            conn.execute("UPDATE log_index_state SET value = (SELECT COALESCE(MAX(id), 0) FROM system_logs) "
+                         "WHERE name = 'system_logs_end'")
+        for statement in DATABASE_FTS_SCHEMA:
+            conn.execute(statement)
+
+    def _state(self, conn: sqlite3.Connection, name: str) -> int:
+        """Valeur d'avancement enregistrée dans log_index_state"""
+        return conn.execute("SELECT value FROM log_index_state WHERE name = ?", (name,)).fetchone()[0]
+
+    @property
+    def database_index_ready(self) -> bool:
+        """True lorsque tous les journaux de system_logs sont dans l'index plein texte"""
+        if not self._database_ready and self.fts_available:
+            with self.db.connection() as conn:
+                self._database_ready = self._state(conn, "system_logs_indexed") >= \
+                    self._state(conn, "system_logs_end")
+        return self._database_ready
+
+    def build_database_index(self, batch_size: int = INDEX_BATCH_SIZE) -> int:
+        """
+        Indexe par lots les journaux antérieurs à la création de l'index de
+        system_logs et supprime la copie faite par les versions précédentes.
+        Chaque lot est une transaction courte; l'avancement est enregistré et
+        reprend au démarrage suivant si l'application est fermée entre-temps.
+
+        Args:
+            batch_size: Nombre de journaux par transaction
+
+        Returns:
+            int: Nombre de journaux indexés
+        """
+        total = 0
+        with self._build_lock, self.db.connection() as conn:
+            self._drop_database_copy(conn, batch_size)
+            if not self.fts_available:
+                return 0
+            while True:
+                indexed = self._state(conn, "system_logs_indexed")
+                end = self._state(conn, "system_logs_end")
+                if indexed >= end:
+                    break
+                with conn:
+                    last_id = conn.execute(
+                        "SELECT MAX(id) FROM (SELECT id FROM system_logs WHERE id > ? AND id <= ? "
+                        "ORDER BY id LIMIT ?)", (indexed, end, batch_size)
+                    ).fetchone()[0] or end
+                    count = conn.execute(
+                        "INSERT INTO system_logs_fts(rowid, message, details) "
+                        "SELECT id, message, details FROM system_logs WHERE id > ? AND id <= ?",
+                        (indexed, last_id)
+                    ).rowcount
+                    conn.execute("UPDATE log_index_state SET value = ? WHERE name = 'system_logs_indexed'",
+                                 (last_id,))
+                total += count
+        self._database_ready = True
+        if total:
+            logger.info(f"{total} journal(aux) de system_logs indexé(s)")
+        return total
+
+    def start_database_build(self) -> threading.Thread:
+        """
+        Lance build_database_index dans un thread d'arrière-plan
+
+        Returns:
+            threading.Thread: Thread lancé
+        """
+        def run():
+            try:
+                self.build_database_index()
+            except sqlite3.Error as e:
+                logger.error(f"Erreur lors de l'indexation de system_logs: {e}")
+
+        thread = threading.Thread(target=run, name="LogIndexBuild", daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _drop_database_copy(conn: sqlite3.Connection, batch_size: int):
+        """Supprime par lots la copie de system_logs conservée par les versions précédentes"""
+        origin = conn.execute("SELECT id FROM log_origins WHERE fingerprint = ?", (DATABASE_ORIGIN,)).fetchone()
+        if origin is None:
+            return
+        while True:
+            with conn:
+                removed = conn.execute(
+                    "DELETE FROM log_entries WHERE id IN "
+                    "(SELECT id FROM log_entries WHERE origin_id = ? LIMIT ?)", (origin["id"], batch_size)
+                ).rowcount
+            if not removed:
+                break
+        with conn:
+            conn.execute("DELETE FROM log_origins WHERE id = ?", (origin["id"],))
+        logger.info("Copie de system_logs retirée de l'index des journaux")
+
+    def sync_file(self, path: str) -> Optional[int]:
+        """
+        Indexe les lignes ajoutées à un fichier de log depuis la dernière lecture
+
+        Args:
+            path: Chemin du fichier
+
+        Returns:
+            Optional[int]: Identifiant de la source du fichier dans l'index,
+                           None si le fichier est vide ou illisible
+        """
+        path = os.path.abspath(path)
+        try:
+            with self._sync_lock, open(path, 'rb') as f, self.db.connection() as conn:
+                head = f.readline(FINGERPRINT_BYTES)
+                if not head.endswith(b"\n") and len(head) < FINGERPRINT_BYTES:
+                    # Première ligne incomplète: le fichier sera indexé plus tard
+                    return None
+                fingerprint = "file:" + hashlib.sha1(head).hexdigest()
+
+                with conn:
+                    origin = self._get_origin(conn, fingerprint, path)
+                    # Après une rotation, le chemin désigne un nouveau fichier et
+                    # l'ancien contenu suit son fichier renommé
+                    conn.execute("UPDATE log_origins SET path = NULL WHERE path = ? AND id != ?",
+                                 (path, origin["id"]))
+                    if origin["path"] != path:
+                        conn.execute("UPDATE log_origins SET path = ? WHERE id = ?", (path, origin["id"]))
+
+                position = origin["position"]
+                if os.fstat(f.fileno()).st_size < position:
+                    # Fichier tronqué puis réécrit avec la même première ligne: réindexer
+                    with conn:
+                        conn.execute("DELETE FROM log_entries WHERE origin_id = ?", (origin["id"],))
+                    position = 0
+                    origin = dict(origin, last_timestamp=None, last_level=None, last_source=None)
+
+                self._index_lines(conn, f, origin, position, os.path.basename(path))
+                return origin["id"]
+        except OSError as e:
+            logger.error(f"Impossible d'indexer le fichier de log {path}: {e}")
+            return None
+
+    def _index_lines(self, conn: sqlite3.Connection, f, origin, position: int, default_source: str):
+        """Indexe les lignes complètes d'un fichier à partir d'une position"""
+        last_timestamp = origin["last_timestamp"] or ""
+        last_level = origin["last_level"]
+        last_source = origin["last_source"] or default_source
+        f.seek(position)
+        batch = []
+
+        def commit():
+            with conn:
+                conn.executemany(INSERT_ENTRY_SQL, batch)
+                conn.execute(UPDATE_ORIGIN_SQL, (position, last_timestamp, last_level, last_source,
+                                                 datetime.now().isoformat(), origin["id"]))
+            batch.clear()
+
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                # Ligne en cours d'écriture: reprise à la prochaine mise à jour
+                break
+            line = raw.decode('utf-8', errors='replace').rstrip()
+            if line:
+                timestamp, level, source = parse_log_line(line)
+                if timestamp:
+                    last_timestamp, last_level, last_source = timestamp, level, source or default_source
+                # Les lignes de continuation (traces d'erreur...) héritent de l'entrée qui les précède
+                batch.append((origin["id"], position, last_timestamp, level or last_level,
+                              last_source, line, None))
+            position += len(raw)
+            if len(batch) >= INDEX_BATCH_SIZE:
+                commit()
+
+        if batch or position != origin["position"]:
+            commit()
+
+    def sync_files(self, paths: Iterable[str]) -> Dict[str, int]:
+        """
+        Indexe plusieurs fichiers et oublie les fichiers supprimés
+
+        Args:
+            paths: Chemins des fichiers
+
+        Returns:
+            Dict[str, int]: Identifiant de la source de chaque fichier indexé
+        """
+        origins = {}
+        for path in paths:
+            origin_id = self.sync_file(path)
+            if origin_id is not None:
+                origins[path] = origin_id
+        self.remove_missing_files()
+        return origins
+
+    def remove_missing_files(self) -> int:
+        """
+        Supprime de l'index les fichiers qui n'existent plus
+
+        Returns:
+            int: Nombre de fichiers oubliés
+        """
+        with self._sync_lock, self.db.connection() as conn:
+            missing = [
+                row["id"] for row in conn.execute("SELECT id, path FROM log_origins WHERE path IS NOT NULL")
+                if not os.path.exists(row["path"])
+            ]
+            with conn:
+                for origin_id in missing:
+                    conn.execute("DELETE FROM log_entries WHERE origin_id = ?", (origin_id,))
+                    conn.execute("DELETE FROM log_origins WHERE id = ?", (origin_id,))
+        return len(missing)
+
+    # ----- Recherche -----
+
+    def _fts_table(self, tables: Tuple[str, str]) -> Optional[str]:
+        """Index plein texte utilisable pour une source, None pour une recherche par LIKE"""
+        if not self.fts_available:
+            return None
+        if tables == DATABASE_TABLES and not self.database_index_ready:
+            # Journaux antérieurs pas encore tous indexés: résultats complets par LIKE
+            return None
+        return tables[1]
+
+    def _filters(self, query: Optional[str], level: Optional[str], source: Optional[str],
+                 origin_id: Optional[int], date_from: Optional[str],
+                 date_to: Optional[str], alias: str = "",
+                 fts: Optional[str] = FILE_TABLES[1]) -> Tuple[List[str], List[Any]]:
+        """
+        Construit les clauses WHERE sur log_entries (ou system_logs) et leurs paramètres
+
+        Args:
+            Mêmes filtres que search()
+            alias: Préfixe des colonnes (par exemple "e.")
+            fts: Index plein texte de la table (None: recherche par LIKE)
+
+        Returns:
+            tuple: (clauses, paramètres)
+        """
+        clauses, params = [], []
+        if query and query.strip():
+            if fts:
+                clauses.append(f"{alias}id IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)")
+                params.append(match_expression(query))
+            else:
+                clauses.append(f"({alias}message LIKE ? OR {alias}details LIKE ?)")
+                params.extend([f"%{query}%", f"%{query}%"])
+        if level:
+            clauses.append(f"{alias}level = ?")
+            params.append(level)
+        if source:
+            clauses.append(f"{alias}source = ?")
+            params.append(source)
+        if origin_id is not None:
+            clauses.append(f"{alias}origin_id = ?")
+            params.append(origin_id)
+        if date_from:
+            clauses.append(f"{alias}timestamp >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append(f"{alias}timestamp <= ?")
+            params.append(date_to)
+        return clauses, params
+
+    def origin_id(self, path: str) -> Optional[int]:
+        """
+        Identifiant de la source d'un fichier de log
+
+        Args:
+            path: Chemin du fichier
+
+        Returns:
+            Optional[int]: Identifiant, None si le fichier n'a jamais été indexé
+        """
+        return self.db.fetch_value("SELECT id FROM log_origins WHERE path = ?", (os.path.abspath(path),))
+
+    def search(self, query: Optional[str] = None, level: Optional[str] = None,
+               source: Optional[str] = None, origin_id: Optional[int] = None,
+               date_from: Optional[str] = None, date_to: Optional[str] = None,
+               order: str = "recent", cursor: Optional[Tuple[Any, int]] = None,
+               limit: int = 200) -> Dict[str, Any]:
+        """
+        Recherche des entrées des fichiers de log, page par page
+
+        Args:
+            query: Texte recherché (tous les mots, par préfixe)
+            level: Niveau à filtrer
+            source: Source (nom du logger) à filtrer
+            origin_id: Fichier dans l'index (voir origin_id())
+            date_from: Date de début (ISO)
+            date_to: Date de fin (ISO)
+            order: "rank" (pertinence, nécessite query), "recent" ou "oldest"
+            cursor: Curseur retourné par la page précédente
+            limit: Nombre maximum d'entrées
+
+        Returns:
+            Dict[str, Any]: Entrées ("entries") et curseur de la page suivante
+                            ("next_cursor", None s'il n'y en a pas)
+        """
+        return self._search(FILE_TABLES, query, level, source, origin_id, date_from, date_to,
+                            order, cursor, limit)
+
+    def search_database(self, query: Optional[str] = None, level: Optional[str] = None,
+                        source: Optional[str] = None, date_from: Optional[str] = None,
+                        date_to: Optional[str] = None, order: str = "recent",
+                        cursor: Optional[Tuple[Any, int]] = None, limit: int = 200) -> Dict[str, Any]:
+        """
+        Recherche dans la table system_logs, page par page (mêmes ordres et
+        curseurs que search())
+
+        Chaque mot saisi est cherché comme début d'un mot du message ou des
+        détails, sans tenir compte des accents: "connex" trouve "Connexion"
+        mais pas "déconnexion". Sans FTS5, ou tant que les journaux antérieurs
+        à l'index ne sont pas tous indexés, la recherche porte sur la
+        sous-chaîne (LIKE) et "rank" devient "recent".
+
+        Returns:
+            Dict[str, Any]: Journaux ("entries") et curseur de la page suivante ("next_cursor")
+        """
+        self.db.flush()
+        return self._search(DATABASE_TABLES, query, level, source, None, date_from, date_to,
+                            order, cursor, limit)
+
+    def _search(self, tables: Tuple[str, str], query: Optional[str], level: Optional[str],
+                source: Optional[str], origin_id: Optional[int], date_from: Optional[str],
+                date_to: Optional[str], order: str, cursor: Optional[Tuple[Any, int]],
+                limit: int) -> Dict[str, Any]:
+        """Recherche paginée par clé dans une source (FILE_TABLES ou DATABASE_TABLES)"""
+        if order not in ORDERS:
+            raise ValueError(f"Ordre de tri inconnu: {order}")
+        table = tables[0]
+        fts = self._fts_table(tables)
+        ranked = order == "rank" and fts is not None and bool(query and query.strip())
+        if order == "rank" and not ranked:
+            order = "recent"
+        order_by, comparison = ORDERS[order]
+
+        clauses, params = self._filters(None if ranked else query, level, source, origin_id,
+                                        date_from, date_to, alias="e." if ranked else "", fts=fts)
+        where = "".join(f" AND {clause}" for clause in clauses)
+        if ranked:
+            inner = (
+                f"SELECT e.*, bm25({fts}) AS score FROM {fts} "
+                f"JOIN {table} e ON e.id = {fts}.rowid "
+                f"WHERE {fts} MATCH ?{where}"
+            )
+            params.insert(0, match_expression(query))
+            key = "score"
+        else:
+            inner = f"SELECT * FROM {table} WHERE 1=1{where}"
+            key = "timestamp"
+
+        sql = f"SELECT * FROM ({inner})"
+        if cursor is not None:
+            sql += f" WHERE ({key}, id) {comparison} (?, ?)"
+            params.extend(cursor)
+        sql += f" ORDER BY {order_by} LIMIT ?"
+        params.append(limit)
+
+        entries = self.db.fetch_all(sql, params)
+        next_cursor = None
+        if len(entries) == limit:
+            next_cursor = (entries[-1][key], entries[-1]["id"])
+        return {"entries": entries, "next_cursor": next_cursor}
+
+    def facets(self, query: Optional[str] = None, level: Optional[str] = None,
+               source: Optional[str] = None, origin_id: Optional[int] = None,
+               date_from: Optional[str] = None, date_to: Optional[str] = None,
+               max_sources: int = 20) -> Dict[str, Any]:
+        """
+        Compte les entrées des fichiers de log par niveau, par source et par jour
+
+        Chaque facette ignore son propre filtre (le comptage par niveau ne
+        tient pas compte du niveau sélectionné) afin de montrer les autres
+        valeurs disponibles.
+
+        Args:
+            Mêmes filtres que search()
+            max_sources: Nombre maximum de sources retournées
+
+        Returns:
+            Dict[str, Any]: Comptages "level", "source", "day" et total ("total")
+        """
+        return self._facets(FILE_TABLES, query, level, source, origin_id, date_from, date_to, max_sources)
+
+    def facets_database(self, query: Optional[str] = None, level: Optional[str] = None,
+                        source: Optional[str] = None, date_from: Optional[str] = None,
+                        date_to: Optional[str] = None, max_sources: int = 20) -> Dict[str, Any]:
+        """
+        Compte les journaux de system_logs par niveau, par source et par jour (voir facets())
+
+        Returns:
+            Dict[str, Any]: Comptages "level", "source", "day" et total ("total")
+        """
+        self.db.flush()
+        return self._facets(DATABASE_TABLES, query, level, source, None, date_from, date_to, max_sources)
+
+    def _facets(self, tables: Tuple[str, str], query: Optional[str], level: Optional[str],
+                source: Optional[str], origin_id: Optional[int], date_from: Optional[str],
+                date_to: Optional[str], max_sources: int) -> Dict[str, Any]:
+        """Comptages par niveau, source et jour dans une source (FILE_TABLES ou DATABASE_TABLES)"""
+        table = tables[0]
+        fts = self._fts_table(tables)
+
+        def count(column: str, **overrides) -> List[Tuple[Any, int]]:
+            filters = dict(query=query, level=level, source=source, origin_id=origin_id,
+                           date_from=date_from, date_to=date_to)
+            filters.update(overrides)
+            clauses, params = self._filters(fts=fts, **filters)
+            where = "".join(f" AND {clause}" for clause in clauses)
+            sql = (f"SELECT {column} AS value, COUNT(*) AS n FROM {table} WHERE 1=1{where} "
+                   "GROUP BY value ORDER BY n DESC")
+            return [(row["value"], row["n"]) for row in self.db.fetch_all(sql, params)]
+
+        levels = count("level", level=None)
+        return {
+            "level": dict(levels),
+            "source": dict(count("source", source=None)[:max_sources]),
+            "day": dict(sorted(count("substr(timestamp, 1, 10)", date_from=None, date_to=None))),
+            "total": sum(n for value, n in levels if not level or value == level),
+        }
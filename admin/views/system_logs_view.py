@@ -12,6 +12,7 @@ from datetime import datetime, timedelta
 import os
 import re
 import glob
+import threading
 from typing import List, Dict, Any, Optional, Union, Callable
 
 logger = logging.getLogger("VynalDocsAutomator.Admin.SystemLogsView")
@@ -36,6 +37,15 @@ class SystemLogsView:
         self.log_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
         self.security_alerts = []  # Initialize security alerts list
         
+        # Index de recherche des journaux (recherche sans relire les fichiers)
+        self.log_index = getattr(self.model, 'log_index', None)
+        self.page_size = 500
+        self._next_cursor = None
+        self._shown_count = 0
+        self._total_count = 0
+        self._search_generation = 0
+        self._filter_after_id = None
+        
         # Créer les répertoires nécessaires
         logs_dir = self.get_logs_dir()
         os.makedirs(logs_dir, exist_ok=True)
@@ -61,6 +71,10 @@ class SystemLogsView:
         # Création de l'interface
         self.create_widgets()
         
+        # Appliquer les filtres à chaque modification (avec délai)
+        for var in self.filter_vars.values():
+            var.trace_add("write", lambda *args: self._delayed_filter())
+        
         # Charger la liste des fichiers de log
         self.reload_logs()
         
@@ -384,6 +398,17 @@ class SystemLogsView:
         self.pagination_frame = ctk.CTkFrame(self.logs_frame, fg_color="transparent", height=30)
         self.pagination_frame.pack(fill=ctk.X, padx=15, pady=(0, 10))
         self.pagination_frame.pack_propagate(False)  # Fixer la hauteur
+        
+        self.load_more_btn = ctk.CTkButton(
+            self.pagination_frame,
+            text="Charger plus",
+            command=lambda: self.search_logs(append=True),
+            width=120,
+            height=25,
+            font=ctk.CTkFont(size=11),
+            state="disabled"
+        )
+        self.load_more_btn.pack(side=ctk.RIGHT)
     
     def create_security_alerts_view(self) -> None:
         """
@@ -505,6 +530,12 @@ class SystemLogsView:
             # Mettre à jour le titre
             self.logs_title.configure(text=f"Logs: {display_name}")
             
+            if self.log_index is not None:
+                # Indexer les nouvelles lignes et afficher la première page
+                self.current_log_file = log_path
+                self.search_logs()
+                return
+            
             # Lire le contenu du fichier
             with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
                 log_lines = f.readlines()
@@ -541,31 +572,7 @@ class SystemLogsView:
         
         # Afficher les lignes filtrées
         for line in filtered_lines:
-            line = line.rstrip()  # Remove trailing whitespace
-            if not line:  # Skip empty lines
-                continue
-                
-            # Analyser le niveau de log pour appliquer la coloration
-            level = self.extract_log_level(line)
-            timestamp = self.extract_timestamp(line)
-            
-            if timestamp:
-                # Insérer le timestamp avec son tag
-                self.logs_text.insert("end", timestamp + " ", "TIMESTAMP")
-                
-                # Insérer le reste de la ligne avec le tag de niveau approprié
-                remaining_text = line[len(timestamp):].rstrip()
-                
-                if level:
-                    self.logs_text.insert("end", remaining_text + "\n", level)
-                else:
-                    self.logs_text.insert("end", remaining_text + "\n")
-            else:
-                # Si aucun timestamp n'est trouvé, insérer toute la ligne
-                if level:
-                    self.logs_text.insert("end", line + "\n", level)
-                else:
-                    self.logs_text.insert("end", line + "\n")
+            self.insert_log_line(line)
         
         # Rendre le widget en lecture seule
         self.logs_text.configure(state="disabled")
@@ -573,6 +580,116 @@ class SystemLogsView:
         # Défiler jusqu'en haut
         self.logs_text.see("1.0")
     
+    def insert_log_line(self, line: str, level: Optional[str] = None) -> None:
+        """
+        Insère une ligne de log colorée selon son niveau dans le widget texte
+        
+        Args:
+            line: Ligne de log
+            level: Niveau de la ligne (déduit de la ligne si absent)
+        """
+        line = line.rstrip()  # Remove trailing whitespace
+        if not line:  # Skip empty lines
+            return
+        
+        # Analyser le niveau de log pour appliquer la coloration
+        level = level or self.extract_log_level(line)
+        timestamp = self.extract_timestamp(line)
+        
+        if timestamp:
+            # Insérer le timestamp avec son tag
+            self.logs_text.insert("end", timestamp + " ", "TIMESTAMP")
+            
+            # Insérer le reste de la ligne avec le tag de niveau approprié
+            line = line[len(timestamp):].strip()
+        
+        if level:
+            self.logs_text.insert("end", line + "\n", level)
+        else:
+            self.logs_text.insert("end", line + "\n")
+    
+    def search_logs(self, append: bool = False) -> None:
+        """
+        Recherche les entrées du fichier courant dans l'index des journaux.
+        L'indexation des nouvelles lignes et la recherche s'exécutent en
+        arrière-plan; seule la page demandée est affichée.
+        
+        Args:
+            append: Ajouter la page suivante aux entrées déjà affichées
+        """
+        if not self.current_log_file:
+            return
+        
+        self._search_generation += 1
+        generation = self._search_generation
+        log_path = self.current_log_file
+        cursor = self._next_cursor if append else None
+        
+        level = self.filter_vars["level"].get()
+        date_from = self.get_date_range_start(self.filter_vars["date_range"].get())
+        filters = {
+            "query": self.filter_vars["search"].get().strip() or None,
+            "level": None if level == "ALL" else level,
+            "date_from": date_from.isoformat() if date_from else None
+        }
+        self.load_more_btn.configure(state="disabled")
+        
+        def run_search():
+            try:
+                origin_id = self.log_index.sync_file(log_path)
+                if origin_id is None:
+                    result, facets = {"entries": [], "next_cursor": None}, None
+                else:
+                    result = self.log_index.search(
+                        origin_id=origin_id,
+                        order="rank" if filters["query"] else "recent",
+                        cursor=cursor,
+                        limit=self.page_size,
+                        **filters
+                    )
+                    facets = None if append else self.log_index.facets(origin_id=origin_id, **filters)
+                self.frame.after(0, lambda: self.show_search_results(generation, result, facets, append))
+            except Exception as e:
+                logger.error(f"Erreur lors de la recherche dans les logs: {e}")
+                message = f"Impossible de rechercher dans les logs: {e}"
+                self.frame.after(0, lambda: self.show_message("Erreur", message, "error"))
+        
+        threading.Thread(target=run_search, daemon=True).start()
+    
+    def show_search_results(self, generation: int, result: Dict[str, Any],
+                            facets: Optional[Dict[str, Any]], append: bool) -> None:
+        """
+        Affiche une page de résultats de l'index des journaux
+        
+        Args:
+            generation: Numéro de la recherche (les résultats périmés sont ignorés)
+            result: Résultat de LogIndex.search
+            facets: Comptages de LogIndex.facets (None pour une page suivante)
+            append: Ajouter les entrées à celles déjà affichées
+        """
+        if generation != self._search_generation:
+            return
+        
+        self.logs_text.configure(state="normal")
+        if not append:
+            self.logs_text.delete("1.0", "end")
+            self._shown_count = 0
+            self._total_count = facets["total"] if facets else 0
+            self.show_level_stats({level: (facets or {}).get("level", {}).get(level, 0)
+                                   for level in self.log_levels})
+        
+        for entry in result["entries"]:
+            self.insert_log_line(entry["message"], entry["level"])
+        self.logs_text.configure(state="disabled")
+        
+        self._shown_count += len(result["entries"])
+        self._next_cursor = result["next_cursor"]
+        self.logs_count.configure(text=f"{self._shown_count} entrées sur {self._total_count}")
+        self.load_more_btn.configure(state="normal" if self._next_cursor else "disabled")
+        
+        if not append:
+            self.logs_text.see("1.0")
+    
     def filter_log_lines(self, log_lines: List[str]) -> List[str]:
         """
         Filtre les lignes de log en fonction des filtres actuels
@@ -712,36 +829,47 @@ class SystemLogsView:
         except Exception:
             return None
     
-    def is_date_in_range(self, date: datetime, date_range: str) -> bool:
+    def get_date_range_start(self, date_range: str) -> Optional[datetime]:
         """
-        Vérifie si une date est dans une plage donnée
+        Retourne le début d'une plage de dates
         
         Args:
-            date: Date à vérifier
             date_range: Plage de dates ('Aujourd'hui', 'Cette semaine', 'Ce mois', 'Tout')
             
         Returns:
-            bool: True si la date est dans la plage, False sinon
+            datetime: Début de la plage, ou None pour 'Tout'
         """
         now = datetime.now()
         today_start = datetime(now.year, now.month, now.day, 0, 0, 0)
         
         if date_range.lower() == "aujourd'hui":
-            return date >= today_start
+            return today_start
         
         elif date_range.lower() == "cette semaine":
             # Calculer le début de la semaine (lundi)
             days_since_monday = now.weekday()
-            week_start = today_start - timedelta(days=days_since_monday)
-            return date >= week_start
+            return today_start - timedelta(days=days_since_monday)
         
         elif date_range.lower() == "ce mois":
             # Début du mois
-            month_start = datetime(now.year, now.month, 1, 0, 0, 0)
-            return date >= month_start
+            return datetime(now.year, now.month, 1, 0, 0, 0)
         
-        # Pour "tout" ou toute autre valeur, retourner True
-        return True
+        # Pour "tout" ou toute autre valeur, pas de limite
+        return None
+    
+    def is_date_in_range(self, date: datetime, date_range: str) -> bool:
+        """
+        Vérifie si une date est dans une plage donnée
+        
+        Args:
+            date: Date à vérifier
+            date_range: Plage de dates ('Aujourd'hui', 'Cette semaine', 'Ce mois', 'Tout')
+            
+        Returns:
+            bool: True si la date est dans la plage, False sinon
+        """
+        start = self.get_date_range_start(date_range)
+        return start is None or date >= start
     
     def update_log_stats(self, log_lines: List[str]) -> None:
         """
@@ -750,10 +878,6 @@ class SystemLogsView:
         Args:
             log_lines: Liste des lignes de log
         """
-        # Effacer les anciennes statistiques
-        for widget in self.stats_container.winfo_children():
-            widget.destroy()
-        
         # Compter les occurrences de chaque niveau
         level_counts = {level: 0 for level in self.log_levels}
         
@@ -763,6 +887,19 @@ class SystemLogsView:
                     level_counts[level] += 1
                     break
         
+        self.show_level_stats(level_counts)
+    
+    def show_level_stats(self, level_counts: Dict[str, int]) -> None:
+        """
+        Affiche le nombre d'entrées par niveau
+        
+        Args:
+            level_counts: Nombre d'entrées pour chaque niveau
+        """
+        # Effacer les anciennes statistiques
+        for widget in self.stats_container.winfo_children():
+            widget.destroy()
+        
         # Créer les étiquettes de statistiques
         for level, count in level_counts.items():
             if level == "DEBUG":
@@ -820,6 +957,10 @@ class SystemLogsView:
             
             logger.debug(f"Applying filters to {self.current_log_file}")
             
+            if self.log_index is not None:
+                self.search_logs()
+                return
+            
             # Read the current log file
             with open(self.current_log_file, 'r', encoding='utf-8', errors='replace') as f:
                 log_lines = f.readlines()
@@ -1246,6 +1387,10 @@ class SystemLogsView:
                         except Exception as e:
                             logger.error(f"Impossible de supprimer {file_path}: {e}")
             
+            # Oublier les entrées des fichiers supprimés
+            if count > 0 and self.log_index is not None:
+                self.log_index.remove_missing_files()
+            
             # Recharger la liste des fichiers
             self.reload_logs()
             
@@ -2,10 +2,10 @@ import tkinter as tk
 from tkinter import ttk, font, scrolledtext
 import logging
 import threading
-import queue
 import time
 # Import la version modifiée de AIModel depuis le module ai
 from ai import AIModel
+from ai.streaming import ChunkCoalescer, STREAM_FRAME_RATE
 
 class AIChatInterface:
     """
@@ -42,8 +42,10 @@ class AIChatInterface:
         self.connection_attempts = 0
         self.max_connection_attempts = 3
         
-        # File d'attente pour la communication entre threads
-        self.response_queue = queue.Queue()
+        # Réponse en cours: fragments reçus par le thread de traitement, affichés
+        # par l'interface à cadence fixe (STREAM_FRAME_RATE)
+        self.response_buffer = None
+        self.ai_response_started = False
         
         # Configuration du style
         self.configure_style()
@@ -51,9 +53,6 @@ class AIChatInterface:
         # Configuration de l'interface utilisateur
         self.setup_ui()
         
-        # Démarrer le vérificateur de file d'attente
-        self.parent.after(100, self.check_queue)
-        
         # Initialiser l'IA
         self.initialize_ai()
         
@@ -646,29 +645,57 @@ Comment puis-je vous assister aujourd'hui ?
         # Ajouter le message utilisateur à l'interface
         self.display_user_message(user_message)
         
+        # Un nouveau message interrompt la réponse en cours
+        self.cancel_response()
+        
         # Indiquer que l'IA est en train de répondre
         self.set_ai_status("thinking")
         
         # Traiter le message dans un thread séparé
-        threading.Thread(target=self.process_message, args=(user_message,), daemon=True).start()
+        buffer = self.response_buffer = ChunkCoalescer()
+        threading.Thread(target=self.process_message, args=(user_message, buffer), daemon=True).start()
+        self.parent.after(1000 // STREAM_FRAME_RATE, self.flush_response, buffer)
     
-    def process_message(self, message):
-        """Traite le message dans un thread séparé"""
+    def process_message(self, message, buffer):
+        """
+        Traite le message dans un thread séparé
+        
+        Args:
+            message: Message de l'utilisateur
+            buffer: Tampon de la réponse (ChunkCoalescer) lu par flush_response
+        """
+        error_message = None
+        chunks = None
         try:
-            # Obtenir la réponse du modèle AI
-            for chunk in self.ai.generate_response(message, stream=True):
-                self.response_queue.put(("chunk", chunk))
-            
-            # Indiquer que le traitement est terminé
-            self.response_queue.put(("end", None))
+            # Obtenir la réponse du modèle AI (texte complet pour les commandes et les erreurs)
+            chunks = self.ai.generate_response(message, stream=True)
+            if isinstance(chunks, str):
+                chunks = [chunks]
+            for chunk in chunks:
+                # Réponse remplacée par un nouveau message: arrêter la lecture
+                if buffer is not self.response_buffer:
+                    break
+                buffer.append(chunk)
         except Exception as e:
             logging.error(f"Erreur lors du traitement du message: {e}")
             error_message = f"Une erreur est survenue: {str(e)}"
-            self.response_queue.put(("error", error_message))
             
             # Vérifier si c'est une erreur de connexion et tenter une reconnexion
             if "connexion" in str(e).lower() or "connection" in str(e).lower():
                 self.retry_connection()
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+            buffer.finish(error_message)
+    
+    def cancel_response(self):
+        """Interrompt la réponse en cours, s'il y en a une"""
+        if self.response_buffer is None:
+            return
+        self.response_buffer = None
+        self.ai_response_started = False
+        if self.ai is not None and hasattr(self.ai, "cancel_generation"):
+            self.ai.cancel_generation()
     
     def retry_connection(self):
         """Tente de se reconnecter au modèle AI"""
@@ -693,28 +720,39 @@ Comment puis-je vous assister aujourd'hui ?
         else:
             self.display_status_message("Nombre maximal de tentatives atteint", "error")
 
-    def check_queue(self):
-        """Vérifie la file d'attente pour les réponses du thread de traitement"""
-        try:
-            # Récupérer les messages sans bloquer
-            while not self.response_queue.empty():
-                msg_type, content = self.response_queue.get_nowait()
-                
-                if msg_type == "chunk":
-                    # Ajouter un morceau de la réponse
-                    self.display_ai_response_chunk(content)
-                elif msg_type == "end":
-                    # Indiquer que l'IA a fini de répondre
-                    self.set_ai_status("ready")
-                elif msg_type == "error":
-                    # Afficher un message d'erreur
-                    self.display_chat_message(content, "error")
-                    self.set_ai_status("error")
-        except queue.Empty:
-            pass
-        
-        # Continuer à vérifier
-        self.parent.after(100, self.check_queue)
+    def flush_response(self, buffer):
+        """
+        Affiche les fragments reçus depuis la dernière image, en une seule insertion.
+        Se reprogramme à cadence fixe tant que la réponse n'est pas terminée.
+        
+        Args:
+            buffer: Tampon de la réponse (ChunkCoalescer)
+        """
+        # Réponse annulée (nouveau message ou réinitialisation du chat)
+        if buffer is not self.response_buffer:
+            return
+        
+        # Lire l'état de fin avant de vider le tampon pour ne perdre aucun fragment
+        finished = buffer.finished
+        text = buffer.drain()
+        if text:
+            self.display_ai_response_chunk(text)
+        
+        if not finished:
+            self.parent.after(1000 // STREAM_FRAME_RATE, self.flush_response, buffer)
+            return
+        
+        self.response_buffer = None
+        self.ai_response_started = False
+        if buffer.error:
+            self.display_chat_message(buffer.error, "error")
+            self.set_ai_status("error")
+        else:
+            self.set_ai_status("ready")
+            if buffer.time_to_first_fragment is not None:
+                self.status_label.config(
+                    text=f"Prêt (premier mot en {buffer.time_to_first_fragment * 1000:.0f} ms)"
+                )
     
     def display_status_message(self, message, status_type="info"):
         """Affiche un message de statut"""
@@ -877,7 +915,8 @@ Comment puis-je vous assister aujourd'hui ?
             # Réinitialiser le statut
             self.chat_text.configure(state="disabled")
             
-            # Réinitialiser tous les attributs liés à l'état du chat
+            # Interrompre la réponse en cours et réinitialiser l'état du chat
+            self.cancel_response()
             self.ai_response_started = False
             
             # Réinitialiser l'historique du modèle AI si disponible
@@ -893,14 +932,6 @@ Comment puis-je vous assister aujourd'hui ?
                 self.initialize_ai()
                 self.display_status_message("Initialisation du modèle AI", "info")
             
-            # Nettoyer toute autre donnée résiduelle
-            if hasattr(self, 'response_queue'):
-                while not self.response_queue.empty():
-                    try:
-                        self.response_queue.get_nowait()
-                    except:
-                        pass
-            
             # Recréer complètement le widget de chat si nécessaire
             if self.chat_text.get("1.0", "end-1c") != "":
                 # Détruire et recréer le widget de chat
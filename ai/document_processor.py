@@ -11,15 +11,71 @@ import json
 import os
 import re
 import chardet
-import requests
 import time
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from typing import Dict, List, Optional, Tuple, Any
 
+from utils.template_renderer import compile_template, MISSING_KEEP
+from ai.llm_client import ConfigFile, get_client
+
 logging.basicConfig(level=logging.DEBUG)
 
 logger = logging.getLogger("VynalDocsAutomator.AIDocumentProcessor")
 
+# Configuration du modèle (relue uniquement lorsque le fichier est modifié)
+AI_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "ai_config.json")
+
+# Analyse des sections par le modèle (valeurs remplaçables par la clé
+# "section_analysis" de ai_config.json)
+SECTION_ANALYSIS_CONFIG = {
+    # Appels simultanés au modèle, tous documents confondus
+    "max_concurrency": 3,
+    # Budget d'un document (secondes)
+    "deadline": 60,
+    # Timeout d'un appel
+    "call_timeout": 10,
+    # Un appel n'est plus lancé s'il reste moins de temps que cela avant l'échéance
+    "min_call_seconds": 3,
+    # Taille maximale du texte envoyé dans un appel (sections voisines regroupées)
+    "batch_chars": 2000,
+}
+
+# Indices de valeurs que les expressions régulières ne savent pas extraire:
+# libellés ("Nom : ..."), champs à compléter, parties et adresses
+AMBIGUOUS_SECTION_PATTERN = re.compile(
+    r"^[^\S\n]*[A-Za-zÀ-ÿ'][A-Za-zÀ-ÿ' ]{1,30}[^\S\n]*:[^\S\n]*\S"
+    r"|_{3,}|\.{4,}|\[[^\]\n]+\]|\{\{[^}\n]+\}\}"
+    r"|\b(?:soussign|représenté|demeurant|domicilié|né le|née le|ci-après|entre les|société)",
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Limite globale des appels simultanés pour l'analyse des sections, créée au
+# premier appel avec la valeur de max_concurrency résolue depuis ai_config.json
+_section_slots: Optional[threading.BoundedSemaphore] = None
+_section_slots_size = 0
+_section_slots_lock = threading.Lock()
+
+
+def _get_section_slots(max_concurrency: int) -> threading.BoundedSemaphore:
+    """
+    Retourne la limite globale des appels simultanés au modèle
+
+    Args:
+        max_concurrency: Nombre d'appels simultanés (configuration résolue)
+
+    Returns:
+        threading.BoundedSemaphore: Limite partagée par tous les documents;
+        elle est recréée si la configuration change
+    """
+    global _section_slots, _section_slots_size
+    with _section_slots_lock:
+        if _section_slots is None or _section_slots_size != max_concurrency:
+            _section_slots = threading.BoundedSemaphore(max_concurrency)
+            _section_slots_size = max_concurrency
+        return _section_slots
+
 class AIDocumentProcessor:
     """
     Classe pour le traitement des documents avec l'IA
@@ -30,7 +86,8 @@ class AIDocumentProcessor:
         """
         Initialise le processeur de documents
         """
-        self.config = self._load_config()
+        self._config_file = ConfigFile(AI_CONFIG_PATH, loader=self._load_config)
+        self.config = self._config_file.get()
         self.cache = {}
         self.cache_size = 100  # Réduit de 1000 à 100
         self.fallback_mode = False  # Ajout de l'attribut fallback_mode initialisé à False
@@ -41,8 +98,7 @@ class AIDocumentProcessor:
         Gère les différents encodages pour éviter les problèmes de décodage
         """
         try:
-            # Utiliser le chemin absolu pour éviter les problèmes de chemin relatif
-            config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "ai_config.json")
+            config_path = AI_CONFIG_PATH
             logger.info(f"Tentative de chargement de la configuration depuis: {config_path}")
             
             if not os.path.exists(config_path):
@@ -395,32 +451,8 @@ class AIDocumentProcessor:
             # Si le fichier est un .docx (Word)
             if file_type in ['docx', 'doc']:
                 try:
-                    import docx
-                    doc = docx.Document(file_path)
-                    full_text = []
-                    # Extraire le texte de chaque paragraphe
-                    for para in doc.paragraphs:
-                        full_text.append(para.text)
-                    # Extraire le texte des tableaux
-                    for table in doc.tables:
-                        for row in table.rows:
-                            for cell in row.cells:
-                                for para in cell.paragraphs:
-                                    full_text.append(para.text)
-                    return '\n'.join(full_text)
-                except ImportError:
-                    logger.warning("Module python-docx non disponible, tentative de fallback")
-                    # Fallback à une lecture textuelle
-                    try:
-                        with open(file_path, 'rb') as f:
-                            import chardet
-                            result = chardet.detect(f.read())
-                            detected_encoding = result['encoding']
-                        with open(file_path, 'r', encoding=detected_encoding or 'utf-8', errors='replace') as f:
-                            return f.read()
-                    except Exception as e:
-                        logger.error(f"Erreur lors de la lecture du fichier Word: {e}")
-                        return f"Erreur: {str(e)}"
+                    from doc_analyzer.utils.text_extraction import get_text_extractor
+                    return get_text_extractor().extract_text(file_path, separator='\n')
                 except Exception as e:
                     logger.error(f"Erreur lors de l'extraction du texte du fichier Word: {e}")
                     return f"Erreur: {str(e)}"
@@ -428,23 +460,8 @@ class AIDocumentProcessor:
             # Si le fichier est un .pdf
             elif file_type == 'pdf':
                 try:
-                    import PyPDF2
-                    with open(file_path, 'rb') as f:
-                        pdf_reader = PyPDF2.PdfReader(f)
-                        text = ''
-                        for page_num in range(len(pdf_reader.pages)):
-                            page = pdf_reader.pages[page_num]
-                            text += page.extract_text() + '\n'
-                        return text
-                except ImportError:
-                    logger.warning("Module PyPDF2 non disponible, tentative de fallback")
-                    # Fallback vers une lecture textuelle basique
-                    try:
-                        with open(file_path, 'r', encoding=encoding, errors='replace') as f:
-                            return f.read()
-                    except Exception as e:
-                        logger.error(f"Erreur lors de la lecture du fichier PDF: {e}")
-                        return f"Erreur: {str(e)}"
+                    from doc_analyzer.utils.text_extraction import get_text_extractor
+                    return get_text_extractor().extract_text(file_path, separator='\n')
                 except Exception as e:
                     logger.error(f"Erreur lors de l'extraction du texte du fichier PDF: {e}")
                     return f"Erreur: {str(e)}"
@@ -955,7 +972,16 @@ DOCUMENT COMPLÉTÉ:
         except Exception:
             return response
 
-    def _call_ollama(self, prompt: str, timeout: int = 10, max_retries: int = 1, fast_mode: bool = True) -> str:
+    def _get_config(self) -> Dict[str, Any]:
+        """
+        Retourne la configuration, relue uniquement si le fichier a été modifié
+        (à ne pas modifier: elle est partagée entre les appels)
+        """
+        self.config = self._config_file.get()
+        return self.config
+
+    def _call_ollama(self, prompt: str, timeout: int = 10, max_retries: int = 1, fast_mode: bool = True,
+                     cache: bool = False) -> str:
         """
         Appelle l'API Ollama avec optimisation pour la détection de variables
         
@@ -964,6 +990,8 @@ DOCUMENT COMPLÉTÉ:
             timeout: Timeout en secondes (par défaut 10s)
             max_retries: Nombre maximum de tentatives en cas d'échec (par défaut 1)
             fast_mode: Utiliser le mode rapide avec moins de tokens (par défaut True)
+            cache: Réutiliser la réponse d'un prompt identique (prompts déterministes
+                   d'extraction de variables)
             
         Returns:
             Réponse de l'API
@@ -974,8 +1002,8 @@ DOCUMENT COMPLÉTÉ:
                 prompt = prompt[:3000]
                 
             # Options optimisées à partir du fichier de configuration
-            config = self._load_config()
-            options = config.get("options", {})
+            config = self._get_config()
+            options = dict(config.get("options", {}))
             
             # En mode rapide, limiter le nombre de tokens
             if fast_mode:
@@ -984,6 +1012,7 @@ DOCUMENT COMPLÉTÉ:
             # Récupérer modèle et URL depuis la configuration
             api_url = config.get("api_url", "http://localhost:11434/api/generate")
             model = config.get("model", "llama3:latest")
+            client = get_client(api_url)
             
             # Ajouter un délai de sécurité pour le timeout réseau
             request_timeout = min(timeout + 3, 10)  # Timeout maximum de 10 secondes et 3 secondes de plus que le timeout API
@@ -994,19 +1023,9 @@ DOCUMENT COMPLÉTÉ:
                     if attempt > 0:
                         logger.info(f"Nouvelle tentative ({attempt}/{max_retries})")
                     
-                    # Appel optimisé à l'API sans stream pour maximiser la vitesse
-                    response = requests.post(
-                        api_url,
-                        json={"model": model, "prompt": prompt, "stream": False, "options": options},
-                        timeout=request_timeout
-                    ).json()
-                    
-                    if "response" in response:
-                        # Extraire la réponse
-                        result = response["response"].strip()
-                        return result
-                        
-                    return ""
+                    # Appel optimisé à l'API sans stream pour maximiser la vitesse,
+                    # sur une connexion keep-alive du client partagé
+                    return client.generate(prompt, model, options, timeout=request_timeout, cache=cache)
                     
                 except Exception as e:
                     logger.error(f"Erreur lors de l'appel à Ollama: {str(e)}")
@@ -1022,7 +1041,11 @@ DOCUMENT COMPLÉTÉ:
 
     def _analyze_document_by_sections(self, content: str) -> Dict[str, Any]:
         """
-        Analyse un document en le divisant en sections pour un traitement plus efficace
+        Analyse un document en le divisant en sections pour un traitement plus efficace.
+        Toutes les sections passent d'abord par l'extraction par expressions
+        régulières; seules les sections ambiguës (libellés, champs à compléter,
+        parties...) sont envoyées au modèle, regroupées et en parallèle, dans la
+        limite de l'échéance du document (SECTION_ANALYSIS_CONFIG)
         
         Args:
             content: Contenu du document à analyser
@@ -1032,6 +1055,8 @@ DOCUMENT COMPLÉTÉ:
         """
         try:
             logger.info("Analyse du document par sections")
+            settings = dict(SECTION_ANALYSIS_CONFIG, **self._get_config().get("section_analysis", {}))
+            deadline = time.monotonic() + settings["deadline"]
             
             # Évaluer la complexité globale du document
             complexity = self._estimate_document_complexity(content)
@@ -1041,62 +1066,72 @@ DOCUMENT COMPLÉTÉ:
             sections = self._split_document_into_sections(content)
             logger.info(f"Document divisé en {len(sections)} sections")
             
-            # Limiter le nombre de sections analysées pour accélérer le processus
-            max_sections = 2 if complexity == "complex" else 3
-            sections_to_analyze = sections[:max_sections]
-            
-            results = []
-            retries_left = 1  # Réduit le nombre de retries pour accélérer
-            
-            # Analyser seulement les sections les plus pertinentes
-            # Section 1: Souvent l'en-tête ou introduction
-            if len(sections) > 0:
-                # Réduire davantage la taille pour éviter les timeouts
-                section = sections[0][:1000]  # 1000 caractères au lieu de 2000
-                
-                # Vérifier d'abord s'il y a des variables évidentes avec regex
-                basic_vars = self._extract_basic_variables_from_text(section)
-                if basic_vars:
-                    logger.info(f"Variables extraites de l'en-tête par regex: {len(basic_vars)}")
-                    results.append({"variables": basic_vars})
-                else:
-                    # Sinon essayer avec l'analyse IA
-                    result = self._analyze_section_simplified(section)
-                    if result and "variables" in result and result["variables"]:
-                        logger.info(f"En-tête/Introduction: {len(result['variables'])} variables trouvées")
-                        results.append(result)
-            
-            # Section 2: Souvent le corps du document 
-            if len(sections) > 2 and len(results) < 2:  # N'analyser que si on n'a pas assez de résultats
-                section = sections[2][:1000]  # 1000 caractères au lieu de 2000
-                
-                # Vérifier d'abord s'il y a des variables évidentes avec regex
-                basic_vars = self._extract_basic_variables_from_text(section)
-                if basic_vars:
-                    logger.info(f"Variables extraites du corps par regex: {len(basic_vars)}")
-                    results.append({"variables": basic_vars})
-                else:
-                    # Sinon essayer avec l'analyse IA
-                    result = self._analyze_section_simplified(section)
-                    if result and "variables" in result and result["variables"]:
-                        logger.info(f"Corps du document: {len(result['variables'])} variables trouvées")
-                        results.append(result)
-            
-            # Fusionner les résultats
-            merged_result = self._merge_results(results)
+            # Extraction par expressions régulières sur toutes les sections
+            variables = {}
+            ambiguous = []
+            seen = set()
+            for section in sections:
+                for key, value in self._extract_basic_variables_from_text(section).items():
+                    variables.setdefault(key, value)
+                if section not in seen and AMBIGUOUS_SECTION_PATTERN.search(section):
+                    ambiguous.append(section)
+                seen.add(section)
+            logger.info(f"{len(variables)} variables extraites par regex, "
+                        f"{len(ambiguous)} section(s) ambiguë(s) sur {len(sections)}")
+            
+            # Regrouper les sections ambiguës voisines pour limiter le nombre d'appels
+            batches = self._batch_sections(ambiguous, settings["batch_chars"])
+            
+            # Fusionner les résultats du modèle à leur arrivée; en cas de conflit,
+            # la valeur du lot le plus proche du début du document l'emporte
+            model_variables = {}
+            origins = {}
+            completed = 0
+            deadline_reached = False
+            if batches:
+                executor = ThreadPoolExecutor(max_workers=settings["max_concurrency"],
+                                              thread_name_prefix="SectionAnalysis")
+                try:
+                    futures = {
+                        executor.submit(self._analyze_section_with_deadline, batch, deadline, settings): index
+                        for index, batch in enumerate(batches)
+                    }
+                    try:
+                        for future in as_completed(futures, timeout=max(0, deadline - time.monotonic())):
+                            index = futures[future]
+                            result = future.result()
+                            if result is None:
+                                continue
+                            completed += 1
+                            for key, value in result.get("variables", {}).items():
+                                if key not in origins or index < origins[key]:
+                                    model_variables[key] = value
+                                    origins[key] = index
+                    except FuturesTimeoutError:
+                        deadline_reached = True
+                        logger.warning(f"Échéance atteinte: {completed}/{len(batches)} lot(s) analysé(s)")
+                finally:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            
+            # Priorité aux variables trouvées par le modèle
+            variables.update(model_variables)
+            merged_result = {"variables": variables}
             
             # Fallback rapide si pas assez de variables
-            if len(merged_result.get("variables", {})) < 3:
+            if len(merged_result["variables"]) < 3:
                 logger.warning("Peu de variables trouvées, extraction directe")
                 basic_vars = self._extract_basic_variables_from_text(content[:5000])
                 if basic_vars:
-                    merged_result["variables"] = merged_result.get("variables", {})
                     merged_result["variables"].update(basic_vars)
             
             # Ajouter des métadonnées
             merged_result["_meta"] = {
                 "sections_count": len(sections),
-                "sections_analyzed": min(max_sections, len(sections)),
+                "sections_analyzed": len(sections),
+                "sections_sent_to_model": len(ambiguous),
+                "model_batches": len(batches),
+                "model_batches_completed": completed,
+                "deadline_reached": deadline_reached,
                 "complexity": complexity,
                 "extraction_method": "sections",
             }
@@ -1109,24 +1144,76 @@ DOCUMENT COMPLÉTÉ:
             variables = self._extract_basic_variables_from_text(content[:3000])
             return {"variables": variables, "_meta": {"extraction_method": "fallback_basic"}}
 
-    def _analyze_section_simplified(self, content: str) -> Dict[str, Any]:
+    def _batch_sections(self, sections: List[str], max_chars: int) -> List[str]:
+        """
+        Regroupe des sections consécutives en lots d'au plus max_chars caractères
+        (une section plus longue est découpée)
+        
+        Args:
+            sections: Sections dans l'ordre du document
+            max_chars: Taille maximale d'un lot
+            
+        Returns:
+            Liste des lots de texte
+        """
+        batches = []
+        current = ""
+        for section in sections:
+            for start in range(0, len(section), max_chars):
+                piece = section[start:start + max_chars]
+                if current and len(current) + len(piece) + 2 > max_chars:
+                    batches.append(current)
+                    current = ""
+                current = f"{current}\n\n{piece}" if current else piece
+        if current:
+            batches.append(current)
+        return batches
+
+    def _analyze_section_with_deadline(self, content: str, deadline: float,
+                                       settings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Analyse un lot de sections avec le modèle si l'échéance le permet encore
+        (exécuté dans un thread, sous la limite globale d'appels simultanés)
+        
+        Args:
+            content: Texte du lot
+            deadline: Échéance du document (time.monotonic())
+            settings: Paramètres de SECTION_ANALYSIS_CONFIG
+            
+        Returns:
+            Dict contenant les variables extraites, None si l'échéance est trop proche
+        """
+        with _get_section_slots(settings["max_concurrency"]):
+            remaining = deadline - time.monotonic()
+            if remaining < settings["min_call_seconds"]:
+                return None
+            timeout = int(min(settings["call_timeout"], remaining))
+            return self._analyze_section_simplified(content, timeout=timeout,
+                                                    max_chars=settings["batch_chars"], max_retries=0)
+
+    def _analyze_section_simplified(self, content: str, timeout: Optional[int] = None,
+                                    max_chars: int = 1000, max_retries: int = 1) -> Dict[str, Any]:
         """
         Analyse une section de document de manière simplifiée pour en extraire les variables
         
         Args:
             content: Section de texte à analyser
+            timeout: Timeout de l'appel (selon la complexité de la section par défaut)
+            max_chars: Taille maximale du texte envoyé au modèle
+            max_retries: Nombre maximum de nouvelles tentatives
             
         Returns:
             Dict contenant les variables extraites
         """
         try:
             # Estimer la complexité de la section pour ajuster le timeout
-            complexity = self._estimate_document_complexity(content)
-            timeout = 10 if complexity == "complex" else 7  # Réduire les timeouts pour éviter les erreurs
+            if timeout is None:
+                complexity = self._estimate_document_complexity(content)
+                timeout = 10 if complexity == "complex" else 7  # Réduire les timeouts pour éviter les erreurs
             
             # Optimisation: réduire le contenu pour cibler l'essentiel
-            if len(content) > 1000:
-                content = content[:1000]  # Réduire à 1000 caractères maximum
+            if len(content) > max_chars:
+                content = content[:max_chars]
             
             # Prompt en format texte simple au lieu de JSON
             prompt = f"""
@@ -1141,7 +1228,7 @@ Texte:
 {content}
 """
             # Appel à l'IA
-            response = self._call_ollama(prompt, timeout=timeout, fast_mode=True)
+            response = self._call_ollama(prompt, timeout=timeout, max_retries=max_retries, fast_mode=True, cache=True)
             if not response:
                 # Utiliser extraction basique si pas de réponse
                 variables = self._extract_basic_variables_from_text(content)
@@ -1281,7 +1368,7 @@ Document:
 ---
 """
             # Essayer avec timeout adapté
-            response = self._call_ollama(prompt, timeout=timeout, max_retries=2)
+            response = self._call_ollama(prompt, timeout=timeout, max_retries=2, cache=True)
             
             if not response:
                 # Si pas de réponse, retourner les variables du template et l'extraction basique
@@ -2006,7 +2093,7 @@ DOCUMENT:
 """
         
         try:
-            response = self._call_ollama(prompt, timeout=15)
+            response = self._call_ollama(prompt, timeout=15, cache=True)
             if response:
                 # Extraire les variables à partir de la réponse
                 # Rechercher les motifs comme "nom", "adresse", "email", etc.
@@ -2084,32 +2171,13 @@ DOCUMENT:
             logger.error("Template vide, impossible de remplacer les variables")
             return ""
             
-        # Utiliser le template original
-        result = template
+        # Compiler le template une seule fois (formats {variable} et {{variable}})
+        # puis le rendre en une passe; les variables sans valeur sont conservées
+        compiled = compile_template(template)
+        result = compiled.render(values, missing=MISSING_KEEP)
         
         # Nombre de remplacements effectués
-        replacements_count = 0
-        
-        # Pour chaque variable, faire un remplacement direct
-        for var_name, value in values.items():
-            # S'assurer que la valeur est une chaîne
-            value_str = str(value) if value is not None else ""
-            
-            # Format 1: {variable}
-            original_count = result.count(f"{{{var_name}}}")
-            result = result.replace(f"{{{var_name}}}", value_str)
-            count1 = original_count - result.count(f"{{{var_name}}}")
-            
-            # Format 2: {{variable}}
-            original_count = result.count(f"{{{{{var_name}}}}}")
-            result = result.replace(f"{{{{{var_name}}}}}", value_str)
-            count2 = original_count - result.count(f"{{{{{var_name}}}}}")
-            
-            # Compter le nombre total de remplacements pour cette variable
-            total_count = count1 + count2
-            if total_count > 0:
-                replacements_count += total_count
-                logger.debug(f"Variable '{var_name}' remplacée {total_count} fois")
+        replacements_count = compiled.replacement_count(values)
         
         # Log du résultat
         logger.info(f"Remplacement terminé: {replacements_count} remplacements effectués")
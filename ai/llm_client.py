@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Client partagé de l'API Ollama pour Vynal Docs Automator
+Une session HTTP par serveur et par processus (connexions keep-alive réutilisées),
+vérification de la disponibilité des modèles mise en cache pour une durée limitée,
+et cache persistant des réponses pour les prompts déterministes (extraction de
+variables). La configuration JSON n'est relue que lorsque son fichier change.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Callable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ai.streaming import GenerationStream
+
+logger = logging.getLogger("VynalDocsAutomator.LLMClient")
+
+DEFAULT_API_BASE = "http://localhost:11434/api"
+
+LLM_CLIENT_CONFIG = {
+    # Connexions keep-alive conservées par serveur
+    "pool_size": 8,
+    # Durée de validité de la vérification d'un modèle (secondes)
+    "model_check_ttl": 300,
+    # Un échec est revérifié plus tôt (Ollama vient peut-être d'être démarré)
+    "model_check_failure_ttl": 15,
+    # Nombre de générations en streaming conservées pour les statistiques
+    "stream_metrics_size": 200,
+    # Nombre maximum de réponses conservées par le cache persistant
+    "response_cache_entries": 2000,
+    "response_cache_path": os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "llm_responses.db"
+    ),
+}
+
+
+def api_base_from_url(api_url: str) -> str:
+    """
+    Déduit la racine de l'API d'une URL d'appel (".../api/generate" -> ".../api")
+
+    Args:
+        api_url: URL d'un point d'accès de l'API
+
+    Returns:
+        str: Racine de l'API
+    """
+    api_url = api_url.rstrip("/")
+    for endpoint in ("/generate", "/chat"):
+        if api_url.endswith(endpoint):
+            return api_url[:-len(endpoint)]
+    return api_url
+
+
+class ConfigFile:
+    """
+    Fichier de configuration JSON relu uniquement lorsqu'il est modifié
+    (taille ou date de modification différente)
+    """
+
+    def __init__(self, path: str, loader: Optional[Callable[[], Dict[str, Any]]] = None):
+        """
+        Initialise le fichier
+
+        Args:
+            path: Chemin du fichier
+            loader: Fonction de chargement (lecture JSON UTF-8 par défaut), également
+                    appelée lorsque le fichier est absent
+        """
+        self.path = path
+        self.loader = loader or self._read
+        self._lock = threading.Lock()
+        self._signature = None
+        self._config: Optional[Dict[str, Any]] = None
+
+    def _read(self) -> Dict[str, Any]:
+        """Lit le fichier JSON"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _stat(self):
+        """Signature du fichier (None s'il est absent)"""
+        try:
+            stat = os.stat(self.path)
+            return stat.st_size, stat.st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Retourne la configuration, relue si le fichier a changé
+
+        Returns:
+            Dict[str, Any]: Configuration (ne pas la modifier: elle est partagée)
+        """
+        signature = self._stat()
+        if self._config is None or signature != self._signature:
+            with self._lock:
+                if self._config is None or signature != self._signature:
+                    self._config = self.loader()
+                    # Le chargeur peut avoir créé le fichier
+                    self._signature = self._stat()
+        return self._config
+
+
+class ResponseCache:
+    """
+    Cache persistant des réponses du modèle (correspondance exacte du modèle, du
+    prompt et des options), borné en nombre d'entrées avec une éviction LRU
+    """
+
+    def __init__(self, db_path: str, max_entries: int = LLM_CLIENT_CONFIG["response_cache_entries"]):
+        """
+        Initialise le cache
+
+        Args:
+            db_path: Chemin de la base SQLite
+            max_entries: Nombre maximum d'entrées conservées
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+
+    @staticmethod
+    def make_key(model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Clé d'une requête (empreinte du modèle, du prompt et des options)"""
+        material = json.dumps({"model": model, "prompt": prompt, "options": options or {}},
+                              sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Récupère une réponse
+
+        Returns:
+            Optional[str]: Réponse en cache ou None
+        """
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"Lecture du cache des réponses impossible: {e}")
+            return None
+
+    def put(self, key: str, model: str, response: str):
+        """
+        Enregistre une réponse puis évince les entrées les moins récemment utilisées
+
+        Args:
+            key: Clé de la requête (make_key)
+            model: Modèle ayant produit la réponse
+            response: Réponse du modèle
+        """
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)", (key, model, response, now, now)
+                )
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Écriture dans le cache des réponses impossible: {e}")
+
+    def count(self) -> int:
+        """Nombre de réponses en cache"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        """Ferme la base"""
+        with self._lock:
+            self._conn.close()
+
+
+class LLMClient:
+    """
+    Client de l'API Ollama partagé par les modules d'IA (voir get_client)
+    """
+
+    def __init__(self, api_base: str = DEFAULT_API_BASE, pool_size: Optional[int] = None,
+                 cache_path: Optional[str] = None):
+        """
+        Initialise le client
+
+        Args:
+            api_base: Racine de l'API (par exemple http://localhost:11434/api)
+            pool_size: Nombre de connexions keep-alive conservées
+            cache_path: Base du cache des réponses (LLM_CLIENT_CONFIG par défaut)
+        """
+        self.api_base = api_base.rstrip("/")
+        pool_size = pool_size or LLM_CLIENT_CONFIG["pool_size"]
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cache_path = cache_path or LLM_CLIENT_CONFIG["response_cache_path"]
+        self._response_cache: Optional[ResponseCache] = None
+        self._cache_lock = threading.Lock()
+
+        # Vérifications mises en cache: clé -> (résultat, date d'expiration)
+        self._checks: Dict[str, Any] = {}
+        self._checks_lock = threading.Lock()
+
+        # Mesures des dernières générations en streaming
+        self._stream_metrics = deque(maxlen=LLM_CLIENT_CONFIG["stream_metrics_size"])
+
+    def url(self, endpoint: str) -> str:
+        """URL d'un point d'accès ("generate", "show", ...)"""
+        return f"{self.api_base}/{endpoint.lstrip('/')}"
+
+    # ---- Requêtes ----
+
+    def post(self, endpoint: str, payload: Dict[str, Any], timeout: float = 60,
+             stream: bool = False) -> requests.Response:
+        """
+        Envoie une requête POST sur une connexion réutilisée
+
+        Args:
+            endpoint: Point d'accès ("generate", "show", ...)
+            payload: Corps JSON
+            timeout: Délai maximum en secondes
+            stream: Lire la réponse au fur et à mesure
+
+        Returns:
+            requests.Response: Réponse HTTP
+        """
+        return self.session.post(self.url(endpoint), json=payload, timeout=timeout, stream=stream)
+
+    def get(self, endpoint: str, timeout: float = 5) -> requests.Response:
+        """Envoie une requête GET sur une connexion réutilisée"""
+        return self.session.get(self.url(endpoint), timeout=timeout)
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        """Cache des réponses, ouvert au premier usage"""
+        if self._response_cache is None:
+            with self._cache_lock:
+                if self._response_cache is None:
+                    self._response_cache = ResponseCache(self._cache_path)
+        return self._response_cache
+
+    def generate(self, prompt: str, model: str, options: Optional[Dict[str, Any]] = None,
+                 timeout: float = 60, cache: bool = False) -> str:
+        """
+        Génère une réponse complète (sans streaming)
+
+        Args:
+            prompt: Prompt à envoyer
+            model: Nom du modèle
+            options: Options de génération Ollama
+            timeout: Délai maximum en secondes
+            cache: Réutiliser la réponse d'un appel identique (à réserver aux prompts
+                   déterministes, comme l'extraction de variables)
+
+        Returns:
+            str: Texte généré
+
+        Raises:
+            requests.RequestException: En cas d'erreur HTTP ou réseau
+        """
+        key = None
+        if cache:
+            key = ResponseCache.make_key(model, prompt, options)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                logger.debug("Réponse servie depuis le cache")
+                return cached
+
+        response = self.post("generate", {"model": model, "prompt": prompt, "stream": False,
+                                           "options": options or {}}, timeout=timeout)
+        response.raise_for_status()
+        text = response.json().get("response", "").strip()
+
+        if cache and text:
+            self.response_cache.put(key, model, text)
+        return text
+
+    def stream_generate(self, prompt: str, model: str, options: Optional[Dict[str, Any]] = None,
+                        timeout: float = 60) -> GenerationStream:
+        """
+        Lance une génération en streaming
+
+        Args:
+            prompt: Prompt à envoyer
+            model: Nom du modèle
+            options: Options de génération Ollama
+            timeout: Délai maximum d'attente entre deux paquets (secondes)
+
+        Returns:
+            GenerationStream: Flux à itérer pour obtenir les fragments de texte
+
+        Raises:
+            requests.RequestException: Si la requête échoue avant le début du flux
+        """
+        started_at = time.monotonic()
+        response = self.post("generate", {"model": model, "prompt": prompt, "stream": True,
+                                          "options": options or {}}, timeout=timeout, stream=True)
+        try:
+            response.raise_for_status()
+        except requests.RequestException:
+            response.close()
+            raise
+        return GenerationStream(response, started_at, on_finish=self._record_stream)
+
+    def _record_stream(self, stream: GenerationStream):
+        """Enregistre les mesures d'une génération terminée"""
+        self._stream_metrics.append({
+            "time_to_first_token": stream.time_to_first_token,
+            "duration": stream.duration,
+            "characters": len(stream.text),
+            "eval_count": stream.server_stats.get("eval_count"),
+            "cancelled": stream.cancelled,
+        })
+        if stream.time_to_first_token is not None:
+            logger.info(f"Génération {'annulée' if stream.cancelled else 'terminée'}: "
+                        f"premier token en {stream.time_to_first_token * 1000:.0f} ms, "
+                        f"{len(stream.text)} caractères en {stream.duration:.1f} s")
+
+    def stream_statistics(self) -> Dict[str, Any]:
+        """
+        Statistiques des dernières générations en streaming
+
+        Returns:
+            Dict[str, Any]: Nombre de générations ("count"), annulations ("cancelled"),
+            délai avant le premier token moyen et au 95e percentile
+            ("ttft_avg", "ttft_p95", en secondes)
+        """
+        metrics = list(self._stream_metrics)
+        delays = sorted(m["time_to_first_token"] for m in metrics if m["time_to_first_token"] is not None)
+        return {
+            "count": len(metrics),
+            "cancelled": sum(1 for m in metrics if m["cancelled"]),
+            "ttft_avg": sum(delays) / len(delays) if delays else None,
+            "ttft_p95": delays[min(len(delays) - 1, int(len(delays) * 0.95))] if delays else None,
+        }
+
+    # ---- Vérifications mises en cache ----
+
+    def _cached_check(self, key: str, check: Callable[[], Any], refresh: bool) -> Any:
+        """
+        Résultat d'une vérification, recalculé à l'expiration de sa durée de validité
+
+        Args:
+            key: Identifiant de la vérification
+            check: Fonction de vérification (un résultat faux expire plus vite)
+            refresh: Ignorer le résultat en cache
+        """
+        now = time.monotonic()
+        with self._checks_lock:
+            cached = self._checks.get(key)
+            if cached is not None and not refresh and cached[1] > now:
+                return cached[0]
+
+        result = check()
+        ttl = LLM_CLIENT_CONFIG["model_check_ttl" if result else "model_check_failure_ttl"]
+        with self._checks_lock:
+            self._checks[key] = (result, now + ttl)
+        return result
+
+    def invalidate_checks(self):
+        """Oublie les vérifications en cache (après l'installation d'un modèle par exemple)"""
+        with self._checks_lock:
+            self._checks.clear()
+
+    def server_version(self, refresh: bool = False) -> Optional[str]:
+        """
+        Version du serveur Ollama
+
+        Args:
+            refresh: Ignorer le résultat en cache
+
+        Returns:
+            Optional[str]: Version, None si le serveur est inaccessible
+        """
+        def check():
+            try:
+                response = self.get("version")
+                if response.status_code != 200:
+                    return None
+                return response.json().get("version", "inconnue")
+            except requests.RequestException:
+                return None
+
+        return self._cached_check("version", check, refresh)
+
+    def model_available(self, model: str, refresh: bool = False) -> bool:
+        """
+        Indique si un modèle est installé sur le serveur
+
+        Args:
+            model: Nom du modèle
+            refresh: Ignorer le résultat en cache
+
+        Returns:
+            bool: True si le modèle est disponible
+        """
+        def check():
+            try:
+                return self.post("show", {"name": model}, timeout=5).status_code == 200
+            except requests.RequestException:
+                return False
+
+        return self._cached_check(f"model:{model}", check, refresh)
+
+    def list_models(self, refresh: bool = False) -> List[str]:
+        """
+        Liste les modèles installés
+
+        Args:
+            refresh: Ignorer le résultat en cache
+
+        Returns:
+            List[str]: Noms des modèles (liste vide si le serveur est inaccessible)
+        """
+        def check():
+            try:
+                response = self.get("tags")
+                if response.status_code != 200:
+                    return []
+                return [model.get("name") for model in response.json().get("models", [])]
+            except requests.RequestException:
+                return []
+
+        return self._cached_check("tags", check, refresh)
+
+    def close(self):
+        """Ferme les connexions et le cache des réponses"""
+        self.session.close()
+        if self._response_cache is not None:
+            self._response_cache.close()
+
+
+_clients: Dict[str, LLMClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_base: str = DEFAULT_API_BASE) -> LLMClient:
+    """
+    Retourne le client partagé du processus pour un serveur
+
+    Args:
+        api_base: Racine de l'API (ou URL d'un point d'accès, voir api_base_from_url)
+
+    Returns:
+        LLMClient: Client partagé
+    """
+    api_base = api_base_from_url(api_base)
+    client = _clients.get(api_base)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(api_base)
+            if client is None:
+                client = _clients[api_base] = LLMClient(api_base)
+    return client
@@ -12,8 +12,10 @@ import os
 import difflib
 import time
 import re
+import threading
 from typing import Dict, List, Optional, Tuple, Generator, Any
 from models.document_model_manager import DocumentModelManager
+from ai.llm_client import get_client
 from pathlib import Path
 
 logger = logging.getLogger("VynalDocsAutomator.AIModel")
@@ -58,6 +60,15 @@ class AIModel:
         self.api_url = "http://localhost:11434/api/generate"
         self.timeout = 60
         
+        # Client HTTP partagé (connexions keep-alive, vérifications en cache)
+        self.client = get_client(self.api_base)
+        
+        # Génération en streaming en cours et sa réponse dans l'historique (voir cancel_generation)
+        self.current_stream = None
+        self._current_reply = None
+        # L'historique est modifié par le thread de l'interface et par celui qui lit le flux
+        self._history_lock = threading.RLock()
+        
         # Paramètres de génération
         self.max_tokens = 4096
         self.num_predict = 4096  # Nombre maximum de tokens à générer
@@ -403,12 +414,17 @@ Je peux vous guider dans la création de votre document étape par étape."""
             else:
                 return f"Commande inconnue: {command}. Tapez /help pour voir les commandes disponibles."
         
-        # Ajouter le message à l'historique
-        self.conversation_history.append({"role": "user", "content": message})
+        # Une nouvelle demande remplace la génération en cours, dont la réponse
+        # (partielle) est enregistrée avant le nouveau message
+        self.cancel_generation()
         
-        # Conserver seulement les 10 derniers messages pour éviter de dépasser le contexte
-        if len(self.conversation_history) > 10:
-            self.conversation_history = self.conversation_history[-10:]
+        with self._history_lock:
+            # Ajouter le message à l'historique
+            self.conversation_history.append({"role": "user", "content": message})
+            
+            # Conserver seulement les 10 derniers messages pour éviter de dépasser le contexte
+            if len(self.conversation_history) > 10:
+                self.conversation_history = self.conversation_history[-10:]
         
         # Construire le prompt complet avec l'historique de conversation
         prompt = self._build_prompt(message)
@@ -444,29 +460,19 @@ Je peux vous guider dans la création de votre document étape par étape."""
             if stream:
                 # Appel en streaming
                 print(f"DEBUG - Mode streaming activé")
-                response = requests.post(
-                    self.api_url,
-                    json=params,
-                    timeout=self.timeout,
-                    stream=True
-                )
-                
-                if response.status_code != 200:
-                    error_msg = f"Erreur API: {response.status_code} - {response.text}"
-                    self.logger.error(error_msg)
-                    print(f"ERREUR - {error_msg}")
-                    return error_msg
-                
-                print(f"DEBUG - Réponse de streaming obtenue, code: {response.status_code}")
-                return self._stream_response(response)
+                generation = self.client.stream_generate(prompt, self.model, params["options"],
+                                                         timeout=self.timeout)
+                # La réponse prend sa place dans l'historique dès le début du flux
+                reply = {"role": "assistant", "content": ""}
+                with self._history_lock:
+                    self.conversation_history.append(reply)
+                self.current_stream = generation
+                self._current_reply = reply
+                return self._stream_response(generation, reply)
             else:
                 # Appel normal
                 print(f"DEBUG - Appel normal (non-streaming)")
-                response = requests.post(
-                    self.api_url,
-                    json=params,
-                    timeout=self.timeout
-                )
+                response = self.client.post("generate", params, timeout=self.timeout)
                 
                 if response.status_code != 200:
                     error_msg = f"Erreur API: {response.status_code} - {response.text}"
@@ -485,7 +491,8 @@ Je peux vous guider dans la création de votre document étape par étape."""
                     return "Le modèle n'a pas généré de réponse. Veuillez réessayer."
                 
                 # Ajouter la réponse à l'historique
-                self.conversation_history.append({"role": "assistant", "content": ai_response})
+                with self._history_lock:
+                    self.conversation_history.append({"role": "assistant", "content": ai_response})
                 
                 print(f"DEBUG - Réponse finale longueur: {len(ai_response)} caractères")
                 return ai_response
@@ -498,6 +505,8 @@ Je peux vous guider dans la création de votre document étape par étape."""
         except requests.exceptions.ConnectionError as e:
             error_msg = f"Erreur de connexion à l'API Ollama: {e}"
             self.logger.error(error_msg)
+            # Refaire la vérification du modèle à la prochaine requête
+            self.client.invalidate_checks()
             print(f"ERREUR CRITIQUE - {error_msg}")
             return "Impossible de se connecter à l'API Ollama. Vérifiez que le service est en cours d'exécution."
         except requests.exceptions.RequestException as e:
@@ -538,7 +547,7 @@ Je peux vous guider dans la création de votre document étape par étape."""
                 prompt = f"<s>[INST] {content} [/INST]\n\n"
             elif role == "user":
                 prompt += f"[INST] {content} [/INST]\n\n"
-            else:  # assistant
+            elif content:  # assistant (réponse en cours de génération ignorée tant qu'elle est vide)
                 prompt += f"{content}\n\n"
         
         # Ajouter le nouveau message de l'utilisateur (qui n'est pas encore dans l'historique)
@@ -546,133 +555,102 @@ Je peux vous guider dans la création de votre document étape par étape."""
         
         return prompt
     
-    def _stream_response(self, response):
+    def _stream_response(self, generation, reply):
         """
         Traite une réponse en streaming
         
         Args:
-            response: Réponse de l'API en streaming
+            generation: Génération en cours (GenerationStream)
+            reply: Entrée de l'historique réservée à la réponse, à sa position
+                   au début du flux
         
         Returns:
             generator: Générateur de morceaux de réponse
         """
-        ai_response = ""
+        try:
+            yield from generation
+        finally:
+            if self.current_stream is generation:
+                self.current_stream = None
+                self._current_reply = None
+            self._complete_reply(generation, reply)
+    
+    def _complete_reply(self, generation, reply):
+        """
+        Enregistre la réponse (partielle si elle a été annulée) dans son entrée de
+        l'historique, retirée si aucun texte n'a été reçu
         
-        for line in response.iter_lines():
-            if line:
-                try:
-                    chunk = json.loads(line)
-                    text = chunk.get("response", "")
-                    ai_response += text
-                    yield text
-                except json.JSONDecodeError:
-                    continue
-        
-        # Ajouter la réponse complète à l'historique
-        self.conversation_history.append({"role": "assistant", "content": ai_response})
+        Args:
+            generation: Génération (GenerationStream)
+            reply: Entrée de l'historique réservée à la réponse
+        """
+        with self._history_lock:
+            if generation.text:
+                reply["content"] = generation.text
+            elif not reply["content"]:
+                self.conversation_history = [msg for msg in self.conversation_history if msg is not reply]
     
-    def _verify_model(self):
-        """Vérifie si le modèle est disponible"""
+    def cancel_generation(self):
+        """
+        Annule la génération en streaming en cours, s'il y en a une
+        
+        Returns:
+            bool: True si une génération a été annulée
+        """
+        generation, reply = self.current_stream, self._current_reply
+        if generation is None or generation.done:
+            return False
+        generation.cancel()
+        if reply is not None:
+            # Texte reçu jusqu'ici, à sa place dans l'historique
+            self._complete_reply(generation, reply)
+        self.logger.info("Génération en cours annulée")
+        return True
+    
+    def _verify_model(self, refresh=False):
+        """
+        Vérifie si le modèle est disponible. Le résultat est mis en cache par le
+        client partagé (voir LLM_CLIENT_CONFIG): les requêtes suivantes ne refont
+        pas l'aller-retour vers l'API
+        
+        Args:
+            refresh: Interroger l'API même si une vérification récente existe
+        
+        Returns:
+            bool: True si un modèle est disponible
+        """
         try:
-            print(f"DEBUG - Vérification du modèle {self.model} via l'API Ollama")
-            
             # Vérifier si l'API Ollama est accessible
-            try:
-                test_connection = requests.get("http://localhost:11434/api/version", timeout=5)
-                if test_connection.status_code != 200:
-                    self.logger.error(f"API Ollama non accessible: {test_connection.status_code}")
-                    print(f"ERREUR - API Ollama non accessible: {test_connection.status_code}")
-                    return False
-                
-                version_info = test_connection.json()
-                version = version_info.get('version', 'inconnue')
-                self.logger.info(f"Ollama API version: {version}")
-                print(f"DEBUG - Ollama API version: {version}")
-            except requests.exceptions.ConnectionError:
+            version = self.client.server_version(refresh)
+            if version is None:
                 self.logger.error("Impossible de se connecter à l'API Ollama (service non démarré?)")
                 print("ERREUR CRITIQUE - Impossible de se connecter à l'API Ollama. Vérifiez que le service Ollama est démarré.")
                 return False
-            except Exception as e:
-                self.logger.error(f"Erreur lors de la vérification de l'API Ollama: {e}")
-                print(f"ERREUR - Erreur lors de la vérification de l'API Ollama: {e}")
-                return False
+            
+            # Essayer d'abord le modèle configuré
+            if self.client.model_available(self.model, refresh):
+                return True
+            
+            # Si le modèle spécifié n'est pas disponible, essayer des alternatives
+            self.logger.warning(f"Modèle {self.model} non trouvé, recherche d'alternatives...")
+            print(f"AVERTISSEMENT - Modèle {self.model} non trouvé, recherche d'alternatives...")
+            installed_models = self.client.list_models(refresh)
+            print(f"DEBUG - Modèles installés: {', '.join(installed_models)}")
             
             # Liste des modèles supportés et disponibles en fallback
             supported_models = ["llama3", "mistral", "phi3", "phi3:mini", "phi", "codellama"]
-            
-            # Essayer d'abord le modèle configuré
-            try:
-                response = requests.post(
-                    "http://localhost:11434/api/show",
-                    json={"name": self.model},
-                    timeout=5
-                )
-                
-                if response.status_code == 200:
-                    model_info = response.json()
-                    model_name = model_info.get('name', 'N/A')
-                    model_size = model_info.get('size', 'N/A')
-                    self.logger.info(f"Modèle {self.model} disponible: {model_name} ({model_size} taille)")
-                    print(f"DEBUG - Modèle {self.model} disponible: {model_name}")
+            for alt_model in supported_models:
+                if alt_model != self.model and self.client.model_available(alt_model, refresh):
+                    # Mettre à jour le modèle
+                    self.model = alt_model
+                    self.logger.info(f"Utilisation du modèle alternatif {alt_model}")
+                    print(f"INFO - Utilisation du modèle alternatif {alt_model}")
                     return True
-                
-                # Si le modèle spécifié n'est pas disponible, essayer des alternatives
-                if response.status_code == 404:
-                    self.logger.warning(f"Modèle {self.model} non trouvé, recherche d'alternatives...")
-                    print(f"AVERTISSEMENT - Modèle {self.model} non trouvé, recherche d'alternatives...")
-                    
-                    # Obtenir la liste des modèles installés
-                    installed_models = []
-                    try:
-                        list_response = requests.get("http://localhost:11434/api/tags", timeout=5)
-                        if list_response.status_code == 200:
-                            models_data = list_response.json()
-                            installed_models = [model.get('name') for model in models_data.get('models', [])]
-                            print(f"DEBUG - Modèles installés: {', '.join(installed_models)}")
-                    except Exception as e:
-                        print(f"AVERTISSEMENT - Impossible de lister les modèles: {e}")
-                    
-                    # Chercher une alternative parmi les modèles supportés
-                    for alt_model in supported_models:
-                        if alt_model in installed_models or alt_model == self.model:
-                            continue  # Sauter le modèle courant ou déjà vérifié
-                            
-                        try:
-                            alt_response = requests.post(
-                                "http://localhost:11434/api/show",
-                                json={"name": alt_model},
-                                timeout=5
-                            )
-                            
-                            if alt_response.status_code == 200:
-                                # Mettre à jour le modèle
-                                self.model = alt_model
-                                alt_model_info = alt_response.json()
-                                self.logger.info(f"Utilisation du modèle alternatif {alt_model}")
-                                print(f"INFO - Utilisation du modèle alternatif {alt_model}")
-                                return True
-                        except Exception:
-                            continue  # Passer au modèle suivant en cas d'erreur
-                    
-                    # Aucune alternative trouvée
-                    self.logger.error("Aucun modèle LLM disponible")
-                    print(f"ERREUR - Aucun modèle disponible. Installez un modèle avec 'ollama pull {self.model}'")
-                    return False
-                    
-                else:
-                    # Autre erreur
-                    self.logger.warning(f"Modèle {self.model} non disponible: {response.text}")
-                    print(f"ERREUR - Modèle {self.model} non disponible: {response.text}")
-                    return False
-                    
-            except requests.exceptions.ConnectionError as e:
-                self.logger.error(f"Erreur de connexion à l'API Ollama: {e}")
-                print(f"ERREUR CRITIQUE - Impossible de se connecter à l'API Ollama: {e}")
-                return False
-            except Exception as e:
-                self.logger.error(f"Erreur lors de la vérification du modèle: {e}")
-                print(f"ERREUR - Vérification du modèle échouée: {e}")
-                return False
+            
+            # Aucune alternative trouvée
+            self.logger.error("Aucun modèle LLM disponible")
+            print(f"ERREUR - Aucun modèle disponible. Installez un modèle avec 'ollama pull {self.model}'")
+            return False
                 
         except Exception as e:
             self.logger.error(f"Erreur inattendue lors de la vérification du modèle: {e}")
@@ -692,7 +670,8 @@ Commandes disponibles:
     
     def _clear_command(self):
         """Efface l'historique de la conversation"""
-        self.conversation_history = []
+        with self._history_lock:
+            self.conversation_history = []
         return "Historique de conversation effacé."
     
     def _status_command(self):
@@ -894,7 +873,7 @@ Format de sortie souhaité :
 
         try:
             # Envoyer la requête à Ollama
-            response = requests.post(self.api_url, json=params, timeout=self.timeout)
+            response = self.client.post("generate", params, timeout=self.timeout)
             
             if response.status_code == 200:
                 result = response.json()
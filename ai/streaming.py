@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Streaming des réponses du modèle pour Vynal Docs Automator
+Lecture incrémentale du flux NDJSON d'Ollama (chaque fragment est transmis dès
+sa réception), annulation d'une génération en cours, mesure du délai avant le
+premier token, et regroupement des fragments pour l'affichage à cadence fixe.
+"""
+
+import json
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger("VynalDocsAutomator.Streaming")
+
+# Cadence de rafraîchissement de l'affichage pendant le streaming (images par seconde)
+STREAM_FRAME_RATE = 30
+
+
+def iter_ndjson(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """
+    Décode un flux NDJSON au fil de l'eau (une ligne peut être répartie sur
+    plusieurs paquets réseau)
+
+    Args:
+        chunks: Paquets d'octets reçus
+
+    Yields:
+        Dict[str, Any]: Objets JSON, dans l'ordre du flux (lignes invalides ignorées)
+    """
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ligne NDJSON invalide ignorée: {line[:100]!r}")
+    if pending.strip():
+        try:
+            yield json.loads(pending)
+        except json.JSONDecodeError:
+            logger.warning(f"Ligne NDJSON invalide ignorée: {pending[:100]!r}")
+
+
+class GenerationStream:
+    """
+    Génération en cours: itérer dessus produit les fragments de texte au fur et
+    à mesure. Peut être annulée depuis un autre thread (cancel).
+
+    Attributes:
+        text: Texte reçu jusqu'ici
+        time_to_first_token: Délai entre l'envoi de la requête et le premier fragment (secondes)
+        duration: Durée totale de la génération (secondes)
+        cancelled: True si la génération a été annulée
+        done: True si le flux est terminé
+        server_stats: Statistiques renvoyées par Ollama en fin de flux (eval_count...)
+    """
+
+    def __init__(self, response, started_at: Optional[float] = None,
+                 on_finish: Optional[Callable[["GenerationStream"], None]] = None):
+        """
+        Initialise le flux
+
+        Args:
+            response: Réponse HTTP en streaming (requests.Response, stream=True)
+            started_at: Instant d'envoi de la requête (time.monotonic())
+            on_finish: Appelé une fois le flux terminé ou annulé
+        """
+        self.response = response
+        self.started_at = started_at if started_at is not None else time.monotonic()
+        self.on_finish = on_finish
+        self.text = ""
+        self.time_to_first_token: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.cancelled = False
+        self.done = False
+        self.server_stats: Dict[str, Any] = {}
+        self._cancel_event = threading.Event()
+        self._iterating = False
+
+    def cancel(self):
+        """Annule la génération (la connexion est fermée, le serveur arrête de générer)"""
+        self._cancel_event.set()
+        try:
+            self.response.close()
+        except Exception:
+            pass
+
+    def __iter__(self) -> Iterator[str]:
+        if self._iterating:
+            raise RuntimeError("Le flux ne peut être lu qu'une fois")
+        self._iterating = True
+        try:
+            # chunk_size=None: chaque paquet est transmis dès sa réception
+            for message in iter_ndjson(self.response.iter_content(chunk_size=None)):
+                if self._cancel_event.is_set():
+                    break
+                if "error" in message:
+                    raise RuntimeError(f"Erreur du modèle: {message['error']}")
+                fragment = message.get("response", "")
+                if fragment:
+                    if self.time_to_first_token is None:
+                        self.time_to_first_token = time.monotonic() - self.started_at
+                    self.text += fragment
+                    yield fragment
+                if message.get("done"):
+                    self.server_stats = {key: value for key, value in message.items()
+                                         if key not in ("response", "context")}
+                    break
+        except Exception:
+            # Fermer la connexion depuis cancel() interrompt la lecture
+            if not self._cancel_event.is_set():
+                raise
+        finally:
+            self.cancelled = self._cancel_event.is_set()
+            self._finish()
+
+    def _finish(self):
+        """Clôt le flux et signale sa fin"""
+        if self.done:
+            return
+        self.done = True
+        self.duration = time.monotonic() - self.started_at
+        try:
+            self.response.close()
+        except Exception:
+            pass
+        if self.on_finish is not None:
+            try:
+                self.on_finish(self)
+            except Exception as e:
+                logger.warning(f"Erreur dans le suivi du flux: {e}")
+
+
+class ChunkCoalescer:
+    """
+    Tampon entre le thread qui lit le flux et l'interface: les fragments reçus
+    entre deux rafraîchissements sont affichés en une seule insertion
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._parts = []
+        self.finished = False
+        self.error: Optional[str] = None
+        self.created_at = time.monotonic()
+        self.first_fragment_at: Optional[float] = None
+
+    @property
+    def time_to_first_fragment(self) -> Optional[float]:
+        """Délai entre la création du tampon et le premier fragment reçu (secondes)"""
+        if self.first_fragment_at is None:
+            return None
+        return self.first_fragment_at - self.created_at
+
+    def append(self, fragment: str):
+        """Ajoute un fragment (thread de lecture)"""
+        with self._lock:
+            if self.first_fragment_at is None:
+                self.first_fragment_at = time.monotonic()
+            self._parts.append(fragment)
+
+    def finish(self, error: Optional[str] = None):
+        """Signale la fin du flux, éventuellement en erreur (thread de lecture)"""
+        with self._lock:
+            self.error = error
+            self.finished = True
+
+    def drain(self) -> str:
+        """
+        Retire le texte accumulé depuis le dernier appel (thread de l'interface).
+        Lire finished avant d'appeler drain garantit qu'aucun fragment n'est perdu.
+
+        Returns:
+            str: Texte à afficher (vide si rien n'est arrivé)
+        """
+        with self._lock:
+            text = "".join(self._parts)
+            self._parts.clear()
+        return text
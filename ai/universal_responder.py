@@ -496,6 +496,9 @@ Vous pouvez dire "Je veux un document" pour commencer ou me poser une question."
                 
                 # Si c'est une demande complexe ou générale, utiliser Llama
                 if any(re.search(pattern, normalized_message) for pattern in complex_patterns):
+                    # En streaming, la génération standard transmet la réponse au fil de l'eau
+                    if stream:
+                        return original_generate_response(self, message, stream)
                     print("DEBUG - Utilisation de Llama pour une demande complexe/générale")
                     llama_response = self._get_llama_response(message)
                     if llama_response:
@@ -1,26 +1,29 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Request, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel
 import shutil
 import os
-import pandas as pd
+import asyncio
+import concurrent.futures
 from io import BytesIO
 import logging
 from datetime import datetime
 from typing import List, Optional
 import json
-import pytesseract
-from PIL import Image
-import docx
-from docx import Document
+import hashlib
+import tempfile
 import magic
-import spacy
-import nltk
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 import uuid
 
+import backend_jobs
+from backend_jobs import JobManager, QueueFullError, JOB_FAILED
+from backend_storage import BlobStore
+from doc_analyzer.utils.result_cache import hash_file
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -57,54 +60,98 @@ os.makedirs(PROCESSED_DIR, exist_ok=True)
 os.makedirs(TEMP_DIR, exist_ok=True)
 os.makedirs("logs", exist_ok=True)
 
+# Contenus uploadés, stockés une seule fois par empreinte SHA-256
+blob_store = BlobStore(os.path.join(UPLOAD_DIR, ".blobs"))
+
+# Lecture des uploads par blocs (jamais entièrement en mémoire)
+UPLOAD_CONFIG = {
+    "chunk_size": int(os.environ.get("VYNAL_UPLOAD_CHUNK_KB", 1024)) * 1024,
+    "max_size": int(os.environ.get("VYNAL_UPLOAD_MAX_MB", 1024)) * 1024 * 1024
+}
+
+ALLOWED_TYPES = [
+    'text/csv',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'application/pdf',
+    'image/jpeg',
+    'image/png',
+    'image/tiff'
+]
+
+# Détecteur de type MIME partagé (python-magic protège chaque appel par un verrou)
+mime_detector = magic.Magic(mime=True)
+
 # Montage des fichiers statiques
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Initialisation des modèles NLP
-try:
-    nlp = spacy.load("fr_core_news_sm")
-except:
-    logger.warning("Modèle spaCy non trouvé, téléchargement en cours...")
-    os.system("python -m spacy download fr_core_news_sm")
-    nlp = spacy.load("fr_core_news_sm")
-
-# Fonctions d'extraction de texte
-def extract_text_from_docx(file_path):
-    """Extrait le texte d'un document Word"""
-    try:
-        doc = Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text
-    except Exception as e:
-        logger.error(f"Erreur lors de l'extraction du texte DOCX: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail="Erreur lors de l'extraction du texte du document Word"
-        )
+# Configuration des tâches asynchrones (OCR, lecture et analyse des documents)
+JOB_CONFIG = {
+    "workers": int(os.environ.get("VYNAL_JOB_WORKERS", min(os.cpu_count() or 1, 4))),
+    "max_queue": int(os.environ.get("VYNAL_JOB_MAX_QUEUE", 100)),
+    "retention": float(os.environ.get("VYNAL_JOB_RETENTION", 3600)),
+    "preload_nlp": os.environ.get("VYNAL_JOB_PRELOAD_NLP", "1") == "1",
+    "nlp_batch_size": int(os.environ.get("VYNAL_NLP_BATCH_SIZE", 64)),
+    "nlp_n_process": int(os.environ.get("VYNAL_NLP_N_PROCESS", 1))
+}
 
-def extract_text_from_csv(file_path):
-    """Extrait le texte d'un fichier CSV"""
-    try:
-        df = pd.read_csv(file_path)
-        return df.to_string()
-    except Exception as e:
-        logger.error(f"Erreur lors de l'extraction du texte CSV: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail="Erreur lors de l'extraction du texte du fichier CSV"
-        )
+# Les traitements lourds sont exécutés par un pool de processus qui charge
+# le modèle spaCy une seule fois par worker
+jobs = JobManager(
+    executor_factory=lambda: concurrent.futures.ProcessPoolExecutor(
+        max_workers=JOB_CONFIG["workers"],
+        initializer=backend_jobs.init_worker,
+        initargs=(JOB_CONFIG["preload_nlp"],)
+    ),
+    max_concurrent=JOB_CONFIG["workers"],
+    max_queue=JOB_CONFIG["max_queue"],
+    retention=JOB_CONFIG["retention"]
+)
 
-def extract_text_from_image(file_path):
-    """Extrait le texte d'une image avec OCR"""
+def submit_job(kind, runner, params=None):
+    """Soumet une tâche, ou répond 503 si la file est pleine"""
     try:
-        text = pytesseract.image_to_string(Image.open(file_path), lang='fra')
-        return text
-    except Exception as e:
-        logger.error(f"Erreur lors de l'extraction du texte de l'image: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail="Erreur lors de l'extraction du texte de l'image"
-        )
+        return jobs.submit(kind, runner, params)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+def job_accepted(job):
+    """Réponse 202 retournée à la soumission d'une tâche"""
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/jobs/{job.id}",
+            "result_url": f"/jobs/{job.id}/result",
+            "events_url": f"/jobs/{job.id}/events"
+        }
+    )
+
+async def extract_text_cached(file_path, file_type, digest):
+    """
+    Extrait le texte d'un fichier dans le pool, ou réutilise le résultat
+    déjà calculé pour un contenu identique
+    """
+    # v2: texte des PDF (auparavant non extrait et mémorisé vide)
+    kind = f"text{os.path.splitext(file_path)[1].lower()}:v2"
+    text = await asyncio.to_thread(blob_store.get_result, digest, kind)
+    if text is None:
+        text = await jobs.run(backend_jobs.extract_text, file_path, file_type)
+        await asyncio.to_thread(blob_store.set_result, digest, kind, text)
+    else:
+        logger.info(f"Texte déjà extrait réutilisé pour {os.path.basename(file_path)}")
+    return text
+
+async def job_result(job, error_prefix):
+    """Attend la fin d'une tâche et retourne son résultat"""
+    await job.wait()
+    if job.status == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=f"{error_prefix}: {job.error}")
+    return job.result
+
+@app.on_event("shutdown")
+async def shutdown_jobs():
+    jobs.shutdown()
 
 # Gestion des erreurs globale
 @app.exception_handler(Exception)
@@ -126,84 +173,124 @@ async def home():
             "upload": "/upload/",
             "files": "/files/",
             "process": "/process/{filename}",
-            "analyze": "/analyze/{filename}"
+            "analyze": "/analyze/{filename}",
+            "analyze_batch": "/analyze/batch",
+            "jobs": "/jobs/",
+            "health": "/api/health"
         }
     }
 
+@app.get("/api/health")
+async def health():
+    """État de l'API (ne dépend d'aucun traitement en cours)"""
+    return {"status": "online", "jobs": jobs.stats()}
+
 @app.post("/upload/")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), wait: bool = True):
     """
     Endpoint pour l'upload de fichiers
     - Accepte les fichiers CSV, DOCX, PDF et images
-    - Valide le contenu
-    - Sauvegarde le fichier
-    - Retourne les informations du fichier
+    - Reçoit le fichier par blocs et valide le type dès le premier bloc
+    - Stocke une seule fois les contenus identiques (empreinte SHA-256)
+    - Extrait le texte dans une tâche asynchrone (ou réutilise l'extraction précédente)
+    - Retourne les informations du fichier (ou l'identifiant de la tâche si wait=false)
     """
+    temp_path = None
     try:
-        # Lecture du contenu du fichier
-        content = await file.read()
+        # Réception par blocs: écriture sur disque et calcul de l'empreinte au fil de l'eau
+        digest = hashlib.sha256()
+        file_type = None
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=TEMP_DIR, suffix=".upload")
         
-        # Détection du type de fichier
-        mime = magic.Magic(mime=True)
-        file_type = mime.from_buffer(content)
-        
-        # Validation du type de fichier
-        allowed_types = [
-            'text/csv',
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'application/pdf',
-            'image/jpeg',
-            'image/png',
-            'image/tiff'
-        ]
+        with os.fdopen(fd, "wb") as buffer:
+            def write_chunk(chunk):
+                buffer.write(chunk)
+                digest.update(chunk)
+            
+            while True:
+                chunk = await file.read(UPLOAD_CONFIG["chunk_size"])
+                if not chunk:
+                    break
+                
+                # Détection et validation du type dès le premier bloc
+                if file_type is None:
+                    file_type = mime_detector.from_buffer(chunk)
+                    if file_type not in ALLOWED_TYPES:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Type de fichier non supporté: {file_type}"
+                        )
+                
+                size += len(chunk)
+                if UPLOAD_CONFIG["max_size"] and size > UPLOAD_CONFIG["max_size"]:
+                    raise HTTPException(
+                        status_code=413,
+                        detail="Fichier trop volumineux"
+                    )
+                
+                await asyncio.to_thread(write_chunk, chunk)
         
-        if file_type not in allowed_types:
+        if file_type is None:
             raise HTTPException(
                 status_code=400,
-                detail=f"Type de fichier non supporté: {file_type}"
+                detail="Fichier vide"
             )
+        
+        # Un contenu déjà reçu n'est stocké qu'une fois
+        sha256 = digest.hexdigest()
+        _, duplicate = await asyncio.to_thread(blob_store.commit, temp_path, sha256, file_type)
+        temp_path = None
 
         # Sauvegarde du fichier
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{timestamp}_{file.filename}"
+        safe_filename = f"{timestamp}_{os.path.basename(file.filename)}"
         file_path = os.path.join(UPLOAD_DIR, safe_filename)
-        
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
-
-        # Extraction du texte selon le type de fichier
-        text = ""
-        if file.filename.endswith(".docx"):
-            text = extract_text_from_docx(file_path)
-        elif file.filename.endswith(".csv"):
-            text = extract_text_from_csv(file_path)
-        elif file_type.startswith('image/'):
-            text = extract_text_from_image(file_path)
-
-        logger.info(f"Fichier {safe_filename} uploadé et traité avec succès")
-        
-        return {
-            "message": "Fichier reçu et traité avec succès",
-            "filename": safe_filename,
-            "type": file_type,
-            "timestamp": timestamp,
-            "content": text if text else None
-        }
+        await asyncio.to_thread(blob_store.link, sha256, file_path)
 
+        async def run(job):
+            # Extraction du texte selon le type de fichier
+            job.update(0.1, "Extraction du texte")
+            text = await extract_text_cached(file_path, file_type, sha256)
+            logger.info(f"Fichier {safe_filename} uploadé et traité avec succès")
+            return {
+                "message": "Fichier reçu et traité avec succès",
+                "filename": safe_filename,
+                "type": file_type,
+                "timestamp": timestamp,
+                "content": text if text else None,
+                "sha256": sha256,
+                "duplicate": duplicate
+            }
+
+        job = submit_job("upload", run, {"filename": safe_filename})
+        if not wait:
+            return job_accepted(job)
+        return await job_result(job, "Erreur lors du traitement du fichier")
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erreur lors de l'upload: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Erreur lors du traitement du fichier: {str(e)}"
         )
+    finally:
+        # Fichier temporaire d'un upload rejeté ou interrompu
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
 
 @app.post("/process/{filename}")
-async def process_file(filename: str, background_tasks: BackgroundTasks):
+async def process_file(filename: str, wait: bool = True):
     """
     Traite un fichier uploadé
-    - Extraction de texte pour les images (OCR)
+    - Extraction de texte pour les images (OCR), les PDF et les documents Word
     - Conversion de format si nécessaire
     - Analyse du contenu
+    
+    Le traitement est exécuté dans une tâche asynchrone; avec wait=false,
+    l'identifiant de la tâche est retourné immédiatement.
     """
     try:
         file_path = os.path.join(UPLOAD_DIR, filename)
@@ -213,36 +300,43 @@ async def process_file(filename: str, background_tasks: BackgroundTasks):
                 detail="Fichier non trouvé"
             )
 
-        # Détection du type de fichier
-        mime = magic.Magic(mime=True)
-        file_type = mime.from_file(file_path)
-        
-        # Traitement selon le type de fichier
-        if file_type.startswith('image/'):
-            # OCR pour les images
-            text = extract_text_from_image(file_path)
-            processed_path = os.path.join(PROCESSED_DIR, f"{filename}_text.txt")
-            with open(processed_path, 'w', encoding='utf-8') as f:
-                f.write(text)
+        async def run(job):
+            # Détection du type de fichier
+            file_type = await asyncio.to_thread(mime_detector.from_file, file_path)
+            
+            # Traitement selon le type de fichier
+            if file_type.startswith('image/') or file_type == 'application/pdf' or \
+                    file_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
+                # OCR pour les images, lecture pour les documents Word et PDF
+                job.update(0.1, "Extraction du texte")
+                digest = await asyncio.to_thread(hash_file, file_path)
+                text = await extract_text_cached(file_path, file_type, digest)
+                processed_path = os.path.join(PROCESSED_DIR, f"{filename}_text.txt")
                 
-        elif file_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
-            # Traitement des documents Word
-            text = extract_text_from_docx(file_path)
-            processed_path = os.path.join(PROCESSED_DIR, f"{filename}_text.txt")
-            with open(processed_path, 'w', encoding='utf-8') as f:
-                f.write(text)
+                def save():
+                    with open(processed_path, 'w', encoding='utf-8') as f:
+                        f.write(text)
                 
-        else:
-            # Copie simple pour les autres types
-            processed_path = os.path.join(PROCESSED_DIR, filename)
-            shutil.copy2(file_path, processed_path)
+                job.update(0.9, "Enregistrement du texte")
+                await asyncio.to_thread(save)
+            else:
+                # Copie simple pour les autres types
+                processed_path = os.path.join(PROCESSED_DIR, filename)
+                await asyncio.to_thread(shutil.copy2, file_path, processed_path)
 
-        return {
-            "message": "Fichier traité avec succès",
-            "processed_file": processed_path,
-            "type": file_type
-        }
+            return {
+                "message": "Fichier traité avec succès",
+                "processed_file": processed_path,
+                "type": file_type
+            }
 
+        job = submit_job("process", run, {"filename": filename})
+        if not wait:
+            return job_accepted(job)
+        return await job_result(job, "Erreur lors du traitement du fichier")
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erreur lors du traitement: {str(e)}")
         raise HTTPException(
@@ -251,12 +345,15 @@ async def process_file(filename: str, background_tasks: BackgroundTasks):
         )
 
 @app.get("/analyze/{filename}")
-async def analyze_file(filename: str):
+async def analyze_file(filename: str, wait: bool = True):
     """
     Analyse le contenu d'un fichier
     - Extraction des entités nommées
     - Analyse des sentiments
     - Statistiques de base
+    
+    L'analyse est exécutée dans une tâche asynchrone; avec wait=false,
+    l'identifiant de la tâche est retourné immédiatement.
     """
     try:
         file_path = os.path.join(PROCESSED_DIR, filename)
@@ -266,40 +363,31 @@ async def analyze_file(filename: str):
                 detail="Fichier non trouvé"
             )
 
-        # Lecture du contenu
-        with open(file_path, 'r', encoding='utf-8') as f:
-            text = f.read()
-
-        # Analyse avec spaCy
-        doc = nlp(text)
-        
-        # Extraction des entités
-        entities = []
-        for ent in doc.ents:
-            entities.append({
-                "text": ent.text,
-                "label": ent.label_,
-                "start": ent.start_char,
-                "end": ent.end_char
-            })
-
-        # Statistiques de base
-        words = text.split()
-        sentences = nltk.sent_tokenize(text)
-        
-        stats = {
-            "word_count": len(words),
-            "sentence_count": len(sentences),
-            "avg_word_length": sum(len(word) for word in words) / len(words) if words else 0,
-            "unique_words": len(set(words))
-        }
+        async def run(job):
+            # Lecture du contenu
+            def read():
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            
+            text = await asyncio.to_thread(read)
+            
+            # Analyse avec spaCy dans un processus worker
+            job.update(0.1, "Analyse du texte")
+            analysis = await jobs.run(backend_jobs.analyze_text, text)
+            
+            return {
+                "filename": filename,
+                "entities": analysis["entities"],
+                "statistics": analysis["statistics"]
+            }
 
-        return {
-            "filename": filename,
-            "entities": entities,
-            "statistics": stats
-        }
+        job = submit_job("analyze", run, {"filename": filename})
+        if not wait:
+            return job_accepted(job)
+        return await job_result(job, "Erreur lors de l'analyse du fichier")
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse: {str(e)}")
         raise HTTPException(
@@ -307,6 +395,106 @@ async def analyze_file(filename: str):
             detail=f"Erreur lors de l'analyse du fichier: {str(e)}"
         )
 
+class BatchAnalysisRequest(BaseModel):
+    """Fichiers traités à analyser en lot"""
+    filenames: List[str]
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalysisRequest, wait: bool = True):
+    """
+    Analyse un lot de fichiers traités
+    - Les textes sont analysés par lots avec nlp.pipe (VYNAL_NLP_BATCH_SIZE textes par lot)
+    - Les lots sont répartis entre les workers du pool
+    - Retourne les entités et statistiques de chaque fichier, dans l'ordre demandé
+    """
+    if not request.filenames:
+        raise HTTPException(status_code=400, detail="Aucun fichier à analyser")
+
+    file_paths = [os.path.join(PROCESSED_DIR, filename) for filename in request.filenames]
+    missing = [name for name, path in zip(request.filenames, file_paths) if not os.path.exists(path)]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Fichiers non trouvés: {', '.join(missing)}")
+
+    async def run(job):
+        def read_all():
+            texts = []
+            for path in file_paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    texts.append(f.read())
+            return texts
+
+        texts = await asyncio.to_thread(read_all)
+        batch_size = JOB_CONFIG["nlp_batch_size"]
+        analyzed = 0
+
+        async def analyze_chunk(chunk):
+            nonlocal analyzed
+            results = await jobs.run(backend_jobs.analyze_texts, chunk, batch_size, JOB_CONFIG["nlp_n_process"])
+            analyzed += len(chunk)
+            job.update(analyzed / len(texts), f"{analyzed}/{len(texts)} fichiers analysés")
+            return results
+
+        chunks = await asyncio.gather(*(
+            analyze_chunk(texts[start:start + batch_size]) for start in range(0, len(texts), batch_size)
+        ))
+        analyses = [analysis for chunk in chunks for analysis in chunk]
+
+        return {
+            "count": len(analyses),
+            "results": [
+                {"filename": filename, "entities": analysis["entities"], "statistics": analysis["statistics"]}
+                for filename, analysis in zip(request.filenames, analyses)
+            ]
+        }
+
+    job = submit_job("analyze_batch", run, {"count": len(request.filenames)})
+    if not wait:
+        return job_accepted(job)
+    return await job_result(job, "Erreur lors de l'analyse des fichiers")
+
+@app.get("/jobs/")
+async def list_jobs(status: Optional[str] = None):
+    """Liste les tâches, les plus récentes d'abord"""
+    return {"jobs": [job.to_dict() for job in jobs.list(status)], "stats": jobs.stats()}
+
+def get_job_or_404(job_id):
+    """Retourne une tâche ou répond 404"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    return job
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """État d'une tâche"""
+    return get_job_or_404(job_id).to_dict()
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Résultat d'une tâche
+    - 202 si la tâche n'est pas terminée
+    - 500 avec le message d'erreur si elle a échoué
+    """
+    job = get_job_or_404(job_id)
+    if not job.finished:
+        return JSONResponse(status_code=202, content=job.to_dict())
+    if job.status == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    return job.result
+
+@app.get("/jobs/{job_id}/events")
+async def get_job_events(job_id: str):
+    """Progression d'une tâche en Server-Sent Events, jusqu'à sa fin"""
+    job = get_job_or_404(job_id)
+
+    async def stream():
+        async for state in job.events():
+            yield f"event: {state['status']}\ndata: {json.dumps(state, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
 @app.get("/files/")
 async def list_files():
     """Liste tous les fichiers uploadés"""
@@ -314,6 +502,9 @@ async def list_files():
         files = []
         for filename in os.listdir(UPLOAD_DIR):
             file_path = os.path.join(UPLOAD_DIR, filename)
+            # Ignorer le dossier des contenus
+            if not os.path.isfile(file_path):
+                continue
             file_stat = os.stat(file_path)
             files.append({
                 "filename": filename,
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tâches asynchrones de l'API Vynal Docs Automator
+Les traitements lourds (OCR, lecture des documents, analyse spaCy) sont exécutés
+par un pool de processus borné, hors de la boucle d'événements: une requête
+soumet une tâche et reçoit immédiatement son identifiant, puis consulte son
+état, son résultat ou suit sa progression.
+"""
+
+import uuid
+import asyncio
+import logging
+import functools
+import concurrent.futures
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Callable, Awaitable, AsyncIterator
+
+logger = logging.getLogger("VynalDocsAutomator.BackendJobs")
+
+# États d'une tâche
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+FINISHED_STATUSES = (JOB_DONE, JOB_FAILED)
+
+
+class QueueFullError(Exception):
+    """La file des tâches a atteint sa profondeur maximale"""
+
+
+class Job:
+    """
+    Tâche soumise au gestionnaire: état, progression et résultat
+    """
+
+    def __init__(self, kind: str, params: Optional[Dict[str, Any]] = None):
+        """
+        Initialise la tâche
+
+        Args:
+            kind: Type de tâche (upload, process, analyze...)
+            params: Paramètres affichés avec l'état de la tâche
+        """
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = JOB_QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        """Indique si la tâche est terminée (succès ou échec)"""
+        return self.status in FINISHED_STATUSES
+
+    def update(self, progress: Optional[float] = None, message: Optional[str] = None):
+        """
+        Met à jour la progression et prévient les abonnés
+
+        Args:
+            progress: Progression entre 0 et 1
+            message: Étape en cours
+        """
+        if progress is not None:
+            self.progress = max(0.0, min(1.0, progress))
+        if message is not None:
+            self.message = message
+        self._notify()
+
+    def _notify(self):
+        """Réveille les coroutines qui attendent un changement"""
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self, timeout: Optional[float] = None) -> "Job":
+        """
+        Attend la fin de la tâche
+
+        Args:
+            timeout: Délai maximum en secondes
+
+        Returns:
+            Job: La tâche elle-même
+        """
+        async def wait_finished():
+            while not self.finished:
+                await self._changed.wait()
+
+        await asyncio.wait_for(wait_finished(), timeout)
+        return self
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Produit l'état de la tâche à chaque changement, jusqu'à sa fin
+
+        Yields:
+            Dict[str, Any]: État de la tâche
+        """
+        while True:
+            changed = self._changed
+            yield self.to_dict()
+            if self.finished:
+                return
+            await changed.wait()
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        """
+        Représentation JSON de la tâche
+
+        Args:
+            include_result: Inclure le résultat
+
+        Returns:
+            Dict[str, Any]: État de la tâche
+        """
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """
+    Gestionnaire de tâches: limite le nombre de tâches simultanées et la
+    profondeur de la file, et exécute les traitements bloquants dans un pool.
+    """
+
+    def __init__(self, executor_factory: Callable[[], concurrent.futures.Executor],
+                 max_concurrent: int = 2, max_queue: int = 100,
+                 retention: float = 3600, max_finished: int = 1000):
+        """
+        Initialise le gestionnaire
+
+        Args:
+            executor_factory: Fabrique du pool d'exécution (créé au premier besoin)
+            max_concurrent: Nombre maximum de tâches exécutées simultanément
+            max_queue: Nombre maximum de tâches en attente ou en cours
+            retention: Durée de conservation des tâches terminées (secondes)
+            max_finished: Nombre maximum de tâches terminées conservées
+        """
+        self.executor_factory = executor_factory
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(1, max_queue)
+        self.retention = retention
+        self.max_finished = max_finished
+        self.jobs: Dict[str, Job] = {}
+        self._executor = None
+        self._semaphore = None
+        self._tasks = set()
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        """Pool d'exécution, créé au premier besoin"""
+        if self._executor is None:
+            self._executor = self.executor_factory()
+        return self._executor
+
+    def active_count(self) -> int:
+        """Nombre de tâches en attente ou en cours"""
+        return sum(1 for job in self.jobs.values() if not job.finished)
+
+    def submit(self, kind: str, runner: Callable[[Job], Awaitable[Any]],
+               params: Optional[Dict[str, Any]] = None) -> Job:
+        """
+        Soumet une tâche; elle démarre dès qu'un emplacement est libre
+
+        Args:
+            kind: Type de tâche
+            runner: Coroutine exécutant la tâche, appelée avec la tâche et
+                    retournant son résultat
+            params: Paramètres affichés avec l'état de la tâche
+
+        Returns:
+            Job: Tâche créée
+
+        Raises:
+            QueueFullError: Si la file est pleine
+        """
+        self._prune()
+        if self.active_count() >= self.max_queue:
+            raise QueueFullError(f"File des tâches pleine ({self.max_queue} tâches en attente)")
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        job = Job(kind, params)
+        self.jobs[job.id] = job
+
+        task = asyncio.get_running_loop().create_task(self._execute(job, runner))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _execute(self, job: Job, runner: Callable[[Job], Awaitable[Any]]):
+        """Exécute une tâche lorsqu'un emplacement se libère"""
+        async with self._semaphore:
+            job.status = JOB_RUNNING
+            job.started_at = datetime.now()
+            job.update()
+            try:
+                job.result = await runner(job)
+                job.status = JOB_DONE
+                job.progress = 1.0
+            except Exception as e:
+                logger.error(f"Échec de la tâche {job.kind} {job.id}: {e}")
+                job.error = str(e)
+                job.status = JOB_FAILED
+            finally:
+                job.finished_at = datetime.now()
+                job.update()
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Exécute une fonction bloquante dans le pool sans bloquer la boucle
+
+        Args:
+            func: Fonction (picklable pour un pool de processus)
+
+        Returns:
+            Any: Résultat de la fonction
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Retourne une tâche par son identifiant"""
+        return self.jobs.get(job_id)
+
+    def list(self, status: Optional[str] = None) -> List[Job]:
+        """
+        Liste les tâches, les plus récentes d'abord
+
+        Args:
+            status: Ne retenir que les tâches dans cet état
+
+        Returns:
+            List[Job]: Tâches
+        """
+        self._prune()
+        jobs = [job for job in self.jobs.values() if status is None or job.status == status]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Nombre de tâches par état"""
+        counts = {status: 0 for status in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    def _prune(self):
+        """Oublie les tâches terminées expirées ou en surnombre"""
+        limit = datetime.now() - timedelta(seconds=self.retention)
+        finished = sorted((job for job in self.jobs.values() if job.finished),
+                          key=lambda job: job.finished_at)
+        excess = len(finished) - self.max_finished
+        for index, job in enumerate(finished):
+            if index < excess or job.finished_at < limit:
+                del self.jobs[job.id]
+
+    def shutdown(self):
+        """Arrête le pool d'exécution"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# ----- Traitements exécutés dans les processus workers -----
+
+def get_nlp():
+    """
+    Retourne le modèle spaCy partagé du processus (chargé au premier appel)
+
+    Returns:
+        Modèle spaCy configuré par NLP_CONFIG
+    """
+    from doc_analyzer.utils.nlp_service import get_nlp as get_shared_nlp
+    model = get_shared_nlp()
+    if model is None:
+        raise RuntimeError("spaCy n'est pas installé")
+    return model
+
+
+def init_worker(preload_nlp: bool = False):
+    """
+    Initialise un processus worker
+
+    Args:
+        preload_nlp: Charger le modèle spaCy dès le démarrage du worker
+    """
+    if preload_nlp:
+        get_nlp()
+
+
+def extract_text_from_docx(file_path: str) -> str:
+    """Extrait le texte d'un document Word"""
+    from doc_analyzer.utils.text_extraction import get_text_extractor
+    try:
+        return get_text_extractor().extract_text(file_path, separator="\n")
+    except Exception as e:
+        logger.error(f"Erreur lors de l'extraction du texte DOCX: {str(e)}")
+        raise RuntimeError("Erreur lors de l'extraction du texte du document Word")
+
+
+def extract_text_from_pdf(file_path: str) -> str:
+    """Extrait le texte d'un PDF (couche texte, OCR pour les pages numérisées)"""
+    from doc_analyzer.utils.text_extraction import get_text_extractor
+    try:
+        return get_text_extractor().extract_text(file_path)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'extraction du texte PDF: {str(e)}")
+        raise RuntimeError("Erreur lors de l'extraction du texte du PDF")
+
+
+def extract_text_from_csv(file_path: str) -> str:
+    """Extrait le texte d'un fichier CSV"""
+    import pandas as pd
+    try:
+        return pd.read_csv(file_path).to_string()
+    except Exception as e:
+        logger.error(f"Erreur lors de l'extraction du texte CSV: {str(e)}")
+        raise RuntimeError("Erreur lors de l'extraction du texte du fichier CSV")
+
+
+def extract_text_from_image(file_path: str) -> str:
+    """Extrait le texte d'une image avec OCR"""
+    import pytesseract
+    from PIL import Image
+    try:
+        with Image.open(file_path) as image:
+            return pytesseract.image_to_string(image, lang='fra')
+    except Exception as e:
+        logger.error(f"Erreur lors de l'extraction du texte de l'image: {str(e)}")
+        raise RuntimeError("Erreur lors de l'extraction du texte de l'image")
+
+
+def extract_text(file_path: str, file_type: str) -> str:
+    """
+    Extrait le texte d'un fichier selon son type
+
+    Args:
+        file_path: Chemin du fichier
+        file_type: Type MIME du fichier
+
+    Returns:
+        str: Texte extrait (chaîne vide pour les types sans extraction)
+    """
+    if file_path.endswith(".docx") or \
+            file_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
+        return extract_text_from_docx(file_path)
+    if file_path.endswith(".pdf") or file_type == 'application/pdf':
+        return extract_text_from_pdf(file_path)
+    if file_path.endswith(".csv"):
+        return extract_text_from_csv(file_path)
+    if file_type.startswith('image/'):
+        return extract_text_from_image(file_path)
+    return ""
+
+
+def text_statistics(text: str) -> Dict[str, Any]:
+    """
+    Statistiques de base d'un texte
+
+    Args:
+        text: Texte à analyser
+
+    Returns:
+        Dict[str, Any]: Nombre de mots, de phrases, longueur moyenne et mots uniques
+    """
+    import nltk
+
+    words = text.split()
+    sentences = nltk.sent_tokenize(text)
+    return {
+        "word_count": len(words),
+        "sentence_count": len(sentences),
+        "avg_word_length": sum(len(word) for word in words) / len(words) if words else 0,
+        "unique_words": len(set(words))
+    }
+
+
+def analyze_text(text: str) -> Dict[str, Any]:
+    """
+    Analyse un texte: entités nommées et statistiques de base
+
+    Args:
+        text: Texte à analyser
+
+    Returns:
+        Dict[str, Any]: Entités ("entities") et statistiques ("statistics")
+    """
+    from doc_analyzer.utils.nlp_service import entities
+
+    return {"entities": entities(get_nlp()(text)), "statistics": text_statistics(text)}
+
+
+def analyze_texts(texts: List[str], batch_size: Optional[int] = None,
+                  n_process: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Analyse une série de textes en un seul passage nlp.pipe
+
+    Args:
+        texts: Textes à analyser
+        batch_size: Nombre de textes par lot (NLP_CONFIG par défaut)
+        n_process: Nombre de processus spaCy (NLP_CONFIG par défaut)
+
+    Returns:
+        List[Dict[str, Any]]: Une analyse par texte, dans l'ordre des textes
+    """
+    from doc_analyzer.utils.nlp_service import entities, pipe_texts
+
+    get_nlp()
+    return [
+        {"entities": entities(doc), "statistics": text_statistics(text)}
+        for text, doc in zip(texts, pipe_texts(texts, batch_size, n_process))
+    ]
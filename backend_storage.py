@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Stockage des fichiers reçus par l'API Vynal Docs Automator
+Chaque contenu distinct est conservé une seule fois, sous son empreinte SHA-256;
+les noms de fichiers uploadés sont des liens vers ce contenu. Les résultats
+d'extraction sont enregistrés à côté du contenu et réutilisés lorsque le même
+fichier est envoyé à nouveau.
+"""
+
+import os
+import json
+import shutil
+import logging
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger("VynalDocsAutomator.BackendStorage")
+
+
+class BlobStore:
+    """
+    Stockage adressé par contenu des fichiers uploadés
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialise le stockage
+
+        Args:
+            root: Dossier des contenus (créé si nécessaire)
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def blob_path(self, digest: str) -> str:
+        """Chemin du contenu correspondant à une empreinte"""
+        return os.path.join(self.root, digest)
+
+    def _sidecar_path(self, digest: str, name: str) -> str:
+        """Chemin d'un fichier annexe (métadonnées, résultat) d'un contenu"""
+        return os.path.join(self.root, f"{digest}.{name}.json")
+
+    def _write_json(self, path: str, data: Any):
+        """Écrit un fichier JSON de manière atomique"""
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _read_json(self, path: str) -> Optional[Any]:
+        """Lit un fichier JSON, None s'il est absent ou illisible"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Fichier annexe illisible {path}: {e}")
+            return None
+
+    def commit(self, temp_path: str, digest: str, file_type: str) -> Tuple[str, bool]:
+        """
+        Enregistre un fichier reçu sous son empreinte
+
+        Args:
+            temp_path: Fichier temporaire contenant l'upload (déplacé ou supprimé)
+            digest: Empreinte SHA-256 du contenu
+            file_type: Type MIME détecté
+
+        Returns:
+            tuple: (chemin du contenu, True si ce contenu était déjà stocké)
+        """
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            os.remove(temp_path)
+            return path, True
+
+        os.replace(temp_path, path)
+        self._write_json(self._sidecar_path(digest, "meta"), {
+            "type": file_type,
+            "size": os.path.getsize(path),
+            "stored_at": datetime.now().isoformat()
+        })
+        return path, False
+
+    def link(self, digest: str, dest_path: str):
+        """
+        Expose un contenu sous un nom de fichier (lien physique, copie à défaut)
+
+        Args:
+            digest: Empreinte du contenu
+            dest_path: Chemin du fichier à créer
+        """
+        try:
+            os.link(self.blob_path(digest), dest_path)
+        except OSError:
+            # Système de fichiers sans liens physiques
+            shutil.copyfile(self.blob_path(digest), dest_path)
+
+    def get_meta(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Métadonnées d'un contenu (type, taille, date d'enregistrement)"""
+        return self._read_json(self._sidecar_path(digest, "meta"))
+
+    def get_result(self, digest: str, kind: str) -> Optional[Any]:
+        """
+        Retourne un résultat enregistré pour un contenu
+
+        Args:
+            digest: Empreinte du contenu
+            kind: Type de résultat (par exemple "text.docx")
+
+        Returns:
+            Optional[Any]: Résultat, ou None s'il n'a jamais été calculé
+        """
+        data = self._read_json(self._sidecar_path(digest, kind))
+        return data["value"] if isinstance(data, dict) and "value" in data else None
+
+    def set_result(self, digest: str, kind: str, value: Any):
+        """
+        Enregistre un résultat pour un contenu
+
+        Args:
+            digest: Empreinte du contenu
+            kind: Type de résultat
+            value: Résultat (sérialisable en JSON)
+        """
+        self._write_json(self._sidecar_path(digest, kind), {
+            "value": value,
+            "computed_at": datetime.now().isoformat()
+        })
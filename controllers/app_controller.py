@@ -180,9 +180,8 @@ class AppController:
         if confirm:
             # Sauvegarder les données non enregistrées
             try:
-                self.model.save_clients()
-                self.model.save_templates()
-                self.model.save_documents()
+                # Enregistrer puis exporter les fichiers JSON encore lus par d'autres modules
+                self.model.export_json_files()
                 logger.info("Données sauvegardées avant fermeture")
             except Exception as e:
                 logger.error(f"Erreur lors de la sauvegarde des données: {e}")
@@ -434,10 +433,8 @@ class AppController:
             templates_backup = os.path.join(backup_dir, "templates.json")
             documents_backup = os.path.join(backup_dir, "documents.json")
             
-            # Sauvegarder les clients, modèles et documents
-            self.model.save_clients()
-            self.model.save_templates()
-            self.model.save_documents()
+            # Exporter les clients, modèles et documents vers leurs fichiers JSON
+            self.model.export_json_files()
             
             # Copier les fichiers
             clients_file = os.path.join(self.model.paths['clients'], "clients.json")
@@ -522,7 +519,8 @@ class AppController:
                     shutil.copy2(templates_backup, templates_file)
                     shutil.copy2(documents_backup, documents_file)
                     
-                    # Recharger les données
+                    # Réimporter les fichiers restaurés dans la base et recharger les données
+                    self.model.import_json_files()
                     self.model.load_all_data()
                     
                     # Mettre à jour les vues
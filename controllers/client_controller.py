@@ -267,7 +267,7 @@ class ClientController:
             self.model.clients[client_index] = data
             
             # Sauvegarder les modifications
-            self.model.save_clients()
+            self.model.save_clients(changed=[data])
             
             # Ajouter l'activité
             self.model.add_activity('client', f"Client modifié: {data.get('name')}")
@@ -300,7 +300,7 @@ class ClientController:
             self.model.clients.append(data)
             
             # Sauvegarder les modifications
-            self.model.save_clients()
+            self.model.save_clients(changed=[data])
             
             # Ajouter l'activité
             self.model.add_activity('client', f"Nouveau client: {data.get('name')}")
@@ -330,7 +330,7 @@ class ClientController:
             self.model.clients = [c for c in self.model.clients if c.get('id') != client_id]
             
             # Sauvegarder les modifications
-            self.model.save_clients()
+            self.model.save_clients(deleted_ids=[client_id])
             
             # Ajouter l'activité
             self.model.add_activity('client', f"Client supprimé: {client.get('name')}")
@@ -480,7 +480,7 @@ class ClientController:
                     count += 1
                 
                 # Sauvegarder les changements
-                self.model.save_clients()
+                self.model.save_clients(changed=imported_clients)
                 
                 # Mettre à jour la vue
                 self.view.update_view()
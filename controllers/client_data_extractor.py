@@ -103,14 +103,12 @@ class ClientDataExtractor:
     
     def _initialize_extractors(self):
         """Initialise les extracteurs spécialisés"""
-        try:
-            # Import conditionnel des dépendances optionnelles
-            import spacy
-            self.nlp = spacy.load("fr_core_news_sm")
-            self.has_spacy = True
-        except ImportError:
+        # Modèle spaCy partagé avec l'analyseur de documents (chargé au premier usage)
+        from doc_analyzer.utils.nlp_service import nlp, SPACY_AVAILABLE
+        self.nlp = nlp
+        self.has_spacy = SPACY_AVAILABLE
+        if not self.has_spacy:
             logger.warning("Spacy non disponible, utilisation des patterns regex uniquement")
-            self.has_spacy = False
     
     def extract_client_data(self, document_text: str, context: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -18,7 +18,7 @@ from reportlab.lib.pagesizes import A4
 import docx
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from doc_analyzer.analyzer import DocumentAnalyzer
+from doc_analyzer.analyzer_service import acquire_document_analyzer
 from docx.shared import Inches
 
 logger = logging.getLogger("VynalDocsAutomator.DocumentController")
@@ -206,8 +206,8 @@ class DocumentController:
         self.model = app_model
         self.view = document_view
         
-        # Initialiser l'analyseur de documents
-        self.document_analyzer = DocumentAnalyzer()
+        # Analyseur de documents partagé (extracteurs déjà construits au démarrage)
+        self.document_analyzer = acquire_document_analyzer()
         
         # Connecter les événements de la vue aux méthodes du contrôleur
         self.connect_events()
@@ -502,7 +502,7 @@ class DocumentController:
                     file_path = result
                     document['file_path'] = file_path
                 
-                self.model.save_documents()
+                self.model.save_documents(changed=[document])
             
             # Ouvrir le fichier avec l'application par défaut du système
             try:
@@ -236,7 +236,7 @@ class TemplateController:
                 self.model.templates.append(template_data)
                 
                 # Sauvegarder les changements
-                self.model.save_templates()
+                self.model.save_templates(changed=[template_data])
                 
                 # Mettre à jour la vue
                 self.view.update_view()
@@ -479,7 +479,7 @@ class TemplateController:
                     self.model.templates[template_index] = template_data
                     
                     # Sauvegarder les changements
-                    if self.model.save_templates():
+                    if self.model.save_templates(changed=[template_data]):
                         # Mettre à jour la vue
                         self.view.update_view()
                         
@@ -643,7 +643,7 @@ class TemplateController:
             self.model.templates.append(imported_template)
             
             # Sauvegarder les changements
-            self.model.save_templates()
+            self.model.save_templates(changed=[imported_template])
             
             # Mettre à jour la vue
             self.view.update_view()
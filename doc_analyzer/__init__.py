@@ -3,5 +3,9 @@ Module d'analyse de documents pour Vynal Docs Automator
 """
 
 from .analyzer import DocumentAnalyzer
+from .analyzer_service import (
+    AnalyzerService, get_analyzer_service, acquire_document_analyzer, release_document_analyzer
+)
 
-__all__ = ['DocumentAnalyzer']
+__all__ = ['DocumentAnalyzer', 'AnalyzerService', 'get_analyzer_service',
+           'acquire_document_analyzer', 'release_document_analyzer']
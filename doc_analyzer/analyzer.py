@@ -14,6 +14,7 @@ from doc_analyzer.extractors.legal_docs import LegalDocsExtractor
 from doc_analyzer.extractors.identity_docs import IdentityDocExtractor
 from doc_analyzer.extractors.contracts import ContractExtractor
 from doc_analyzer.extractors.business_docs import BusinessDocExtractor
+from doc_analyzer.extractors.engine import ExtractionEngine, PreparedDocument
 
 from doc_analyzer.recognizers.phone_recognizer import PhoneRecognizer
 from doc_analyzer.recognizers.name_recognizer import NameRecognizer
@@ -23,14 +24,26 @@ from doc_analyzer.recognizers.address_recognizer import AddressRecognizer
 from doc_analyzer.utils.text_processor import TextProcessor
 from doc_analyzer.utils.validators import DataValidator
 from doc_analyzer.utils.ocr import OCRProcessor
+from doc_analyzer.utils.result_cache import get_result_cache, hash_file
+from doc_analyzer.analyzer_service import get_analyzer_service
 
 logger = logging.getLogger("VynalDocsAutomator.Views.Analysis")
 
 class DocumentAnalyzer:
     """
     Classe principale pour l'analyse de documents
+    Les composants sont construits à la demande, une seule fois même si
+    plusieurs threads les demandent en même temps.
     """
     
+    # Composants construits à la demande (noms des propriétés)
+    COMPONENTS = (
+        'personal_data_extractor', 'legal_docs_extractor', 'identity_doc_extractor',
+        'contract_extractor', 'business_doc_extractor',
+        'phone_recognizer', 'name_recognizer', 'id_recognizer', 'address_recognizer',
+        'text_processor', 'data_validator', 'ocr_processor', 'extraction_engine'
+    )
+    
     def __init__(self):
         """
         Initialise l'analyseur de documents avec initialisation paresseuse des composants
@@ -50,96 +63,139 @@ class DocumentAnalyzer:
         self._text_processor = None
         self._data_validator = None
         self._ocr_processor = None
+        self._extraction_engine = None
+        
+        # Réentrant: le moteur d'extraction est construit à partir des extracteurs
+        self._components_lock = threading.RLock()
         
         logger.info("DocumentAnalyzer initialisé avec succès")
     
+    def _component(self, attribute: str, factory: Callable[[], Any], message: str):
+        """
+        Retourne un composant, construit au premier accès
+        
+        Args:
+            attribute: Attribut privé du composant
+            factory: Fonction construisant le composant
+            message: Message journalisé après la construction
+        """
+        component = getattr(self, attribute)
+        if component is None:
+            with self._components_lock:
+                component = getattr(self, attribute)
+                if component is None:
+                    component = factory()
+                    setattr(self, attribute, component)
+                    if component is not None:
+                        logger.info(message)
+        return component
+    
     # Propriétés pour l'initialisation paresseuse
     @property
     def personal_data_extractor(self):
-        if self._personal_data_extractor is None:
-            self._personal_data_extractor = PersonalDataExtractor()
-            logger.info("Extracteur de données personnelles initialisé")
-        return self._personal_data_extractor
+        return self._component('_personal_data_extractor', PersonalDataExtractor,
+                               "Extracteur de données personnelles initialisé")
     
     @property
     def legal_docs_extractor(self):
-        if self._legal_docs_extractor is None:
-            self._legal_docs_extractor = LegalDocsExtractor()
-            logger.info("Extracteur de documents légaux initialisé")
-        return self._legal_docs_extractor
+        return self._component('_legal_docs_extractor', LegalDocsExtractor,
+                               "Extracteur de documents légaux initialisé")
     
     @property
     def identity_doc_extractor(self):
-        if self._identity_doc_extractor is None:
-            self._identity_doc_extractor = IdentityDocExtractor()
-            logger.info("Extracteur de documents d'identité initialisé")
-        return self._identity_doc_extractor
+        return self._component('_identity_doc_extractor', IdentityDocExtractor,
+                               "Extracteur de documents d'identité initialisé")
     
     @property
     def contract_extractor(self):
-        if self._contract_extractor is None:
-            self._contract_extractor = ContractExtractor()
-            logger.info("Extracteur de contrats initialisé")
-        return self._contract_extractor
+        return self._component('_contract_extractor', ContractExtractor,
+                               "Extracteur de contrats initialisé")
     
     @property
     def business_doc_extractor(self):
-        if self._business_doc_extractor is None:
-            self._business_doc_extractor = BusinessDocExtractor()
-            logger.info("BusinessDocExtractor initialized")
-        return self._business_doc_extractor
+        return self._component('_business_doc_extractor', BusinessDocExtractor,
+                               "BusinessDocExtractor initialized")
     
     @property
     def phone_recognizer(self):
-        if self._phone_recognizer is None:
-            self._phone_recognizer = PhoneRecognizer()
-            logger.info("Reconnaisseur de numéros de téléphone initialisé")
-        return self._phone_recognizer
+        return self._component('_phone_recognizer', PhoneRecognizer,
+                               "Reconnaisseur de numéros de téléphone initialisé")
     
     @property
     def name_recognizer(self):
-        if self._name_recognizer is None:
-            self._name_recognizer = NameRecognizer()
-            logger.info("Reconnaisseur de noms initialisé")
-        return self._name_recognizer
+        return self._component('_name_recognizer', NameRecognizer,
+                               "Reconnaisseur de noms initialisé")
     
     @property
     def id_recognizer(self):
-        if self._id_recognizer is None:
-            self._id_recognizer = IDRecognizer()
-            logger.info("IDRecognizer initialisé")
-        return self._id_recognizer
+        return self._component('_id_recognizer', IDRecognizer, "IDRecognizer initialisé")
     
     @property
     def address_recognizer(self):
-        if self._address_recognizer is None:
-            self._address_recognizer = AddressRecognizer()
-            logger.info("Reconnaisseur d'adresses initialisé")
-        return self._address_recognizer
+        return self._component('_address_recognizer', AddressRecognizer,
+                               "Reconnaisseur d'adresses initialisé")
     
     @property
     def text_processor(self):
-        if self._text_processor is None:
-            self._text_processor = TextProcessor()
-            logger.info("Initialisation du TextProcessor")
-        return self._text_processor
+        return self._component('_text_processor', TextProcessor, "Initialisation du TextProcessor")
     
     @property
     def data_validator(self):
-        if self._data_validator is None:
-            self._data_validator = DataValidator()
-            logger.info("DataValidator initialisé")
-        return self._data_validator
+        return self._component('_data_validator', DataValidator, "DataValidator initialisé")
     
     @property
     def ocr_processor(self):
-        if not hasattr(self, '_ocr_processor') or self._ocr_processor is None:
+        def create():
             try:
-                self._ocr_processor = OCRProcessor()
+                return OCRProcessor()
             except Exception as e:
                 logger.warning(f"OCR non disponible - fonctionnalités limitées: {e}")
-                self._ocr_processor = None
-        return self._ocr_processor
+                return None
+        return self._component('_ocr_processor', create, "OCRProcessor initialisé")
+    
+    @property
+    def extraction_engine(self):
+        # Les extracteurs restent paresseux: seuls ceux routés sont instanciés
+        return self._component('_extraction_engine', lambda: ExtractionEngine({
+            'personal_data': lambda: self.personal_data_extractor,
+            'legal_docs': lambda: self.legal_docs_extractor,
+            'identity_docs': lambda: self.identity_doc_extractor,
+            'contracts': lambda: self.contract_extractor,
+            'business_docs': lambda: self.business_doc_extractor
+        }), "Moteur d'extraction initialisé")
+    
+    def warm_up(self, components: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Construit les composants à l'avance (au démarrage plutôt qu'à la première analyse)
+        
+        Args:
+            components: Noms des composants à construire (tous par défaut)
+            
+        Returns:
+            Dict[str, float]: Durée de construction de chaque composant (secondes);
+            un composant qui n'a pas pu être construit est absent
+        """
+        durations = {}
+        for name in components or self.COMPONENTS:
+            start = time.perf_counter()
+            try:
+                getattr(self, name)
+                durations[name] = time.perf_counter() - start
+            except Exception as e:
+                logger.error(f"Impossible de préparer le composant {name}: {e}")
+        return durations
+    
+    def loaded_components(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Composants déjà construits, par nom
+        """
+        components = {}
+        for name in self.COMPONENTS:
+            component = getattr(self, f"_{name}", None)
+            if component is not None:
+                components[name] = component
+        return components
     
     def analyze_document(self, document_path: str) -> Dict[str, Any]:
         """
@@ -175,6 +231,20 @@ class DocumentAnalyzer:
                 # Ce n'est pas un fichier texte UTF-8, donc pas un JSON
                 pass
             
+            # Réutiliser l'analyse d'un fichier au contenu identique
+            result_cache = get_result_cache()
+            file_hash = None
+            cache_settings = None
+            if result_cache is not None:
+                file_hash = hash_file(document_path)
+                # Le même fichier analysé avec une autre configuration OCR est une autre entrée
+                cache_settings = self.text_processor.ocr_settings(document_path)
+                cached_results = result_cache.get_analysis(file_hash, cache_settings)
+                if cached_results is not None:
+                    logger.info(f"Analyse de {document_path} récupérée depuis le cache")
+                    cached_results['file_path'] = document_path
+                    return cached_results
+            
             # Prétraitement du document
             text_result = self.text_processor.process_document(document_path)
             
@@ -203,9 +273,12 @@ class DocumentAnalyzer:
                 'variables': {}
             }
             
+            # Document normalisé une seule fois et partagé entre les extracteurs
+            prepared = PreparedDocument(text)
+            
             # Analyse de la structure du document
             try:
-                structure = self.text_processor.analyze_document_structure(text)
+                structure = prepared.structure
                 if structure:
                     results['structure'] = structure
                     # Ajouter les variables de base
@@ -218,9 +291,12 @@ class DocumentAnalyzer:
             except Exception as e:
                 logger.error(f"Erreur lors de l'analyse de la structure: {e}")
             
+            # Exécution des extracteurs applicables au type de document
+            extractions = self.extraction_engine.run(prepared)
+            
             # Extraction des données personnelles
             try:
-                personal_data = self.personal_data_extractor.extract(text)
+                personal_data = extractions.get('personal_data')
                 if personal_data:
                     results["personal_data"] = personal_data
                     # Ajouter les variables d'identité
@@ -275,7 +351,7 @@ class DocumentAnalyzer:
             
             # Extraction des documents légaux
             try:
-                legal_data = self.legal_docs_extractor.extract(text)
+                legal_data = extractions.get('legal_docs')
                 if legal_data:
                     results["legal_data"] = legal_data
                     # Ajouter les variables de base
@@ -326,7 +402,7 @@ class DocumentAnalyzer:
             
             # Extraction des documents d'identité
             try:
-                identity_data = self.identity_doc_extractor.extract(text)
+                identity_data = extractions.get('identity_docs')
                 if identity_data:
                     results["identity_data"] = identity_data
                     # Ajouter les variables d'identité
@@ -352,7 +428,7 @@ class DocumentAnalyzer:
             
             # Extraction des contrats
             try:
-                contract_data = self.contract_extractor.extract(text)
+                contract_data = extractions.get('contracts')
                 if contract_data:
                     results["contract_data"] = contract_data
                     # Ajouter les variables de contrat
@@ -385,7 +461,7 @@ class DocumentAnalyzer:
             
             # Extraction des documents commerciaux
             try:
-                business_data = self.business_doc_extractor.extract(text)
+                business_data = extractions.get('business_docs')
                 if business_data:
                     results["business_data"] = business_data
                     # Ajouter les variables commerciales
@@ -434,6 +510,9 @@ class DocumentAnalyzer:
                 logger.error(f"Erreur lors de la validation des données: {e}")
                 validated_results = results
             
+            if result_cache is not None and not validated_results.get('error'):
+                result_cache.put_analysis(file_hash, validated_results, cache_settings)
+            
             logger.info(f"Analyse du document {document_path} terminée avec succès")
             return validated_results
             
@@ -479,9 +558,9 @@ class ModernAnalysisView:
         # Créer le cadre principal avec un aspect moderne
         self.frame = ctk.CTkFrame(parent, fg_color=self.colors["light_bg"])
         
-        # Initialiser l'analyseur de documents avec gestion d'erreur améliorée
+        # Analyseur de documents partagé, rendu à la destruction de la vue
         try:
-            self.doc_analyzer = DocumentAnalyzer()
+            self.doc_analyzer = get_analyzer_service().acquire_for(self.frame)
             self._analyzer_ready = True
         except Exception as e:
             logger.error(f"Erreur lors de l'initialisation de l'analyseur: {e}")
@@ -547,7 +626,7 @@ class ModernAnalysisView:
         """Tente de réinitialiser l'analyseur s'il n'est pas disponible"""
         try:
             logger.info("Tentative de réinitialisation de l'analyseur de documents...")
-            self.doc_analyzer = DocumentAnalyzer()
+            self.doc_analyzer = get_analyzer_service().acquire_for(self.frame)
             self._analyzer_ready = True
             self.update_status("Analyseur réinitialisé avec succès", "success")
             self.toggle_buttons_state()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Analyseur de documents partagé par le processus pour Vynal Docs Automator
+Les vues et contrôleurs utilisent une seule instance de DocumentAnalyzer: les
+extracteurs et reconnaisseurs (motifs compilés, données de référence) ne sont
+construits qu'une fois, de préférence au démarrage. Chaque utilisateur prend une
+référence et la rend quand il n'en a plus besoin; les composants peuvent alors
+être libérés après un délai d'inactivité.
+"""
+
+import sys
+import time
+import types
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import ANALYZER_SERVICE_CONFIG
+
+logger = logging.getLogger("VynalDocsAutomator.AnalyzerService")
+
+# Objets partagés ou techniques exclus du calcul de la mémoire d'un composant
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType,
+                  types.BuiltinFunctionType, types.CodeType, type(threading.Lock()),
+                  type(threading.RLock()), threading.Thread)
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Estime la mémoire occupée par un objet et tout ce qu'il référence
+
+    Les modules, classes et fonctions ne sont pas comptés; un objet déjà vu
+    (présent dans seen) n'est compté qu'une fois.
+
+    Args:
+        obj: Objet à mesurer
+        seen: Identifiants des objets déjà comptés ou à ignorer
+
+    Returns:
+        int: Taille estimée en octets
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED_TYPES):
+            continue
+        seen.add(id(current))
+        try:
+            total += sys.getsizeof(current)
+        except TypeError:
+            continue
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        if hasattr(current, "__dict__"):
+            stack.append(vars(current))
+        for slot in getattr(type(current), "__slots__", ()):
+            if hasattr(current, slot):
+                stack.append(getattr(current, slot))
+    return total
+
+
+def _create_document_analyzer():
+    """Construit l'analyseur (importé ici: le module charge l'interface)"""
+    from .analyzer import DocumentAnalyzer
+    return DocumentAnalyzer()
+
+
+class AnalyzerService:
+    """
+    Instance partagée de DocumentAnalyzer, avec préchauffage et compteur de
+    références. Sûr entre threads.
+    """
+
+    def __init__(self, factory: Optional[Callable[[], Any]] = None):
+        """
+        Initialise le service (l'analyseur n'est pas encore construit)
+
+        Args:
+            factory: Fonction construisant l'analyseur (DocumentAnalyzer par défaut)
+        """
+        self.factory = factory or _create_document_analyzer
+        self._analyzer = None
+        self._references = 0
+        self._lock = threading.RLock()
+        self._release_timer: Optional[threading.Timer] = None
+        self._warm_up_thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self.warm_up_durations: Dict[str, float] = {}
+
+    @property
+    def references(self) -> int:
+        """Nombre d'utilisateurs de l'analyseur"""
+        return self._references
+
+    @property
+    def is_loaded(self) -> bool:
+        """Indique si l'analyseur est construit"""
+        return self._analyzer is not None
+
+    def get(self):
+        """
+        Retourne l'analyseur partagé, construit au premier appel
+
+        Returns:
+            DocumentAnalyzer: Analyseur partagé
+        """
+        analyzer = self._analyzer
+        if analyzer is None:
+            with self._lock:
+                if self._analyzer is None:
+                    self._analyzer = self.factory()
+                analyzer = self._analyzer
+        return analyzer
+
+    def acquire(self):
+        """
+        Prend une référence sur l'analyseur partagé
+
+        Returns:
+            DocumentAnalyzer: Analyseur partagé
+        """
+        with self._lock:
+            analyzer = self.get()
+            self._references += 1
+            self._cancel_release()
+            return analyzer
+
+    def release(self):
+        """Rend une référence; sans utilisateur, l'analyseur est libéré après le délai configuré"""
+        with self._lock:
+            if self._references == 0:
+                logger.warning("Libération d'une référence non acquise sur l'analyseur")
+                return
+            self._references -= 1
+            delay = ANALYZER_SERVICE_CONFIG.get("idle_release_after")
+            if self._references == 0 and delay is not None:
+                self._cancel_release()
+                self._release_timer = threading.Timer(delay, self._release_if_idle)
+                self._release_timer.daemon = True
+                self._release_timer.start()
+
+    def acquire_for(self, widget):
+        """
+        Prend une référence rendue automatiquement à la destruction d'un widget
+
+        Args:
+            widget: Widget Tk/CustomTkinter propriétaire de la référence
+
+        Returns:
+            DocumentAnalyzer: Analyseur partagé
+        """
+        analyzer = self.acquire()
+        released = threading.Event()
+
+        def on_destroy(event=None):
+            if not released.is_set():
+                released.set()
+                self.release()
+
+        try:
+            widget.bind("<Destroy>", on_destroy, add="+")
+        except Exception as e:
+            logger.debug(f"Référence sur l'analyseur non liée au widget: {e}")
+        return analyzer
+
+    def _cancel_release(self):
+        if self._release_timer is not None:
+            self._release_timer.cancel()
+            self._release_timer = None
+
+    def _release_if_idle(self):
+        with self._lock:
+            if self._references == 0:
+                self.unload()
+
+    def unload(self):
+        """Libère l'analyseur et ses composants (reconstruits à la prochaine demande)"""
+        with self._lock:
+            self._cancel_release()
+            if self._analyzer is not None:
+                self._analyzer = None
+                self._ready.clear()
+                self.warm_up_durations = {}
+                logger.info("Analyseur de documents partagé libéré")
+
+    def warm_up(self, components: Optional[List[str]] = None, background: bool = False):
+        """
+        Construit l'analyseur et ses composants à l'avance
+
+        Args:
+            components: Composants à construire (ANALYZER_SERVICE_CONFIG par défaut: tous)
+            background: Construire dans un thread, sans attendre
+
+        Returns:
+            Dict[str, float] | threading.Thread: Durée de construction par composant,
+            ou le thread de préchauffage en arrière-plan
+        """
+        components = components or ANALYZER_SERVICE_CONFIG.get("warm_up_components")
+        if background:
+            with self._lock:
+                if self._warm_up_thread is None or not self._warm_up_thread.is_alive():
+                    self._warm_up_thread = threading.Thread(
+                        target=self.warm_up, args=(components,), name="AnalyzerWarmUp", daemon=True
+                    )
+                    self._warm_up_thread.start()
+                return self._warm_up_thread
+
+        start = time.perf_counter()
+        try:
+            durations = self.get().warm_up(components)
+        except Exception as e:
+            logger.error(f"Erreur lors du préchauffage de l'analyseur: {e}")
+            return {}
+        self.warm_up_durations.update(durations)
+        self._ready.set()
+        logger.info(f"Analyseur de documents préchauffé en {time.perf_counter() - start:.2f}s "
+                    f"({len(durations)} composant(s))")
+        return durations
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend la fin du préchauffage
+
+        Args:
+            timeout: Délai maximal en secondes (None = sans limite)
+
+        Returns:
+            bool: True si l'analyseur est préchauffé
+        """
+        return self._ready.wait(timeout)
+
+    def memory_report(self) -> Dict[str, int]:
+        """
+        Mémoire estimée de chaque composant construit
+
+        Un objet partagé entre composants n'est compté que pour le premier;
+        les références vers l'analyseur ou les autres composants sont ignorées.
+
+        Returns:
+            Dict[str, int]: Taille estimée en octets par composant
+        """
+        analyzer = self._analyzer
+        if analyzer is None:
+            return {}
+        components = analyzer.loaded_components()
+        excluded = {id(analyzer), id(vars(analyzer))} | {id(c) for c in components.values()}
+        seen = set(excluded)
+        report = {}
+        for name, component in components.items():
+            seen.discard(id(component))
+            report[name] = deep_sizeof(component, seen)
+        return report
+
+
+# Instance partagée par le processus
+_analyzer_service = None
+_analyzer_service_lock = threading.Lock()
+
+
+def get_analyzer_service() -> AnalyzerService:
+    """
+    Retourne le service d'analyse partagé par le processus
+
+    Returns:
+        AnalyzerService: Instance partagée
+    """
+    global _analyzer_service
+    if _analyzer_service is None:
+        with _analyzer_service_lock:
+            if _analyzer_service is None:
+                _analyzer_service = AnalyzerService()
+    return _analyzer_service
+
+
+def acquire_document_analyzer(widget=None):
+    """
+    Prend une référence sur l'analyseur partagé
+
+    Args:
+        widget: Widget dont la destruction rend la référence (facultatif)
+
+    Returns:
+        DocumentAnalyzer: Analyseur partagé
+    """
+    service = get_analyzer_service()
+    return service.acquire_for(widget) if widget is not None else service.acquire()
+
+
+def release_document_analyzer():
+    """Rend une référence prise avec acquire_document_analyzer (sans widget)"""
+    get_analyzer_service().release()
@@ -72,6 +72,47 @@ OCR_CONFIG = {
     }
 }
 
+# Cache persistant des résultats OCR et d'analyse (adressé par contenu)
+RESULT_CACHE_CONFIG = {
+    "enabled": True,
+    "cache_dir": os.path.join("cache", "results"),
+    "max_size_mb": 512,  # Taille maximale avant éviction LRU
+    "analyzer_version": "1.1.0"  # À incrémenter lorsque les extracteurs changent
+}
+
+# Extraction du texte des documents (service partagé par le processus)
+TEXT_EXTRACTION_CONFIG = {
+    # Une page dont la couche texte est plus courte ou moins lisible est traitée par OCR
+    "min_page_chars": 20,
+    "min_readable_ratio": 0.9,
+    "ocr_language": "fra",
+    "memo_size": 64  # Documents dont le texte reste en mémoire (par empreinte)
+}
+
+# Modèle spaCy partagé (chargé une seule fois par processus)
+NLP_CONFIG = {
+    "model": "fr_core_news_sm",
+    # Seules les entités nommées sont exploitées: les autres composants ne sont pas exécutés
+    "disable": ["parser", "tagger", "morphologizer", "lemmatizer", "attribute_ruler", "senter"],
+    "batch_size": 64,  # Nombre de textes par lot pour nlp.pipe
+    "n_process": 1  # Processus utilisés par nlp.pipe (1 = dans le processus courant)
+}
+
+# Analyseur de documents partagé par le processus (doc_analyzer.analyzer_service)
+ANALYZER_SERVICE_CONFIG = {
+    "warm_up_at_startup": True,  # Construire les composants au démarrage (en arrière-plan)
+    "warm_up_components": None,  # Composants à construire; None = tous
+    # Délai sans utilisateur avant de libérer les composants (secondes); None = les garder
+    "idle_release_after": None
+}
+
+# Surveillance des dossiers de documents (DocumentWatcher)
+WATCHER_CONFIG = {
+    "quiet_period": 0.5,  # Délai sans événement avant d'analyser un fichier (secondes)
+    "max_workers": 4,  # Nombre maximum d'analyses simultanées
+    "cache_db": "analysis_cache.db"  # Base du cache d'analyses, dans le dossier de cache
+}
+
 # Configuration de l'interface utilisateur
 UI_CONFIG = {
     "auto_fill_dialog": {
@@ -91,6 +132,8 @@ UI_CONFIG = {
         "match_threshold": 0.7,  # Seuil de correspondance minimum
         "max_results": 5,  # Nombre maximum de résultats
         "search_fields": ["name", "email", "phone", "company"],
+        "candidate_limit": 200,  # Candidats présélectionnés par l'index avant le calcul des scores
+        "ngram_size": 3,  # Taille des n-grammes de l'index des noms et entreprises
         "quick_add_enabled": True
     }
 }
@@ -129,6 +172,47 @@ ANALYZER_CONFIG = {
     }
 }
 
+# Routage des extracteurs par type de document et par section
+# - document_types: types (issus de TextProcessor.estimate_document_type) pour lesquels
+#   l'extracteur est exécuté; None = tous les types
+# - sections: sections du document (TextProcessor.segment_document) transmises à
+#   l'extracteur pour les documents longs; None = texte complet
+# - view: forme normalisée du texte attendue ('raw', 'processed', 'collapsed', 'sanitized');
+#   l'extracteur reçoit alors preprocessed=True et ne renormalise pas le texte
+EXTRACTION_ROUTES = {
+    "personal_data": {
+        "document_types": None,
+        "sections": None,
+        "view": "sanitized"
+    },
+    "legal_docs": {
+        "document_types": ["contrat", "attestation", "procès-verbal", "lettre", "formulaire"],
+        "sections": None,
+        "view": "raw"
+    },
+    "identity_docs": {
+        "document_types": ["formulaire", "attestation", "contrat"],
+        "sections": ["header", "body"],
+        "view": "processed"
+    },
+    "contracts": {
+        "document_types": ["contrat", "devis"],
+        "sections": None,
+        "view": "processed"
+    },
+    "business_docs": {
+        "document_types": ["facture", "devis", "contrat", "lettre"],
+        "sections": ["header", "body", "footer"],
+        "view": "collapsed"
+    }
+}
+
+# Types de document trop peu discriminants pour écarter un extracteur
+EXTRACTION_UNROUTED_TYPES = ["document_general", "autre"]
+
+# Taille minimale (en caractères) à partir de laquelle le routage par section s'applique
+EXTRACTION_SECTION_ROUTING_MIN_CHARS = 4000
+
 # Supprimer la configuration OCR
 DEFAULT_CONFIG = {
     "version": "1.0.0",
@@ -2,36 +2,95 @@
 Processeur parallèle pour l'analyse de documents
 """
 
-import logging
-import threading
+import os
+import time
 import queue
+import signal
+import logging
+import multiprocessing
 import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Dict, Any, Optional, Callable
-from ..analyzer import Analysis
+from ..analyzer import DocumentAnalyzer
 
 logger = logging.getLogger("VynalDocsAutomator.Extensions.Parallel")
 
+# Analyseur conservé par chaque processus worker (construit une seule fois)
+_worker_analyzer = None
+
+
+def _init_process_worker(analyzer_factory: Callable[[], Any], pid_queue=None):
+    """
+    Initialise un processus worker en construisant son analyseur
+
+    Args:
+        analyzer_factory: Fabrique (picklable) de l'analyseur
+        pid_queue: File où le worker annonce son PID (pour pouvoir l'arrêter)
+    """
+    global _worker_analyzer
+    if pid_queue is not None:
+        pid_queue.put(os.getpid())
+    _worker_analyzer = analyzer_factory()
+
+
+def _analyze_in_worker(file_path: str) -> Dict[str, Any]:
+    """
+    Analyse un document avec l'analyseur du processus worker
+
+    Args:
+        file_path: Chemin du document
+
+    Returns:
+        Dict[str, Any]: Résultat de l'analyse
+    """
+    return _worker_analyzer.analyze_document(file_path)
+
+
 class ParallelProcessor:
     """
     Gère le traitement parallèle des documents
     S'intègre avec l'analyseur existant sans le modifier
+    
+    Deux backends sont disponibles:
+    - "thread": les fichiers sont analysés par l'analyseur partagé dans un pool de threads
+    - "process": chaque processus worker construit son propre analyseur une seule fois
+      et le garde chaud pour tout le lot, ce qui contourne le GIL
     """
     
-    def __init__(self, analyzer: Analysis, max_workers: int = 4):
+    BACKENDS = ("thread", "process")
+    
+    def __init__(self, analyzer: Optional[DocumentAnalyzer] = None, max_workers: int = 4,
+                 backend: str = "thread", file_timeout: Optional[float] = None,
+                 max_in_flight: Optional[int] = None,
+                 analyzer_factory: Optional[Callable[[], Any]] = None):
         """
         Initialise le processeur parallèle
         
         Args:
-            analyzer: Instance de l'analyseur existant
+            analyzer: Instance de l'analyseur existant (backend "thread")
             max_workers: Nombre maximum de workers
+            backend: "thread" ou "process"
+            file_timeout: Durée maximale d'analyse d'un fichier en secondes (None = illimitée)
+            max_in_flight: Nombre maximum de fichiers soumis et non collectés
+                           (par défaut deux fois le nombre de workers)
+            analyzer_factory: Fabrique picklable de l'analyseur pour les processus workers
+                              (par défaut la classe de l'analyseur)
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend inconnu: {backend}")
+        
         self.analyzer = analyzer
         self.max_workers = max_workers
-        self._results_queue = queue.Queue()
-        self._error_queue = queue.Queue()
+        self.backend = backend
+        self.file_timeout = file_timeout
+        self.max_in_flight = max(max_in_flight or max_workers * 2, 1)
+        self.analyzer_factory = analyzer_factory or (type(analyzer) if analyzer else DocumentAnalyzer)
         self._progress_callback = None
+        self._result_callback = None
+        # Files où les processus workers de chaque pool annoncent leur PID
+        self._worker_pids: Dict[concurrent.futures.Executor, Any] = {}
         
-        logger.info(f"Processeur parallèle initialisé avec {max_workers} workers")
+        logger.info(f"Processeur parallèle initialisé avec {max_workers} workers ({backend})")
     
     def set_progress_callback(self, callback: Callable[[int, int, str], None]):
         """
@@ -42,12 +101,101 @@ class ParallelProcessor:
         """
         self._progress_callback = callback
     
-    def process_batch(self, file_paths: List[str]) -> Dict[str, Any]:
+    def set_result_callback(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """
+        Définit la fonction appelée dès qu'un fichier est terminé
+        
+        Args:
+            callback: Fonction appelée avec (file_path, result)
+        """
+        self._result_callback = callback
+    
+    def _create_executor(self) -> concurrent.futures.Executor:
+        """Crée l'exécuteur correspondant au backend"""
+        if self.backend == "process":
+            pid_queue = multiprocessing.get_context().Queue()
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_process_worker,
+                initargs=(self.analyzer_factory, pid_queue)
+            )
+            self._worker_pids[executor] = pid_queue
+            return executor
+        return concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+    
+    def _submit(self, executor: concurrent.futures.Executor, file_path: str) -> concurrent.futures.Future:
+        """Soumet l'analyse d'un fichier à l'exécuteur"""
+        logger.debug(f"Analyse de {file_path}")
+        if self.backend == "process":
+            return executor.submit(_analyze_in_worker, file_path)
+        if self.analyzer is None:
+            self.analyzer = self.analyzer_factory()
+        return executor.submit(self.analyzer.analyze_document, file_path)
+    
+    def _shutdown_executor(self, executor: concurrent.futures.Executor, wait: bool = True,
+                           terminate: bool = False):
+        """
+        Arrête un exécuteur
+        
+        Args:
+            executor: Exécuteur à arrêter
+            wait: Attendre la fin des tâches en cours
+            terminate: Arrêter immédiatement les processus workers (backend "process")
+        """
+        pid_queue = self._worker_pids.pop(executor, None)
+        if pid_queue is None:
+            executor.shutdown(wait=wait)
+            return
+        
+        pids = []
+        while True:
+            try:
+                pids.append(pid_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        executor.shutdown(wait=wait and not terminate, cancel_futures=terminate)
+        if terminate:
+            for pid in pids:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    # Processus déjà terminé
+                    pass
+        pid_queue.close()
+    
+    def _recycle_executor(self, executor: concurrent.futures.Executor) -> concurrent.futures.Executor:
+        """
+        Remplace un exécuteur dont un worker est bloqué sur un fichier hors délai,
+        ou dont le pool de processus est cassé (worker mort en cours d'analyse)
+        
+        Les processus workers sont arrêtés immédiatement; les threads ne pouvant pas
+        être interrompus, l'ancien pool est abandonné et termine seul ses tâches.
+        
+        Args:
+            executor: Exécuteur à remplacer
+            
+        Returns:
+            concurrent.futures.Executor: Nouvel exécuteur
+        """
+        self._shutdown_executor(executor, wait=False, terminate=True)
+        logger.info("Workers bloqués remplacés par un nouveau pool")
+        return self._create_executor()
+    
+    def process_batch(self, file_paths: List[str], collect_results: bool = True) -> Dict[str, Any]:
         """
         Traite un lot de documents en parallèle
         
+        Les fichiers sont soumis au fil de l'eau (au plus max_in_flight à la fois) et
+        chaque résultat est transmis au callback de résultat dès qu'il est disponible.
+        Avec un file_timeout, chaque fichier a une échéance fixée à sa soumission
+        (la fenêtre est alors limitée à max_workers pour qu'il démarre aussitôt);
+        un fichier hors délai est abandonné et le worker qui le traitait est remplacé.
+        
         Args:
             file_paths: Liste des chemins de fichiers à analyser
+            collect_results: Conserver les résultats dans le dictionnaire retourné
+                             (désactiver pour les très gros lots traités via callback)
             
         Returns:
             Dict[str, Any]: Résultats d'analyse pour chaque fichier
@@ -55,43 +203,107 @@ class ParallelProcessor:
         total_files = len(file_paths)
         processed_files = 0
         results = {}
+        pending_paths = iter(file_paths)
+        in_flight: Dict[concurrent.futures.Future, str] = {}
+        deadlines: Dict[concurrent.futures.Future, float] = {}
+        window = min(self.max_in_flight, self.max_workers) if self.file_timeout else self.max_in_flight
         
-        def process_file(file_path: str):
-            try:
-                logger.debug(f"Analyse de {file_path}")
-                result = self.analyzer.analyze_document(file_path)
-                self._results_queue.put((file_path, result))
-            except Exception as e:
-                logger.error(f"Erreur lors de l'analyse de {file_path}: {e}")
-                self._error_queue.put((file_path, str(e)))
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Soumettre tous les fichiers pour traitement
-            futures = [executor.submit(process_file, file_path) for file_path in file_paths]
-            
-            # Collecter les résultats au fur et à mesure
-            while processed_files < total_files:
-                # Vérifier les résultats
+        def finish(file_path: str, result: Dict[str, Any]):
+            nonlocal processed_files
+            processed_files += 1
+            if collect_results:
+                results[file_path] = result
+            if self._result_callback:
                 try:
-                    file_path, result = self._results_queue.get_nowait()
-                    results[file_path] = result
-                    processed_files += 1
-                    
-                    if self._progress_callback:
-                        self._progress_callback(processed_files, total_files, file_path)
-                except queue.Empty:
-                    pass
+                    self._result_callback(file_path, result)
+                except Exception as e:
+                    logger.error(f"Erreur dans le callback de résultat pour {file_path}: {e}")
+            if self._progress_callback:
+                self._progress_callback(processed_files, total_files, file_path)
+        
+        def submit(file_path: str):
+            future = self._submit(executor, file_path)
+            in_flight[future] = file_path
+            if self.file_timeout:
+                deadlines[future] = time.monotonic() + self.file_timeout
+        
+        def restart(retry: List[str]):
+            # Remplace le pool et soumet à nouveau les fichiers qu'il traitait
+            nonlocal executor
+            executor = self._recycle_executor(executor)
+            retry = retry + list(in_flight.values())
+            in_flight.clear()
+            deadlines.clear()
+            for file_path in retry:
+                submit(file_path)
+        
+        # Fichiers déjà soumis à un pool de processus cassé
+        crashes: Dict[str, int] = {}
+        
+        executor = self._create_executor()
+        try:
+            while True:
+                # Remplir la fenêtre de fichiers en cours
+                while len(in_flight) < window:
+                    file_path = next(pending_paths, None)
+                    if file_path is None:
+                        break
+                    try:
+                        submit(file_path)
+                    except BrokenProcessPool:
+                        restart([file_path])
                 
-                # Vérifier les erreurs
-                try:
-                    file_path, error = self._error_queue.get_nowait()
-                    results[file_path] = {"error": error, "status": "failed"}
-                    processed_files += 1
-                    
-                    if self._progress_callback:
-                        self._progress_callback(processed_files, total_files, file_path)
-                except queue.Empty:
-                    pass
+                if not in_flight:
+                    break
+                
+                # Attendre le prochain résultat ou la prochaine échéance
+                timeout = None
+                if deadlines:
+                    timeout = max(0.0, min(deadlines.values()) - time.monotonic())
+                done, _ = concurrent.futures.wait(
+                    in_flight, timeout=timeout,
+                    return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                
+                broken = []
+                for future in done:
+                    file_path = in_flight.pop(future)
+                    deadlines.pop(future, None)
+                    try:
+                        finish(file_path, future.result())
+                    except BrokenProcessPool as e:
+                        # Un worker est mort: chaque fichier concerné est réessayé une fois
+                        crashes[file_path] = crashes.get(file_path, 0) + 1
+                        if crashes[file_path] > 1:
+                            logger.error(f"Erreur lors de l'analyse de {file_path}: {e}")
+                            finish(file_path, {"error": str(e), "status": "failed"})
+                        else:
+                            broken.append(file_path)
+                    except Exception as e:
+                        logger.error(f"Erreur lors de l'analyse de {file_path}: {e}")
+                        finish(file_path, {"error": str(e), "status": "failed"})
+                
+                # Abandonner les fichiers qui dépassent leur échéance
+                now = time.monotonic()
+                overdue = [f for f, deadline in deadlines.items() if deadline <= now and not f.done()]
+                stuck = False
+                for future in overdue:
+                    file_path = in_flight.pop(future)
+                    del deadlines[future]
+                    stuck = not future.cancel() or stuck
+                    logger.warning(f"Délai dépassé pour {file_path} ({self.file_timeout}s)")
+                    finish(file_path, {
+                        "error": f"Délai d'analyse dépassé ({self.file_timeout}s)",
+                        "status": "timeout"
+                    })
+                
+                if broken or (stuck and self.backend == "process"):
+                    # Les autres fichiers du pool arrêté sont soumis à nouveau
+                    restart(broken)
+                elif stuck:
+                    executor = self._recycle_executor(executor)
+        finally:
+            self._shutdown_executor(executor)
         
         logger.info(f"Traitement parallèle terminé: {processed_files}/{total_files} fichiers traités")
         return results
@@ -109,62 +321,54 @@ class ParallelProcessor:
         """
         results = {}
         processed = set()
-        processing = set()
+        in_flight: Dict[concurrent.futures.Future, str] = {}
         
         def can_process(file_path: str) -> bool:
             if file_path not in dependencies:
                 return True
             return all(dep in processed for dep in dependencies[file_path])
         
-        def process_file(file_path: str):
-            if file_path in processing:
-                return
-            if not can_process(file_path):
-                return
-            
-            processing.add(file_path)
-            try:
-                result = self.analyzer.analyze_document(file_path)
-                self._results_queue.put((file_path, result))
-            except Exception as e:
-                self._error_queue.put((file_path, str(e)))
-            finally:
-                processing.remove(file_path)
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        def finish(file_path: str, result: Dict[str, Any]):
+            # Un fichier en erreur compte comme traité: ses dépendants sont analysés
+            results[file_path] = result
+            processed.add(file_path)
+            if self._progress_callback:
+                self._progress_callback(len(processed), len(file_paths), file_path)
+        
+        executor = self._create_executor()
+        try:
             while len(processed) < len(file_paths):
-                # Trouver les fichiers qui peuvent être traités
-                processable = [f for f in file_paths if f not in processed and can_process(f)]
-                
-                if not processable:
-                    # Attendre les résultats si aucun fichier ne peut être traité
-                    try:
-                        file_path, result = self._results_queue.get(timeout=1)
-                        results[file_path] = result
-                        processed.add(file_path)
-                        
-                        if self._progress_callback:
-                            self._progress_callback(len(processed), len(file_paths), file_path)
-                    except queue.Empty:
-                        continue
-                    except Exception as e:
-                        logger.error(f"Erreur inattendue: {e}")
+                # Soumettre les fichiers dont les dépendances sont traitées
+                submitted = set(in_flight.values())
+                for file_path in file_paths:
+                    if file_path in processed or file_path in submitted or not can_process(file_path):
                         continue
+                    try:
+                        in_flight[self._submit(executor, file_path)] = file_path
+                    except BrokenProcessPool:
+                        executor = self._recycle_executor(executor)
+                        in_flight[self._submit(executor, file_path)] = file_path
+                    submitted.add(file_path)
                 
-                # Soumettre les fichiers processables
-                for file_path in processable:
-                    if file_path not in processing:
-                        executor.submit(process_file, file_path)
+                if not in_flight:
+                    # Dépendances cycliques ou absentes du lot
+                    for file_path in file_paths:
+                        if file_path not in processed:
+                            logger.error(f"Dépendances non satisfaites pour {file_path}")
+                            finish(file_path, {"error": "Dépendances non satisfaites", "status": "failed"})
+                    break
                 
-                # Vérifier les erreurs
-                try:
-                    file_path, error = self._error_queue.get_nowait()
-                    results[file_path] = {"error": error, "status": "failed"}
-                    processed.add(file_path)
-                    
-                    if self._progress_callback:
-                        self._progress_callback(len(processed), len(file_paths), file_path)
-                except queue.Empty:
-                    pass
+                done, _ = concurrent.futures.wait(
+                    in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    file_path = in_flight.pop(future)
+                    try:
+                        finish(file_path, future.result())
+                    except Exception as e:
+                        logger.error(f"Erreur lors de l'analyse de {file_path}: {e}")
+                        finish(file_path, {"error": str(e), "status": "failed"})
+        finally:
+            self._shutdown_executor(executor)
         
-        return results 
\ No newline at end of file
+        return results
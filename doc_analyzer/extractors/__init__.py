@@ -7,11 +7,14 @@ from .business_docs import BusinessDocExtractor
 from .personal_data import PersonalDataExtractor
 from .legal_docs import LegalDocsExtractor
 from .contracts import ContractExtractor
+from .engine import ExtractionEngine, PreparedDocument
 
 __all__ = [
     'IdentityDocExtractor',
     'BusinessDocExtractor',
     'PersonalDataExtractor',
     'LegalDocsExtractor',
-    'ContractExtractor'
+    'ContractExtractor',
+    'ExtractionEngine',
+    'PreparedDocument'
 ]
@@ -190,13 +190,15 @@ class BusinessDocExtractor:
             r'(?i)prestation.*?(?:quantité|qté).*?(?:prix|montant|p\.u\.)'
         ]
     
-    def extract(self, text_content: str, file_path: str = None) -> Dict[str, Any]:
+    def extract(self, text_content: str, file_path: str = None,
+                preprocessed: bool = False) -> Dict[str, Any]:
         """
         Extrait les informations des documents commerciaux
         
         Args:
             text_content: Contenu texte du document
             file_path: Chemin du fichier original (pour analyse d'image si nécessaire)
+            preprocessed: Le texte a déjà ses espaces normalisés
             
         Returns:
             dict: Données extraites du document commercial
@@ -204,7 +206,7 @@ class BusinessDocExtractor:
         data = {}
         
         # Prétraitement du texte
-        cleaned_text = self._preprocess_text(text_content)
+        cleaned_text = text_content if preprocessed else self._preprocess_text(text_content)
         
         # Extraire le type de document commercial
         business_type = self.extract_business_type(cleaned_text)
@@ -19,27 +19,15 @@ import re
 import os
 import logging
 from datetime import datetime
-import spacy
 
 from ..utils.text_processor import preprocess_text, clean_text
 from ..utils.validators import validate_amount, validate_date, validate_entity
+# Modèle spaCy partagé, chargé au premier usage
+from ..utils.nlp_service import nlp
 
 # Configuration du logger
 logger = logging.getLogger("Vynal Docs Automator.doc_analyzer.contracts")
 
-# Chargement du modèle spaCy (un modèle léger)
-try:
-    nlp = spacy.load("fr_core_news_sm")
-except OSError:
-    logger.warning("Modèle fr_core_news_sm non trouvé. Tentative de téléchargement...")
-    from spacy.cli import download
-    download("fr_core_news_sm")
-    nlp = spacy.load("fr_core_news_sm")
-except Exception as e:
-    logger.error(f"Erreur lors du chargement du modèle spaCy: {e}")
-    # Fallback sur un modèle vide si nécessaire
-    nlp = spacy.blank("fr")
-
 class ContractExtractor:
     """
     Classe pour l'extraction des informations des contrats
@@ -162,20 +150,24 @@ class ContractExtractor:
         
         return patterns
     
-    def extract(self, text, contract_type=None):
+    def extract(self, text, contract_type=None, preprocessed=False):
         """
         Extrait les informations d'un contrat
         
         Args:
             text (str): Texte du contrat à analyser
             contract_type (str, optional): Type de contrat si déjà connu
+            preprocessed (bool): Le texte a déjà subi clean_text et preprocess_text
             
         Returns:
             dict: Dictionnaire contenant toutes les informations extraites
         """
         # Prétraitement du texte
-        clean = clean_text(text)
-        processed = preprocess_text(clean)
+        if preprocessed:
+            processed = text
+        else:
+            clean = clean_text(text)
+            processed = preprocess_text(clean)
         
         # Détection du type de contrat si non spécifié
         if not contract_type:
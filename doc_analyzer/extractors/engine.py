@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Moteur d'extraction en une passe pour Vynal Docs Automator
+Normalise le texte une seule fois, partage le document segmenté entre les
+extracteurs et n'exécute que les extracteurs pertinents pour le type de document.
+"""
+
+import re
+import time
+import logging
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from ..config import (
+    EXTRACTION_ROUTES,
+    EXTRACTION_UNROUTED_TYPES,
+    EXTRACTION_SECTION_ROUTING_MIN_CHARS
+)
+from ..utils.text_processor import TextProcessor
+
+logger = logging.getLogger("VynalDocsAutomator.Extractors.Engine")
+
+# Ordre des sections dans le document d'origine
+SECTION_ORDER = ('header', 'body', 'footer', 'signature')
+
+# Formes normalisées du texte disponibles pour les extracteurs
+VIEWS = ('raw', 'processed', 'collapsed', 'sanitized')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class PreparedDocument:
+    """
+    Document préparé une seule fois et partagé entre les extracteurs.
+    Toutes les formes dérivées (texte nettoyé, sections, structure, type)
+    sont calculées à la demande puis mises en cache.
+    """
+
+    def __init__(self, text: str, section_routing_min_chars: int = None):
+        """
+        Initialise le document préparé
+
+        Args:
+            text: Texte brut du document
+            section_routing_min_chars: Taille minimale pour appliquer le routage par section
+        """
+        self.text = text or ""
+        self.section_routing_min_chars = (
+            EXTRACTION_SECTION_ROUTING_MIN_CHARS
+            if section_routing_min_chars is None else section_routing_min_chars
+        )
+        self._structure = None
+        self._sections = None
+        self._views: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+
+    @property
+    def structure(self) -> Dict[str, Any]:
+        """Structure du document (TextProcessor.analyze_document_structure)"""
+        if self._structure is None:
+            self._structure = TextProcessor.analyze_document_structure(self.text)
+        return self._structure
+
+    @property
+    def document_type(self) -> str:
+        """Type de document estimé ('document_general' si la structure est indisponible)"""
+        try:
+            return self.structure.get('document_type', 'document_general')
+        except Exception as e:
+            logger.warning(f"Type de document indéterminé, aucun extracteur ignoré: {e}")
+            return 'document_general'
+
+    @property
+    def sections(self) -> Dict[str, str]:
+        """Sections du texte brut (en-tête, corps, pied de page, signature)"""
+        if self._sections is None:
+            structure_sections = self._structure.get('sections') if self._structure else None
+            self._sections = structure_sections or TextProcessor.segment_document(self.text)
+        return self._sections
+
+    @property
+    def routes_by_section(self) -> bool:
+        """Indique si le document est assez long pour être routé par section"""
+        return len(self.text) >= self.section_routing_min_chars
+
+    def view(self, kind: str = 'raw', sections: Optional[List[str]] = None) -> str:
+        """
+        Retourne une forme normalisée du texte, éventuellement restreinte à des sections
+
+        Args:
+            kind: 'raw' (texte brut), 'processed' (clean_text + preprocess_text),
+                  'collapsed' (espaces normalisés) ou 'sanitized' (sanitize_text)
+            sections: Sections à conserver, None pour le texte complet
+
+        Returns:
+            str: Texte correspondant
+        """
+        if kind not in VIEWS:
+            raise ValueError(f"Vue de texte inconnue: {kind}")
+
+        if sections and self.routes_by_section:
+            wanted = tuple(s for s in SECTION_ORDER if s in sections)
+        else:
+            wanted = ()
+
+        key = (kind, wanted)
+        if key in self._views:
+            return self._views[key]
+
+        if kind == 'raw':
+            if wanted:
+                parts = [self.sections.get(s, '') for s in wanted]
+                value = '\n'.join(p for p in parts if p)
+            else:
+                value = self.text
+        elif kind == 'processed':
+            value = TextProcessor.preprocess_text(
+                TextProcessor.clean_text(self.view('raw', list(wanted)))
+            )
+        elif kind == 'sanitized':
+            value = TextProcessor.sanitize_text(self.view('raw', list(wanted)))
+        else:
+            value = _WHITESPACE_RE.sub(' ', self.view('raw', list(wanted)))
+
+        self._views[key] = value
+        return value
+
+
+class ExtractionEngine:
+    """
+    Orchestrateur des extracteurs de DocumentAnalyzer.
+    Chaque extracteur est associé à une route (types de document, sections, vue)
+    définie dans EXTRACTION_ROUTES; les extracteurs non pertinents ne sont
+    ni exécutés ni même instanciés.
+    """
+
+    def __init__(self, providers: Dict[str, Callable[[], Any]],
+                 routes: Dict[str, Dict[str, Any]] = None,
+                 skip_by_document_type: bool = True):
+        """
+        Initialise le moteur d'extraction
+
+        Args:
+            providers: Fonctions retournant l'instance de chaque extracteur, par nom de route
+            routes: Table de routage (EXTRACTION_ROUTES par défaut)
+            skip_by_document_type: Ignorer les extracteurs non applicables au type estimé
+        """
+        self.providers = providers
+        self.routes = routes if routes is not None else EXTRACTION_ROUTES
+        self.skip_by_document_type = skip_by_document_type
+
+    def is_applicable(self, name: str, document_type: str) -> bool:
+        """
+        Indique si un extracteur doit être exécuté pour un type de document
+
+        Args:
+            name: Nom de la route de l'extracteur
+            document_type: Type de document estimé
+
+        Returns:
+            bool: True si l'extracteur est applicable
+        """
+        if not self.skip_by_document_type or document_type in EXTRACTION_UNROUTED_TYPES:
+            return True
+        allowed = self.routes.get(name, {}).get('document_types')
+        return allowed is None or document_type in allowed
+
+    def run(self, document: PreparedDocument) -> Dict[str, Any]:
+        """
+        Exécute les extracteurs applicables sur le document préparé
+
+        Args:
+            document: Document préparé
+
+        Returns:
+            dict: Résultat de chaque extracteur exécuté, par nom de route
+                  (la clé '_skipped' liste les extracteurs ignorés)
+        """
+        results = {}
+        skipped = []
+        document_type = document.document_type
+
+        for name, provider in self.providers.items():
+            if not self.is_applicable(name, document_type):
+                skipped.append(name)
+                continue
+
+            route = self.routes.get(name, {})
+            start = time.time()
+            try:
+                text = document.view(route.get('view', 'raw'), route.get('sections'))
+                results[name] = self._call_extractor(provider(), text, route)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'extraction '{name}': {e}")
+                results[name] = None
+            logger.debug(f"Extraction '{name}' terminée en {time.time() - start:.3f}s")
+
+        if skipped:
+            logger.info(f"Extracteurs ignorés pour le type '{document_type}': {', '.join(skipped)}")
+        results['_skipped'] = skipped
+        return results
+
+    @staticmethod
+    def _call_extractor(extractor: Any, text: str, route: Dict[str, Any]) -> Any:
+        """Appelle un extracteur en lui signalant si le texte est déjà prétraité"""
+        if route.get('view', 'raw') == 'raw':
+            return extractor.extract(text)
+        return extractor.extract(text, preprocessed=True)
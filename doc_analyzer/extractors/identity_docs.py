@@ -31,24 +31,8 @@ except ImportError:
     OCR_AVAILABLE = False
     logging.warning("pytesseract non disponible, fonctionnalités OCR limitées")
 
-try:
-    import spacy
-    SPACY_AVAILABLE = True
-    # Chargement du modèle spaCy (un modèle léger)
-    try:
-        nlp = spacy.load("fr_core_news_sm")
-    except OSError:
-        logging.warning("Modèle fr_core_news_sm non trouvé. Tentative de téléchargement...")
-        from spacy.cli import download
-        download("fr_core_news_sm")
-        nlp = spacy.load("fr_core_news_sm")
-    except Exception as e:
-        logging.error(f"Erreur lors du chargement du modèle spaCy: {e}")
-        # Fallback sur un modèle vide si nécessaire
-        nlp = spacy.blank("fr")
-except ImportError:
-    SPACY_AVAILABLE = False
-    logging.warning("spacy non disponible, NER limité")
+# Modèle spaCy partagé, chargé au premier usage
+from ..utils.nlp_service import nlp, SPACY_AVAILABLE
 
 from ..utils.text_processor import preprocess_text, clean_text
 
@@ -248,13 +232,14 @@ class IdentityDocExtractor:
         
         return patterns
     
-    def extract(self, text=None, image_path=None):
+    def extract(self, text=None, image_path=None, preprocessed=False):
         """
         Point d'entrée principal pour l'extraction des informations d'un document d'identité
         
         Args:
             text (str, optional): Texte du document si déjà extrait
             image_path (str, optional): Chemin vers l'image du document
+            preprocessed (bool): Le texte a déjà subi clean_text et preprocess_text
             
         Returns:
             dict: Informations extraites du document
@@ -275,7 +260,7 @@ class IdentityDocExtractor:
         doc_type, country = self.detect_document_type(text, image_path)
         
         # Extraction des informations à partir du texte
-        result = self.extract_from_text(text, doc_type, country)
+        result = self.extract_from_text(text, doc_type, country, preprocessed=preprocessed)
         
         return result
     
@@ -429,7 +414,7 @@ class IdentityDocExtractor:
             
         return doc_type, country
     
-    def extract_from_text(self, text, doc_type=None, country=None):
+    def extract_from_text(self, text, doc_type=None, country=None, preprocessed=False):
         """
         Extrait les informations d'identité à partir du texte
         
@@ -437,13 +422,17 @@ class IdentityDocExtractor:
             text (str): Texte du document
             doc_type (str, optional): Type de document si déjà connu
             country (str, optional): Pays d'origine si déjà connu
+            preprocessed (bool): Le texte a déjà subi clean_text et preprocess_text
             
         Returns:
             dict: Informations d'identité extraites
         """
         # Prétraitement du texte
-        clean = TextProcessor.clean_text(text)
-        processed = TextProcessor.preprocess_text(clean)
+        if preprocessed:
+            processed = text
+        else:
+            clean = TextProcessor.clean_text(text)
+            processed = TextProcessor.preprocess_text(clean)
         
         # Détection du type de document et du pays si non spécifiés
         if not doc_type or not country:
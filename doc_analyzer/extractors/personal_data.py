@@ -21,25 +21,9 @@ from typing import Dict, Any, List, Optional, Tuple, Set
 import json
 import csv
 
-# Tentative d'importation des dépendances optionnelles
-try:
-    import spacy
-    SPACY_AVAILABLE = True
-    # Chargement du modèle spaCy (un modèle léger)
-    try:
-        nlp = spacy.load("fr_core_news_sm")
-    except OSError:
-        logging.warning("Modèle fr_core_news_sm non trouvé. Tentative de téléchargement...")
-        from spacy.cli import download
-        download("fr_core_news_sm")
-        nlp = spacy.load("fr_core_news_sm")
-    except Exception as e:
-        logging.error(f"Erreur lors du chargement du modèle spaCy: {e}")
-        # Fallback sur un modèle vide si nécessaire
-        nlp = spacy.blank("fr")
-except ImportError:
-    SPACY_AVAILABLE = False
-    logging.warning("spacy non disponible, capacités d'extraction limitées")
+# Modèle spaCy partagé, chargé au premier usage
+from ..utils.nlp_service import nlp, SPACY_AVAILABLE
+from ..utils.text_processor import TextProcessor
 
 # Configuration du logger
 logger = logging.getLogger("VynalDocsAutomator.DocAnalyzer.PersonalData")
@@ -312,19 +296,21 @@ class PersonalDataExtractor:
         
         return config
     
-    def extract(self, text, anonymize=False):
+    def extract(self, text, anonymize=False, preprocessed=False):
         """
         Extrait toutes les données personnelles d'un texte
         
         Args:
             text (str): Texte à analyser
             anonymize (bool): Indique si les données sensibles doivent être anonymisées
+            preprocessed (bool): Le texte a déjà subi TextProcessor.sanitize_text
             
         Returns:
             dict: Données personnelles extraites
         """
         # Prétraitement du texte
-        text = self._preprocess_text(text)
+        if not preprocessed:
+            text = self._preprocess_text(text)
         
         # Initialisation du résultat
         result = {
@@ -363,24 +349,7 @@ class PersonalDataExtractor:
         Returns:
             str: Texte prétraité
         """
-        # Suppression des caractères spéciaux problématiques
-        text = re.sub(r'[^\w\s\.,;:\'\"!?@#&\(\)\[\]\{\}\-/\\<>%€$£¥+\*=|°²³_]', ' ', text)
-        
-        # Normalisation des espaces
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Conversion de certains caractères spéciaux
-        replacements = {
-            'œ': 'oe',
-            'Œ': 'OE',
-            'æ': 'ae',
-            'Æ': 'AE'
-        }
-        
-        for char, replacement in replacements.items():
-            text = text.replace(char, replacement)
-        
-        return text
+        return TextProcessor.sanitize_text(text)
     
     def extract_identity(self, text):
         """
@@ -12,7 +12,8 @@ import os
 import logging
 import json
 from typing import Dict, List, Tuple, Optional, Any
-import spacy
+
+from ..utils.nlp_service import nlp as shared_nlp, SPACY_AVAILABLE
 
 # Configuration du logger
 logger = logging.getLogger("VynalDocsAutomator.Recognizers.IDRecognizer")
@@ -102,10 +103,10 @@ class IDRecognizer:
         # Chargement des formats d'identifiants
         self.formats = self._load_id_formats()
         
-        # Chargement du modèle spaCy si disponible
-        try:
-            self.nlp = spacy.load("fr_core_news_sm")
-        except:
+        # Modèle spaCy partagé si disponible (chargé au premier usage)
+        if SPACY_AVAILABLE:
+            self.nlp = shared_nlp
+        else:
             self.logger.warning("Modèle spaCy non disponible, certaines fonctionnalités seront limitées")
             self.nlp = None
         
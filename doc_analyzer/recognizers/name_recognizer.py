@@ -18,23 +18,8 @@ import unicodedata
 # Configuration du logger
 logger = logging.getLogger("VynalDocsAutomator.DocAnalyzer.NameRecognizer")
 
-# Importation conditionnelle de spaCy pour la NER
-try:
-    import spacy
-    SPACY_AVAILABLE = True
-    try:
-        nlp = spacy.load("fr_core_news_sm")
-    except OSError:
-        logger.warning("Modèle fr_core_news_sm non trouvé. Tentative de téléchargement...")
-        from spacy.cli import download
-        download("fr_core_news_sm")
-        nlp = spacy.load("fr_core_news_sm")
-    except Exception as e:
-        logger.error(f"Erreur lors du chargement du modèle spaCy: {e}")
-        nlp = spacy.blank("fr")
-except ImportError:
-    SPACY_AVAILABLE = False
-    logger.warning("spaCy non disponible, fonctionnalités NER limitées")
+# Modèle spaCy partagé pour la NER, chargé au premier usage
+from ..utils.nlp_service import nlp, SPACY_AVAILABLE
 
 class NameType(Enum):
     """Types de noms supportés"""
@@ -193,6 +193,31 @@ class TestDocumentWatcher(unittest.TestCase):
         hash_initial = self.watcher.cache[fichier]["hash"]
         self.assertEqual(hash_initial, self.watcher._get_file_hash(fichier))
     
+    def test_regroupement_evenements(self):
+        """Test du regroupement des événements successifs sur un même fichier."""
+        fichier = os.path.join(self.documents_dir, "rafale.txt")
+        
+        with patch.object(self.watcher.analyzer, "analyser_document",
+                          wraps=self.watcher.analyzer.analyser_document) as analyse:
+            # Plusieurs enregistrements rapprochés
+            for i in range(5):
+                with open(fichier, "w", encoding="utf-8") as f:
+                    f.write(f"Montant : {i}00€")
+                time.sleep(0.05)
+            
+            time.sleep(1)
+            self.watcher.wait_for_analysis()
+            
+            # Une seule analyse, sur la dernière version
+            self.assertEqual(analyse.call_count, 1)
+            montant = self.watcher.cache[fichier]["rapport"]["informations_extraites"]["montant"]
+            self.assertTrue(montant.startswith("400"))
+            
+            # Un fichier simplement touché n'est pas réanalysé
+            os.utime(fichier)
+            self.watcher._handle_file_event(fichier)
+            self.assertEqual(analyse.call_count, 1)
+    
     def test_encodages(self):
         """Test de la gestion des différents encodages."""
         # Test UTF-8
@@ -30,6 +30,7 @@ from PIL import Image, ImageTk
 # Importation des modules internes
 from ..config import get_config
 from ..analyzer import DocumentAnalyzer
+from ..analyzer_service import get_analyzer_service
 from .client_matcher import ClientMatcher
 
 # Configuration du logger
@@ -54,8 +55,8 @@ class AutoFillDialog:
         self.config = get_config()
         self.ui_config = self.config.get_section("ui").get("auto_fill_dialog", {})
         
-        # Initialiser l'analyseur
-        self.analyzer = analyzer or DocumentAnalyzer(self.config.get_all())
+        # Analyseur fourni, ou analyseur partagé par l'application
+        self.analyzer = analyzer or get_analyzer_service().get()
         
         # Base de données des clients
         self.clients_db = clients_db or []
@@ -991,8 +992,8 @@ class SimpleAutoFillDialog:
         self.parent = parent
         self.config = get_config()
         
-        # Initialiser l'analyseur
-        self.analyzer = analyzer or DocumentAnalyzer(self.config.get_all())
+        # Analyseur fourni, ou analyseur partagé par l'application
+        self.analyzer = analyzer or get_analyzer_service().get()
     
     def show(self, document_path: str, callback: Callable = None):
         """
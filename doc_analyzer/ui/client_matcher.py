@@ -7,13 +7,15 @@ Fournit des fonctionnalités pour rechercher des clients correspondants
 aux données extraites des documents et effectuer des correspondances.
 """
 
-import re
 import logging
 import difflib
 from typing import Dict, Any, List, Tuple, Optional, Union
 
 # Importation des modules internes
 from ..config import get_config
+from ..utils.client_index import (
+    ClientIndex, normalize_field, batch_similarity, EXACT_FIELDS
+)
 
 # Configuration du logger
 logger = logging.getLogger("Vynal Docs Automator.doc_analyzer.ui.client_matcher")
@@ -38,6 +40,10 @@ class ClientMatcher:
         self.match_threshold = self.match_config.get("match_threshold", 0.7)
         self.max_results = self.match_config.get("max_results", 5)
         self.search_fields = self.match_config.get("search_fields", ["name", "email", "phone", "company"])
+        self.candidate_limit = self.match_config.get("candidate_limit", 200)
+        
+        # Index des clients (identifiants exacts et n-grammes), maintenu de façon incrémentale
+        self.index = ClientIndex(self.clients_db, ngram_size=self.match_config.get("ngram_size", 3))
         
         # Stockage des derniers résultats
         self.last_results = []
@@ -64,9 +70,21 @@ class ClientMatcher:
             self.last_results = []
             return []
         
-        # Calculer les scores pour chaque client
+        # Présélectionner les candidats via l'index de n-grammes
+        query_values = {normalize_field(field, query) for field in ("name", "email")}
+        slots = self.index.candidates(query_values, self.candidate_limit)
+        for field in ("email", "phone", "siret"):
+            slots.extend(self.index.find_exact(field, query))
+        
+        # Requête trop courte pour l'index: parcourir toute la base
+        if not slots and len(query) < self.index.ngram_size:
+            clients = self.clients_db
+        else:
+            clients = [self.index.clients[slot] for slot in dict.fromkeys(slots)]
+        
+        # Calculer les scores pour chaque candidat
         matches = []
-        for client in self.clients_db:
+        for client in clients:
             score = self._calculate_match_score(client, query)
             if score >= self.match_threshold:
                 matches.append((client, score))
@@ -137,9 +155,8 @@ class ClientMatcher:
         if not identifiers:
             return []
         
-        # Calculer les scores pour chaque client
-        for client in self.clients_db:
-            score = self._calculate_client_match_score(client, identifiers)
+        # Calculer les scores sur les seuls candidats présélectionnés par l'index
+        for client, score in self._score_candidates(identifiers):
             if score >= self.match_threshold:
                 matches.append((client, score))
         
@@ -211,6 +228,77 @@ class ClientMatcher:
                             identifiers[field] = str(sub_value[field]).lower()
                             break
     
+    # Poids des différents champs
+    FIELD_WEIGHTS = {
+        "email": 10,       # Email (identifiant fort)
+        "phone": 8,        # Téléphone (identifiant fort)
+        "siret": 10,       # SIRET (identifiant fort)
+        "name": 7,         # Nom complet
+        "full_name": 7,    # Nom complet (first_name + last_name)
+        "first_name": 3,   # Prénom (partiel)
+        "last_name": 4,    # Nom de famille (partiel)
+        "company": 6       # Nom de l'entreprise
+    }
+    
+    def _score_candidates(self, identifiers: Dict[str, str]) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Calcule les scores de correspondance des clients présélectionnés par l'index.
+        Équivalent à _calculate_client_match_score, mais les valeurs des clients sont
+        normalisées une seule fois (dans l'index) et les similarités calculées par lot.
+        
+        Args:
+            identifiers (dict): Identifiants extraits
+            
+        Returns:
+            list: Liste de tuples (client, score)
+        """
+        id_values = {field: normalize_field(field, identifiers.get(field, ""))
+                     for field in self.FIELD_WEIGHTS}
+        
+        # Correspondances exactes sur les identifiants forts: quasiment certain
+        exact_slots = set()
+        for field in EXACT_FIELDS:
+            if id_values[field]:
+                exact_slots.update(self.index.find_exact(field, id_values[field]))
+        
+        # Présélection sur tous les champs notés (noms, entreprise, email, téléphone)
+        candidates = self.index.candidates(
+            [id_values[f] for f in self.FIELD_WEIGHTS if f != "siret"],
+            self.candidate_limit
+        )
+        if not candidates and not exact_slots:
+            # Aucun bloc ne correspond (valeurs plus courtes qu'un n-gramme): parcourir toute la base
+            candidates = list(self.index.clients)
+        slots = [slot for slot in candidates if slot not in exact_slots]
+        
+        totals = [0.0] * len(slots)
+        weights = [0] * len(slots)
+        for field, weight in self.FIELD_WEIGHTS.items():
+            id_value = id_values[field]
+            if not id_value:
+                continue
+            
+            positions = [i for i, slot in enumerate(slots) if self.index.normalized[slot][field]]
+            if not positions:
+                continue
+            
+            similarities = batch_similarity(
+                id_value, [self.index.normalized[slots[i]][field] for i in positions]
+            )
+            for i, similarity in zip(positions, similarities):
+                # Pour les identifiants forts, pas de score partiel sous 0.9
+                if field in EXACT_FIELDS and similarity < 0.9:
+                    similarity = 0
+                totals[i] += similarity * weight
+                weights[i] += weight
+        
+        scores = {slot: 0.95 for slot in exact_slots}
+        for i, slot in enumerate(slots):
+            scores[slot] = totals[i] / weights[i] if weights[i] else 0
+        
+        # Conserver l'ordre de la base pour départager les scores égaux
+        return [(self.index.clients[slot], scores[slot]) for slot in sorted(scores)]
+    
     def _calculate_client_match_score(self, client: Dict[str, Any], identifiers: Dict[str, str]) -> float:
         """
         Calcule un score de correspondance entre un client et des identifiants
@@ -225,18 +313,7 @@ class ClientMatcher:
         # Initialiser le score et les poids
         total_score = 0
         total_weight = 0
-        
-        # Poids des différents champs
-        weights = {
-            "email": 10,       # Email (identifiant fort)
-            "phone": 8,        # Téléphone (identifiant fort)
-            "siret": 10,       # SIRET (identifiant fort)
-            "name": 7,         # Nom complet
-            "full_name": 7,    # Nom complet (first_name + last_name)
-            "first_name": 3,   # Prénom (partiel)
-            "last_name": 4,    # Nom de famille (partiel)
-            "company": 6       # Nom de l'entreprise
-        }
+        weights = self.FIELD_WEIGHTS
         
         # Correspondances exactes pour certains identifiants forts
         for field in ["email", "phone", "siret"]:
@@ -320,39 +397,7 @@ class ClientMatcher:
         Returns:
             str: Valeur normalisée
         """
-        if not value:
-            return ""
-        
-        # Traitement selon le type de champ
-        if field == "email":
-            # Normaliser les emails (tout en minuscules, supprimer les espaces)
-            return value.lower().strip().replace(" ", "")
-        
-        elif field == "phone":
-            # Normaliser les numéros de téléphone (supprimer tous les non-chiffres)
-            normalized = re.sub(r'\D', '', value)
-            
-            # Gérer les préfixes internationaux
-            if normalized.startswith("33") and len(normalized) > 9:
-                normalized = "0" + normalized[2:]
-            
-            return normalized
-        
-        elif field in ["name", "first_name", "last_name", "full_name", "company"]:
-            # Normaliser les noms (minuscules, supprimer les caractères spéciaux)
-            normalized = re.sub(r'[^\w\s]', '', value).lower()
-            
-            # Supprimer les espaces multiples
-            normalized = re.sub(r'\s+', ' ', normalized).strip()
-            
-            return normalized
-        
-        elif field == "siret":
-            # Normaliser les SIRET (supprimer tous les non-chiffres)
-            return re.sub(r'\D', '', value)
-        
-        # Par défaut, retourner la valeur en minuscules sans espaces excessifs
-        return re.sub(r'\s+', ' ', value.lower()).strip()
+        return normalize_field(field, value)
     
     def get_best_match(self, extracted_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -386,6 +431,7 @@ class ClientMatcher:
             clients_db (list): Nouvelle base de données des clients
         """
         self.clients_db = clients_db or []
+        self.index.rebuild(self.clients_db)
         logger.info(f"Base de données clients mise à jour ({len(self.clients_db)} clients)")
     
     def add_client(self, client: Dict[str, Any]) -> bool:
@@ -398,19 +444,19 @@ class ClientMatcher:
         Returns:
             bool: True si le client a été ajouté, False sinon
         """
-        # Vérifier si le client existe déjà
-        for existing_client in self.clients_db:
-            # Vérifier par ID si disponible
-            if "id" in existing_client and "id" in client and existing_client["id"] == client["id"]:
-                return False
-            
-            # Vérifier par email si disponible
-            if "email" in existing_client and "email" in client and existing_client["email"] and client["email"]:
-                if existing_client["email"].lower() == client["email"].lower():
+        # Vérifier si le client existe déjà (par ID puis par email)
+        if "id" in client and self.index.get_by_id(client["id"]) is not None:
+            return False
+        
+        if client.get("email"):
+            email = client["email"].lower()
+            for slot in self.index.find_exact("email", client["email"]):
+                if (self.index.clients[slot].get("email") or "").lower() == email:
                     return False
         
         # Ajouter le client
         self.clients_db.append(client)
+        self.index.add(client)
         return True
     
     def update_client(self, client: Dict[str, Any]) -> bool:
@@ -432,6 +478,7 @@ class ClientMatcher:
             if "id" in existing_client and existing_client["id"] == client["id"]:
                 # Mettre à jour le client
                 self.clients_db[i] = client
+                self.index.update(client)
                 return True
         
         return False
@@ -451,6 +498,7 @@ class ClientMatcher:
             if "id" in client and client["id"] == client_id:
                 # Supprimer le client
                 del self.clients_db[i]
+                self.index.remove(client_id)
                 return True
         
         return False
@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Index de clients pour Vynal Docs Automator
+Index construit une seule fois puis maintenu de façon incrémentale :
+recherche exacte sur les identifiants forts normalisés (email, téléphone, SIRET),
+index de n-grammes de caractères pour présélectionner les candidats sur les noms,
+entreprises, emails et téléphones, et calcul de similarité par lot sur cette seule présélection.
+Fournit aussi la détection des mentions de clients dans un texte (automate d'Aho-Corasick).
+"""
+
+import re
+import difflib
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Optional, Iterable, Set, Tuple
+
+logger = logging.getLogger("VynalDocsAutomator.Utils.ClientIndex")
+
+# Identifiants forts, recherchés par égalité exacte après normalisation
+EXACT_FIELDS = ("email", "phone", "siret")
+
+# Champs indexés par n-grammes pour la présélection des candidats
+# (tous les champs notés par ClientMatcher, pour ne perdre aucune correspondance)
+NGRAM_FIELDS = ("name", "first_name", "last_name", "company", "email", "phone")
+
+NAME_FIELDS = ("name", "first_name", "last_name", "full_name", "company")
+
+_NON_DIGIT_RE = re.compile(r'\D')
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_field(field: str, value: Any) -> str:
+    """
+    Normalise la valeur d'un champ client pour la comparaison
+
+    Args:
+        field: Nom du champ
+        value: Valeur à normaliser
+
+    Returns:
+        str: Valeur normalisée
+    """
+    if not value:
+        return ""
+    value = str(value)
+
+    if field == "email":
+        # Tout en minuscules, sans espaces
+        return value.lower().strip().replace(" ", "")
+
+    if field == "phone":
+        # Chiffres uniquement, préfixe international français ramené à 0
+        normalized = _NON_DIGIT_RE.sub('', value)
+        if normalized.startswith("33") and len(normalized) > 9:
+            normalized = "0" + normalized[2:]
+        return normalized
+
+    if field in NAME_FIELDS:
+        # Minuscules, sans caractères spéciaux ni espaces multiples
+        normalized = _NON_WORD_RE.sub('', value).lower()
+        return _WHITESPACE_RE.sub(' ', normalized).strip()
+
+    if field == "siret":
+        return _NON_DIGIT_RE.sub('', value)
+
+    return _WHITESPACE_RE.sub(' ', value.lower()).strip()
+
+
+def client_display_name(client: Dict[str, Any]) -> str:
+    """
+    Retourne le nom d'un client ('name' ou, à défaut, prénom + nom)
+
+    Args:
+        client: Données du client
+
+    Returns:
+        str: Nom du client en minuscules
+    """
+    name = str(client.get("name") or "").lower()
+    if not name:
+        first = str(client.get("first_name") or "").lower()
+        last = str(client.get("last_name") or "").lower()
+        if first or last:
+            name = f"{first} {last}".strip()
+    return name
+
+
+def similarity(a: str, b: str) -> float:
+    """Ratio de similarité entre deux chaînes (0-1)"""
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def batch_similarity(query: str, choices: List[str]) -> List[float]:
+    """
+    Calcule la similarité d'une requête avec une liste de valeurs
+
+    Args:
+        query: Valeur recherchée
+        choices: Valeurs à comparer
+
+    Returns:
+        list: Ratio de similarité (0-1) pour chaque valeur
+    """
+    # SequenceMatcher met en cache les informations de la seconde séquence:
+    # la requête est donc fixée en seq2 et réutilisée pour toute la liste
+    matcher = difflib.SequenceMatcher(None)
+    matcher.set_seq2(query)
+    scores = []
+    for choice in choices:
+        matcher.set_seq1(choice)
+        scores.append(matcher.ratio())
+    return scores
+
+
+class ClientIndex:
+    """
+    Index incrémental d'une base de clients.
+    Chaque client reçoit un numéro d'emplacement interne; ses valeurs normalisées
+    sont calculées une seule fois, à l'ajout ou à la mise à jour.
+    """
+
+    def __init__(self, clients: Iterable[Dict[str, Any]] = None, ngram_size: int = 3):
+        """
+        Initialise l'index
+
+        Args:
+            clients: Clients à indexer
+            ngram_size: Taille des n-grammes de caractères
+        """
+        self.ngram_size = ngram_size
+        self.rebuild(clients or [])
+
+    def rebuild(self, clients: Iterable[Dict[str, Any]]) -> None:
+        """
+        Reconstruit entièrement l'index
+
+        Args:
+            clients: Clients à indexer
+        """
+        self._next_slot = 0
+        self.clients: Dict[int, Dict[str, Any]] = {}
+        self.normalized: Dict[int, Dict[str, str]] = {}
+        self._slots_by_id: Dict[Any, int] = {}
+        self._exact: Dict[str, Dict[str, Set[int]]] = {f: defaultdict(set) for f in EXACT_FIELDS}
+        self._grams: Dict[str, Set[int]] = defaultdict(set)
+
+        for client in clients:
+            self.add(client)
+
+        logger.debug(f"Index clients construit ({len(self.clients)} clients)")
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def ngrams(self, value: str) -> Set[str]:
+        """
+        Découpe une valeur normalisée en n-grammes (bornée par des espaces)
+
+        Args:
+            value: Valeur normalisée
+
+        Returns:
+            set: N-grammes de la valeur
+        """
+        if not value:
+            return set()
+        padded = f" {value} "
+        n = self.ngram_size
+        if len(padded) <= n:
+            return {padded}
+        return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+    def _normalize_client(self, client: Dict[str, Any]) -> Dict[str, str]:
+        """Calcule les valeurs normalisées d'un client"""
+        name = normalize_field("name", client_display_name(client))
+        return {
+            "name": name,
+            "full_name": name,
+            "first_name": normalize_field("first_name", client.get("first_name")),
+            "last_name": normalize_field("last_name", client.get("last_name")),
+            "company": normalize_field("company", client.get("company")),
+            "email": normalize_field("email", client.get("email")),
+            "phone": normalize_field("phone", client.get("phone")),
+            "siret": normalize_field("siret", client.get("siret")),
+        }
+
+    def add(self, client: Dict[str, Any]) -> int:
+        """
+        Ajoute un client à l'index
+
+        Args:
+            client: Données du client
+
+        Returns:
+            int: Emplacement interne du client
+        """
+        slot = self._next_slot
+        self._next_slot += 1
+        self._index_slot(slot, client)
+        return slot
+
+    def _index_slot(self, slot: int, client: Dict[str, Any]) -> None:
+        """Indexe un client à un emplacement donné"""
+        values = self._normalize_client(client)
+        self.clients[slot] = client
+        self.normalized[slot] = values
+        if client.get("id") is not None:
+            self._slots_by_id[client["id"]] = slot
+
+        for field in EXACT_FIELDS:
+            if values[field]:
+                self._exact[field][values[field]].add(slot)
+        for field in NGRAM_FIELDS:
+            for gram in self.ngrams(values[field]):
+                self._grams[gram].add(slot)
+
+    def _remove_slot(self, slot: int) -> None:
+        """Retire un emplacement de toutes les structures de l'index"""
+        values = self.normalized.pop(slot)
+        client = self.clients.pop(slot)
+        if self._slots_by_id.get(client.get("id")) == slot:
+            del self._slots_by_id[client["id"]]
+
+        for field in EXACT_FIELDS:
+            postings = self._exact[field].get(values[field])
+            if postings is not None:
+                postings.discard(slot)
+                if not postings:
+                    del self._exact[field][values[field]]
+        for field in NGRAM_FIELDS:
+            for gram in self.ngrams(values[field]):
+                postings = self._grams.get(gram)
+                if postings is not None:
+                    postings.discard(slot)
+                    if not postings:
+                        del self._grams[gram]
+
+    def update(self, client: Dict[str, Any]) -> bool:
+        """
+        Remplace un client indexé (identifié par son 'id') en conservant son
+        emplacement, et donc son rang en cas d'égalité de score
+
+        Args:
+            client: Nouvelles données du client
+
+        Returns:
+            bool: True si le client était indexé
+        """
+        slot = self._slots_by_id.get(client.get("id"))
+        if slot is None:
+            return False
+        self._remove_slot(slot)
+        self._index_slot(slot, client)
+        return True
+
+    def remove(self, client_id: Any) -> bool:
+        """
+        Retire un client de l'index
+
+        Args:
+            client_id: ID du client
+
+        Returns:
+            bool: True si le client était indexé
+        """
+        slot = self._slots_by_id.get(client_id)
+        if slot is None:
+            return False
+        self._remove_slot(slot)
+        return True
+
+    def get_by_id(self, client_id: Any) -> Optional[Dict[str, Any]]:
+        """Retourne le client indexé portant cet ID"""
+        slot = self._slots_by_id.get(client_id)
+        return self.clients.get(slot) if slot is not None else None
+
+    def find_exact(self, field: str, value: Any) -> List[int]:
+        """
+        Recherche exacte sur un identifiant fort normalisé
+
+        Args:
+            field: 'email', 'phone' ou 'siret'
+            value: Valeur recherchée (non normalisée)
+
+        Returns:
+            list: Emplacements des clients correspondants
+        """
+        normalized = normalize_field(field, value)
+        if not normalized:
+            return []
+        return sorted(self._exact[field].get(normalized, ()))
+
+    def candidates(self, values: Iterable[str], limit: int = 200) -> List[int]:
+        """
+        Présélectionne les clients partageant le plus de n-grammes avec les valeurs
+
+        Args:
+            values: Valeurs normalisées recherchées (noms, entreprise, email, téléphone)
+            limit: Nombre maximal de candidats
+
+        Returns:
+            list: Emplacements des candidats, du plus prometteur au moins prometteur
+        """
+        counts = Counter()
+        for value in values:
+            for gram in self.ngrams(value):
+                postings = self._grams.get(gram)
+                if postings:
+                    counts.update(postings)
+
+        if not counts:
+            return []
+        return [slot for slot, _ in counts.most_common(limit)]
+
+
+# Motifs de détection des mentions de clients dans un texte
+MENTION_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+MENTION_PHONE_PATTERN = re.compile(r'(?:\+33|0)\s*[1-9](?:[\s.-]?\d{2}){4}')
+_PHONE_SEPARATORS_RE = re.compile(r'[\s.-]')
+
+# Points attribués à chaque type de mention
+MENTION_SCORES = {"email": 5, "phone": 4, "name": 3, "company": 2}
+
+
+def normalize_mention_phone(phone: str) -> str:
+    """Normalise un numéro au format international (+33...) sans séparateurs"""
+    clean = _PHONE_SEPARATORS_RE.sub('', phone or '')
+    if clean.startswith('0'):
+        clean = '+33' + clean[1:]
+    return clean
+
+
+class AhoCorasick:
+    """
+    Automate d'Aho-Corasick: trouve toutes les occurrences d'un ensemble de motifs
+    en un seul parcours du texte.
+    Les motifs s'ajoutent et se retirent au fil de l'eau; seuls les liens d'échec
+    sont recalculés (à la recherche suivante) après une modification. Les nœuds
+    des motifs retirés restent dans le trie jusqu'à sa reconstruction, faite
+    après prune_after retraits.
+    """
+
+    def __init__(self, prune_after: int = 256):
+        """
+        Initialise l'automate
+
+        Args:
+            prune_after: Nombre de motifs retirés au-delà duquel le trie est reconstruit
+        """
+        self.prune_after = prune_after
+        self._owners: Dict[str, Set[Any]] = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        """Vide le trie (les propriétaires des motifs sont conservés)"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._terminal: List[Optional[str]] = [None]
+        self._fail: List[int] = [0]
+        self._dict_link: List[int] = [0]
+        self._removed = 0
+        self._dirty = False
+
+    def _insert(self, pattern: str) -> None:
+        """Insère un motif dans le trie"""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._terminal.append(None)
+                self._fail.append(0)
+                self._dict_link.append(0)
+                self._goto[node][char] = next_node
+            node = next_node
+        self._terminal[node] = pattern
+        self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    def add(self, pattern: str, owner: Any) -> None:
+        """
+        Ajoute un motif (ou un propriétaire supplémentaire à un motif existant)
+
+        Args:
+            pattern: Motif à rechercher
+            owner: Propriétaire du motif, retourné lors des correspondances
+        """
+        if not pattern:
+            return
+        owners = self._owners.get(pattern)
+        if owners is not None:
+            owners.add(owner)
+            return
+
+        self._owners[pattern] = {owner}
+        self._insert(pattern)
+
+    def remove(self, pattern: str, owner: Any) -> None:
+        """
+        Retire un propriétaire d'un motif (le motif disparaît avec son dernier propriétaire)
+
+        Args:
+            pattern: Motif
+            owner: Propriétaire à retirer
+        """
+        owners = self._owners.get(pattern)
+        if owners is None:
+            return
+        owners.discard(owner)
+        if owners:
+            return
+
+        del self._owners[pattern]
+        self._removed += 1
+        if self._removed >= self.prune_after:
+            # Reconstruire le trie sans les nœuds des motifs retirés
+            self._reset()
+            for live_pattern in self._owners:
+                self._insert(live_pattern)
+            return
+
+        node = 0
+        for char in pattern:
+            node = self._goto[node][char]
+        self._terminal[node] = None
+        self._dirty = True
+
+    @property
+    def node_count(self) -> int:
+        """Nombre de nœuds du trie (racine comprise)"""
+        return len(self._goto)
+
+    def _build(self) -> None:
+        """Calcule les liens d'échec et de sortie par un parcours en largeur du trie"""
+        queue = []
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._dict_link[child] = 0
+            queue.append(child)
+
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                if fail == child:
+                    fail = 0
+                self._fail[child] = fail
+                self._dict_link[child] = fail if self._terminal[fail] else self._dict_link[fail]
+                queue.append(child)
+
+        self._dirty = False
+
+    def find(self, text: str) -> Dict[str, Set[Any]]:
+        """
+        Recherche tous les motifs présents dans le texte
+
+        Args:
+            text: Texte à parcourir
+
+        Returns:
+            dict: Propriétaires de chaque motif trouvé
+        """
+        if not self._owners:
+            return {}
+        if self._dirty:
+            self._build()
+
+        goto, fail, terminal, dict_link = self._goto, self._fail, self._terminal, self._dict_link
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            output = node if terminal[node] else dict_link[node]
+            while output:
+                found.add(terminal[output])
+                output = dict_link[output]
+
+        return {pattern: self._owners[pattern] for pattern in found}
+
+
+class ClientMentionIndex:
+    """
+    Index des mentions de clients dans un texte: noms et entreprises dans un
+    automate d'Aho-Corasick, emails et téléphones normalisés dans des tables de
+    hachage. L'index est synchronisé de façon incrémentale avec la liste des clients.
+    """
+
+    def __init__(self, clients: List[Dict[str, Any]] = None):
+        """
+        Initialise l'index
+
+        Args:
+            clients: Clients à indexer
+        """
+        self._automaton = AhoCorasick()
+        self._entries: Dict[int, Tuple[Dict[str, Any], Tuple[str, str, str, str]]] = {}
+        self._emails: Dict[str, Set[int]] = defaultdict(set)
+        self._phones: Dict[str, Set[int]] = defaultdict(set)
+        self._order: Dict[int, int] = {}
+        # Liste et version synchronisées en dernier (voir sync)
+        self._synced: Optional[Tuple[int, int, Any]] = None
+        if clients:
+            self.sync(clients)
+
+    @staticmethod
+    def _fingerprint(client: Dict[str, Any]) -> Tuple[str, str, str, str]:
+        """Valeurs normalisées d'un client utilisées pour la détection"""
+        return (
+            str(client.get('name') or '').lower(),
+            str(client.get('company') or '').lower(),
+            str(client.get('email') or '').lower(),
+            normalize_mention_phone(str(client.get('phone') or '')),
+        )
+
+    def _add(self, key: int, client: Dict[str, Any], fingerprint: Tuple[str, str, str, str]) -> None:
+        name, company, email, phone = fingerprint
+        self._entries[key] = (client, fingerprint)
+        if name:
+            self._automaton.add(name, (key, 'name'))
+        if len(company) > 2:
+            self._automaton.add(company, (key, 'company'))
+        if email:
+            self._emails[email].add(key)
+        if phone:
+            self._phones[phone].add(key)
+
+    def _remove(self, key: int) -> None:
+        _, (name, company, email, phone) = self._entries.pop(key)
+        self._automaton.remove(name, (key, 'name'))
+        self._automaton.remove(company, (key, 'company'))
+        for table, value in ((self._emails, email), (self._phones, phone)):
+            keys = table.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del table[value]
+
+    def sync(self, clients: List[Dict[str, Any]], version: Any = None) -> None:
+        """
+        Met l'index en conformité avec la liste des clients: seuls les clients
+        ajoutés, retirés ou modifiés sont (ré)indexés
+
+        Args:
+            clients: Liste actuelle des clients
+            version: Numéro de version de la liste, modifié à chaque ajout, retrait
+                     ou modification de client. Si la même liste est synchronisée
+                     avec la même version, elle n'est pas reparcourue; sans version,
+                     chaque client est comparé à son état indexé.
+        """
+        synced = (id(clients), len(clients), version)
+        if version is not None and synced == self._synced:
+            return
+
+        order = {}
+        for position, client in enumerate(clients):
+            key = id(client)
+            if key in order:
+                continue
+            order[key] = position
+
+            fingerprint = self._fingerprint(client)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] == fingerprint:
+                    continue
+                self._remove(key)
+            self._add(key, client, fingerprint)
+
+        for key in [k for k in self._entries if k not in order]:
+            self._remove(key)
+        self._order = order
+        self._synced = synced
+
+    def find_matches(self, text: str) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Recherche les clients mentionnés dans un texte
+
+        Args:
+            text: Texte du document
+
+        Returns:
+            list: Liste de tuples (client, score) triés par score décroissant
+        """
+        scores: Dict[int, int] = defaultdict(int)
+
+        # Emails et téléphones: extraits du texte puis recherchés par égalité
+        for email in {e.lower() for e in MENTION_EMAIL_PATTERN.findall(text)}:
+            for key in self._emails.get(email, ()):
+                scores[key] += MENTION_SCORES['email']
+        for phone in {normalize_mention_phone(p) for p in MENTION_PHONE_PATTERN.findall(text)}:
+            for key in self._phones.get(phone, ()):
+                scores[key] += MENTION_SCORES['phone']
+
+        # Noms et entreprises: un seul parcours du texte par l'automate
+        for owners in self._automaton.find(text.lower()).values():
+            for key, kind in owners:
+                scores[key] += MENTION_SCORES[kind]
+
+        # Ordre de la liste des clients puis score décroissant (tri stable)
+        keys = sorted(scores, key=lambda k: self._order.get(k, 0))
+        matches = [(self._entries[key][0], scores[key]) for key in keys]
+        matches.sort(key=lambda x: x[1], reverse=True)
+        return matches
@@ -1,21 +1,19 @@
 import time
 import os
-import json
-from datetime import datetime
 from typing import Dict, List, Any, Optional
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import logging
 from pathlib import Path
 import threading
-import queue
-import hashlib
-from docx import Document
-from PyPDF2 import PdfReader
+import concurrent.futures
 import io
 
 from .document_analyzer import DocumentAnalyzer
 from .notification_manager import NotificationManager
+from .text_extraction import get_text_extractor
+from .watch_cache import WatchCache
+from ..config import WATCHER_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -24,13 +22,20 @@ class DocumentWatcher(FileSystemEventHandler):
     Classe pour surveiller les modifications de documents et déclencher leur analyse.
     """
     
-    def __init__(self, cache_dir: str = ".cache", root_window=None):
+    def __init__(self, cache_dir: str = ".cache", root_window=None,
+                 quiet_period: Optional[float] = None, max_workers: Optional[int] = None):
         """
         Initialise le surveillant de documents.
         
+        Les événements reçus pour un même fichier sont regroupés: le fichier n'est
+        analysé qu'après une période sans nouvel événement (quiet_period), par un
+        pool borné de max_workers analyses simultanées.
+        
         Args:
             cache_dir (str): Dossier pour stocker le cache des analyses
             root_window: Fenêtre principale Tkinter (optionnel)
+            quiet_period (float): Délai sans événement avant l'analyse (WATCHER_CONFIG par défaut)
+            max_workers (int): Nombre maximum d'analyses simultanées (WATCHER_CONFIG par défaut)
         """
         super().__init__()
         # Initialisation du verrou en premier
@@ -40,16 +45,14 @@ class DocumentWatcher(FileSystemEventHandler):
         self.analyzer = DocumentAnalyzer()
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
-        self.cache_file = self.cache_dir / "analysis_cache.json"
+        self.cache_file = self.cache_dir / WATCHER_CONFIG["cache_db"]
+        
+        # Cache des analyses (une ligne par fichier), avec import de l'ancien cache JSON
+        self.cache = WatchCache(str(self.cache_file), legacy_json=str(self.cache_dir / "analysis_cache.json"))
         
         # Initialisation du gestionnaire de notifications
         self.notification_manager = NotificationManager(root_window)
         
-        # File d'attente pour les analyses
-        self.analysis_queue = queue.Queue()
-        self.analysis_thread = threading.Thread(target=self._process_analysis_queue, daemon=True)
-        self.analysis_thread.start()
-        
         # Formats de fichiers supportés
         self.supported_extensions = {
             '.txt': self._read_text_file,
@@ -59,86 +62,55 @@ class DocumentWatcher(FileSystemEventHandler):
             '.rtf': self._read_text_file
         }
         
+        # Analyses en attente: chemin -> échéance (fin de la période de calme)
+        self.quiet_period = WATCHER_CONFIG["quiet_period"] if quiet_period is None else quiet_period
+        self.max_workers = max(1, max_workers or WATCHER_CONFIG["max_workers"])
+        self._pending: Dict[str, float] = {}
+        self._running = set()
+        self._next_wakeup = None  # Échéance attendue par l'ordonnanceur (None: aucune)
+        self._stopping = False
+        self._condition = threading.Condition(self.lock)
+        
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="DocumentWatcher"
+        )
+        self.scheduler_thread = threading.Thread(target=self._schedule_analyses, daemon=True)
+        self.scheduler_thread.start()
+        
         # Initialisation de l'observateur
         self.observer = Observer()
         self.observer.schedule(self, path=str(self.cache_dir.parent), recursive=True)
         self.observer.start()
         
-        # Chargement du cache après l'initialisation du verrou
-        self.cache = self._load_cache()
-        
         logger.info("DocumentWatcher initialisé")
     
-    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
-        """
-        Charge le cache des analyses précédentes.
-        
-        Returns:
-            Dict[str, Dict[str, Any]]: Cache des analyses
-        """
-        with self.lock:
-            if self.cache_file.exists():
-                try:
-                    with open(self.cache_file, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                except Exception as e:
-                    logger.error(f"Erreur lors du chargement du cache : {e}")
-                    return {}
-            return {}
-    
-    def _save_cache(self):
-        """Sauvegarde le cache des analyses."""
-        with self.lock:
-            try:
-                with open(self.cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.cache, f, indent=2, ensure_ascii=False)
-            except Exception as e:
-                logger.error(f"Erreur lors de la sauvegarde du cache : {e}")
-    
     def _get_file_hash(self, file_path: str) -> str:
         """
-        Calcule un hash MD5 du fichier.
+        Calcule l'empreinte SHA-256 du fichier (partagée avec l'extraction du texte).
         
         Args:
             file_path (str): Chemin du fichier
             
         Returns:
-            str: Hash MD5 du fichier
+            str: Empreinte du fichier (chaîne vide en cas d'erreur)
         """
         try:
-            hash_md5 = hashlib.md5()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            return get_text_extractor().file_hash(file_path)
         except Exception as e:
             logger.error(f"Erreur lors du calcul du hash pour {file_path}: {e}")
             return ""
     
-    def _should_analyze(self, file_path: str) -> bool:
+    def _is_watched_file(self, file_path: str) -> bool:
         """
-        Vérifie si le fichier doit être analysé.
+        Vérifie si un chemin correspond à un document à analyser.
         
         Args:
             file_path (str): Chemin du fichier
             
         Returns:
-            bool: True si le fichier doit être analysé
+            bool: True si l'extension est supportée
         """
-        # Vérifier l'extension
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext not in self.supported_extensions:
-            return False
-        
-        # Vérifier le cache
-        file_hash = self._get_file_hash(file_path)
-        with self.lock:
-            cached_data = self.cache.get(file_path, {})
-            if cached_data.get('hash') == file_hash:
-                logger.debug(f"Fichier {file_path} inchangé, analyse ignorée")
-                return False
-        
-        return True
+        return os.path.splitext(file_path)[1].lower() in self.supported_extensions
     
     def _read_text_file(self, file_path: str) -> str:
         """Lit un fichier texte."""
@@ -159,20 +131,15 @@ class DocumentWatcher(FileSystemEventHandler):
     def _read_docx_file(self, file_path: str) -> str:
         """Lit un fichier DOCX."""
         try:
-            doc = Document(file_path)
-            return "\n".join(paragraph.text for paragraph in doc.paragraphs)
+            return get_text_extractor().extract_text(file_path, separator="\n")
         except Exception as e:
             logger.error(f"Erreur lors de la lecture du fichier DOCX {file_path}: {e}")
             raise
     
     def _read_pdf_file(self, file_path: str) -> str:
-        """Lit un fichier PDF."""
+        """Lit un fichier PDF (pages numérisées reconnues par OCR)."""
         try:
-            reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text
+            return get_text_extractor().extract_text(file_path, separator="\n")
         except Exception as e:
             logger.error(f"Erreur lors de la lecture du fichier PDF {file_path}: {e}")
             raise
@@ -185,7 +152,7 @@ class DocumentWatcher(FileSystemEventHandler):
             event: Événement de modification
         """
         if not event.is_directory:
-            self.analysis_queue.put(('modified', event.src_path))
+            self._schedule(event.src_path)
     
     def on_created(self, event):
         """
@@ -195,69 +162,162 @@ class DocumentWatcher(FileSystemEventHandler):
             event: Événement de création
         """
         if not event.is_directory:
-            self.analysis_queue.put(('created', event.src_path))
+            self._schedule(event.src_path)
     
-    def _process_analysis_queue(self):
-        """Traite la file d'attente des analyses."""
-        while True:
-            try:
-                event_type, file_path = self.analysis_queue.get()
-                self._handle_file_event(file_path)
-            except Exception as e:
-                logger.error(f"Erreur lors du traitement de la file d'attente : {e}")
-            finally:
-                self.analysis_queue.task_done()
+    def on_moved(self, event):
+        """
+        Gère les déplacements (dont les enregistrements par renommage d'un fichier temporaire).
+        
+        Args:
+            event: Événement de déplacement
+        """
+        if not event.is_directory:
+            self.cache.remove(event.src_path)
+            self._schedule(event.dest_path)
+    
+    def on_deleted(self, event):
+        """
+        Gère les suppressions de fichier.
+        
+        Args:
+            event: Événement de suppression
+        """
+        if not event.is_directory:
+            with self._condition:
+                self._pending.pop(event.src_path, None)
+                self._condition.notify_all()
+            self.cache.remove(event.src_path)
+    
+    def _schedule(self, file_path: str):
+        """
+        Programme l'analyse d'un fichier à la fin de sa période de calme.
+        Un nouvel événement sur le même fichier repousse l'échéance.
+        
+        Args:
+            file_path (str): Chemin du fichier
+        """
+        if not self._is_watched_file(file_path):
+            return
+        
+        with self._condition:
+            if self._stopping:
+                return
+            # L'échéance ajoutée est toujours la plus tardive: il suffit de réveiller
+            # l'ordonnanceur lorsqu'il n'attend aucune échéance
+            self._pending[file_path] = time.monotonic() + self.quiet_period
+            if self._next_wakeup is None:
+                self._condition.notify_all()
     
-    def wait_for_analysis(self, timeout: float = 5.0) -> bool:
+    def _schedule_analyses(self):
+        """Soumet au pool les fichiers dont la période de calme est écoulée."""
+        with self._condition:
+            while not self._stopping:
+                now = time.monotonic()
+                next_deadline = None
+                
+                for file_path, deadline in list(self._pending.items()):
+                    # Un fichier en cours d'analyse attend la fin de l'analyse précédente
+                    if file_path in self._running:
+                        continue
+                    if deadline > now:
+                        next_deadline = deadline if next_deadline is None else min(next_deadline, deadline)
+                        continue
+                    if len(self._running) >= self.max_workers:
+                        next_deadline = None
+                        break
+                    
+                    del self._pending[file_path]
+                    self._running.add(file_path)
+                    self.executor.submit(self._run_analysis, file_path)
+                
+                # Attendre la prochaine échéance, un nouvel événement ou la fin d'une analyse
+                self._next_wakeup = next_deadline
+                timeout = None if next_deadline is None else max(0.0, next_deadline - time.monotonic())
+                self._condition.wait(timeout)
+    
+    def _run_analysis(self, file_path: str):
         """
-        Attend que toutes les analyses en cours soient terminées.
+        Analyse un fichier dans un worker du pool.
         
         Args:
-            timeout (float): Temps maximum d'attente en secondes
+            file_path (str): Chemin du fichier
+        """
+        try:
+            self._handle_file_event(file_path)
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement de {file_path} : {e}")
+        finally:
+            with self._condition:
+                self._running.discard(file_path)
+                self._condition.notify_all()
+    
+    def wait_for_analysis(self, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Attend que toutes les analyses en attente et en cours soient terminées.
+        
+        Args:
+            timeout (float): Temps maximum d'attente en secondes (None: sans limite)
             
         Returns:
             bool: True si toutes les analyses sont terminées, False si timeout
         """
-        try:
-            self.analysis_queue.join(timeout=timeout)
-            return True
-        except TimeoutError:
-            logger.warning("Timeout en attendant la fin des analyses")
-            return False
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning("Timeout en attendant la fin des analyses")
+                    return False
+                self._condition.wait(remaining)
+        return True
     
     def _handle_file_event(self, file_path: str):
         """
         Traite un événement de fichier.
         
+        Le fichier n'est relu et haché que si sa taille ou sa date de modification
+        a changé depuis la dernière analyse, et réanalysé que si son contenu a changé.
+        
         Args:
             file_path (str): Chemin du fichier
         """
-        if not self._should_analyze(file_path):
+        # Vérifier l'extension
+        ext = os.path.splitext(file_path)[1].lower()
+        read_func = self.supported_extensions.get(ext)
+        if not read_func:
+            return
+        
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # Fichier supprimé ou renommé entre-temps
+            return
+        
+        # Chemin rapide: taille et date inchangées
+        if self.cache.stat_matches(file_path, stat.st_size, stat.st_mtime_ns):
+            logger.debug(f"Fichier {file_path} inchangé, analyse ignorée")
+            return
+        
+        file_hash = self._get_file_hash(file_path)
+        if not file_hash:
+            return
+        
+        if self.cache.get_hash(file_path) == file_hash:
+            # Contenu identique (fichier simplement touché): mémoriser la nouvelle date
+            logger.debug(f"Contenu de {file_path} inchangé, analyse ignorée")
+            self.cache.touch(file_path, stat.st_size, stat.st_mtime_ns)
             return
         
         try:
             logger.info(f"Analyse du fichier : {file_path}")
             
-            # Lire le contenu du fichier selon son type
-            ext = os.path.splitext(file_path)[1].lower()
-            read_func = self.supported_extensions.get(ext)
-            if not read_func:
-                logger.warning(f"Format de fichier non supporté : {ext}")
-                return
-            
             contenu = read_func(file_path)
             
             # Analyser le document
             rapport = self.analyzer.analyser_document(contenu)
             
-            # Mettre à jour le cache
-            with self.lock:
-                self.cache[file_path] = {
-                    'hash': self._get_file_hash(file_path),
-                    'last_analysis': datetime.now().isoformat(),
-                    'rapport': rapport
-                }
-                self._save_cache()
+            # Mettre à jour le cache (seule l'entrée de ce fichier est écrite)
+            self.cache.put(file_path, file_hash, stat.st_size, stat.st_mtime_ns, rapport)
             
             # Générer une notification si nécessaire
             self._generate_notification(file_path, rapport)
@@ -334,8 +394,15 @@ class DocumentWatcher(FileSystemEventHandler):
         if hasattr(self, 'observer'):
             self.observer.stop()
             self.observer.join()
-        if hasattr(self, 'analysis_thread'):
-            self.analysis_queue.join()  # Attendre que toutes les analyses soient terminées
+        if hasattr(self, 'scheduler_thread'):
+            self.wait_for_analysis(timeout=None)  # Attendre que toutes les analyses soient terminées
+            with self._condition:
+                self._stopping = True
+                self._condition.notify_all()
+            self.scheduler_thread.join()
+            self.executor.shutdown(wait=True)
+        if hasattr(self, 'cache'):
+            self.cache.close()
         if hasattr(self, 'notification_manager'):
             self.notification_manager.stop()
         logger.info("DocumentWatcher arrêté")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Service NLP partagé pour Vynal Docs Automator
+Le modèle spaCy est chargé une seule fois par processus, au premier usage, avec
+les composants inutiles désactivés (seules les entités nommées sont exploitées).
+Les extracteurs utilisent l'objet `nlp` de ce module comme un modèle spaCy;
+les traitements par lot passent par `pipe_texts` (nlp.pipe).
+"""
+
+import logging
+import threading
+from typing import Iterable, Iterator, List, Optional
+
+from ..config import NLP_CONFIG
+
+logger = logging.getLogger("VynalDocsAutomator.Utils.NLPService")
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+except ImportError:
+    SPACY_AVAILABLE = False
+    logger.warning("spacy non disponible, fonctionnalités NER limitées")
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def _load_model():
+    """Charge le modèle configuré (téléchargement, puis modèle vide en dernier recours)"""
+    model_name = NLP_CONFIG["model"]
+    try:
+        model = spacy.load(model_name)
+    except OSError:
+        logger.warning(f"Modèle {model_name} non trouvé. Tentative de téléchargement...")
+        try:
+            from spacy.cli import download
+            download(model_name)
+            model = spacy.load(model_name)
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement du modèle spaCy: {e}")
+            # Fallback sur un modèle vide si nécessaire
+            return spacy.blank("fr")
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement du modèle spaCy: {e}")
+        return spacy.blank("fr")
+
+    disabled = [name for name in NLP_CONFIG["disable"] if name in model.pipe_names]
+    if disabled:
+        model.select_pipes(disable=disabled)
+    logger.info(f"Modèle spaCy {model_name} chargé (composants actifs: {', '.join(model.pipe_names)})")
+    return model
+
+
+def get_nlp():
+    """
+    Retourne le modèle spaCy du processus, chargé au premier appel
+
+    Returns:
+        Modèle spaCy, ou None si spaCy n'est pas installé
+    """
+    global _model
+    if not SPACY_AVAILABLE:
+        return None
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _load_model()
+    return _model
+
+
+def pipe_texts(texts: Iterable[str], batch_size: Optional[int] = None,
+               n_process: Optional[int] = None) -> Iterator:
+    """
+    Analyse une série de textes par lots avec nlp.pipe
+
+    Args:
+        texts: Textes à analyser
+        batch_size: Nombre de textes par lot (NLP_CONFIG par défaut)
+        n_process: Nombre de processus (NLP_CONFIG par défaut)
+
+    Yields:
+        Documents spaCy, dans l'ordre des textes
+    """
+    model = get_nlp()
+    if model is None:
+        raise RuntimeError("spaCy n'est pas installé")
+    yield from model.pipe(
+        texts,
+        batch_size=batch_size or NLP_CONFIG["batch_size"],
+        n_process=n_process or NLP_CONFIG["n_process"]
+    )
+
+
+class SharedNLP:
+    """
+    Accès au modèle partagé avec l'interface d'un modèle spaCy (nlp(text), nlp.pipe...),
+    sans le charger à l'import des modules qui l'utilisent
+    """
+
+    def __call__(self, text: str):
+        model = get_nlp()
+        if model is None:
+            raise RuntimeError("spaCy n'est pas installé")
+        return model(text)
+
+    def pipe(self, texts: Iterable[str], batch_size: Optional[int] = None,
+             n_process: Optional[int] = None) -> Iterator:
+        return pipe_texts(texts, batch_size, n_process)
+
+    def __getattr__(self, name: str):
+        return getattr(get_nlp(), name)
+
+    def __bool__(self) -> bool:
+        return SPACY_AVAILABLE
+
+
+nlp = SharedNLP()
+
+
+def entities(doc) -> List[dict]:
+    """
+    Liste les entités nommées d'un document spaCy
+
+    Args:
+        doc: Document spaCy
+
+    Returns:
+        List[dict]: Entités (texte, étiquette, positions)
+    """
+    return [
+        {"text": ent.text, "label": ent.label_, "start": ent.start_char, "end": ent.end_char}
+        for ent in doc.ents
+    ]
@@ -15,8 +15,12 @@ from typing import Dict, List, Optional, Tuple, Union, Any
 import tempfile
 import json
 import re
+import concurrent.futures
+from collections import deque
 from pathlib import Path
 
+from .result_cache import hash_file, get_result_cache
+
 # Configuration du logger
 logger = logging.getLogger("VynalDocsAutomator.Utils.OCR")
 
@@ -45,7 +49,7 @@ except ImportError:
     logger.warning("PyTesseract n'est pas disponible. Les fonctionnalités OCR seront désactivées.")
 
 try:
-    from pdf2image import convert_from_path, convert_from_bytes
+    from pdf2image import convert_from_path, convert_from_bytes, pdfinfo_from_path
     PDF2IMAGE_AVAILABLE = True
 except ImportError:
     PDF2IMAGE_AVAILABLE = False
@@ -54,6 +58,8 @@ except ImportError:
 # Variables globales pour la configuration OCR
 DEFAULT_LANGUAGE = "fra"  # Langue par défaut: français
 AVAILABLE_LANGUAGES = ["fra", "eng", "ara", "deu", "spa", "ita", "por", "nld"]  # Langues supportées par défaut
+PDF_OCR_DPI = 300  # Résolution suffisante pour l'OCR
+DEFAULT_PDF_OCR_WORKERS = min(4, os.cpu_count() or 1)  # Pages traitées en parallèle
 
 # Configuration des chemins Tesseract (à ajuster selon l'environnement)
 if sys.platform.startswith('win'):
@@ -116,12 +122,44 @@ def enhance_image(image_path: str, output_path: Optional[str] = None,
         output_path = temp_file.name
         temp_file.close()
     
+    enhanced_image = enhance_image_array(img, enhancement_level)
+    
+    # Enregistrer l'image améliorée
+    try:
+        cv2.imwrite(output_path, enhanced_image)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement de l'image améliorée: {e}")
+        raise
+    
+    return output_path
+
+
+def enhance_image_array(img: "np.ndarray", enhancement_level: str = "medium") -> "np.ndarray":
+    """
+    Améliore une image déjà chargée en mémoire pour optimiser l'OCR.
+    
+    Args:
+        img (np.ndarray): Image BGR (ou niveaux de gris) à améliorer
+        enhancement_level (str): Niveau d'amélioration (low, medium, high, extreme)
+    
+    Returns:
+        np.ndarray: Image améliorée
+    
+    Raises:
+        ValueError: Si OpenCV n'est pas disponible
+    """
+    if not CV2_AVAILABLE:
+        raise ValueError("OpenCV (cv2) est nécessaire pour l'amélioration d'image")
+    
     # Sélectionner les techniques de prétraitement selon le niveau d'amélioration
     enhanced_image = img.copy()
     
     if enhancement_level in ["low", "medium", "high", "extreme"]:
         # Convertir en niveaux de gris
-        gray = cv2.cvtColor(enhanced_image, cv2.COLOR_BGR2GRAY)
+        if enhanced_image.ndim == 2:
+            gray = enhanced_image
+        else:
+            gray = cv2.cvtColor(enhanced_image, cv2.COLOR_BGR2GRAY)
         
         # Débruitage (pour tous les niveaux)
         if enhancement_level in ["medium", "high", "extreme"]:
@@ -150,18 +188,108 @@ def enhance_image(image_path: str, output_path: Optional[str] = None,
         
         enhanced_image = gray
     
-    # Enregistrer l'image améliorée
-    try:
-        cv2.imwrite(output_path, enhanced_image)
-    except Exception as e:
-        logger.error(f"Erreur lors de l'enregistrement de l'image améliorée: {e}")
-        raise
+    return enhanced_image
+
+
+def _select_preprocessing_level(img: "np.ndarray") -> str:
+    """
+    Choisit le niveau de prétraitement en fonction de la qualité de l'image.
     
-    return output_path
+    Args:
+        img (np.ndarray): Image BGR (ou niveaux de gris)
+    
+    Returns:
+        str: Niveau de prétraitement (low, medium, high)
+    """
+    # Calculer la netteté de l'image
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+    
+    # Calculer le contraste
+    min_val, max_val, _, _ = cv2.minMaxLoc(gray)
+    contrast = (max_val - min_val) / (max_val + min_val + 1e-10)
+    
+    # Calculer la luminosité moyenne
+    brightness = np.mean(gray)
+    
+    # Déterminer le niveau de prétraitement en fonction des mesures
+    if laplacian_var > 500 and contrast > 0.5:
+        # Image déjà nette avec bon contraste
+        return "low"
+    elif laplacian_var > 100 or (contrast > 0.3 and brightness > 100):
+        # Image de qualité moyenne
+        return "medium"
+    # Image de faible qualité
+    return "high"
+
+
+def _build_tesseract_config(language: str, config: str = "") -> str:
+    """
+    Construit la configuration Tesseract (options et langues validées).
+    
+    Args:
+        language (str): Code de langue pour l'OCR (ex: 'fra+eng')
+        config (str): Configuration supplémentaire pour Tesseract
+    
+    Returns:
+        str: Configuration à transmettre à pytesseract
+    """
+    # Configuration par défaut: OEM 3 (default), PSM 3 (auto)
+    custom_config = config or r'--oem 3 --psm 3'
+    
+    # Ajouter la spécification de langue
+    if language:
+        # Validation des langues
+        valid_langs = []
+        
+        for lang in language.split('+'):
+            if lang in AVAILABLE_LANGUAGES:
+                valid_langs.append(lang)
+            else:
+                logger.warning(f"Langue '{lang}' non reconnue, ignorée")
+        
+        if not valid_langs:
+            valid_langs.append(DEFAULT_LANGUAGE)
+        
+        custom_config += f" -l {'+'.join(valid_langs)}"
+    
+    return custom_config
+
+
+def extract_text_from_array(image: "np.ndarray", language: str = DEFAULT_LANGUAGE,
+                            preprocessing: str = "auto", config: str = "") -> str:
+    """
+    Extrait le texte d'une image déjà chargée en mémoire, sans fichier temporaire.
+    
+    Args:
+        image (np.ndarray): Image BGR (ou niveaux de gris)
+        language (str): Code de langue pour l'OCR
+        preprocessing (str): Méthode de prétraitement (none, auto, low, medium, high, extreme)
+        config (str): Configuration supplémentaire pour Tesseract
+    
+    Returns:
+        str: Texte extrait de l'image
+    
+    Raises:
+        ValueError: Si Tesseract n'est pas disponible
+    """
+    if not TESSERACT_AVAILABLE:
+        raise ValueError("PyTesseract est nécessaire pour l'extraction de texte")
+    
+    if preprocessing != "none" and CV2_AVAILABLE:
+        if preprocessing == "auto":
+            preprocessing = _select_preprocessing_level(image)
+        image = enhance_image_array(image, preprocessing)
+    
+    if image.ndim == 3:
+        # pytesseract attend une image RGB
+        image = image[:, :, ::-1]
+    
+    return pytesseract.image_to_string(image, config=_build_tesseract_config(language, config))
 
 
 def extract_text_from_image(image_path: str, language: str = DEFAULT_LANGUAGE, 
-                           preprocessing: str = "auto", config: str = "") -> str:
+                           preprocessing: str = "auto", config: str = "", cache=None) -> str:
     """
     Extrait le texte d'une image en utilisant OCR.
     
@@ -170,6 +298,7 @@ def extract_text_from_image(image_path: str, language: str = DEFAULT_LANGUAGE,
         language (str): Code de langue pour l'OCR (fra, eng, ara, etc. ou combinaisons comme 'fra+eng')
         preprocessing (str): Méthode de prétraitement (none, auto, low, medium, high, extreme)
         config (str): Configuration supplémentaire pour Tesseract
+        cache (ResultCache, optional): Cache du texte OCR
     
     Returns:
         str: Texte extrait de l'image
@@ -183,89 +312,32 @@ def extract_text_from_image(image_path: str, language: str = DEFAULT_LANGUAGE,
     if not os.path.exists(image_path):
         raise ValueError(f"Le fichier image n'existe pas: {image_path}")
     
-    # Prétraitement de l'image
-    processed_image_path = image_path
-    temp_file = None
+    settings = {"language": language, "preprocessing": preprocessing, "config": config}
+    file_hash = None
+    if cache is not None:
+        file_hash = hash_file(image_path)
+        cached = cache.get_ocr_page(file_hash, 1, settings)
+        if cached is not None:
+            return cached
     
     try:
         if preprocessing != "none" and CV2_AVAILABLE:
-            # Détection automatique du niveau de prétraitement
-            if preprocessing == "auto":
-                # Lire l'image et évaluer sa qualité
-                img = cv2.imread(image_path)
-                if img is None:
-                    raise ValueError(f"Impossible de charger l'image: {image_path}")
-                
-                # Calculer la netteté de l'image
-                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-                
-                # Calculer le contraste
-                min_val, max_val, _, _ = cv2.minMaxLoc(gray)
-                contrast = (max_val - min_val) / (max_val + min_val + 1e-10)
-                
-                # Calculer la luminosité moyenne
-                brightness = np.mean(gray)
-                
-                # Déterminer le niveau de prétraitement en fonction des mesures
-                if laplacian_var > 500 and contrast > 0.5:
-                    # Image déjà nette avec bon contraste
-                    preprocessing = "low"
-                elif laplacian_var > 100 or (contrast > 0.3 and brightness > 100):
-                    # Image de qualité moyenne
-                    preprocessing = "medium"
-                else:
-                    # Image de faible qualité
-                    preprocessing = "high"
-            
-            # Appliquer le prétraitement
-            if preprocessing != "none":
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-                temp_file.close()
-                processed_image_path = enhance_image(image_path, temp_file.name, preprocessing)
-        
-        # Configurer les options OCR
-        custom_config = ""
-        
-        # Configuration par défaut: OEM 3 (default), PSM 3 (auto)
-        if not config:
-            custom_config = r'--oem 3 --psm 3'
+            # Charger l'image une seule fois et la traiter en mémoire
+            img = cv2.imread(image_path)
+            if img is None:
+                raise ValueError(f"Impossible de charger l'image: {image_path}")
+            text = extract_text_from_array(img, language, preprocessing, config)
         else:
-            custom_config = config
-        
-        # Ajouter la spécification de langue
-        if language:
-            # Validation des langues
-            langs = language.split('+')
-            valid_langs = []
-            
-            for lang in langs:
-                if lang in AVAILABLE_LANGUAGES:
-                    valid_langs.append(lang)
-                else:
-                    logger.warning(f"Langue '{lang}' non reconnue, ignorée")
-            
-            if not valid_langs:
-                valid_langs.append(DEFAULT_LANGUAGE)
-            
-            custom_config += f" -l {'+'.join(valid_langs)}"
+            # Exécuter l'OCR directement sur le fichier
+            text = pytesseract.image_to_string(image_path, config=_build_tesseract_config(language, config))
         
-        # Exécuter l'OCR
-        extracted_text = pytesseract.image_to_string(processed_image_path, config=custom_config)
-        
-        return extracted_text
+        if cache is not None:
+            cache.put_ocr_page(file_hash, 1, settings, text)
+        return text
     
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction de texte: {e}")
         raise
-    
-    finally:
-        # Supprimer le fichier temporaire si créé
-        if temp_file and os.path.exists(temp_file.name):
-            try:
-                os.unlink(temp_file.name)
-            except Exception as e:
-                logger.warning(f"Impossible de supprimer le fichier temporaire: {e}")
 
 
 def extract_text_with_layout(image_path: str, language: str = DEFAULT_LANGUAGE, 
@@ -456,19 +528,76 @@ def extract_text_with_layout(image_path: str, language: str = DEFAULT_LANGUAGE,
                 logger.warning(f"Impossible de supprimer le fichier temporaire: {e}")
 
 
-def pdf_to_text(pdf_path: str, language: str = DEFAULT_LANGUAGE, 
-               preprocessing: str = "auto", page_range: Optional[Tuple[int, int]] = None) -> str:
+def get_pdf_page_count(pdf_path: str) -> int:
     """
-    Convertit un document PDF en texte en utilisant OCR.
+    Retourne le nombre de pages d'un PDF sans le rendre.
+    
+    Args:
+        pdf_path (str): Chemin vers le document PDF
+    
+    Returns:
+        int: Nombre de pages
+    """
+    return int(pdfinfo_from_path(pdf_path)["Pages"])
+
+
+def render_pdf_page(pdf_path: str, page_number: int, dpi: int = PDF_OCR_DPI) -> "np.ndarray":
+    """
+    Rend une seule page d'un PDF en image BGR en mémoire.
+    
+    Args:
+        pdf_path (str): Chemin vers le document PDF
+        page_number (int): Numéro de la page (à partir de 1)
+        dpi (int): Résolution du rendu
+    
+    Returns:
+        np.ndarray: Image de la page
+    """
+    pages = convert_from_path(pdf_path, first_page=page_number, last_page=page_number, dpi=dpi)
+    if not pages:
+        raise ValueError(f"Page {page_number} introuvable dans {pdf_path}")
+    
+    page = np.array(pages[0].convert("RGB"))
+    return cv2.cvtColor(page, cv2.COLOR_RGB2BGR) if CV2_AVAILABLE else page[:, :, ::-1]
+
+
+def _ocr_pdf_page(pdf_path: str, page_number: int, language: str,
+                  preprocessing: str, dpi: int, cache=None, file_hash: Optional[str] = None) -> str:
+    """Rend puis reconnaît une page de PDF; l'image ne quitte jamais la mémoire"""
+    settings = {"language": language, "preprocessing": preprocessing, "dpi": dpi}
+    if cache is not None:
+        cached = cache.get_ocr_page(file_hash, page_number, settings)
+        if cached is not None:
+            return cached
+    
+    text = extract_text_from_array(render_pdf_page(pdf_path, page_number, dpi), language, preprocessing)
+    
+    if cache is not None:
+        cache.put_ocr_page(file_hash, page_number, settings, text)
+    return text
+
+
+def iter_pdf_text(pdf_path: str, language: str = DEFAULT_LANGUAGE,
+                  preprocessing: str = "auto", page_range: Optional[Tuple[int, int]] = None,
+                  max_workers: Optional[int] = None, dpi: int = PDF_OCR_DPI, cache=None):
+    """
+    Extrait le texte d'un PDF page par page, sous forme de générateur.
+    
+    Chaque page est rendue individuellement et traitée en mémoire par un pool de
+    workers borné: au plus deux pages par worker sont en cours à un instant donné,
+    quelle que soit la taille du document. Les pages sont produites dans l'ordre.
     
     Args:
         pdf_path (str): Chemin vers le document PDF
         language (str): Code de langue pour l'OCR
         preprocessing (str): Méthode de prétraitement
         page_range (tuple, optional): Plage de pages à traiter (début, fin)
+        max_workers (int, optional): Nombre de pages traitées en parallèle
+        dpi (int): Résolution du rendu des pages
+        cache (ResultCache, optional): Cache du texte OCR par page
     
-    Returns:
-        str: Texte extrait du PDF
+    Yields:
+        str: Texte de chaque page
     
     Raises:
         ValueError: Si pdf2image n'est pas disponible ou si le fichier PDF est invalide
@@ -479,53 +608,66 @@ def pdf_to_text(pdf_path: str, language: str = DEFAULT_LANGUAGE,
     if not os.path.exists(pdf_path):
         raise ValueError(f"Le fichier PDF n'existe pas: {pdf_path}")
     
+    # Définir la plage de pages
+    page_count = get_pdf_page_count(pdf_path)
+    first_page, last_page = page_range if page_range else (1, None)
+    first_page = max(first_page or 1, 1)
+    last_page = min(last_page or page_count, page_count)
+    
+    max_workers = max(max_workers or DEFAULT_PDF_OCR_WORKERS, 1)
+    pages = iter(range(first_page, last_page + 1))
+    file_hash = hash_file(pdf_path) if cache is not None else None
+    pending = deque()
+    
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
     try:
-        # Définir la plage de pages
-        if page_range:
-            first_page, last_page = page_range
-        else:
-            # Toutes les pages
-            first_page = 1
-            last_page = None
-        
-        # Convertir les pages PDF en images
-        images = convert_from_path(
-            pdf_path,
-            first_page=first_page,
-            last_page=last_page,
-            dpi=300,  # Résolution suffisante pour l'OCR
-            fmt='png'
-        )
-        
-        # Extraire le texte de chaque page
-        all_text = []
-        
-        for i, image in enumerate(images):
-            # Créer un fichier temporaire pour l'image
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-                temp_path = temp_file.name
-            
-            # Enregistrer l'image
-            image.save(temp_path, 'PNG')
+        while True:
+            # Garder la fenêtre de pages en cours remplie
+            while len(pending) < max_workers * 2:
+                page_number = next(pages, None)
+                if page_number is None:
+                    break
+                pending.append(executor.submit(
+                    _ocr_pdf_page, pdf_path, page_number, language, preprocessing, dpi,
+                    cache, file_hash
+                ))
             
-            # Extraire le texte
-            page_text = extract_text_from_image(temp_path, language, preprocessing)
-            all_text.append(page_text)
+            if not pending:
+                break
             
-            # Supprimer le fichier temporaire
-            try:
-                os.unlink(temp_path)
-            except Exception as e:
-                logger.warning(f"Impossible de supprimer le fichier temporaire: {e}")
-        
-        # Joindre le texte de toutes les pages
-        full_text = "\n\n".join(all_text)
-        
-        return full_text
-    
+            yield pending.popleft().result()
     except Exception as e:
         logger.error(f"Erreur lors de la conversion du PDF en texte: {e}")
         raise
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def pdf_to_text(pdf_path: str, language: str = DEFAULT_LANGUAGE, 
+               preprocessing: str = "auto", page_range: Optional[Tuple[int, int]] = None,
+               max_workers: Optional[int] = None, cache=None) -> str:
+    """
+    Convertit un document PDF en texte en utilisant OCR.
+    
+    Args:
+        pdf_path (str): Chemin vers le document PDF
+        language (str): Code de langue pour l'OCR
+        preprocessing (str): Méthode de prétraitement
+        page_range (tuple, optional): Plage de pages à traiter (début, fin)
+        max_workers (int, optional): Nombre de pages traitées en parallèle
+        cache (ResultCache, optional): Cache du texte OCR par page
+    
+    Returns:
+        str: Texte extrait du PDF
+    
+    Raises:
+        ValueError: Si pdf2image n'est pas disponible ou si le fichier PDF est invalide
+    """
+    # Joindre le texte de toutes les pages
+    return "\n\n".join(iter_pdf_text(pdf_path, language, preprocessing, page_range, max_workers,
+                                     cache=cache))
 
 
 def optimize_image_for_ocr(image_path: str, output_path: Optional[str] = None) -> str:
@@ -1043,7 +1185,8 @@ def install_language(language_code: str) -> bool:
 
 # Fonction principale pour extraire du texte à partir d'un fichier
 def extract_text(file_path: str, language: str = DEFAULT_LANGUAGE, 
-                preprocessing: str = "auto", page_range: Optional[Tuple[int, int]] = None) -> str:
+                preprocessing: str = "auto", page_range: Optional[Tuple[int, int]] = None,
+                cache=None) -> str:
     """
     Extrait le texte d'un fichier image ou PDF.
     
@@ -1052,6 +1195,7 @@ def extract_text(file_path: str, language: str = DEFAULT_LANGUAGE,
         language (str): Code de langue pour l'OCR
         preprocessing (str): Méthode de prétraitement
         page_range (tuple, optional): Plage de pages à traiter pour les PDF
+        cache (ResultCache, optional): Cache du texte OCR par page
     
     Returns:
         str: Texte extrait du fichier
@@ -1071,14 +1215,14 @@ def extract_text(file_path: str, language: str = DEFAULT_LANGUAGE,
         if not PDF2IMAGE_AVAILABLE:
             raise ValueError("pdf2image est nécessaire pour la conversion de PDF en texte")
         
-        return pdf_to_text(file_path, language, preprocessing, page_range)
+        return pdf_to_text(file_path, language, preprocessing, page_range, cache=cache)
     
     elif file_extension in ['.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff']:
         # Vérifier que l'OCR est disponible
         if not TESSERACT_AVAILABLE:
             raise ValueError("PyTesseract est nécessaire pour l'extraction de texte")
         
-        return extract_text_from_image(file_path, language, preprocessing)
+        return extract_text_from_image(file_path, language, preprocessing, cache=cache)
     
     else:
         raise ValueError(f"Format de fichier non supporté: {file_extension}")
@@ -1099,6 +1243,7 @@ class OCRProcessor:
             language: Code de langue par défaut pour l'OCR
         """
         self.language = language
+        self.cache = get_result_cache()
         
         if tesseract_path:
             set_tesseract_path(tesseract_path)
@@ -1120,7 +1265,38 @@ class OCRProcessor:
         Returns:
             str: Texte extrait
         """
-        return extract_text(file_path, self.language, preprocessing, page_range)
+        return extract_text(file_path, self.language, preprocessing, page_range, cache=self.cache)
+    
+    def iter_pdf_text(self, pdf_path: str, preprocessing: str = "auto",
+                      page_range: Optional[Tuple[int, int]] = None,
+                      max_workers: Optional[int] = None):
+        """
+        Extrait le texte d'un PDF page par page
+        
+        Args:
+            pdf_path: Chemin vers le PDF
+            preprocessing: Niveau de prétraitement
+            page_range: Plage de pages
+            max_workers: Nombre de pages traitées en parallèle
+            
+        Returns:
+            generator: Texte de chaque page, dans l'ordre
+        """
+        return iter_pdf_text(pdf_path, self.language, preprocessing, page_range, max_workers,
+                             cache=self.cache)
+    
+    def extract_text_from_array(self, image, preprocessing: str = "auto") -> str:
+        """
+        Extrait le texte d'une image déjà chargée en mémoire
+        
+        Args:
+            image: Image BGR (numpy)
+            preprocessing: Niveau de prétraitement
+            
+        Returns:
+            str: Texte extrait
+        """
+        return extract_text_from_array(image, self.language, preprocessing)
     
     def extract_text_with_layout(self, image_path: str, preprocessing: str = "auto") -> Dict[str, Any]:
         """
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache persistant adressé par contenu pour Vynal Docs Automator
+Conserve le texte OCR de chaque page et les résultats d'analyse, indexés par
+l'empreinte SHA-256 du fichier, les paramètres de traitement et la version de
+l'analyseur. La taille du cache est bornée avec une éviction LRU.
+
+Utilisation en ligne de commande:
+    python -m doc_analyzer.utils.result_cache stats
+    python -m doc_analyzer.utils.result_cache list --kind ocr_page
+    python -m doc_analyzer.utils.result_cache purge --older-than 30
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+from ..config import RESULT_CACHE_CONFIG
+
+logger = logging.getLogger("VynalDocsAutomator.Utils.ResultCache")
+
+# Types d'entrées stockées
+KIND_OCR_PAGE = "ocr_page"
+KIND_ANALYSIS = "analysis"
+
+# Taille des blocs lus pour le calcul de l'empreinte
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: str, length: Optional[int] = None, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Calcule l'empreinte SHA-256 d'un fichier par blocs.
+
+    Args:
+        file_path (str): Chemin du fichier
+        length (int, optional): Nombre d'octets pris en compte depuis le début (tout le fichier si None)
+        chunk_size (int): Taille des blocs lus
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    digest = hashlib.sha256()
+    remaining = length
+    with open(file_path, "rb") as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Cache adressé par contenu stocké dans une base SQLite.
+    Sûr entre threads (verrou) et entre processus (verrouillage SQLite).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[float] = None,
+                 analyzer_version: Optional[str] = None):
+        """
+        Initialise le cache
+
+        Args:
+            cache_dir: Répertoire du cache (RESULT_CACHE_CONFIG par défaut)
+            max_size_mb: Taille maximale du cache en Mo
+            analyzer_version: Version de l'analyseur incluse dans les clés
+        """
+        self.cache_dir = cache_dir or RESULT_CACHE_CONFIG["cache_dir"]
+        self.max_size_bytes = int((max_size_mb or RESULT_CACHE_CONFIG["max_size_mb"]) * 1024 * 1024)
+        self.analyzer_version = analyzer_version or RESULT_CACHE_CONFIG["analyzer_version"]
+        self.db_path = os.path.join(self.cache_dir, "results.db")
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+
+        logger.info(f"Cache de résultats initialisé: {self.db_path}")
+
+    def _init_schema(self):
+        """Crée la table et les index du cache"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    page INTEGER,
+                    settings TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_file_hash ON entries(file_hash)")
+
+    def make_key(self, kind: str, file_hash: str, settings: Optional[Dict[str, Any]] = None,
+                 page: Optional[int] = None) -> str:
+        """
+        Construit la clé d'une entrée
+
+        Args:
+            kind: Type d'entrée (ocr_page, analysis)
+            file_hash: Empreinte du fichier
+            settings: Paramètres de traitement (langue, prétraitement, ...)
+            page: Numéro de page pour le texte OCR
+
+        Returns:
+            str: Clé de l'entrée
+        """
+        material = json.dumps({
+            "kind": kind,
+            "file_hash": file_hash,
+            "page": page,
+            "settings": settings or {},
+            "version": self.analyzer_version
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, kind: str, file_hash: str, settings: Optional[Dict[str, Any]] = None,
+            page: Optional[int] = None) -> Optional[Any]:
+        """
+        Récupère une entrée du cache
+
+        Returns:
+            Optional[Any]: Valeur en cache ou None
+        """
+        key = self.make_key(kind, file_hash, settings, page)
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            return json.loads(row[0])
+        except Exception as e:
+            logger.warning(f"Lecture du cache impossible: {e}")
+            return None
+
+    def put(self, kind: str, file_hash: str, value: Any, settings: Optional[Dict[str, Any]] = None,
+            page: Optional[int] = None):
+        """
+        Stocke une entrée dans le cache puis applique l'éviction LRU si nécessaire
+
+        Args:
+            kind: Type d'entrée
+            file_hash: Empreinte du fichier
+            value: Valeur sérialisable en JSON
+            settings: Paramètres de traitement
+            page: Numéro de page pour le texte OCR
+        """
+        key = self.make_key(kind, file_hash, settings, page)
+        try:
+            payload = json.dumps(value, ensure_ascii=False, default=str)
+            now = time.time()
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(key, kind, file_hash, page, settings, value, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, kind, file_hash, page, json.dumps(settings or {}, sort_keys=True),
+                     payload, len(payload.encode("utf-8")), now, now)
+                )
+                self._evict_locked()
+        except Exception as e:
+            logger.warning(f"Écriture dans le cache impossible: {e}")
+
+    def _evict_locked(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        # Descendre sous 90% de la limite pour éviter d'évincer à chaque écriture
+        target = int(self.max_size_bytes * 0.9)
+        evicted = 0
+        cursor = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC")
+        keys = []
+        for key, size in cursor:
+            if total <= target:
+                break
+            keys.append((key,))
+            total -= size
+            evicted += 1
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", keys)
+        logger.info(f"Cache: {evicted} entrée(s) évincée(s)")
+
+    # Raccourcis pour les deux types d'entrées
+
+    def get_ocr_page(self, file_hash: str, page: int, settings: Dict[str, Any]) -> Optional[str]:
+        """Texte OCR d'une page en cache"""
+        return self.get(KIND_OCR_PAGE, file_hash, settings, page)
+
+    def put_ocr_page(self, file_hash: str, page: int, settings: Dict[str, Any], text: str):
+        """Met en cache le texte OCR d'une page"""
+        self.put(KIND_OCR_PAGE, file_hash, text, settings, page)
+
+    def get_analysis(self, file_hash: str, settings: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Résultat d'analyse en cache"""
+        return self.get(KIND_ANALYSIS, file_hash, settings)
+
+    def put_analysis(self, file_hash: str, result: Dict[str, Any], settings: Optional[Dict[str, Any]] = None):
+        """Met en cache un résultat d'analyse"""
+        self.put(KIND_ANALYSIS, file_hash, result, settings)
+
+    # Inspection et purge
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Statistiques du cache
+
+        Returns:
+            dict: Nombre d'entrées et taille par type
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY kind"
+            ).fetchall()
+        by_kind = {kind: {"entries": count, "size": size} for kind, count, size in rows}
+        return {
+            "path": self.db_path,
+            "entries": sum(k["entries"] for k in by_kind.values()),
+            "size": sum(k["size"] for k in by_kind.values()),
+            "max_size": self.max_size_bytes,
+            "by_kind": by_kind
+        }
+
+    def list_entries(self, kind: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Liste les entrées les plus récemment utilisées
+
+        Args:
+            kind: Filtrer par type d'entrée
+            limit: Nombre maximum d'entrées
+
+        Returns:
+            list: Métadonnées des entrées (sans les valeurs)
+        """
+        query = "SELECT kind, file_hash, page, settings, size, created_at, last_access FROM entries"
+        params: List[Any] = []
+        if kind:
+            query += " WHERE kind = ?"
+            params.append(kind)
+        query += " ORDER BY last_access DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        columns = ("kind", "file_hash", "page", "settings", "size", "created_at", "last_access")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def purge(self, kind: Optional[str] = None, file_hash: Optional[str] = None,
+              older_than_days: Optional[float] = None) -> int:
+        """
+        Supprime des entrées du cache (toutes par défaut)
+
+        Args:
+            kind: Ne supprimer que ce type d'entrée
+            file_hash: Ne supprimer que les entrées de ce fichier
+            older_than_days: Ne supprimer que les entrées non utilisées depuis ce nombre de jours
+
+        Returns:
+            int: Nombre d'entrées supprimées
+        """
+        conditions, params = [], []
+        if kind:
+            conditions.append("kind = ?")
+            params.append(kind)
+        if file_hash:
+            conditions.append("file_hash = ?")
+            params.append(file_hash)
+        if older_than_days is not None:
+            conditions.append("last_access < ?")
+            params.append(time.time() - older_than_days * 86400)
+
+        query = "DELETE FROM entries"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._lock, self._conn:
+            deleted = self._conn.execute(query, params).rowcount
+        with self._lock:
+            self._conn.execute("VACUUM")
+        logger.info(f"Cache: {deleted} entrée(s) purgée(s)")
+        return deleted
+
+    def close(self):
+        """Ferme la connexion à la base du cache"""
+        with self._lock:
+            self._conn.close()
+
+
+# Instance partagée par le processus
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Retourne le cache de résultats partagé, ou None s'il est désactivé
+
+    Returns:
+        Optional[ResultCache]: Instance partagée
+    """
+    global _result_cache
+    if not RESULT_CACHE_CONFIG.get("enabled", True):
+        return None
+    with _result_cache_lock:
+        if _result_cache is None:
+            try:
+                _result_cache = ResultCache()
+            except Exception as e:
+                logger.warning(f"Cache de résultats indisponible: {e}")
+                return None
+        return _result_cache
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspection et purge du cache OCR/analyse")
+    parser.add_argument("--cache-dir", help="Répertoire du cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Afficher les statistiques du cache")
+
+    list_parser = subparsers.add_parser("list", help="Lister les entrées récentes")
+    list_parser.add_argument("--kind", choices=[KIND_OCR_PAGE, KIND_ANALYSIS], help="Type d'entrée")
+    list_parser.add_argument("--limit", type=int, default=50, help="Nombre maximum d'entrées")
+
+    purge_parser = subparsers.add_parser("purge", help="Supprimer des entrées")
+    purge_parser.add_argument("--kind", choices=[KIND_OCR_PAGE, KIND_ANALYSIS], help="Type d'entrée")
+    purge_parser.add_argument("--file", help="Ne purger que les entrées de ce fichier")
+    purge_parser.add_argument("--older-than", type=float, help="Entrées inutilisées depuis N jours")
+
+    args = parser.parse_args()
+    cache = ResultCache(cache_dir=args.cache_dir)
+
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"Cache: {stats['path']}")
+        print(f"Entrées: {stats['entries']} - {stats['size'] / 1024 / 1024:.1f} Mo "
+              f"/ {stats['max_size'] / 1024 / 1024:.0f} Mo")
+        for kind, values in stats["by_kind"].items():
+            print(f"  {kind}: {values['entries']} entrée(s), {values['size'] / 1024:.1f} Ko")
+    elif args.command == "list":
+        for entry in cache.list_entries(args.kind, args.limit):
+            page = f" p.{entry['page']}" if entry["page"] is not None else ""
+            accessed = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_access"]))
+            print(f"{entry['kind']:<9} {entry['file_hash'][:16]}{page:<6} "
+                  f"{entry['size']:>9} o  {accessed}  {entry['settings']}")
+    elif args.command == "purge":
+        file_hash = hash_file(args.file) if args.file else None
+        deleted = cache.purge(args.kind, file_hash, args.older_than)
+        print(f"{deleted} entrée(s) supprimée(s)")
+
+    cache.close()
+    sys.exit(0)
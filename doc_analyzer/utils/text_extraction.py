@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Service d'extraction de texte partagé pour Vynal Docs Automator
+Les PDF sont lus page par page, à la demande: la couche texte d'une page née
+numérique est utilisée telle quelle, une page numérisée (couche texte absente ou
+illisible) passe par l'OCR. Le texte de chaque document est mémorisé par empreinte
+SHA-256: un même fichier n'est analysé qu'une fois par processus, quel que soit
+le composant qui le demande.
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .result_cache import hash_file, get_result_cache
+from ..config import TEXT_EXTRACTION_CONFIG
+
+logger = logging.getLogger("VynalDocsAutomator.Utils.TextExtraction")
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+    logger.warning("PyPDF2 n'est pas installé. L'extraction de texte des PDF ne sera pas possible.")
+
+try:
+    from docx import Document
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+
+try:
+    from . import ocr
+    OCR_AVAILABLE = ocr.is_ocr_available() and ocr.PDF2IMAGE_AVAILABLE
+except ImportError:
+    OCR_AVAILABLE = False
+
+# Origine du texte d'une page
+SOURCE_TEXT = "text"
+SOURCE_OCR = "ocr"
+SOURCE_EMPTY = "empty"
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+
+@dataclass(frozen=True)
+class PageText:
+    """Texte d'une page (numérotée à partir de 1) et son origine"""
+    number: int
+    text: str
+    source: str
+
+
+def text_layer_usable(text: Optional[str], min_chars: Optional[int] = None,
+                      min_readable_ratio: Optional[float] = None) -> bool:
+    """
+    Indique si la couche texte d'une page peut être utilisée sans OCR
+
+    Une page numérisée n'a pas de couche texte, ou seulement quelques caractères;
+    une police mal encodée produit des caractères de contrôle, privés ou de
+    remplacement.
+
+    Args:
+        text: Texte extrait de la couche texte
+        min_chars: Nombre minimal de caractères hors espaces
+        min_readable_ratio: Part minimale de caractères lisibles
+
+    Returns:
+        bool: True si la page est née numérique et lisible
+    """
+    min_chars = TEXT_EXTRACTION_CONFIG["min_page_chars"] if min_chars is None else min_chars
+    if min_readable_ratio is None:
+        min_readable_ratio = TEXT_EXTRACTION_CONFIG["min_readable_ratio"]
+
+    characters = "".join(text.split()) if text else ""
+    if not characters or len(characters) < min_chars:
+        return False
+    readable = sum(1 for ch in characters if ch.isprintable() and ch != "\ufffd")
+    return readable / len(characters) >= min_readable_ratio
+
+
+def read_docx_text(file_path: str, separator: str = "\n") -> str:
+    """
+    Texte d'un document Word: paragraphes non vides puis lignes des tableaux
+    (cellules séparées par des tabulations)
+
+    Args:
+        file_path: Chemin du fichier DOCX
+        separator: Séparateur entre les paragraphes et les lignes ("\n\n" pour
+                   le format historique de TextProcessor)
+
+    Returns:
+        str: Texte du document
+
+    Raises:
+        ImportError: Si python-docx n'est pas installé
+    """
+    if not DOCX_AVAILABLE:
+        raise ImportError("python-docx n'est pas installé")
+
+    doc = Document(file_path)
+    lines = [paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()]
+    for table in doc.tables:
+        for row in table.rows:
+            cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+            if cells:
+                lines.append("\t".join(cells))
+    return separator.join(lines)
+
+
+class TextExtractionService:
+    """
+    Extraction du texte des documents PDF et DOCX, page par page, avec
+    mémorisation par empreinte du fichier. Sûr entre threads.
+    """
+
+    def __init__(self, ocr_page: Optional[Callable[[str, int, str], str]] = None,
+                 memo_size: Optional[int] = None, language: Optional[str] = None, cache=None):
+        """
+        Initialise le service
+
+        Args:
+            ocr_page: Fonction ocr_page(chemin, numéro de page, empreinte) reconnaissant
+                      une page de PDF (Tesseract si disponible, sinon pas d'OCR)
+            memo_size: Nombre de documents gardés en mémoire (TEXT_EXTRACTION_CONFIG par défaut)
+            language: Langue de l'OCR
+            cache: Cache persistant du texte OCR par page (cache de résultats partagé par défaut)
+        """
+        self.memo_size = memo_size or TEXT_EXTRACTION_CONFIG["memo_size"]
+        self.language = language or TEXT_EXTRACTION_CONFIG["ocr_language"]
+        self.cache = cache
+        if ocr_page is None and OCR_AVAILABLE:
+            ocr_page = self._ocr_pdf_page
+        self.ocr_page = ocr_page
+
+        self._memo: "OrderedDict[Tuple[str, bool], Tuple[PageText, ...]]" = OrderedDict()
+        self._hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._pending: Dict[Tuple[str, bool], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.stats = {"parsed": 0, "memo_hits": 0, "text_pages": 0, "ocr_pages": 0}
+
+    def _ocr_pdf_page(self, file_path: str, page_number: int, file_hash: str) -> str:
+        """Reconnaît une page avec Tesseract (texte mis en cache par page)"""
+        cache = self.cache if self.cache is not None else get_result_cache()
+        return ocr._ocr_pdf_page(file_path, page_number, self.language, "auto", ocr.PDF_OCR_DPI,
+                                 cache, file_hash)
+
+    def ocr_settings(self) -> Dict[str, object]:
+        """
+        Paramètres qui déterminent le texte produit pour un PDF (pages reconnues
+        par OCR et configuration de l'OCR), à inclure dans les clés de cache
+
+        Returns:
+            dict: Paramètres effectifs
+        """
+        settings = {
+            "ocr": self.ocr_page is not None,
+            "language": self.language,
+            "min_page_chars": TEXT_EXTRACTION_CONFIG["min_page_chars"],
+            "min_readable_ratio": TEXT_EXTRACTION_CONFIG["min_readable_ratio"]
+        }
+        if self.ocr_page == self._ocr_pdf_page:
+            settings.update(preprocessing="auto", dpi=ocr.PDF_OCR_DPI)
+        return settings
+
+    def file_hash(self, file_path: str) -> str:
+        """
+        Empreinte SHA-256 d'un fichier, recalculée seulement s'il a changé
+
+        Args:
+            file_path: Chemin du fichier
+
+        Returns:
+            str: Empreinte hexadécimale
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            known = self._hashes.get(path)
+        if known and known[0] == signature:
+            return known[1]
+        digest = hash_file(path)
+        with self._lock:
+            self._hashes[path] = (signature, digest)
+        return digest
+
+    def _memo_key(self, file_hash: str, ocr: bool) -> Tuple[str, bool]:
+        return file_hash, bool(ocr and self.ocr_page)
+
+    def _memo_get(self, key) -> Optional[Tuple[PageText, ...]]:
+        with self._lock:
+            pages = self._memo.get(key)
+            if pages is not None:
+                self._memo.move_to_end(key)
+                self.stats["memo_hits"] += 1
+            return pages
+
+    def _memo_put(self, key, pages: Iterable[PageText]):
+        with self._lock:
+            self._memo[key] = tuple(pages)
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def iter_pages(self, file_path: str, pages: Optional[Iterable[int]] = None,
+                   ocr: bool = True) -> Iterator[PageText]:
+        """
+        Produit le texte d'un document page par page
+
+        Seules les pages consommées sont analysées (et reconnues par OCR si
+        nécessaire). Un document lu en entier est mémorisé.
+
+        Args:
+            file_path: Chemin du document (PDF ou DOCX)
+            pages: Numéros des pages à produire, à partir de 1 (toutes par défaut)
+            ocr: Reconnaître les pages dont la couche texte est inutilisable
+
+        Yields:
+            PageText: Texte de chaque page, dans l'ordre demandé
+
+        Raises:
+            ValueError: Si le format n'est pas pris en charge
+            ImportError: Si la bibliothèque de lecture du format n'est pas installée
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Format de fichier non pris en charge: {extension}")
+
+        pages = None if pages is None else list(pages)
+        file_hash = self.file_hash(file_path)
+        key = self._memo_key(file_hash, ocr)
+        memo = self._memo_get(key)
+        if memo is None and extension == '.docx':
+            # Un document Word n'a pas de pages: il est lu en une fois
+            memo = (PageText(1, read_docx_text(file_path), SOURCE_TEXT),)
+            self._count(memo)
+            self._memo_put(key, memo)
+        if memo is not None:
+            if pages is None:
+                yield from memo
+            else:
+                # Même ordre (doublons compris) qu'une lecture du fichier
+                by_number = {page.number: page for page in memo}
+                for number in pages:
+                    if number in by_number:
+                        yield by_number[number]
+            return
+
+        produced = []
+        for page in self._iter_pdf_pages(file_path, file_hash, pages, ocr):
+            produced.append(page)
+            yield page
+        if pages is None:
+            self._memo_put(key, produced)
+
+    def _iter_pdf_pages(self, file_path: str, file_hash: str, pages: Optional[Iterable[int]],
+                        ocr: bool) -> Iterator[PageText]:
+        """Analyse les pages demandées d'un PDF, une à une"""
+        if not PYPDF2_AVAILABLE:
+            raise ImportError("PyPDF2 n'est pas installé")
+
+        reader = PyPDF2.PdfReader(file_path)
+        if reader.is_encrypted:
+            reader.decrypt("")
+        total = len(reader.pages)
+        numbers = range(1, total + 1) if pages is None else [n for n in pages if 1 <= n <= total]
+        with self._lock:
+            self.stats["parsed"] += 1
+
+        for number in numbers:
+            try:
+                text = reader.pages[number - 1].extract_text() or ""
+            except Exception as e:
+                logger.warning(f"Couche texte illisible page {number} de {file_path}: {e}")
+                text = ""
+
+            page = None
+            if text_layer_usable(text):
+                page = PageText(number, text, SOURCE_TEXT)
+            elif ocr and self.ocr_page is not None:
+                try:
+                    recognized = self.ocr_page(file_path, number, file_hash)
+                    if recognized and recognized.strip():
+                        page = PageText(number, recognized, SOURCE_OCR)
+                except Exception as e:
+                    logger.warning(f"Échec de l'OCR page {number} de {file_path}: {e}")
+            if page is None:
+                # Sans OCR, la couche texte (même courte) reste la meilleure source
+                page = PageText(number, text, SOURCE_TEXT if text.strip() else SOURCE_EMPTY)
+            self._count((page,))
+            yield page
+
+    def _count(self, pages: Iterable[PageText]):
+        with self._lock:
+            for page in pages:
+                if page.source == SOURCE_OCR:
+                    self.stats["ocr_pages"] += 1
+                elif page.source == SOURCE_TEXT:
+                    self.stats["text_pages"] += 1
+
+    def pages(self, file_path: str, ocr: bool = True) -> List[PageText]:
+        """
+        Texte de toutes les pages d'un document (analysé au plus une fois)
+
+        Args:
+            file_path: Chemin du document (PDF ou DOCX)
+            ocr: Reconnaître les pages dont la couche texte est inutilisable
+
+        Returns:
+            List[PageText]: Texte de chaque page
+        """
+        key = self._memo_key(self.file_hash(file_path), ocr)
+        memo = self._memo_get(key)
+        if memo is not None:
+            return list(memo)
+
+        # Les demandes simultanées d'un même document attendent la première analyse
+        with self._lock:
+            pending = self._pending.setdefault(key, threading.Lock())
+        with pending:
+            try:
+                return list(self.iter_pages(file_path, ocr=ocr))
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+
+    def extract_text(self, file_path: str, pages: Optional[Iterable[int]] = None,
+                     ocr: bool = True, separator: str = "\n\n") -> str:
+        """
+        Texte d'un document, pages jointes par separator
+
+        Args:
+            file_path: Chemin du document (PDF ou DOCX)
+            pages: Numéros des pages à extraire, à partir de 1 (toutes par défaut)
+            ocr: Reconnaître les pages dont la couche texte est inutilisable
+            separator: Séparateur entre les pages
+
+        Returns:
+            str: Texte extrait (vide si aucune page n'a de texte)
+        """
+        if pages is None:
+            document = self.pages(file_path, ocr=ocr)
+        else:
+            document = self.iter_pages(file_path, pages=pages, ocr=ocr)
+        return separator.join(page.text for page in document if page.text)
+
+    def forget(self, file_path: Optional[str] = None):
+        """
+        Oublie le texte mémorisé d'un fichier, ou de tous les fichiers
+
+        Args:
+            file_path: Chemin du fichier (None pour tout oublier)
+        """
+        with self._lock:
+            if file_path is None:
+                self._memo.clear()
+                self._hashes.clear()
+                return
+            known = self._hashes.pop(os.path.abspath(file_path), None)
+            if known:
+                for key in [k for k in self._memo if k[0] == known[1]]:
+                    del self._memo[key]
+
+
+# Instance partagée par le processus
+_text_extractor = None
+_text_extractor_lock = threading.Lock()
+
+
+def get_text_extractor() -> TextExtractionService:
+    """
+    Retourne le service d'extraction partagé par le processus
+
+    Returns:
+        TextExtractionService: Instance partagée
+    """
+    global _text_extractor
+    if _text_extractor is None:
+        with _text_extractor_lock:
+            if _text_extractor is None:
+                _text_extractor = TextExtractionService()
+    return _text_extractor
+
+
+def extract_text(file_path: str, **options) -> str:
+    """Texte d'un document via le service partagé (voir TextExtractionService.extract_text)"""
+    return get_text_extractor().extract_text(file_path, **options)
@@ -10,6 +10,7 @@ des documents avant extraction des données.
 import re
 import unicodedata
 import logging
+import threading
 from typing import List, Dict, Any, Tuple, Optional, Union
 import os
 
@@ -32,14 +33,27 @@ except ImportError:
     DOCX_AVAILABLE = False
     logging.warning("python-docx n'est pas installé. L'extraction de texte des DOCX ne sera pas possible.")
 
+from .text_extraction import get_text_extractor, read_docx_text
+
 # Importer les modules OCR si disponibles
 try:
-    from .ocr import extract_text_from_image
+    from .ocr import extract_text_from_image, DEFAULT_LANGUAGE as OCR_LANGUAGE
+    from .result_cache import get_result_cache
     OCR_AVAILABLE = True
 except ImportError:
+    OCR_LANGUAGE = None
     OCR_AVAILABLE = False
     logging.warning("Module OCR non disponible. L'extraction de texte des images ne sera pas possible.")
 
+from .client_index import ClientMentionIndex
+
+# Images traitées par OCR dans process_document
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.tiff', '.tif', '.bmp')
+
+# Index des mentions de clients partagé, synchronisé avant chaque recherche
+_client_mention_index = ClientMentionIndex()
+_client_mention_lock = threading.Lock()
+
 def clean_text(text: str) -> str:
     """
     Nettoie le texte brut en supprimant les caractères non imprimables,
@@ -286,6 +300,41 @@ class TextProcessor:
         
         return text
 
+    @staticmethod
+    def sanitize_text(text: str) -> str:
+        """
+        Normalise le texte pour l'extraction des données personnelles:
+        suppression des caractères spéciaux problématiques, normalisation
+        des espaces et décomposition des ligatures.
+        
+        Args:
+            text: Texte à normaliser
+            
+        Returns:
+            str: Texte normalisé
+        """
+        if not text:
+            return ""
+        
+        # Suppression des caractères spéciaux problématiques
+        text = re.sub(r'[^\w\s\.,;:\'\"!?@#&\(\)\[\]\{\}\-/\\<>%€$£¥+\*=|°²³_]', ' ', text)
+        
+        # Normalisation des espaces
+        text = re.sub(r'\s+', ' ', text)
+        
+        # Conversion de certains caractères spéciaux
+        replacements = {
+            'œ': 'oe',
+            'Œ': 'OE',
+            'æ': 'ae',
+            'Æ': 'AE'
+        }
+        
+        for char, replacement in replacements.items():
+            text = text.replace(char, replacement)
+        
+        return text
+
     @staticmethod
     def segment_document(text: str) -> Dict[str, str]:
         """
@@ -982,70 +1031,30 @@ class TextProcessor:
         return doc_type
 
     @staticmethod
-    def find_client_matches(text: str, clients_db: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], float]]:
+    def find_client_matches(text: str, clients_db: List[Dict[str, Any]],
+                            clients_version: Any = None) -> List[Tuple[Dict[str, Any], float]]:
         """
-        Recherche des correspondances potentielles avec des clients existants
+        Recherche des correspondances potentielles avec des clients existants.
+        Les noms et entreprises sont recherchés en un seul parcours du texte par un
+        automate d'Aho-Corasick; l'index n'est mis à jour que pour les clients
+        ajoutés, retirés ou modifiés depuis l'appel précédent.
         
         Args:
             text (str): Texte du document
             clients_db (list): Liste des clients existants
+            clients_version: Version de la liste, changée à chaque modification
+                             des clients (évite de recomparer tous les clients
+                             à chaque appel, voir ClientMentionIndex.sync)
             
         Returns:
             list: Liste de tuples (client, score de correspondance)
         """
-        matches = []
-        
-        # Recherche de noms, d'emails et de numéros de téléphone dans le texte
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
+        if not text or not clients_db:
+            return []
         
-        phone_pattern = r'(?:\+33|0)\s*[1-9](?:[\s.-]?\d{2}){4}'
-        phones = re.findall(phone_pattern, text)
-        
-        # Normaliser les numéros de téléphone trouvés
-        normalized_phones = []
-        for phone in phones:
-            clean = re.sub(r'[\s.-]', '', phone)
-            if clean.startswith('0'):
-                clean = '+33' + clean[1:]
-            normalized_phones.append(clean)
-        
-        # Rechercher des correspondances pour chaque client
-        for client in clients_db:
-            score = 0
-            
-            # Correspondance par email
-            client_email = client.get('email', '').lower()
-            if client_email and any(email.lower() == client_email for email in emails):
-                score += 5  # Score élevé pour une correspondance d'email
-            
-            # Correspondance par téléphone
-            client_phone = client.get('phone', '')
-            normalized_client_phone = re.sub(r'[\s.-]', '', client_phone)
-            if normalized_client_phone.startswith('0'):
-                normalized_client_phone = '+33' + normalized_client_phone[1:]
-            
-            if normalized_client_phone and normalized_client_phone in normalized_phones:
-                score += 4  # Score élevé pour une correspondance de téléphone
-            
-            # Correspondance par nom
-            client_name = client.get('name', '').lower()
-            if client_name and client_name in text.lower():
-                score += 3  # Score modéré pour une correspondance de nom
-            
-            # Correspondance par entreprise
-            client_company = client.get('company', '').lower()
-            if client_company and len(client_company) > 2 and client_company in text.lower():
-                score += 2  # Score pour une correspondance d'entreprise
-            
-            # Si le score est suffisant, ajouter à la liste des correspondances
-            if score > 0:
-                matches.append((client, score))
-        
-        # Trier par score décroissant
-        matches.sort(key=lambda x: x[1], reverse=True)
-        
-        return matches
+        with _client_mention_lock:
+            _client_mention_index.sync(clients_db, clients_version)
+            return _client_mention_index.find_matches(text)
 
     @staticmethod
     def extract_document_signatures(text: str) -> List[Dict[str, Any]]:
@@ -1230,16 +1239,7 @@ class TextProcessor:
             return "PyPDF2 n'est pas installé. Impossible d'extraire le texte du PDF."
         
         try:
-            text = ""
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                num_pages = len(reader.pages)
-                
-                for page_num in range(num_pages):
-                    page = reader.pages[page_num]
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n\n"
+            text = get_text_extractor().extract_text(file_path, ocr=False)
             
             if not text.strip():
                 logger.warning(f"Aucun texte extrait du PDF {file_path} avec PyPDF2")
@@ -1266,24 +1266,8 @@ class TextProcessor:
             return "python-docx n'est pas installé. Impossible d'extraire le texte du DOCX."
         
         try:
-            text = []
-            doc = Document(file_path)
-            
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text.append(paragraph.text)
-            
-            # Extraire aussi le texte des tableaux
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_text.append(cell.text.strip())
-                    if row_text:
-                        text.append("\t".join(row_text))
-            
-            result = "\n\n".join(text)
+            # Paragraphes séparés par une ligne vide, comme les versions précédentes
+            result = read_docx_text(file_path, separator="\n\n")
             
             if not result.strip():
                 logger.warning(f"Aucun texte extrait du DOCX {file_path}")
@@ -1296,6 +1280,24 @@ class TextProcessor:
             logger.error(f"Erreur lors de l'extraction du texte du DOCX {file_path}: {e}")
             return f"Erreur lors de l'extraction du texte: {str(e)}"
 
+    @staticmethod
+    def ocr_settings(file_path: str) -> Dict[str, Any]:
+        """
+        Paramètres OCR effectivement appliqués par process_document à un fichier
+        
+        Args:
+            file_path: Chemin du document
+            
+        Returns:
+            Dict[str, Any]: Paramètres OCR (vide si le format ne passe pas par l'OCR)
+        """
+        file_extension = os.path.splitext(file_path)[1].lower()
+        if file_extension == '.pdf':
+            return get_text_extractor().ocr_settings()
+        if file_extension in IMAGE_EXTENSIONS:
+            return {"language": OCR_LANGUAGE, "preprocessing": "auto"}
+        return {}
+
     def process_document(self, file_path: str) -> Union[str, Dict[str, Any]]:
         """
         Prétraite un document pour en extraire le texte
@@ -1345,36 +1347,31 @@ class TextProcessor:
         
         # Traitement des fichiers PDF
         elif file_extension == '.pdf':
-            # Essayer d'extraire le texte directement du PDF d'abord
-            text = self.extract_text_from_pdf(file_path)
-            
-            # Si le texte est vide ou contient un message d'erreur et que l'OCR est disponible, essayer l'OCR
-            if (not text or text.startswith("Erreur") or text.startswith("Aucun texte")) and OCR_AVAILABLE:
-                logger.info(f"Tentative d'extraction de texte avec OCR pour {file_path}")
-                try:
-                    text = extract_text_from_image(file_path)
-                    if text:
-                        return text
-                    else:
-                        error_msg = "Échec de l'extraction de texte avec OCR"
-                        logger.error(error_msg)
-                        return {"error": error_msg, "text": "Aucun texte n'a pu être extrait de ce document."}
-                except Exception as e:
-                    error_msg = f"Erreur lors de l'extraction OCR: {str(e)}"
-                    logger.error(error_msg)
-                    return {"error": error_msg, "text": text}
+            # Couche texte des pages nées numériques, OCR page par page pour les autres
+            try:
+                text = get_text_extractor().extract_text(file_path)
+            except Exception as e:
+                error_msg = f"Erreur lors de l'extraction du texte du PDF: {str(e)}"
+                logger.error(error_msg)
+                return {"error": error_msg}
+            
+            if not text.strip():
+                error_msg = "Échec de l'extraction de texte (couche texte et OCR)"
+                logger.error(error_msg)
+                return {"error": error_msg, "text": "Aucun texte n'a pu être extrait de ce document."}
             
             return text
         
         # Traitement des images
-        elif file_extension in ['.jpg', '.jpeg', '.png', '.tiff', '.tif', '.bmp']:
+        elif file_extension in IMAGE_EXTENSIONS:
             if not OCR_AVAILABLE:
                 error_msg = "Module OCR non disponible. Impossible d'extraire le texte des images."
                 logger.error(error_msg)
                 return {"error": error_msg}
             
             try:
-                text = extract_text_from_image(file_path)
+                text = extract_text_from_image(file_path, cache=get_result_cache(),
+                                               **TextProcessor.ocr_settings(file_path))
                 if text:
                     return text
                 else:
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache des analyses du surveillant de documents pour Vynal Docs Automator
+Chaque fichier surveillé occupe une ligne d'une base SQLite (taille, date de
+modification, empreinte et rapport d'analyse): une analyse n'écrit que la
+ligne du fichier concerné. Les métadonnées sont gardées en mémoire pour
+décider sans accès disque si un fichier a changé; les rapports sont lus à
+la demande.
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+logger = logging.getLogger("VynalDocsAutomator.Utils.WatchCache")
+
+
+class WatchCache:
+    """
+    Cache persistant des analyses, indexé par chemin de fichier.
+    S'utilise comme un dictionnaire en lecture (cache[chemin]["rapport"]).
+    """
+
+    def __init__(self, db_path: str, legacy_json: Optional[str] = None):
+        """
+        Initialise le cache
+
+        Args:
+            db_path: Chemin de la base SQLite
+            legacy_json: Ancien cache JSON à importer lors de la première ouverture
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # chemin -> (taille, date de modification en ns, empreinte)
+        self._meta: Dict[str, Tuple[Optional[int], Optional[int], str]] = {}
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+
+        if legacy_json and os.path.exists(legacy_json):
+            self._migrate_json(legacy_json)
+
+        for path, size, mtime_ns, file_hash in self._conn.execute(
+                "SELECT path, size, mtime_ns, hash FROM analyses"):
+            self._meta[path] = (size, mtime_ns, file_hash)
+
+        logger.info(f"Cache d'analyses chargé: {len(self._meta)} fichier(s)")
+
+    def _init_schema(self):
+        """Crée la table du cache"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    hash TEXT NOT NULL,
+                    last_analysis TEXT NOT NULL,
+                    rapport TEXT NOT NULL
+                )
+            """)
+
+    def _migrate_json(self, json_path: str):
+        """
+        Importe l'ancien cache JSON puis le renomme pour ne pas le réimporter
+
+        Args:
+            json_path: Chemin de l'ancien fichier analysis_cache.json
+        """
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+
+            rows = [
+                (path, entry.get('hash', ''), entry.get('last_analysis', ''),
+                 json.dumps(entry.get('rapport', {}), ensure_ascii=False))
+                for path, entry in legacy.items() if isinstance(entry, dict)
+            ]
+            with self._lock, self._conn:
+                # Sans taille ni date, ces fichiers seront revérifiés par empreinte
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO analyses (path, hash, last_analysis, rapport) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+            os.replace(json_path, json_path + ".migrated")
+            logger.info(f"{len(rows)} analyse(s) importée(s) depuis {json_path}")
+        except Exception as e:
+            logger.error(f"Erreur lors de l'import de l'ancien cache {json_path}: {e}")
+
+    def stat_matches(self, path: str, size: int, mtime_ns: int) -> bool:
+        """
+        Indique si la taille et la date de modification sont celles de la dernière analyse
+
+        Args:
+            path: Chemin du fichier
+            size: Taille actuelle
+            mtime_ns: Date de modification actuelle (ns)
+
+        Returns:
+            bool: True si le fichier n'a pas changé depuis la dernière analyse
+        """
+        meta = self._meta.get(path)
+        return meta is not None and meta[0] == size and meta[1] == mtime_ns
+
+    def get_hash(self, path: str) -> Optional[str]:
+        """Retourne l'empreinte enregistrée pour un fichier"""
+        meta = self._meta.get(path)
+        return meta[2] if meta else None
+
+    def touch(self, path: str, size: int, mtime_ns: int):
+        """
+        Met à jour la taille et la date d'un fichier dont le contenu n'a pas changé
+
+        Args:
+            path: Chemin du fichier
+            size: Taille actuelle
+            mtime_ns: Date de modification actuelle (ns)
+        """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE analyses SET size = ?, mtime_ns = ? WHERE path = ?",
+                               (size, mtime_ns, path))
+            meta = self._meta.get(path)
+            if meta:
+                self._meta[path] = (size, mtime_ns, meta[2])
+
+    def put(self, path: str, file_hash: str, size: int, mtime_ns: int, rapport: Dict[str, Any]):
+        """
+        Enregistre l'analyse d'un fichier (une seule ligne écrite)
+
+        Args:
+            path: Chemin du fichier
+            file_hash: Empreinte du contenu analysé
+            size: Taille du fichier
+            mtime_ns: Date de modification du fichier (ns)
+            rapport: Rapport d'analyse
+        """
+        data = json.dumps(rapport, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (path, size, mtime_ns, hash, last_analysis, rapport) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, file_hash, datetime.now().isoformat(), data)
+            )
+            self._meta[path] = (size, mtime_ns, file_hash)
+
+    def remove(self, path: str):
+        """Supprime l'entrée d'un fichier"""
+        with self._lock, self._conn:
+            if self._meta.pop(path, None) is not None:
+                self._conn.execute("DELETE FROM analyses WHERE path = ?", (path,))
+
+    def get(self, path: str, default: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Lit l'entrée complète d'un fichier
+
+        Args:
+            path: Chemin du fichier
+            default: Valeur retournée si le fichier n'est pas en cache
+
+        Returns:
+            Dict[str, Any]: Entrée avec les clés hash, last_analysis, rapport, size et mtime_ns
+        """
+        if path not in self._meta:
+            return default
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hash, last_analysis, rapport, size, mtime_ns FROM analyses WHERE path = ?",
+                (path,)
+            ).fetchone()
+        if row is None:
+            return default
+        return {'hash': row[0], 'last_analysis': row[1], 'rapport': json.loads(row[2]),
+                'size': row[3], 'mtime_ns': row[4]}
+
+    def __getitem__(self, path: str) -> Dict[str, Any]:
+        entry = self.get(path)
+        if entry is None:
+            raise KeyError(path)
+        return entry
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._meta
+
+    def __len__(self) -> int:
+        return len(self._meta)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._meta))
+
+    def close(self):
+        """Ferme la base"""
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception as e:
+                logger.error(f"Erreur lors de la fermeture du cache d'analyses: {e}")
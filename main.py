@@ -116,9 +116,9 @@ def setup_doc_analyzer():
             sys.path.insert(0, current_dir)
             logging.info(f"Répertoire ajouté au PYTHONPATH: {current_dir}")
         
-        # Tester l'importation du module doc_analyzer
-        from doc_analyzer.analyzer import DocumentAnalyzer
-        analyzer = DocumentAnalyzer()
+        # Construire l'analyseur partagé et ses composants
+        from doc_analyzer.analyzer_service import get_analyzer_service
+        get_analyzer_service().warm_up()
         logging.info("Module doc_analyzer initialisé avec succès")
         mark_component_initialized('doc_analyzer')
         return True
@@ -334,6 +334,12 @@ def main():
                 # Créer uniquement les répertoires critiques
                 ensure_critical_directories()
                 
+                # Préchauffer l'analyseur partagé: la première analyse ne paie pas
+                # la construction des extracteurs
+                from doc_analyzer.config import ANALYZER_SERVICE_CONFIG
+                if ANALYZER_SERVICE_CONFIG.get("warm_up_at_startup", True):
+                    setup_doc_analyzer()
+                
                 # Ne pas initialiser automatiquement ces composants au démarrage
                 # Ils seront initialisés à la demande lors de leur première utilisation
                 # initialize_ocr()
@@ -14,9 +14,11 @@ import shutil
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Union
 from utils.cache_manager import CacheManager
+from utils.app_store import AppStore, INDEXED_COLUMNS
+from utils.backup_store import BackupStore
+from utils.entitlements import get_entitlement_service
 import time
 import threading
-import glob
 from utils.free_version_manager import FreeVersionManager
 
 logger = logging.getLogger("VynalDocsAutomator.AppModel")
@@ -89,6 +91,13 @@ class AppModel:
         for path in self.paths.values():
             os.makedirs(path, exist_ok=True)
         
+        # Base SQLite des clients, modèles et documents (les fichiers JSON
+        # ne servent plus qu'à la migration, aux sauvegardes et aux lecteurs externes)
+        self.store = AppStore(os.path.join(self.data_dir, "app_data.db"))
+        
+        # Dépôt des sauvegardes dédupliquées (créé à la première sauvegarde)
+        self._backup_store = None
+        
         # Initialiser le gestionnaire de cache avec les paramètres optimisés
         self.cache_manager = CacheManager()
         
@@ -256,12 +265,32 @@ class AppModel:
             logger.warning("Vérification de licence impossible: pas d'email utilisateur")
             return False
             
+        # État de licence partagé: fichiers déchiffrés une seule fois, relus s'ils changent
+        entitlements = get_entitlement_service()
+        user_data = entitlements.current_user_data()
+        
+        # La décision est conservée jusqu'à son expiration ou à la modification d'une licence
+        return entitlements.decision(
+            ("license", email, feature),
+            lambda: self._compute_license_access(entitlements, email, user_data, feature)
+        )
+    
+    def _compute_license_access(self, entitlements, email, user_data, feature=None):
+        """
+        Calcule l'accès de l'utilisateur actuel (voir check_license)
+        
+        Args:
+            entitlements: Service de droits d'accès
+            email: Email de l'utilisateur
+            user_data: Données de l'utilisateur connecté (vide si aucun)
+            feature: Fonctionnalité spécifique à vérifier (facultatif)
+            
+        Returns:
+            bool: True si l'accès est autorisé, False sinon
+        """
         # Vérifier d'abord si l'utilisateur a une licence valide dans les données utilisateur
-        from utils.usage_tracker import UsageTracker
-        usage_tracker = UsageTracker()
-        if usage_tracker.is_user_registered():
-            user_data = usage_tracker.get_user_data()
-            if user_data and not user_data.get('license_valid', False):
+        if user_data:
+            if not user_data.get('license_valid', False):
                 logger.warning(f"Licence marquée comme invalide dans les données utilisateur pour {email}")
                 return False
             
@@ -273,17 +302,12 @@ class AppModel:
                 license_key = user_data.get('license_key')
                 if license_key:
                     is_valid, message, _ = self.license_model.check_license_is_valid(email, license_key)
+                    user_data['license_valid'] = is_valid
+                    user_data['license_verified_at'] = int(time.time())
+                    entitlements.save_user_data(user_data)
                     if not is_valid:
                         logger.warning(f"Licence invalide lors de la re-vérification: {message}")
-                        user_data['license_valid'] = False
-                        user_data['license_verified_at'] = int(time.time())
-                        usage_tracker.save_user_data(user_data)
                         return False
-                    else:
-                        # Mettre à jour le timestamp de vérification
-                        user_data['license_valid'] = True
-                        user_data['license_verified_at'] = int(time.time())
-                        usage_tracker.save_user_data(user_data)
             
         # Vérifier si une fonctionnalité spécifique est demandée
         if feature:
@@ -293,16 +317,14 @@ class AppModel:
             return has_access
         else:
             # Vérifier juste si la licence est valide
-            valid, message, _ = self.license_model.check_license_is_valid(email)
+            valid, message = self.license_model.check_license_validity(email)
             if not valid:
                 logger.warning(f"Licence invalide pour {email}: {message}")
                 # Mettre à jour les données utilisateur
-                if usage_tracker.is_user_registered():
-                    user_data = usage_tracker.get_user_data()
-                    if user_data:
-                        user_data['license_valid'] = False
-                        user_data['license_verified_at'] = int(time.time())
-                        usage_tracker.save_user_data(user_data)
+                if user_data:
+                    user_data['license_valid'] = False
+                    user_data['license_verified_at'] = int(time.time())
+                    entitlements.save_user_data(user_data)
             return valid
     
     def get_current_license(self):
@@ -350,37 +372,77 @@ class AppModel:
     
     # ---- Gestion des clients ----
     
-    def load_clients(self) -> None:
+    # ---- Stockage ----
+    
+    def _json_file(self, kind: str) -> str:
         """
-        Charge les données clients depuis le fichier
+        Retourne le chemin du fichier JSON historique d'un type de données
+        
+        Args:
+            kind: 'clients', 'templates' ou 'documents'
+        
+        Returns:
+            str: Chemin du fichier JSON
         """
-        client_file = os.path.join(self.paths['clients'], "clients.json")
+        return os.path.join(self.paths[kind], f"{kind}.json")
+    
+    def _persist(self, kind: str, records: List[Dict[str, Any]] = None,
+                 deleted_ids: List[str] = None) -> None:
+        """
+        Écrit uniquement les enregistrements ajoutés, modifiés ou supprimés
         
-        if not os.path.exists(client_file):
-            # Créer un fichier vide
-            with open(client_file, 'w', encoding='utf-8') as f:
-                json.dump([], f)
-            
-            self.clients = []
-            logger.info("Fichier clients.json créé")
-            return
+        Args:
+            kind: 'clients', 'templates' ou 'documents'
+            records: Enregistrements à insérer ou mettre à jour
+            deleted_ids: IDs des enregistrements à supprimer
+        """
+        if records:
+            self.store.upsert(kind, records)
+        if deleted_ids:
+            self.store.delete(kind, deleted_ids)
+    
+    def export_json_files(self) -> bool:
+        """
+        Exporte les clients, modèles et documents vers leurs fichiers JSON
+        (avant une sauvegarde par copie de fichiers, ou à la fermeture pour les
+        modules qui lisent encore ces fichiers): la base n'écrit plus de miroir JSON
+        à chaque modification
+        
+        Returns:
+            bool: True si tous les exports ont réussi, False sinon
+        """
+        # Enregistrer d'abord les modifications faites directement sur les listes
+        self.save_clients()
+        self.save_templates()
+        self.save_documents()
+        
+        return all([self.store.export_json(kind, self._json_file(kind))
+                    for kind in ('clients', 'templates', 'documents')])
+    
+    def import_json_files(self, force: bool = True) -> None:
+        """
+        Importe les fichiers JSON dans la base (restauration d'une sauvegarde),
+        à faire suivre d'un rechargement des données
         
+        Args:
+            force: Importer même si les fichiers n'ont pas changé depuis le dernier import
+        """
+        for kind in ('clients', 'templates', 'documents'):
+            self.store.import_json(kind, self._json_file(kind), force=force)
+    
+    def load_clients(self) -> None:
+        """
+        Charge les données clients depuis la base
+        """
         try:
-            with open(client_file, 'r', encoding='utf-8') as f:
-                self.clients = json.load(f)
+            # Migration unique du fichier JSON
+            self.store.import_json('clients', self._json_file('clients'))
+            self.clients = self.store.load('clients')
             
             # Validation des données clients
             self._validate_clients()
             
             logger.info(f"{len(self.clients)} clients chargés")
-        except json.JSONDecodeError as e:
-            logger.error(f"Erreur de format JSON lors du chargement des clients: {e}")
-            # Créer un backup du fichier corrompu
-            if os.path.exists(client_file):
-                backup_file = f"{client_file}.bak.{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                shutil.copy2(client_file, backup_file)
-                logger.info(f"Sauvegarde du fichier clients corrompu créée: {backup_file}")
-            self.clients = []
         except Exception as e:
             logger.error(f"Erreur lors du chargement des clients: {e}")
             self.clients = []
@@ -423,26 +485,26 @@ class AppModel:
             logger.info(f"Données clients corrigées: {len(self.clients)} -> {len(valid_clients)}")
             self.save_clients()
     
-    def save_clients(self) -> bool:
+    def save_clients(self, changed: List[Dict[str, Any]] = None,
+                     deleted_ids: List[str] = None) -> bool:
         """
-        Sauvegarde les données clients dans le fichier
+        Sauvegarde les données clients dans la base
+        
+        Args:
+            changed: Clients ajoutés ou modifiés dans self.clients
+            deleted_ids: IDs des clients retirés de self.clients
+        
+        Sans argument, la liste complète est comparée au dernier état écrit
+        (seuls les clients ajoutés, modifiés ou supprimés sont écrits).
         
         Returns:
             bool: True si l'opération a réussi, False sinon
         """
-        client_file = os.path.join(self.paths['clients'], "clients.json")
-        
         try:
-            # Créer un fichier temporaire d'abord
-            temp_file = f"{client_file}.tmp"
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(self.clients, f, indent=2, ensure_ascii=False)
-            
-            # Remplacer l'ancien fichier par le nouveau
-            if os.path.exists(client_file):
-                os.replace(temp_file, client_file)
+            if changed is not None or deleted_ids is not None:
+                self._persist('clients', changed, deleted_ids)
             else:
-                os.rename(temp_file, client_file)
+                self.clients = self.store.sync('clients', self.clients)
             
             logger.info(f"{len(self.clients)} clients sauvegardés")
             return True
@@ -499,12 +561,12 @@ class AppModel:
                 'updated_at': datetime.now().isoformat()
             }
             
+            # Sauvegarder
+            self._persist('clients', [clean_data])
+            
             # Ajouter à la liste
             self.clients.append(clean_data)
             
-            # Sauvegarder
-            self.save_clients()
-            
             # Ajouter l'activité
             self.add_activity('client', f"Nouveau client ajouté: {clean_data.get('name')}")
             
@@ -568,12 +630,12 @@ class AppModel:
             'updated_at': datetime.now().isoformat()
         }
         
+        # Sauvegarder
+        self._persist('clients', [updated_data])
+        
         # Remplacer le client
         self.clients[client_index] = updated_data
         
-        # Sauvegarder
-        self.save_clients()
-        
         # Ajouter l'activité
         self.add_activity('client', f"Client mis à jour: {updated_data.get('name')}")
         
@@ -608,14 +670,14 @@ class AppModel:
                     doc['updated_at'] = datetime.now().isoformat()
                 
                 # Sauvegarder les documents mis à jour
-                self.save_documents()
+                self._persist('documents', linked_docs)
+            
+            # Sauvegarder
+            self._persist('clients', deleted_ids=[client_id])
             
             # Supprimer le client
             self.clients = [c for c in self.clients if c.get('id') != client_id]
             
-            # Sauvegarder
-            self.save_clients()
-            
             # Ajouter l'activité
             self.add_activity('client', f"Client supprimé: {client.get('name')}")
             
@@ -681,7 +743,7 @@ class AppModel:
         """
         Charge les modèles de documents avec validation des données
         """
-        template_file = os.path.join(self.paths['templates'], "templates.json")
+        template_file = self._json_file('templates')
         backup_file = os.path.join(self.paths['templates'], "templates.json.bak")
         
         # Si le fichier principal n'existe pas mais que la sauvegarde existe
@@ -692,21 +754,10 @@ class AppModel:
             except Exception as e:
                 logger.error(f"Erreur lors de la restauration depuis la sauvegarde: {e}")
         
-        if not os.path.exists(template_file):
-            # Créer un fichier vide
-            self.templates = []
-            self.save_templates()
-            logger.info("Nouveau fichier templates.json créé")
-            return
-        
         try:
-            # Lire le fichier
-            with open(template_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Vérifier que c'est une liste
-            if not isinstance(data, list):
-                raise ValueError("Le fichier de modèles n'est pas au bon format (liste attendue)")
+            # Migration unique (ou réimport après restauration) du fichier JSON
+            self.store.import_json('templates', template_file)
+            data = self.store.load('templates')
             
             # Valider chaque modèle
             valid_templates = []
@@ -756,16 +807,6 @@ class AppModel:
             
             logger.info(f"{len(self.templates)} modèles chargés avec succès")
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Erreur de format JSON lors du chargement des modèles: {e}")
-            # Créer une sauvegarde du fichier corrompu
-            if os.path.exists(template_file):
-                backup_file = f"{template_file}.corrupted.{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                shutil.copy2(template_file, backup_file)
-                logger.info(f"Sauvegarde du fichier templates corrompu créée: {backup_file}")
-            self.templates = []
-            self.save_templates()
-            
         except Exception as e:
             logger.error(f"Erreur lors du chargement des modèles: {e}")
             self.templates = []
@@ -820,68 +861,32 @@ class AppModel:
             logger.info(f"Données des modèles corrigées: {len(self.templates)} -> {len(valid_templates)}")
             self.save_templates()
     
-    def save_templates(self):
+    def save_templates(self, changed: List[Dict[str, Any]] = None,
+                       deleted_ids: List[str] = None):
         """
-        Sauvegarde les modèles dans le fichier JSON de manière sécurisée
+        Sauvegarde les modèles dans la base
+        
+        Args:
+            changed: Modèles ajoutés ou modifiés dans self.templates
+            deleted_ids: IDs des modèles retirés de self.templates
+        
+        Sans argument, la liste complète est comparée au dernier état écrit
+        (seuls les modèles ajoutés, modifiés ou supprimés sont écrits).
         
         Returns:
             bool: True si la sauvegarde a réussi, False sinon
         """
         try:
-            # Créer le chemin du fichier temporaire et final
-            temp_file = os.path.join(self.paths['templates'], f'templates_temp_{uuid.uuid4()}.json')
-            backup_file = os.path.join(self.paths['templates'], 'templates.json.bak')
-            final_file = os.path.join(self.paths['templates'], 'templates.json')
-            
-            # S'assurer que le dossier existe
-            os.makedirs(self.paths['templates'], exist_ok=True)
-            
-            # Créer une copie de sauvegarde si le fichier existe déjà
-            if os.path.exists(final_file):
-                shutil.copy2(final_file, backup_file)
-            
-            # Sauvegarder dans un fichier temporaire
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(self.templates, f, ensure_ascii=False, indent=4)
-            
-            # Vérifier l'intégrité du fichier temporaire
-            with open(temp_file, 'r', encoding='utf-8') as f:
-                test_load = json.load(f)
-                if not isinstance(test_load, list):
-                    raise ValueError("Format de données invalide")
-            
-            # Si le fichier final existe, le supprimer
-            if os.path.exists(final_file):
-                os.remove(final_file)
-            
-            # Renommer le fichier temporaire
-            os.rename(temp_file, final_file)
-            
-            # Supprimer la sauvegarde si tout s'est bien passé
-            if os.path.exists(backup_file):
-                os.remove(backup_file)
+            if changed is not None or deleted_ids is not None:
+                self._persist('templates', changed, deleted_ids)
+            else:
+                self.templates = self.store.sync('templates', self.templates)
             
             logger.info("Modèles sauvegardés avec succès")
             return True
             
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde des modèles: {e}")
-            # Restaurer la sauvegarde si elle existe
-            if os.path.exists(backup_file):
-                try:
-                    if os.path.exists(final_file):
-                        os.remove(final_file)
-                    shutil.copy2(backup_file, final_file)
-                    logger.info("Restauration de la sauvegarde réussie")
-                except Exception as restore_error:
-                    logger.error(f"Erreur lors de la restauration de la sauvegarde: {restore_error}")
-            
-            # Nettoyer le fichier temporaire s'il existe
-            if os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
             return False
     
     def add_template(self, template_data: Dict[str, Any]) -> Optional[str]:
@@ -931,12 +936,12 @@ class AppModel:
             if not isinstance(clean_data['variables'], list):
                 clean_data['variables'] = []
             
+            # Sauvegarder
+            self._persist('templates', [clean_data])
+            
             # Ajouter à la liste
             self.templates.append(clean_data)
             
-            # Sauvegarder
-            self.save_templates()
-            
             # Ajouter l'activité
             self.add_activity('template', f"Nouveau modèle créé: {clean_data.get('name')}")
             
@@ -1000,14 +1005,16 @@ class AppModel:
             if not isinstance(updated_data['variables'], list):
                 updated_data['variables'] = []
             
-            # Remplacer le modèle
-            self.templates[template_index] = updated_data
-            
             # Sauvegarder
-            if not self.save_templates():
-                logger.error("Échec de la sauvegarde des modèles")
+            try:
+                self._persist('templates', [updated_data])
+            except Exception as e:
+                logger.error(f"Échec de la sauvegarde des modèles: {e}")
                 return False
             
+            # Remplacer le modèle
+            self.templates[template_index] = updated_data
+            
             # Ajouter l'activité
             self.add_activity('template', f"Modèle mis à jour: {updated_data.get('name')}")
             
@@ -1048,14 +1055,14 @@ class AppModel:
                     doc['updated_at'] = datetime.now().isoformat()
                 
                 # Sauvegarder les documents mis à jour
-                self.save_documents()
+                self._persist('documents', linked_docs)
+            
+            # Sauvegarder
+            self._persist('templates', deleted_ids=[template_id])
             
             # Supprimer le modèle
             self.templates = [t for t in self.templates if t.get('id') != template_id]
             
-            # Sauvegarder
-            self.save_templates()
-            
             # Ajouter l'activité
             self.add_activity('template', f"Modèle supprimé: {template.get('name')}")
             
@@ -1161,7 +1168,7 @@ class AppModel:
         self.templates[template_index]['updated_at'] = datetime.now().isoformat()
         
         # Sauvegarder
-        self.save_templates()
+        self._persist('templates', [self.templates[template_index]])
         
         logger.info(f"Variables du modèle mises à jour: {len(variables)} variables trouvées")
         return True
@@ -1170,35 +1177,17 @@ class AppModel:
     
     def load_documents(self) -> None:
         """
-        Charge les documents générés
+        Charge les documents générés depuis la base
         """
-        document_file = os.path.join(self.paths['documents'], "documents.json")
-        
-        if not os.path.exists(document_file):
-            # Créer un fichier vide
-            with open(document_file, 'w', encoding='utf-8') as f:
-                json.dump([], f)
-            
-            self.documents = []
-            logger.info("Fichier documents.json créé")
-            return
-        
         try:
-            with open(document_file, 'r', encoding='utf-8') as f:
-                self.documents = json.load(f)
+            # Migration unique (ou réimport après restauration) du fichier JSON
+            self.store.import_json('documents', self._json_file('documents'))
+            self.documents = self.store.load('documents')
             
             # Validation des données des documents
             self._validate_documents()
             
             logger.info(f"{len(self.documents)} documents chargés")
-        except json.JSONDecodeError as e:
-            logger.error(f"Erreur de format JSON lors du chargement des documents: {e}")
-            # Créer un backup du fichier corrompu
-            if os.path.exists(document_file):
-                backup_file = f"{document_file}.bak.{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                shutil.copy2(document_file, backup_file)
-                logger.info(f"Sauvegarde du fichier documents corrompu créée: {backup_file}")
-            self.documents = []
         except Exception as e:
             logger.error(f"Erreur lors du chargement des documents: {e}")
             self.documents = []
@@ -1254,25 +1243,83 @@ class AppModel:
             logger.info(f"Données des documents corrigées: {len(self.documents)} -> {len(valid_documents)}")
             self.save_documents()
     
-    def save_documents(self):
+    def _prepare_document_for_save(self, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Nettoie et vérifie un document avant son écriture
+        
+        Args:
+            doc: Document à écrire
+        
+        Returns:
+            dict: Copie nettoyée du document ou None s'il doit être ignoré
+        """
+        if not isinstance(doc, dict):
+            logger.warning(f"Document ignoré car format invalide: {type(doc)}")
+            return None
+        
+        # Créer une copie du document pour le nettoyage
+        doc_copy = doc.copy()
+        
+        # Nettoyer les chemins NULL dans file_paths
+        if "file_paths" in doc_copy:
+            doc_copy["file_paths"] = {k: v for k, v in doc_copy["file_paths"].items() if v is not None}
+        
+        # Corriger le chemin principal s'il est NULL
+        if "file_path" in doc_copy and doc_copy["file_path"] is None:
+            if "file_paths" in doc_copy and doc_copy["file_paths"]:
+                # Utiliser le premier chemin valide comme chemin principal
+                doc_copy["file_path"] = next(iter(doc_copy["file_paths"].values()))
+            else:
+                # Si pas de chemin valide, supprimer cette clé
+                doc_copy.pop("file_path", None)
+        
+        # S'assurer que chaque document a un ID et des timestamps
+        if "id" not in doc_copy:
+            doc_copy["id"] = str(uuid.uuid4())
+        if "created_at" not in doc_copy:
+            doc_copy["created_at"] = datetime.now().isoformat()
+        if "updated_at" not in doc_copy:
+            doc_copy["updated_at"] = datetime.now().isoformat()
+        
+        # Vérifier les champs obligatoires
+        required_fields = ["title", "date", "template_id", "client_id"]
+        missing_fields = [field for field in required_fields if field not in doc_copy]
+        
+        if missing_fields:
+            logger.warning(f"Document {doc_copy.get('id')} ignoré: champs manquants {missing_fields}")
+            return None
+        
+        # Vérifier le format de la date
+        try:
+            datetime.strptime(doc_copy["date"], "%Y-%m-%d")
+        except (TypeError, ValueError):
+            logger.warning(f"Document {doc_copy.get('id')} ignoré: format de date invalide")
+            return None
+        
+        # Vérifier que le fichier existe si un chemin est spécifié
+        if "file_path" in doc_copy and not os.path.exists(doc_copy["file_path"]):
+            logger.warning(f"Document {doc_copy.get('id')}: fichier non trouvé {doc_copy['file_path']}")
+            doc_copy["file_path"] = None
+        
+        return doc_copy
+    
+    def save_documents(self, changed: List[Dict[str, Any]] = None,
+                       deleted_ids: List[str] = None):
         """
-        Sauvegarde les données des documents dans un fichier JSON avec gestion améliorée
-        des erreurs et des sauvegardes
+        Sauvegarde les documents dans la base.
+        Seuls les documents ajoutés, modifiés ou supprimés depuis la dernière écriture
+        sont vérifiés et écrits, dans une seule transaction.
+        
+        Args:
+            changed: Documents ajoutés ou modifiés dans self.documents
+            deleted_ids: IDs des documents retirés de self.documents
+        
+        Sans argument, la liste complète est comparée au dernier état écrit.
         
         Returns:
             bool: True si la sauvegarde a réussi, False sinon
         """
         try:
-            # Vérifier que le répertoire documents existe
-            documents_path = os.path.join(self.paths['documents'])
-            os.makedirs(documents_path, exist_ok=True)
-            
-            # Chemin complet du fichier de destination
-            documents_file = os.path.join(documents_path, "documents.json")
-            
-            # Créer un fichier temporaire avec un nom unique
-            temp_file = f"{documents_file}.{uuid.uuid4()}.tmp"
-            
             # Vérifier que la liste documents est bien initialisée
             if not hasattr(self, 'documents') or self.documents is None:
                 self.documents = []
@@ -1282,121 +1329,20 @@ class AppModel:
                 logger.error(f"Format de documents invalide: {type(self.documents)}, utilisation d'une liste vide")
                 self.documents = []
             
-            # Faire une copie des documents à sauvegarder pour ne pas modifier les originaux
-            documents_to_save = []
-            
-            # Vérifier et nettoyer chaque document
-            for doc in self.documents:
-                if not isinstance(doc, dict):
-                    logger.warning(f"Document ignoré car format invalide: {type(doc)}")
-                    continue
-                
-                # Créer une copie du document pour le nettoyage
-                doc_copy = doc.copy()
-                
-                # Nettoyer les chemins NULL dans file_paths
-                if "file_paths" in doc_copy:
-                    doc_copy["file_paths"] = {k: v for k, v in doc_copy["file_paths"].items() if v is not None}
-                
-                # Corriger le chemin principal s'il est NULL
-                if "file_path" in doc_copy and doc_copy["file_path"] is None:
-                    if "file_paths" in doc_copy and doc_copy["file_paths"]:
-                        # Utiliser le premier chemin valide comme chemin principal
-                        doc_copy["file_path"] = next(iter(doc_copy["file_paths"].values()))
-                    else:
-                        # Si pas de chemin valide, supprimer cette clé
-                        doc_copy.pop("file_path", None)
-                
-                # S'assurer que chaque document a un ID et des timestamps
-                if "id" not in doc_copy:
-                    doc_copy["id"] = str(uuid.uuid4())
-                if "created_at" not in doc_copy:
-                    doc_copy["created_at"] = datetime.now().isoformat()
-                if "updated_at" not in doc_copy:
-                    doc_copy["updated_at"] = datetime.now().isoformat()
-                
-                # Vérifier les champs obligatoires
-                required_fields = ["title", "date", "template_id", "client_id"]
-                missing_fields = [field for field in required_fields if field not in doc_copy]
-                
-                if missing_fields:
-                    logger.warning(f"Document {doc_copy.get('id')} ignoré: champs manquants {missing_fields}")
-                    continue
-                
-                # Vérifier le format de la date
-                try:
-                    datetime.strptime(doc_copy["date"], "%Y-%m-%d")
-                except ValueError:
-                    logger.warning(f"Document {doc_copy.get('id')} ignoré: format de date invalide")
-                    continue
-                
-                # Vérifier que le fichier existe si un chemin est spécifié
-                if "file_path" in doc_copy:
-                    if not os.path.exists(doc_copy["file_path"]):
-                        logger.warning(f"Document {doc_copy.get('id')}: fichier non trouvé {doc_copy['file_path']}")
-                        doc_copy["file_path"] = None
-                
-                documents_to_save.append(doc_copy)
-            
-            # Créer une sauvegarde du fichier actuel
-            backup_created = False
-            if os.path.exists(documents_file):
-                try:
-                    # Créer un nom unique pour la sauvegarde
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    backup_file = f"{documents_file}.{timestamp}.bak"
-                    shutil.copy2(documents_file, backup_file)
-                    backup_created = True
-                    
-                    # Garder seulement les 5 dernières sauvegardes
-                    backup_pattern = f"{documents_file}.*.bak"
-                    backup_files = sorted(glob.glob(backup_pattern), reverse=True)
-                    for old_backup in backup_files[5:]:
-                        try:
-                            os.remove(old_backup)
-                        except:
-                            pass
-                            
-                except Exception as e:
-                    logger.warning(f"Impossible de créer une sauvegarde: {e}")
-            
-            # Sauvegarder dans le fichier temporaire
-            try:
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    json.dump(documents_to_save, f, indent=2, ensure_ascii=False)
-            except Exception as e:
-                logger.error(f"Erreur lors de l'écriture du fichier temporaire: {e}")
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                return False
-            
-            # Vérifier que le fichier temporaire est un JSON valide
-            try:
-                with open(temp_file, 'r', encoding='utf-8') as f:
-                    json.load(f)
-            except Exception as e:
-                logger.error(f"Le fichier temporaire contient un JSON invalide: {e}")
-                os.remove(temp_file)
-                return False
-            
-            # Remplacer le fichier final par le temporaire
-            try:
-                os.replace(temp_file, documents_file)
-            except Exception as e:
-                # Sur certains systèmes, os.replace peut échouer
-                logger.warning(f"os.replace a échoué: {e}, tentative avec remove/rename")
-                try:
-                    if os.path.exists(documents_file):
-                        os.remove(documents_file)
-                    os.rename(temp_file, documents_file)
-                except Exception as e2:
-                    logger.error(f"Échec du remplacement du fichier: {e2}")
-                    return False
-            
-            # Mettre à jour la liste des documents
-            self.documents = documents_to_save
+            if changed is not None or deleted_ids is not None:
+                # Écrire les seuls documents indiqués, une fois vérifiés
+                prepared = [doc for doc in map(self._prepare_document_for_save, changed or [])
+                            if doc is not None]
+                self._persist('documents', prepared, deleted_ids)
+                if prepared:
+                    by_id = {str(doc['id']): doc for doc in prepared}
+                    self.documents = [by_id.get(str(doc.get('id')), doc) for doc in self.documents]
+            else:
+                # Mettre à jour la liste des documents
+                self.documents = self.store.sync('documents', self.documents,
+                                                 prepare=self._prepare_document_for_save)
             
-            logger.info(f"Documents sauvegardés avec succès dans {documents_file}")
+            logger.info(f"{len(self.documents)} documents sauvegardés")
             return True
             
         except Exception as e:
@@ -1432,24 +1378,25 @@ class AppModel:
             document_data['created_at'] = datetime.now().isoformat()
             document_data['updated_at'] = datetime.now().isoformat()
             
+            # Vérifier le document avant de l'écrire
+            document = self._prepare_document_for_save(document_data)
+            if document is None:
+                logger.error("Échec de la sauvegarde du document")
+                return None
+            
+            # Sauvegarder immédiatement
+            self._persist('documents', [document])
+            logger.info("Document sauvegardé avec succès")
+            
             # Ajouter le document à la liste
-            self.documents.append(document_data)
+            self.documents.append(document)
             logger.info(f"Document ajouté avec l'ID: {document_id}")
             
-            # Sauvegarder immédiatement
-            if self.save_documents():
-                logger.info("Document sauvegardé avec succès")
+            # Si réussi et pas de licence, incrémenter le compteur
+            if not self.check_license():
+                self.free_version_manager.increment_counter("documents")
                 
-                # Si réussi et pas de licence, incrémenter le compteur
-                if not self.check_license():
-                    self.free_version_manager.increment_counter("documents")
-                    
-                return document_id
-            else:
-                logger.error("Échec de la sauvegarde du document")
-                # Retirer le document de la liste en cas d'échec
-                self.documents.remove(document_data)
-                return None
+            return document_id
             
         except Exception as e:
             logger.error(f"Erreur lors de l'ajout du document: {e}")
@@ -1500,12 +1447,12 @@ class AppModel:
         if not isinstance(updated_data['variables'], dict):
             updated_data['variables'] = {}
         
+        # Sauvegarder
+        self._persist('documents', [updated_data])
+        
         # Remplacer le document
         self.documents[document_index] = updated_data
         
-        # Sauvegarder
-        self.save_documents()
-        
         # Ajouter l'activité
         self.add_activity('document', f"Document mis à jour: {updated_data.get('title')}")
         
@@ -1541,12 +1488,12 @@ class AppModel:
                     logger.error(f"Erreur lors de la suppression du fichier: {e}")
                     # On continue quand même avec la suppression du document
             
+            # Sauvegarder
+            self._persist('documents', deleted_ids=[document_id])
+            
             # Supprimer le document
             self.documents = [d for d in self.documents if d.get('id') != document_id]
             
-            # Sauvegarder
-            self.save_documents()
-            
             # Ajouter l'activité
             self.add_activity('document', f"Document supprimé: {document.get('title')}")
             
@@ -1597,11 +1544,16 @@ class AppModel:
         if cache_entry and time.time() - cache_entry['timestamp'] < 300:
             return cache_entry['results']
 
+        # Restreindre les candidats par une requête indexée si possible
+        documents = self.documents
+        if filters and all(key in INDEXED_COLUMNS['documents'] for key in filters):
+            documents = self.store.find('documents', **filters)
+        
         # Effectuer la recherche
         query = query.lower()
         results = []
         
-        for doc in self.documents:
+        for doc in documents:
             # Vérifier d'abord les filtres si présents
             if filters:
                 if not self._document_matches_filters(doc, filters):
@@ -1621,6 +1573,47 @@ class AppModel:
         
         return results
     
+    def get_documents_by_client(self, client_id: str) -> List[Dict[str, Any]]:
+        """
+        Récupère les documents d'un client (requête indexée)
+        
+        Args:
+            client_id: ID du client
+        
+        Returns:
+            list: Documents du client, du plus récent au plus ancien
+        """
+        return self.store.find('documents', order_by='-date', client_id=client_id)
+    
+    def get_documents_by_template(self, template_id: str) -> List[Dict[str, Any]]:
+        """
+        Récupère les documents générés à partir d'un modèle (requête indexée)
+        
+        Args:
+            template_id: ID du modèle
+        
+        Returns:
+            list: Documents du modèle, du plus récent au plus ancien
+        """
+        return self.store.find('documents', order_by='-date', template_id=template_id)
+    
+    def get_documents_by_date(self, date_from: str = None, date_to: str = None,
+                              document_type: str = None) -> List[Dict[str, Any]]:
+        """
+        Récupère les documents d'une période (requête indexée)
+        
+        Args:
+            date_from: Date minimale incluse (YYYY-MM-DD)
+            date_to: Date maximale incluse (YYYY-MM-DD)
+            document_type: Type de document (optionnel)
+        
+        Returns:
+            list: Documents de la période, par date croissante
+        """
+        criteria = {'type': document_type} if document_type else {}
+        return self.store.find('documents', order_by='date', date_from=date_from,
+                               date_to=date_to, **criteria)
+    
     def _document_matches_filters(self, document: Dict, filters: Dict) -> bool:
         """Vérifie si un document correspond aux filtres"""
         for key, value in filters.items():
@@ -1636,8 +1629,8 @@ class AppModel:
         if cache_entry and time.time() - cache_entry['timestamp'] < 3600:
             return cache_entry['types']
 
-        # Extraire les types uniques
-        types = sorted(list(set(d.get("type", "") for d in self.documents if d.get("type"))))
+        # Extraire les types uniques (index sur la colonne type)
+        types = self.store.distinct('documents', 'type')
         
         # Mettre en cache
         self._document_type_cache[cache_key] = {
@@ -1774,74 +1767,91 @@ class AppModel:
     
     # ---- Fonctions de sauvegarde et restauration ----
     
-    def create_backup(self, backup_dir: str = None) -> Optional[str]:
+    def _get_backup_store(self, backup_dir: str = None) -> BackupStore:
+        """
+        Récupère le dépôt de sauvegardes d'un dossier
+        
+        Args:
+            backup_dir: Dossier des sauvegardes (si None, utilise le dossier par défaut)
+        
+        Returns:
+            BackupStore: Dépôt dédupliqué situé dans le sous-dossier "store"
+        """
+        root = os.path.abspath(os.path.join(backup_dir or self.paths['backup'], "store"))
+        if self._backup_store is None or self._backup_store.root != root:
+            self._backup_store = BackupStore(root)
+        return self._backup_store
+    
+    def create_backup(self, backup_dir: str = None, full: bool = False) -> Optional[str]:
         """
-        Crée une sauvegarde complète des données
+        Crée une sauvegarde des données dans un dépôt dédupliqué: seuls les blocs
+        modifiés depuis la sauvegarde précédente sont écrits, mais chaque
+        sauvegarde reste restaurable seule
         
         Args:
             backup_dir: Dossier où créer la sauvegarde (si None, utilise le dossier par défaut)
+            full: Relire tous les fichiers au lieu de reprendre ceux dont la taille
+                  et la date de modification n'ont pas changé
         
         Returns:
-            str: Chemin de la sauvegarde créée ou None en cas d'erreur
+            str: Chemin du manifeste de la sauvegarde créée ou None en cas d'erreur
         """
         try:
-            # Utiliser le dossier de sauvegarde par défaut si non spécifié
-            if backup_dir is None:
-                backup_dir = self.paths['backup']
-            
-            # S'assurer que le dossier existe
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            # Nom du dossier de sauvegarde avec la date et l'heure
-            backup_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_folder = os.path.join(backup_dir, f"backup_{backup_time}")
-            os.makedirs(backup_folder, exist_ok=True)
-            
-            # Sauvegarder d'abord toutes les données
+            # Écrire les modifications en attente (écritures incrémentales)
             self.save_clients()
             self.save_templates()
             self.save_documents()
             self.save_recent_activities()
             
-            # Copier les fichiers de données
-            shutil.copy2(os.path.join(self.paths['clients'], "clients.json"), 
-                       os.path.join(backup_folder, "clients.json"))
-            
-            shutil.copy2(os.path.join(self.paths['templates'], "templates.json"), 
-                       os.path.join(backup_folder, "templates.json"))
-            
-            shutil.copy2(os.path.join(self.paths['documents'], "documents.json"), 
-                       os.path.join(backup_folder, "documents.json"))
-            
-            shutil.copy2(os.path.join(self.data_dir, "activities.json"), 
-                       os.path.join(backup_folder, "activities.json"))
-            
-            # Copier la configuration
-            config_file = os.path.join(self.data_dir, "config.json")
-            if os.path.exists(config_file):
-                shutil.copy2(config_file, os.path.join(backup_folder, "config.json"))
+            sources = {
+                'clients': self.paths['clients'],
+                'templates': self.paths['templates'],
+                'documents': self.paths['documents'],
+                'activities.json': os.path.join(self.data_dir, "activities.json"),
+                'config.json': os.path.join(self.data_dir, "config.json"),
+            }
+            # La base est copiée avec l'API de sauvegarde en ligne de SQLite
+            snapshot = self._get_backup_store(backup_dir).create_snapshot(
+                sources, {'app_data.db': self.store.db_path}, full=full
+            )
             
             # Ajouter l'activité
-            self.add_activity('system', f"Sauvegarde créée: backup_{backup_time}")
+            self.add_activity('system', f"Sauvegarde créée: backup_{snapshot['id']}")
             
-            logger.info(f"Sauvegarde complète créée dans {backup_folder}")
-            return backup_folder
+            logger.info(f"Sauvegarde créée: {snapshot['path']}")
+            return snapshot["path"]
             
         except Exception as e:
             logger.error(f"Erreur lors de la création de la sauvegarde: {e}")
             return None
     
-    def restore_backup(self, backup_path: str) -> bool:
+    def reopen_store(self) -> None:
+        """
+        Rouvre la base SQLite (après le remplacement de son fichier par une
+        restauration) et recharge les données
+        """
+        db_path = self.store.db_path
+        self.store.close()
+        self.store = AppStore(db_path)
+        self.load_all_data()
+    
+    def restore_backup(self, backup_path: str, paths: List[str] = None) -> bool:
         """
         Restaure les données à partir d'une sauvegarde
         
         Args:
-            backup_path: Chemin vers le dossier de sauvegarde
+            backup_path: Chemin du manifeste d'une sauvegarde (voir create_backup)
+                         ou d'un ancien dossier de sauvegarde
+            paths: Fichiers ou dossiers à restaurer sous leur nom dans la sauvegarde
+                   (par exemple "documents/contrat.docx"); tout par défaut
         
         Returns:
             bool: True si la restauration a réussi, False sinon
         """
         try:
+            if os.path.isfile(backup_path) and backup_path.endswith(".json"):
+                return self._restore_snapshot(backup_path, paths)
+            
             if not os.path.exists(backup_path) or not os.path.isdir(backup_path):
                 logger.error(f"Dossier de sauvegarde non trouvé: {backup_path}")
                 return False
@@ -1879,7 +1889,8 @@ class AppModel:
                 # Recharger la configuration
                 self.config.load_config()
             
-            # Recharger les données
+            # Réimporter les fichiers restaurés dans la base et recharger les données
+            self.import_json_files()
             self.load_all_data()
             
             # Ajouter l'activité
@@ -1893,6 +1904,47 @@ class AppModel:
             logger.error(f"Erreur lors de la restauration des données: {e}")
             return False
     
+    def _restore_snapshot(self, manifest_path: str, paths: List[str] = None) -> bool:
+        """
+        Restaure une sauvegarde du dépôt dédupliqué
+        
+        Args:
+            manifest_path: Chemin du manifeste (<dépôt>/snapshots/<id>.json)
+            paths: Fichiers ou dossiers à restaurer; tout par défaut
+        
+        Returns:
+            bool: True si la restauration a réussi
+        """
+        store = BackupStore(os.path.dirname(os.path.dirname(manifest_path)))
+        manifest = store.load_snapshot(manifest_path)
+        if manifest is None:
+            logger.error(f"Sauvegarde non trouvée: {manifest_path}")
+            return False
+        
+        # Sauvegarde de l'état actuel (seuls les blocs modifiés sont écrits)
+        temp_backup = self.create_backup()
+        if not temp_backup:
+            logger.error("Impossible de créer une sauvegarde temporaire avant restauration")
+            return False
+        
+        # Fermer la base avant de remplacer son fichier
+        self.store.close()
+        try:
+            restored = store.restore(manifest_path, paths=paths)
+        finally:
+            self.reopen_store()
+        
+        if any(os.path.basename(path) == "config.json" for path in restored):
+            self.config.load_config()
+        
+        # Ajouter l'activité
+        self.add_activity('system', f"Sauvegarde restaurée: backup_{manifest['id']} "
+                                    f"({len(restored)} fichier(s))")
+        
+        logger.info(f"Données restaurées depuis {manifest_path}")
+        logger.info(f"Sauvegarde temporaire créée: {temp_backup}")
+        return True
+    
     def get_backup_list(self) -> List[Dict[str, Any]]:
         """
         Récupère la liste des sauvegardes disponibles
@@ -1907,6 +1959,16 @@ class AppModel:
             if not os.path.exists(backup_dir):
                 return backups
             
+            for snapshot in self._get_backup_store().list_snapshots():
+                date_obj = datetime.fromisoformat(snapshot["created"])
+                backups.append({
+                    "name": f"backup_{snapshot['id']}",
+                    "path": snapshot["path"],
+                    "date": date_obj.strftime("%d/%m/%Y %H:%M:%S"),
+                    "timestamp": date_obj.timestamp()
+                })
+            
+            # Anciens dossiers de sauvegarde
             for item in os.listdir(backup_dir):
                 item_path = os.path.join(backup_dir, item)
                 
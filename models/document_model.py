@@ -11,6 +11,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from functools import lru_cache
 from utils.cache_manager import CacheManager
+from utils.template_renderer import render_template, MISSING_KEEP
 from utils.lazy_loader import LazyModelLoader, ModelType, ModelMetadata
 
 logger = logging.getLogger("VynalDocsAutomator.DocumentModel")
@@ -998,25 +999,45 @@ class AppModel:
     
     # === Génération de documents ===
     
-    def fill_template_variables(self, template_content: str, variables: Dict) -> str:
+    def fill_template_variables(self, template_content: str, variables: Dict,
+                                template_id: str = None) -> str:
         """
         Remplace les variables dans un modèle par leurs valeurs.
+        Seul le format {{variable_name}} est reconnu; les variables sans valeur
+        sont laissées telles quelles.
         
         Args:
             template_content (str): Contenu du modèle avec variables
             variables (Dict): Dictionnaire des variables et leurs valeurs
+            template_id (str, optional): ID du modèle, pour réutiliser sa version compilée
             
         Returns:
             str: Contenu avec variables remplacées
         """
-        filled_content = template_content
+        return render_template(template_content, variables,
+                               key=template_id, mtime=self._get_template_mtime(template_id),
+                               missing=MISSING_KEEP, single_braces=False)
+    
+    def _get_template_mtime(self, template_id: Optional[str]) -> Optional[Any]:
+        """
+        Retourne la date de modification d'un modèle (fichier de contenu ou fiche)
         
-        # Remplacer les variables de la forme {{variable_name}}
-        for var_name, var_value in variables.items():
-            placeholder = f"{{{{{var_name}}}}}"
-            filled_content = filled_content.replace(placeholder, str(var_value))
+        Args:
+            template_id (str): ID du modèle
+            
+        Returns:
+            Date de modification ou None si le modèle est inconnu
+        """
+        template = self.get_template(template_id) if template_id else None
+        if not template:
+            return None
         
-        return filled_content
+        content_file = template.get("content_file", "")
+        if content_file:
+            file_path = os.path.join(self.data_dir, "templates", content_file)
+            if os.path.exists(file_path):
+                return os.path.getmtime(file_path)
+        return template.get("updated_at")
     
     def generate_document(self, template_id: str, client_id: str, custom_variables: Dict, 
                          output_format: str = "pdf", output_path: Optional[str] = None) -> Optional[str]:
@@ -1064,7 +1085,7 @@ class AppModel:
         all_variables = {**client_variables, **custom_variables}
         
         # Remplir le modèle avec les variables
-        filled_content = self.fill_template_variables(template_content, all_variables)
+        filled_content = self.fill_template_variables(template_content, all_variables, template_id)
         
         # Déterminer le chemin de sortie
         if not output_path:
@@ -12,6 +12,7 @@ import time
 import logging
 import datetime
 from typing import Dict, List, Optional, Any, Tuple
+from utils.entitlements import get_entitlement_service, invalidate_entitlements
 
 logger = logging.getLogger("VynalDocsAutomator.LicenseModel")
 
@@ -108,6 +109,8 @@ class LicenseModel:
             with open(self.licenses_file, 'w', encoding='utf-8') as f:
                 json.dump(self.licenses, f, indent=2, ensure_ascii=False)
             logger.info(f"Licences sauvegardées: {len(self.licenses)} entrées")
+            # Les décisions d'accès calculées sur les anciennes licences ne sont plus valables
+            invalidate_entitlements()
             return True
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde des licences: {str(e)}")
@@ -508,8 +511,8 @@ class LicenseModel:
             bool: True si l'accès est autorisé, False sinon
         """
         try:
-            # Vérifier d'abord si la licence est valide
-            is_valid, message, _ = self.check_license_is_valid(email)
+            # Vérifier d'abord si la licence est valide (résultat partagé et mis en cache)
+            is_valid, message = self.check_license_validity(email)
             if not is_valid:
                 logger.warning(f"Accès refusé à {feature} pour {email}: {message}")
                 return False
@@ -551,6 +554,22 @@ class LicenseModel:
             logger.error(f"Erreur lors de la vérification de l'accès à {feature} pour {email}: {e}")
             return False
     
+    def check_license_validity(self, email: str) -> Tuple[bool, str]:
+        """
+        Validité de la licence d'un utilisateur, mise en cache jusqu'à expiration ou
+        modification d'une licence (voir utils.entitlements)
+        
+        Args:
+            email: Email de l'utilisateur
+            
+        Returns:
+            Tuple[bool, str]: (validité, message)
+        """
+        return get_entitlement_service().decision(
+            ("license_valid", email),
+            lambda: self.check_license_is_valid(email)[:2]
+        )
+    
     def verify_hmac_license(self, username: str, license_key: str) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Vérifie la validité d'une licence avec le nouveau système basé sur HMAC SHA256
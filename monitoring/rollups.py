@@ -0,0 +1,416 @@
+import os
+import json
+import math
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger("VynalDocsAutomator.MetricRollups")
+
+# Résolutions des agrégats et durée d'un intervalle (secondes)
+RESOLUTIONS = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# Durée de conservation des agrégats par résolution (jours)
+DEFAULT_RETENTION_DAYS = {
+    "minute": 2,
+    "hour": 90,
+    "day": 3650,
+}
+
+# Précision relative des percentiles (histogramme à intervalles logarithmiques)
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+# Valeurs nulles ou négatives (non représentables sur une échelle logarithmique)
+_ZERO_BIN = "z"
+_MIN_VALUE = 1e-9
+
+Timestamp = Union[datetime, str]
+
+
+def _to_datetime(value: Timestamp) -> datetime:
+    """Convertit un horodatage ISO ou datetime en datetime"""
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def bucket_start(timestamp: Timestamp, resolution: str) -> str:
+    """
+    Début de l'intervalle contenant un horodatage
+
+    Args:
+        timestamp: Horodatage
+        resolution: "minute", "hour" ou "day"
+
+    Returns:
+        str: Début de l'intervalle (ISO)
+    """
+    moment = _to_datetime(timestamp).replace(second=0, microsecond=0)
+    if resolution in ("hour", "day"):
+        moment = moment.replace(minute=0)
+    if resolution == "day":
+        moment = moment.replace(hour=0)
+    return moment.isoformat()
+
+
+def _bin(value: float) -> str:
+    """Intervalle de l'histogramme contenant une valeur"""
+    if value <= _MIN_VALUE:
+        return _ZERO_BIN
+    return str(math.ceil(math.log(value) / _LOG_GAMMA))
+
+
+def _bin_value(key: str) -> float:
+    """Valeur représentative d'un intervalle de l'histogramme"""
+    if key == _ZERO_BIN:
+        return 0.0
+    return 2 * _GAMMA ** int(key) / (_GAMMA + 1)
+
+
+def percentile(histogram: Dict[str, int], fraction: float) -> Optional[float]:
+    """
+    Percentile approché d'un histogramme (erreur relative RELATIVE_ACCURACY)
+
+    Args:
+        histogram: Nombre de valeurs par intervalle
+        fraction: Percentile recherché entre 0 et 1 (0.95 pour le p95)
+
+    Returns:
+        Optional[float]: Valeur du percentile, None si l'histogramme est vide
+    """
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = fraction * (total - 1)
+    seen = 0
+    for key in sorted(histogram, key=lambda k: -math.inf if k == _ZERO_BIN else int(k)):
+        seen += histogram[key]
+        if seen > rank:
+            return _bin_value(key)
+    return None
+
+
+class SQLiteConnection:
+    """
+    Connexion SQLite unique partagée entre threads, avec la même interface
+    connection() que le pool de l'administration
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Ouvre la base
+
+        Args:
+            db_path: Chemin du fichier SQLite
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Prête la connexion le temps d'un bloc with"""
+        with self._lock:
+            yield self._conn
+
+    def close(self):
+        """Ferme la connexion"""
+        with self._lock:
+            self._conn.close()
+
+
+class MetricRollups:
+    """
+    Agrégats de métriques par minute, heure et jour (nombre, somme, minimum,
+    maximum et histogramme pour les percentiles), mis à jour à chaque relevé.
+    Les graphiques lisent un point par intervalle au lieu des relevés bruts.
+    """
+
+    def __init__(self, db, name: str = "metrics", retention_days: Optional[Dict[str, int]] = None):
+        """
+        Initialise les agrégats
+
+        Args:
+            db: Base offrant connection() (AdminDatabase ou SQLiteConnection)
+            name: Préfixe de la table des agrégats
+            retention_days: Conservation par résolution (DEFAULT_RETENTION_DAYS par défaut)
+        """
+        self.db = db
+        self.table = f"{name}_rollups"
+        self.retention_days = dict(DEFAULT_RETENTION_DAYS, **(retention_days or {}))
+        self._lock = threading.Lock()
+
+        with db.connection() as conn, conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    resolution TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    histogram TEXT NOT NULL,
+                    PRIMARY KEY (resolution, metric, bucket)
+                ) WITHOUT ROWID
+            """)
+            # Avancement de l'agrégation des relevés antérieurs aux agrégats
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table}_state (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+
+        self._select_sql = (f"SELECT count, total, min, max, histogram FROM {self.table} "
+                            "WHERE resolution = ? AND metric = ? AND bucket = ?")
+        self._upsert_sql = (f"INSERT OR REPLACE INTO {self.table} "
+                            "(resolution, metric, bucket, count, total, min, max, histogram) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+    def is_empty(self) -> bool:
+        """Indique si aucun relevé n'a encore été agrégé"""
+        with self.db.connection() as conn:
+            return conn.execute(f"SELECT 1 FROM {self.table} LIMIT 1").fetchone() is None
+
+    def add(self, timestamp: Timestamp, values: Dict[str, Optional[float]]):
+        """
+        Agrège un relevé
+
+        Args:
+            timestamp: Horodatage du relevé
+            values: Valeur de chaque métrique (les valeurs None sont ignorées)
+        """
+        self.add_many([(timestamp, values)])
+
+    def add_many(self, samples: Iterable[Tuple[Timestamp, Dict[str, Optional[float]]]],
+                 now: Optional[datetime] = None,
+                 state: Optional[Tuple[str, int]] = None) -> int:
+        """
+        Agrège une série de relevés en une transaction
+
+        Args:
+            samples: Couples (horodatage, valeurs)
+            now: Si indiqué, les intervalles déjà expirés à cette date (durée de
+                 conservation de leur résolution) ne sont pas écrits
+            state: Couple (clé, valeur) d'avancement enregistré dans la même transaction
+
+        Returns:
+            int: Nombre de relevés agrégés
+        """
+        cutoffs = {}
+        if now is not None:
+            cutoffs = {resolution: bucket_start(now - timedelta(days=days), resolution)
+                       for resolution, days in self.retention_days.items()}
+
+        # Regrouper d'abord en mémoire: une seule écriture par intervalle
+        pending: Dict[Tuple[str, str, str], List[Any]] = {}
+        count = 0
+        for timestamp, values in samples:
+            count += 1
+            moment = _to_datetime(timestamp)
+            for resolution in RESOLUTIONS:
+                bucket = bucket_start(moment, resolution)
+                if resolution in cutoffs and bucket < cutoffs[resolution]:
+                    continue
+                for metric, value in values.items():
+                    if value is None:
+                        continue
+                    value = float(value)
+                    entry = pending.get((resolution, metric, bucket))
+                    if entry is None:
+                        pending[(resolution, metric, bucket)] = [1, value, value, value, {_bin(value): 1}]
+                    else:
+                        entry[0] += 1
+                        entry[1] += value
+                        entry[2] = min(entry[2], value)
+                        entry[3] = max(entry[3], value)
+                        key = _bin(value)
+                        entry[4][key] = entry[4].get(key, 0) + 1
+
+        if not pending and state is None:
+            return count
+
+        with self._lock, self.db.connection() as conn, conn:
+            rows = []
+            for (resolution, metric, bucket), (n, total, low, high, histogram) in pending.items():
+                existing = conn.execute(self._select_sql, (resolution, metric, bucket)).fetchone()
+                if existing is not None:
+                    n += existing[0]
+                    total += existing[1]
+                    low = min(low, existing[2])
+                    high = max(high, existing[3])
+                    for key, value in json.loads(existing[4]).items():
+                        histogram[key] = histogram.get(key, 0) + value
+                rows.append((resolution, metric, bucket, n, total, low, high,
+                             json.dumps(histogram, separators=(",", ":"))))
+            conn.executemany(self._upsert_sql, rows)
+            if state is not None:
+                self._set_state(conn, *state)
+        return count
+
+    def _get_state(self, key: str) -> Optional[int]:
+        with self.db.connection() as conn:
+            row = conn.execute(f"SELECT value FROM {self.table}_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, conn: sqlite3.Connection, key: str, value: int):
+        conn.execute(f"INSERT OR REPLACE INTO {self.table}_state (key, value) VALUES (?, ?)", (key, value))
+
+    def backfill_range(self, last_id: int) -> Optional[Tuple[int, int]]:
+        """
+        Relevés bruts restant à agréger, antérieurs aux agrégats en cours
+
+        La borne haute est fixée au premier appel (dernier relevé existant): les
+        relevés suivants sont agrégés au fil de l'eau par add(). Des agrégats
+        présents sans avancement enregistré sont considérés comme complets.
+
+        Args:
+            last_id: ID du dernier relevé brut existant
+
+        Returns:
+            Optional[Tuple[int, int]]: (dernier ID agrégé, ID final) ou None si
+            l'agrégation est terminée
+        """
+        end = self._get_state("backfill_end")
+        if end is None:
+            end = last_id if self.is_empty() else 0
+            with self._lock, self.db.connection() as conn, conn:
+                self._set_state(conn, "backfill_end", end)
+        done = self._get_state("backfill_done") or 0
+        return (done, end) if done < end else None
+
+    def backfill(self, batches: Iterable[List[Tuple[int, Timestamp, Dict[str, Optional[float]]]]],
+                 now: Optional[datetime] = None) -> int:
+        """
+        Agrège des relevés antérieurs par lots chronologiques, une transaction par lot
+
+        L'avancement (ID du dernier relevé du lot) est enregistré avec chaque lot:
+        une agrégation interrompue reprend là où elle s'était arrêtée.
+
+        Args:
+            batches: Lots de triplets (ID, horodatage, valeurs) par ID croissant
+            now: Date de référence pour ignorer les intervalles expirés (maintenant par défaut)
+
+        Returns:
+            int: Nombre de relevés agrégés
+        """
+        now = now or datetime.now()
+        count = 0
+        for batch in batches:
+            if not batch:
+                continue
+            count += self.add_many(((timestamp, values) for _, timestamp, values in batch),
+                                   now=now, state=("backfill_done", batch[-1][0]))
+        return count
+
+    def series(self, metrics: Sequence[str], resolution: str, start: Timestamp,
+               end: Optional[Timestamp] = None) -> List[Dict[str, Any]]:
+        """
+        Retourne un point par intervalle pour les métriques demandées
+
+        Args:
+            metrics: Noms des métriques
+            resolution: "minute", "hour" ou "day"
+            start: Début de la période (l'intervalle qui le contient est inclus)
+            end: Fin de la période (maintenant par défaut)
+
+        Returns:
+            List[Dict[str, Any]]: Points triés par date: "timestamp" (début de
+            l'intervalle), la moyenne de chaque métrique sous son nom et les clés
+            <métrique>_min, <métrique>_max, <métrique>_p95 et <métrique>_count
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Résolution inconnue: {resolution}")
+        if not metrics:
+            return []
+
+        sql = (f"SELECT metric, bucket, count, total, min, max, histogram FROM {self.table} "
+               f"WHERE resolution = ? AND metric IN ({', '.join('?' for _ in metrics)}) AND bucket >= ?")
+        params: List[Any] = [resolution, *metrics, bucket_start(start, resolution)]
+        if end is not None:
+            sql += " AND bucket <= ?"
+            params.append(_to_datetime(end).isoformat())
+
+        points: Dict[str, Dict[str, Any]] = {}
+        with self.db.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        for metric, bucket, n, total, low, high, histogram in rows:
+            point = points.setdefault(bucket, {"timestamp": bucket})
+            point[metric] = total / n
+            point[f"{metric}_min"] = low
+            point[f"{metric}_max"] = high
+            p95 = percentile(json.loads(histogram), 0.95)
+            # L'approximation de l'histogramme reste dans les bornes observées
+            point[f"{metric}_p95"] = min(max(p95, low), high) if p95 is not None else None
+            point[f"{metric}_count"] = n
+        return [points[bucket] for bucket in sorted(points)]
+
+    def trend(self, metric: str, resolution: str = "hour", points: int = 24,
+              threshold: float = 0.05) -> Dict[str, Any]:
+        """
+        Tendance récente d'une métrique (régression linéaire sur les derniers intervalles)
+
+        Args:
+            metric: Nom de la métrique
+            resolution: Résolution des intervalles
+            points: Nombre d'intervalles considérés
+            threshold: Variation relative sur la période au-delà de laquelle la
+                       tendance n'est plus considérée comme stable
+
+        Returns:
+            Dict[str, Any]: Valeur actuelle ("current"), moyenne ("average"),
+            pente par intervalle ("slope") et tendance ("increasing",
+            "decreasing" ou "stable")
+        """
+        start = datetime.now() - timedelta(seconds=RESOLUTIONS[resolution] * points)
+        values = [point[metric] for point in self.series([metric], resolution, start)][-points:]
+        if not values:
+            return {"current": None, "average": None, "slope": 0.0, "trend": "stable"}
+
+        n = len(values)
+        average = sum(values) / n
+        slope = 0.0
+        if n > 1:
+            mean_x = (n - 1) / 2
+            variance = sum((x - mean_x) ** 2 for x in range(n))
+            slope = sum((x - mean_x) * (y - average) for x, y in enumerate(values)) / variance
+
+        change = slope * (n - 1)
+        scale = abs(average) or 1.0
+        if change > threshold * scale:
+            direction = "increasing"
+        elif change < -threshold * scale:
+            direction = "decreasing"
+        else:
+            direction = "stable"
+        return {"current": values[-1], "average": average, "slope": slope, "trend": direction}
+
+    def apply_retention(self, now: Optional[datetime] = None) -> int:
+        """
+        Supprime les agrégats plus anciens que la durée de conservation de leur résolution
+
+        Args:
+            now: Date de référence (maintenant par défaut)
+
+        Returns:
+            int: Nombre d'agrégats supprimés
+        """
+        now = now or datetime.now()
+        removed = 0
+        with self._lock, self.db.connection() as conn, conn:
+            for resolution, days in self.retention_days.items():
+                cutoff = bucket_start(now - timedelta(days=days), resolution)
+                removed += conn.execute(
+                    f"DELETE FROM {self.table} WHERE resolution = ? AND bucket < ?", (resolution, cutoff)
+                ).rowcount
+        return removed
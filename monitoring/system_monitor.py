@@ -6,6 +6,8 @@ from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 import json
 
+from .rollups import MetricRollups, SQLiteConnection
+
 logger = logging.getLogger("VynalDocsAutomator.Monitor")
 
 class SystemMonitor:
@@ -35,6 +37,13 @@ class SystemMonitor:
         # Créer le dossier de monitoring s'il n'existe pas
         os.makedirs('monitoring', exist_ok=True)
         
+        # Agrégats des métriques (minute, heure, jour) pour l'analyse des tendances
+        self.rollups = MetricRollups(
+            SQLiteConnection(self.config.get('rollups_db', 'monitoring/metrics.db')),
+            name='monitor',
+            retention_days=self.config['monitoring'].get('rollup_retention')
+        )
+        
         # Configurer le logging
         self._setup_logging()
         
@@ -70,7 +79,8 @@ class SystemMonitor:
                 'max_size': 10485760,           # 10 MB
                 'backup_count': 5
             },
-            'stats_file': 'monitoring/system_stats.json'
+            'stats_file': 'monitoring/system_stats.json',
+            'rollups_db': 'monitoring/metrics.db'
         }
         
         if config_path and os.path.exists(config_path):
@@ -150,6 +160,7 @@ class SystemMonitor:
             
             # Sauvegarder les statistiques
             self._save_stats()
+            self._record_rollups(current_time)
             
             # Nettoyer les anciennes données
             self._cleanup_old_data()
@@ -300,11 +311,27 @@ class SystemMonitor:
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde des statistiques: {e}")
     
+    def _record_rollups(self, timestamp: datetime) -> None:
+        """Ajoute les métriques numériques courantes aux agrégats"""
+        try:
+            values = {
+                f"{category}.{name}": value
+                for category in ('performance', 'resources', 'quality')
+                for name, value in self.metrics[category].items()
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            }
+            self.rollups.add(timestamp, values)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'agrégation des métriques: {e}")
+    
     def _cleanup_old_data(self) -> None:
         """Nettoie les anciennes données"""
         retention_days = self.config['monitoring']['stats_retention']
         cutoff_date = datetime.now() - timedelta(days=retention_days)
         
+        # Supprimer les agrégats expirés
+        self.rollups.apply_retention()
+        
         # Nettoyer les anciennes alertes
         self.alerts = [
             alert for alert in self.alerts
@@ -4,6 +4,7 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 import logging
 from .system_monitor import SystemMonitor
+from .rollups import MetricRollups, SQLiteConnection
 
 logger = logging.getLogger("VynalDocsAutomator.MonitorUtils")
 
@@ -114,12 +115,16 @@ class MonitoringUtils:
             raise
     
     @staticmethod
-    def analyze_trends(stats_file: str) -> Dict[str, Any]:
+    def analyze_trends(stats_file: str, rollups_db: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyse les tendances à partir des statistiques sauvegardées
         
+        Les tendances sont calculées sur les agrégats horaires des dernières
+        24 heures; sans agrégats, seules les valeurs courantes sont retournées.
+        
         Args:
             stats_file: Chemin vers le fichier de statistiques
+            rollups_db: Base des agrégats (metrics.db à côté du fichier de statistiques par défaut)
             
         Returns:
             Dict: Analyse des tendances
@@ -131,13 +136,21 @@ class MonitoringUtils:
             with open(stats_file, 'r') as f:
                 stats = json.load(f)
             
-            # Analyser les tendances
-            trends = {
-                'performance': MonitoringUtils._analyze_performance_trends(stats),
-                'resources': MonitoringUtils._analyze_resource_trends(stats),
-                'quality': MonitoringUtils._analyze_quality_trends(stats),
-                'alerts': MonitoringUtils._analyze_alert_trends(stats)
-            }
+            rollups_db = rollups_db or os.path.join(os.path.dirname(stats_file), 'metrics.db')
+            connection = SQLiteConnection(rollups_db) if os.path.exists(rollups_db) else None
+            try:
+                rollups = MetricRollups(connection, name='monitor') if connection else None
+                
+                # Analyser les tendances
+                trends = {
+                    'performance': MonitoringUtils._analyze_performance_trends(stats, rollups),
+                    'resources': MonitoringUtils._analyze_resource_trends(stats, rollups),
+                    'quality': MonitoringUtils._analyze_quality_trends(stats, rollups),
+                    'alerts': MonitoringUtils._analyze_alert_trends(stats)
+                }
+            finally:
+                if connection:
+                    connection.close()
             
             return trends
             
@@ -146,53 +159,37 @@ class MonitoringUtils:
             return {'error': str(e)}
     
     @staticmethod
-    def _analyze_performance_trends(stats: Dict) -> Dict[str, Any]:
+    def _metric_trends(stats: Dict, category: str, names: tuple,
+                       rollups: Optional[MetricRollups]) -> Dict[str, Any]:
+        """Valeur courante et tendance horaire de métriques d'une catégorie"""
+        metrics = stats.get('metrics', {}).get(category, {})
+        trends = {}
+        for name in names:
+            trend = {'current': metrics.get(name, 0), 'trend': 'stable'}
+            if rollups is not None:
+                recent = rollups.trend(f"{category}.{name}", resolution='hour', points=24)
+                if recent['current'] is not None:
+                    trend.update(average=recent['average'], trend=recent['trend'])
+            trends[name] = trend
+        return trends
+    
+    @staticmethod
+    def _analyze_performance_trends(stats: Dict, rollups: Optional[MetricRollups] = None) -> Dict[str, Any]:
         """Analyse les tendances de performance"""
-        metrics = stats.get('metrics', {}).get('performance', {})
-        return {
-            'avg_processing_time': {
-                'current': metrics.get('avg_processing_time', 0),
-                'trend': 'stable'  # À implémenter: calcul de tendance
-            },
-            'success_rate': {
-                'current': metrics.get('success_rate', 0),
-                'trend': 'stable'
-            }
-        }
+        return MonitoringUtils._metric_trends(
+            stats, 'performance', ('avg_processing_time', 'success_rate'), rollups)
     
     @staticmethod
-    def _analyze_resource_trends(stats: Dict) -> Dict[str, Any]:
+    def _analyze_resource_trends(stats: Dict, rollups: Optional[MetricRollups] = None) -> Dict[str, Any]:
         """Analyse les tendances d'utilisation des ressources"""
-        metrics = stats.get('metrics', {}).get('resources', {})
-        return {
-            'cache_size': {
-                'current': metrics.get('cache_size', 0),
-                'trend': 'stable'
-            },
-            'memory_usage': {
-                'current': metrics.get('memory_usage', 0),
-                'trend': 'stable'
-            },
-            'cpu_usage': {
-                'current': metrics.get('cpu_usage', 0),
-                'trend': 'stable'
-            }
-        }
+        return MonitoringUtils._metric_trends(
+            stats, 'resources', ('cache_size', 'memory_usage', 'cpu_usage'), rollups)
     
     @staticmethod
-    def _analyze_quality_trends(stats: Dict) -> Dict[str, Any]:
+    def _analyze_quality_trends(stats: Dict, rollups: Optional[MetricRollups] = None) -> Dict[str, Any]:
         """Analyse les tendances de qualité"""
-        metrics = stats.get('metrics', {}).get('quality', {})
-        return {
-            'variable_detection_rate': {
-                'current': metrics.get('variable_detection_rate', 0),
-                'trend': 'stable'
-            },
-            'false_positive_rate': {
-                'current': metrics.get('false_positive_rate', 0),
-                'trend': 'stable'
-            }
-        }
+        return MonitoringUtils._metric_trends(
+            stats, 'quality', ('variable_detection_rate', 'false_positive_rate'), rollups)
     
     @staticmethod
     def _analyze_alert_trends(stats: Dict) -> Dict[str, Any]:
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de la base SQLite de l'administration
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import sqlite3
+import threading
+from unittest.mock import patch
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admin.models.admin_db import AdminDatabase
+
+
+class TestAdminDatabase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "admin.db")
+        self.db = AdminDatabase(self.db_path, pool_size=2, log_flush_interval=60)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_schema_and_indexes(self):
+        """La base est en mode WAL et les colonnes filtrées sont indexées"""
+        with self.db.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            plan = " ".join(row[-1] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM system_logs WHERE level = ? ORDER BY timestamp DESC LIMIT 10",
+                ("ERROR",)
+            ))
+        self.assertIn("idx_system_logs_level", plan)
+        self.assertEqual(set(self.db.list_tables()) & {"system_logs", "system_metrics", "admin_actions"},
+                         {"system_logs", "system_metrics", "admin_actions"})
+
+    def test_buffered_logs_visible_to_reads(self):
+        """Les journaux sont mis en tampon puis écrits par lot avant toute lecture"""
+        for i in range(10):
+            self.db.add_log("ERROR" if i % 2 else "INFO", "test", f"message {i}")
+        self.assertEqual(self.db.pending_logs(), 10)
+
+        errors = self.db.get_logs(level="ERROR")
+        self.assertEqual(self.db.pending_logs(), 0)
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(len(self.db.get_logs(search_text="message 3")), 1)
+        self.assertEqual(self.db.count_errors_since("2000-01-01"), 5)
+
+    def test_pool_shared_between_threads(self):
+        """Les écritures concurrentes partagent un nombre borné de connexions"""
+        def record(n):
+            for i in range(20):
+                self.db.add_action(f"user{n}", "login", f"connexion {i}")
+
+        threads = [threading.Thread(target=record, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLessEqual(self.db._opened, 2)
+        self.assertEqual(self.db.count_actions_since("login", "2000-01-01"), 80)
+        self.assertEqual(len(self.db.get_actions(user_id="user1", limit=100)), 20)
+
+    def test_close_flushes_pending_logs(self):
+        """La fermeture écrit les journaux encore en attente"""
+        self.db.add_log("INFO", "test", "avant fermeture")
+        self.db.close()
+
+        reopened = AdminDatabase(self.db_path)
+        try:
+            self.assertEqual(len(reopened.get_logs()), 1)
+        finally:
+            reopened.close()
+
+
+class TestAdminModelWithoutDatabase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        patchers = [
+            patch.dict(os.environ, {"HOME": self.temp_dir, "USERPROFILE": self.temp_dir}),
+            patch("admin.models.admin_model.AdminDatabase",
+                  side_effect=sqlite3.OperationalError("unable to open database file")),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_methods_degrade_when_database_is_unavailable(self):
+        """Sans base, journaux, métriques et audit échouent proprement au lieu de lever AttributeError"""
+        from admin.models.admin_model import AdminModel
+        model = AdminModel()
+
+        self.assertIsNone(model.db)
+        self.assertFalse(model.add_system_log("INFO", "test", "message"))
+        self.assertEqual(model.get_system_logs(search_text="message"), [])
+        self.assertIsNone(model.record_system_metrics())
+        self.assertEqual(model.get_system_metrics("hour"), [])
+        self.assertFalse(model.add_admin_action("admin", "login", "test"))
+        self.assertEqual(model.get_admin_actions(), [])
+        self.assertFalse(model.optimize_database())
+        self.assertIn("Base de données indisponible", model.check_integrity()["issues"])
+
+
+if __name__ == '__main__':
+    unittest.main()
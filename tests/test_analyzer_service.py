@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'analyseur de documents partagé (instance unique, préchauffage,
+compteur de références et rapport mémoire)
+"""
+
+import unittest
+import sys
+import os
+import time
+import threading
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_analyzer.analyzer_service import AnalyzerService, ANALYZER_SERVICE_CONFIG
+
+
+class FakeAnalyzer:
+    """Analyseur de test: composants construits à la demande, comptés"""
+
+    COMPONENTS = ('patterns', 'reference_data', 'engine')
+
+    def __init__(self, built):
+        self.built = built
+        self._patterns = None
+        self._reference_data = None
+        self._engine = None
+
+    def _build(self, name):
+        self.built.append(name)
+        if name == 'patterns':
+            return {"codes": ["code-%05d" % i for i in range(2000)]}
+        if name == 'reference_data':
+            return ["ville-%05d" % i for i in range(500)]
+        # Le moteur référence l'analyseur et les autres composants
+        return {"owner": self, "patterns": self.patterns}
+
+    def __getattr__(self, name):
+        if name in FakeAnalyzer.COMPONENTS:
+            if self.__dict__[f"_{name}"] is None:
+                self.__dict__[f"_{name}"] = self._build(name)
+            return self.__dict__[f"_{name}"]
+        raise AttributeError(name)
+
+    def warm_up(self, components=None):
+        durations = {}
+        for name in components or self.COMPONENTS:
+            getattr(self, name)
+            durations[name] = 0.0
+        return durations
+
+    def loaded_components(self):
+        return {name: self.__dict__[f"_{name}"] for name in self.COMPONENTS
+                if self.__dict__[f"_{name}"] is not None}
+
+
+class FakeWidget:
+    """Widget de test: conserve les fonctions liées à <Destroy>"""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def bind(self, sequence, callback, add=None):
+        self.callbacks.append(callback)
+
+    def destroy(self):
+        for callback in self.callbacks:
+            callback(None)
+
+
+class TestAnalyzerService(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+        self.built = []
+        self.service = AnalyzerService(self._factory)
+
+    def _factory(self):
+        time.sleep(0.01)
+        analyzer = FakeAnalyzer(self.built)
+        self.created.append(analyzer)
+        return analyzer
+
+    def test_single_instance_across_threads(self):
+        """Tous les utilisateurs partagent un seul analyseur, construit une fois"""
+        analyzers = []
+        threads = [threading.Thread(target=lambda: analyzers.append(self.service.acquire()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.created), 1)
+        self.assertTrue(all(analyzer is self.created[0] for analyzer in analyzers))
+        self.assertEqual(self.service.references, 8)
+
+        for _ in range(8):
+            self.service.release()
+        self.assertEqual(self.service.references, 0)
+        # Sans délai de libération configuré, l'analyseur reste prêt
+        self.assertTrue(self.service.is_loaded)
+
+    def test_background_warm_up(self):
+        """Le préchauffage en arrière-plan construit les composants une seule fois"""
+        thread = self.service.warm_up(background=True)
+        self.assertTrue(self.service.wait_ready(5))
+        thread.join()
+        self.assertEqual(sorted(self.built), sorted(FakeAnalyzer.COMPONENTS))
+        self.assertEqual(set(self.service.warm_up_durations), set(FakeAnalyzer.COMPONENTS))
+
+        # Ouvrir de nouveau une vue ne reconstruit rien
+        for _ in range(3):
+            widget = FakeWidget()
+            self.service.acquire_for(widget).engine
+            widget.destroy()
+        self.assertEqual(len(self.built), 3)
+        self.assertEqual(len(self.created), 1)
+
+    def test_widget_reference_released_once(self):
+        """La référence d'un widget est rendue une seule fois, à sa destruction"""
+        widget = FakeWidget()
+        self.service.acquire()
+        self.service.acquire_for(widget)
+        self.assertEqual(self.service.references, 2)
+        widget.destroy()
+        widget.destroy()
+        self.assertEqual(self.service.references, 1)
+
+    def test_idle_release(self):
+        """Sans utilisateur, l'analyseur est libéré après le délai configuré"""
+        delay = ANALYZER_SERVICE_CONFIG["idle_release_after"]
+        ANALYZER_SERVICE_CONFIG["idle_release_after"] = 0.05
+        try:
+            self.service.acquire()
+            self.service.release()
+            # Une nouvelle référence prise avant le délai annule la libération
+            self.service.acquire()
+            time.sleep(0.2)
+            self.assertTrue(self.service.is_loaded)
+
+            self.service.release()
+            time.sleep(0.2)
+            self.assertFalse(self.service.is_loaded)
+            self.assertEqual(self.service.memory_report(), {})
+        finally:
+            ANALYZER_SERVICE_CONFIG["idle_release_after"] = delay
+
+    def test_memory_report_per_component(self):
+        """Chaque composant construit est mesuré, sans compter deux fois les objets partagés"""
+        self.service.get().patterns
+        report = self.service.memory_report()
+        self.assertEqual(list(report), ['patterns'])
+
+        self.service.warm_up()
+        report = self.service.memory_report()
+        self.assertEqual(set(report), set(FakeAnalyzer.COMPONENTS))
+        self.assertGreater(report['patterns'], report['reference_data'])
+        # Le moteur ne compte ni l'analyseur ni les motifs qu'il référence
+        self.assertLess(report['engine'], 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du stockage SQLite des données de l'application
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.app_store import AppStore
+
+
+class TestAppStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = AppStore(os.path.join(self.temp_dir, "app_data.db"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _document(self, doc_id, client_id="c1", date="2024-01-15"):
+        return {"id": doc_id, "title": f"Document {doc_id}", "type": "contrat",
+                "date": date, "client_id": client_id, "template_id": "t1"}
+
+    def test_migrates_json_once(self):
+        """Le fichier JSON est importé une seule fois, puis seulement sur demande (restauration)"""
+        json_file = os.path.join(self.temp_dir, "documents.json")
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump([self._document("d1"), self._document("d2")], f)
+
+        self.assertTrue(self.store.import_json("documents", json_file))
+        self.assertFalse(self.store.import_json("documents", json_file))
+        self.assertEqual([d["id"] for d in self.store.load("documents")], ["d1", "d2"])
+
+        self.assertTrue(self.store.import_json("documents", json_file, force=True))
+
+    def test_changed_json_does_not_overwrite_database(self):
+        """Un fichier JSON modifié après la migration n'écrase pas les modifications de la base"""
+        json_file = os.path.join(self.temp_dir, "documents.json")
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump([self._document("d1")], f)
+        self.assertTrue(self.store.import_json("documents", json_file))
+
+        self.store.upsert("documents", [self._document("d2")])
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump([self._document("d3")], f)
+        os.utime(json_file, (0, 0))
+
+        self.assertFalse(self.store.import_json("documents", json_file))
+        self.assertEqual([d["id"] for d in self.store.load("documents")], ["d1", "d2"])
+
+    def test_sync_writes_only_changes(self):
+        """La synchronisation n'écrit que les enregistrements modifiés ou supprimés"""
+        documents = [self._document("d1"), self._document("d2"), self._document("d3")]
+        self.store.sync("documents", documents)
+
+        prepared = []
+
+        def prepare(doc):
+            prepared.append(doc["id"])
+            return doc
+
+        documents[1]["title"] = "Modifié"
+        kept = self.store.sync("documents", documents[:2], prepare=prepare)
+
+        self.assertEqual(prepared, ["d2"])
+        self.assertEqual([d["id"] for d in kept], ["d1", "d2"])
+        self.assertEqual(self.store.count("documents"), 2)
+        self.assertEqual(self.store.get("documents", "d2")["title"], "Modifié")
+
+    def test_indexed_queries(self):
+        """Les requêtes par client et par période utilisent les colonnes indexées"""
+        self.store.upsert("documents", [
+            self._document("d1", "c1", "2024-01-10"),
+            self._document("d2", "c2", "2024-02-10"),
+            self._document("d3", "c1", "2024-03-10"),
+        ])
+
+        by_client = self.store.find("documents", order_by="-date", client_id="c1")
+        self.assertEqual([d["id"] for d in by_client], ["d3", "d1"])
+
+        in_period = self.store.find("documents", date_from="2024-02-01", date_to="2024-03-31")
+        self.assertEqual([d["id"] for d in in_period], ["d2", "d3"])
+
+        self.assertEqual(self.store.distinct("documents", "type"), ["contrat"])
+        with self.assertRaises(ValueError):
+            self.store.find("documents", title="Document d1")
+
+    def test_export_is_not_reimported(self):
+        """Un fichier exporté par la base n'est pas réimporté au chargement suivant"""
+        self.assertFalse(self.store.import_json("clients", os.path.join(self.temp_dir, "absent.json")))
+        self.store.upsert("clients", [{"id": "c1", "name": "Dupont", "email": "d@example.com"}])
+        json_file = os.path.join(self.temp_dir, "clients.json")
+
+        self.assertTrue(self.store.export_json("clients", json_file))
+        with open(json_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)[0]["name"], "Dupont")
+        self.assertFalse(self.store.import_json("clients", json_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
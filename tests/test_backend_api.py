@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'endpoint d'analyse par lot de l'API
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import concurrent.futures
+from unittest.mock import patch
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from fastapi.testclient import TestClient
+    TESTCLIENT_AVAILABLE = True
+except ImportError:
+    TESTCLIENT_AVAILABLE = False
+
+import backend_jobs
+from backend_jobs import JobManager
+
+
+def fake_analyze_texts(texts, batch_size=None, n_process=None):
+    """Analyse factice: une entité par texte et le nombre de mots"""
+    return [{"entities": [{"text": text, "label": "MISC"}], "statistics": {"words": len(text.split())}}
+            for text in texts]
+
+
+@unittest.skipUnless(TESTCLIENT_AVAILABLE, "fastapi.testclient (httpx) non disponible")
+class TestAnalyzeBatchEndpoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # L'API crée ses dossiers relativement au répertoire courant
+        cls.previous_cwd = os.getcwd()
+        cls.temp_dir = tempfile.mkdtemp()
+        for directory in ("static", "logs"):
+            os.makedirs(os.path.join(cls.temp_dir, directory))
+        os.chdir(cls.temp_dir)
+        import backend
+        cls.backend = backend
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.previous_cwd)
+        shutil.rmtree(cls.temp_dir)
+
+    def setUp(self):
+        manager = JobManager(lambda: concurrent.futures.ThreadPoolExecutor(max_workers=2))
+        self.addCleanup(manager.shutdown)
+        patchers = [
+            patch.object(self.backend, "jobs", manager),
+            patch.object(backend_jobs, "analyze_texts", side_effect=fake_analyze_texts),
+            patch.dict(self.backend.JOB_CONFIG, {"nlp_batch_size": 2}),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.analyze_texts = backend_jobs.analyze_texts
+
+        for index in range(3):
+            with open(os.path.join(self.backend.PROCESSED_DIR, f"doc{index}.txt"), "w", encoding="utf-8") as f:
+                f.write(f"Contrat numéro {index}")
+
+    def test_results_follow_requested_order(self):
+        """Chaque fichier a ses entités et statistiques, dans l'ordre de la requête"""
+        filenames = ["doc2.txt", "doc0.txt", "doc1.txt"]
+        with TestClient(self.backend.app) as client:
+            response = client.post("/analyze/batch", json={"filenames": filenames})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["count"], 3)
+        self.assertEqual([result["filename"] for result in body["results"]], filenames)
+        self.assertEqual(body["results"][0], {
+            "filename": "doc2.txt",
+            "entities": [{"text": "Contrat numéro 2", "label": "MISC"}],
+            "statistics": {"words": 3}
+        })
+        # Trois textes par lots de deux
+        self.assertEqual([len(call.args[0]) for call in self.analyze_texts.call_args_list], [2, 1])
+
+    def test_empty_batch_is_rejected(self):
+        """Un lot vide est refusé sans soumettre de tâche"""
+        with TestClient(self.backend.app) as client:
+            response = client.post("/analyze/batch", json={"filenames": []})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "Aucun fichier à analyser")
+        self.analyze_texts.assert_not_called()
+
+    def test_missing_files_and_invalid_body(self):
+        """Les fichiers inconnus donnent 404, un corps sans 'filenames' 422"""
+        with TestClient(self.backend.app) as client:
+            missing = client.post("/analyze/batch", json={"filenames": ["doc0.txt", "absent.txt"]})
+            invalid = client.post("/analyze/batch", json={"files": ["doc0.txt"]})
+
+        self.assertEqual(missing.status_code, 404)
+        self.assertIn("absent.txt", missing.json()["detail"])
+        self.assertEqual(invalid.status_code, 422)
+
+    def test_without_wait_returns_job(self):
+        """Avec wait=false, la réponse 202 désigne la tâche d'analyse soumise"""
+        with TestClient(self.backend.app) as client:
+            response = client.post("/analyze/batch?wait=false", json={"filenames": ["doc1.txt"]})
+            self.assertEqual(response.status_code, 202)
+            job = self.backend.jobs.get(response.json()["job_id"])
+            self.assertIsNotNone(job)
+
+        self.assertEqual(job.kind, "analyze_batch")
+        self.assertEqual(job.params, {"count": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du gestionnaire de tâches asynchrones de l'API
+"""
+
+import unittest
+import sys
+import os
+import time
+import asyncio
+import concurrent.futures
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_jobs import JobManager, QueueFullError, JOB_DONE, JOB_FAILED
+
+
+def make_manager(**kwargs):
+    return JobManager(lambda: concurrent.futures.ThreadPoolExecutor(max_workers=2), **kwargs)
+
+
+class TestJobManager(unittest.TestCase):
+    def test_jobs_run_off_the_event_loop(self):
+        """Les traitements bloquants n'empêchent pas la boucle de répondre"""
+        async def scenario():
+            manager = make_manager(max_concurrent=2)
+
+            async def run(job):
+                job.update(0.5, "Traitement")
+                await manager.run(time.sleep, 0.3)
+                return "ok"
+
+            job = manager.submit("ocr", run)
+            # La boucle reste disponible pendant le traitement
+            started = time.monotonic()
+            await asyncio.sleep(0.01)
+            self.assertLess(time.monotonic() - started, 0.2)
+
+            states = [state["status"] async for state in job.events()]
+            manager.shutdown()
+            return job, states
+
+        job, states = asyncio.run(scenario())
+        self.assertEqual(job.status, JOB_DONE)
+        self.assertEqual(job.result, "ok")
+        self.assertEqual(states[-1], JOB_DONE)
+
+    def test_limits_and_failures(self):
+        """La concurrence et la profondeur de file sont bornées; les erreurs sont conservées"""
+        async def scenario():
+            manager = make_manager(max_concurrent=1, max_queue=2)
+            running = []
+
+            async def run(job):
+                running.append(sum(1 for j in manager.jobs.values() if j.status == "running"))
+                await asyncio.sleep(0.05)
+                if job.params.get("fail"):
+                    raise RuntimeError("Erreur lors de l'extraction du texte de l'image")
+                return job.params
+
+            first = manager.submit("ocr", run, {"fail": True})
+            second = manager.submit("ocr", run)
+            with self.assertRaises(QueueFullError):
+                manager.submit("ocr", run)
+
+            await second.wait(timeout=2)
+            manager.shutdown()
+            return first, second, running
+
+        first, second, running = asyncio.run(scenario())
+        self.assertEqual(max(running), 1)
+        self.assertEqual(first.status, JOB_FAILED)
+        self.assertIn("extraction", first.error)
+        self.assertEqual(second.status, JOB_DONE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du stockage adressé par contenu des fichiers uploadés
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_storage import BlobStore
+from doc_analyzer.utils.result_cache import hash_file
+
+
+class TestBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = BlobStore(os.path.join(self.temp_dir, ".blobs"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _upload(self, content):
+        path = os.path.join(self.temp_dir, "upload.tmp")
+        with open(path, "wb") as f:
+            f.write(content)
+        return path, hash_file(path)
+
+    def test_identical_uploads_share_one_blob(self):
+        """Deux envois identiques sont stockés une seule fois et exposés sous deux noms"""
+        first_path, digest = self._upload(b"scan" * 1000)
+        blob, duplicate = self.store.commit(first_path, digest, "image/png")
+        self.assertFalse(duplicate)
+
+        second_path, same_digest = self._upload(b"scan" * 1000)
+        self.assertEqual(self.store.commit(second_path, same_digest, "image/png"), (blob, True))
+        self.assertFalse(os.path.exists(second_path))
+
+        for name in ("a.png", "b.png"):
+            self.store.link(digest, os.path.join(self.temp_dir, name))
+        with open(os.path.join(self.temp_dir, "b.png"), "rb") as f:
+            self.assertEqual(f.read(), b"scan" * 1000)
+        self.assertEqual(self.store.get_meta(digest)["size"], 4000)
+
+    def test_results_are_reused_by_digest(self):
+        """Un résultat d'extraction est retrouvé par l'empreinte du contenu"""
+        path, digest = self._upload(b"contenu")
+        self.store.commit(path, digest, "text/csv")
+
+        self.assertIsNone(self.store.get_result(digest, "text.csv"))
+        self.store.set_result(digest, "text.csv", "texte extrait")
+        self.assertEqual(self.store.get_result(digest, "text.csv"), "texte extrait")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests des sauvegardes incrémentales dédupliquées
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backup_store import BackupStore
+
+
+class TestBackupStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_dir = os.path.join(self.temp_dir, "data")
+        os.makedirs(os.path.join(self.data_dir, "documents"))
+        self._write("documents/contrat.txt", b"Contrat de prestation\n" * 500)
+        self._write("documents/scan.bin", os.urandom(10000))
+        self._write("config.json", b'{"theme": "dark"}')
+        self.store = BackupStore(os.path.join(self.temp_dir, "store"), chunk_size=4096, workers=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, rel_path, content):
+        with open(os.path.join(self.data_dir, rel_path), "wb") as f:
+            f.write(content)
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_incremental_backup_only_writes_changed_chunks(self):
+        """Une seconde sauvegarde ne relit pas les fichiers inchangés et n'écrit que les nouveaux blocs"""
+        first = self.store.create_snapshot({"data": self.data_dir})
+        self.assertEqual(first["stats"]["files"], 3)
+        self.assertGreater(first["stats"]["stored_bytes"], 0)
+
+        unchanged = self.store.create_snapshot({"data": self.data_dir})
+        self.assertEqual(unchanged["stats"]["reused_files"], 3)
+        self.assertEqual(unchanged["stats"]["stored_bytes"], 0)
+
+        # Seul le dernier bloc du fichier change
+        self._write("documents/contrat.txt", b"Contrat de prestation\n" * 500 + b"Avenant\n")
+        changed = self.store.create_snapshot({"data": self.data_dir})
+        self.assertEqual(changed["stats"]["reused_files"], 2)
+        self.assertEqual(changed["stats"]["new_chunks"], 1)
+
+        # Une sauvegarde complète relit tout mais ne réécrit aucun bloc connu
+        full = self.store.create_snapshot({"data": self.data_dir}, full=True)
+        self.assertEqual(full["type"], "full")
+        self.assertEqual(full["stats"]["reused_files"], 0)
+        self.assertEqual(full["stats"]["stored_bytes"], 0)
+
+    def test_restore_single_file_and_whole_snapshot(self):
+        """Un fichier peut être restauré seul, à son emplacement d'origine ou ailleurs"""
+        original = self._read(os.path.join(self.data_dir, "documents", "scan.bin"))
+        snapshot = self.store.create_snapshot({"data": self.data_dir})
+
+        self._write("documents/scan.bin", b"abime")
+        self._write("config.json", b"{}")
+        restored = self.store.restore(snapshot["id"], paths=["data/documents/scan.bin"])
+        self.assertEqual(len(restored), 1)
+        self.assertEqual(self._read(os.path.join(self.data_dir, "documents", "scan.bin")), original)
+        self.assertEqual(self._read(os.path.join(self.data_dir, "config.json")), b"{}")
+
+        target = os.path.join(self.temp_dir, "restore")
+        restored = self.store.restore(snapshot["path"], destination=target)
+        self.assertEqual(len(restored), 3)
+        self.assertEqual(self._read(os.path.join(target, "data", "config.json")), b'{"theme": "dark"}')
+
+    def test_sqlite_database_is_copied_with_online_backup(self):
+        """Les bases SQLite sont sauvegardées pendant leur utilisation et restaurées à l'identique"""
+        db_path = os.path.join(self.data_dir, "app_data.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE clients (id TEXT PRIMARY KEY, name TEXT)")
+        conn.executemany("INSERT INTO clients VALUES (?, ?)", [(str(i), f"Client {i}") for i in range(200)])
+        conn.commit()
+
+        snapshot = self.store.create_snapshot({"data": self.data_dir}, databases={"app_data.db": conn})
+        # La base n'est pas copiée une seconde fois comme fichier ordinaire
+        self.assertNotIn("data/app_data.db", self.store.load_snapshot(snapshot["id"])["files"])
+
+        conn.execute("DELETE FROM clients")
+        conn.commit()
+        conn.close()
+
+        self.store.restore(snapshot["id"], paths=["app_data.db"])
+        conn = sqlite3.connect(db_path)
+        try:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0], 200)
+        finally:
+            conn.close()
+
+    def test_prune_removes_orphan_chunks(self):
+        """La purge conserve les sauvegardes récentes et libère les blocs qu'elles n'utilisent plus"""
+        first = self.store.create_snapshot({"data": self.data_dir})
+        self._write("documents/scan.bin", os.urandom(10000))
+        second = self.store.create_snapshot({"data": self.data_dir})
+
+        self.assertEqual(self.store.prune(keep=1), 1)
+        self.assertEqual([s["id"] for s in self.store.list_snapshots()], [second["id"]])
+        self.assertIsNone(self.store.load_snapshot(first["id"]))
+
+        # La sauvegarde restante est toujours complète
+        target = os.path.join(self.temp_dir, "restore")
+        self.assertEqual(len(self.store.restore(second["id"], destination=target)), 3)
+        self.assertEqual(self.store.collect_garbage(), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
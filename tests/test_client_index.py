@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'index de clients utilisé par ClientMatcher
+"""
+
+import unittest
+import sys
+import os
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_analyzer.utils.client_index import ClientIndex, ClientMentionIndex, AhoCorasick
+from doc_analyzer.ui.client_matcher import ClientMatcher
+
+
+CLIENTS = [
+    {"id": "1", "name": "Jean Dupont", "email": "jean.dupont@example.com",
+     "phone": "06 12 34 56 78", "company": "Dupont Conseil"},
+    {"id": "2", "name": "Marie Martin", "email": "marie.martin@example.com",
+     "phone": "+33 6 98 76 54 32", "company": "Martin & Fils"},
+    {"id": "3", "name": "Paul Durand", "email": "p.durand@example.com",
+     "phone": "07 11 22 33 44", "company": "Durand SA"},
+]
+
+
+class TestClientIndex(unittest.TestCase):
+    def test_exact_lookup_on_normalized_identifiers(self):
+        """Email et téléphone sont retrouvés après normalisation"""
+        index = ClientIndex(CLIENTS)
+
+        slots = index.find_exact("phone", "0698765432")
+        self.assertEqual([index.clients[s]["id"] for s in slots], ["2"])
+        slots = index.find_exact("email", " JEAN.DUPONT@example.com")
+        self.assertEqual([index.clients[s]["id"] for s in slots], ["1"])
+
+    def test_incremental_updates(self):
+        """Les mises à jour et suppressions sont reportées dans l'index"""
+        index = ClientIndex(CLIENTS)
+        index.update(dict(CLIENTS[0], email="jd@example.org"))
+        index.remove("3")
+
+        self.assertEqual(index.find_exact("email", "jean.dupont@example.com"), [])
+        self.assertEqual(len(index.find_exact("email", "jd@example.org")), 1)
+        self.assertEqual(index.find_exact("phone", "0711223344"), [])
+        self.assertNotIn("3", [index.clients[s]["id"] for s in index.candidates(["paul durand"])])
+
+    def test_update_keeps_slot(self):
+        """Un client mis à jour garde son emplacement et son rang à score égal"""
+        clients = [{"id": "1", "name": "Jean Dupont"}, {"id": "2", "name": "Jean Dupont"}]
+        matcher = ClientMatcher([dict(c) for c in clients])
+        slot = matcher.index._slots_by_id["1"]
+
+        self.assertTrue(matcher.index.update({"id": "1", "name": "Jean Dupont", "phone": "0612345678"}))
+
+        self.assertEqual(matcher.index._slots_by_id["1"], slot)
+        results = matcher.find_matching_clients({"personal_info": {"name": "Jean Dupont"}})
+        self.assertEqual([c["id"] for c, _ in results], ["1", "2"])
+
+    def test_matcher_scores_match_full_scan(self):
+        """Les scores sur la présélection sont identiques au calcul client par client"""
+        matcher = ClientMatcher(list(CLIENTS))
+        data = {"personal_info": {"name": "Jean Dupond", "company": "Dupont Conseil"}}
+
+        identifiers = matcher._extract_identifiers(data)
+        expected = sorted(
+            ((c["id"], matcher._calculate_client_match_score(c, identifiers)) for c in CLIENTS),
+            key=lambda x: x[1], reverse=True
+        )
+        expected = [(cid, round(s, 6)) for cid, s in expected if s >= matcher.match_threshold]
+
+        results = [(c["id"], round(s, 6)) for c, s in matcher.find_matching_clients(data)]
+        self.assertEqual(results, expected)
+
+    def test_last_name_only_is_still_matched(self):
+        """Un nom de famille seul retrouve le client comme le calcul complet"""
+        clients = [{"id": "1", "first_name": "Jean", "last_name": "Dupont"},
+                   {"id": "2", "first_name": "Marie", "last_name": "Martin"}]
+        matcher = ClientMatcher(clients)
+
+        results = matcher.find_matching_clients({"personal_info": {"last_name": "Dupont"}})
+
+        self.assertEqual([(c["id"], round(s, 6)) for c, s in results], [("1", 1.0)])
+
+    def test_near_phone_is_still_matched(self):
+        """Un téléphone à un chiffre près obtient le score partiel du calcul complet"""
+        matcher = ClientMatcher(list(CLIENTS))
+
+        results = matcher.find_matching_clients({"personal_info": {"phone": "0612345679"}})
+
+        self.assertEqual([(c["id"], round(s, 6)) for c, s in results], [("1", 0.9)])
+
+    def test_empty_block_falls_back_to_full_scan(self):
+        """Sans n-gramme commun, tous les clients sont notés comme par le calcul complet"""
+        clients = [{"id": "1", "first_name": "Xy", "last_name": "Wu"}]
+        matcher = ClientMatcher(clients)
+        identifiers = {"first_name": "x"}
+
+        self.assertEqual(matcher.index.candidates(["x"]), [])
+        expected = matcher._calculate_client_match_score(clients[0], identifiers)
+        self.assertGreater(expected, 0)
+        self.assertEqual(matcher._score_candidates(identifiers), [(clients[0], expected)])
+
+class TestClientMentionIndex(unittest.TestCase):
+    def test_automaton_finds_overlapping_patterns(self):
+        """L'automate trouve les motifs imbriqués ou qui se chevauchent"""
+        automaton = AhoCorasick()
+        for pattern in ("he", "she", "his", "hers"):
+            automaton.add(pattern, pattern)
+        automaton.remove("his", "his")
+
+        self.assertEqual(set(automaton.find("ushers")), {"he", "she", "hers"})
+
+    def test_removed_patterns_are_pruned(self):
+        """Le trie est reconstruit sans les nœuds des motifs retirés"""
+        automaton = AhoCorasick(prune_after=3)
+        automaton.add("dupont", 1)
+        for index in range(3):
+            automaton.add(f"martin{index}", index)
+        grown = automaton.node_count
+        for index in range(3):
+            automaton.remove(f"martin{index}", index)
+
+        self.assertLess(automaton.node_count, grown)
+        self.assertEqual(automaton.node_count, len("dupont") + 1)
+        self.assertEqual(automaton.find("m. dupont et martin0"), {"dupont": {1}})
+
+    def test_sync_is_skipped_for_same_version(self):
+        """Une même liste à la même version n'est pas reparcourue"""
+        clients = [dict(c) for c in CLIENTS]
+        index = ClientMentionIndex()
+        index.sync(clients, version=1)
+
+        clients[0]["name"] = "Jacques Durand"
+        index.sync(clients, version=1)
+        self.assertEqual([c["id"] for c, _ in index.find_matches("Jean Dupont")], ["1"])
+
+        index.sync(clients, version=2)
+        self.assertEqual(index.find_matches("Jean Dupont"), [])
+
+    def test_mentions_are_scored_and_synced(self):
+        """Les mentions sont notées comme avant et l'index suit les modifications"""
+        clients = [dict(c) for c in CLIENTS]
+        index = ClientMentionIndex(clients)
+        text = ("Entre Jean Dupont (jean.dupont@example.com) et la société Durand SA, "
+                "joignable au 07.11.22.33.44.")
+
+        results = [(c["id"], s) for c, s in index.find_matches(text)]
+        self.assertEqual(results, [("1", 8), ("3", 6)])
+
+        clients[0]["name"] = "Jean-Pierre Dupont"
+        del clients[2]
+        index.sync(clients)
+        self.assertEqual([(c["id"], s) for c, s in index.find_matches(text)], [("1", 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
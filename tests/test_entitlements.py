@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du service de droits d'accès partagé (fichiers sensibles déchiffrés une
+seule fois, décisions d'accès en cache, compteur d'utilisation en écriture différée)
+"""
+
+import unittest
+import sys
+import os
+import time
+import shutil
+import tempfile
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.entitlements import EntitlementService, ENTITLEMENT_CONFIG, get_entitlement_service
+from utils.usage_tracker import UsageTracker
+from models.license_model import LicenseModel
+
+
+class CountingService(EntitlementService):
+    """Service qui compte les lectures et écritures chiffrées"""
+
+    def __init__(self, data_dir):
+        super().__init__(data_dir)
+        self.reads = []
+        self.writes = []
+        secure_files = self.secure_files
+        read, write = secure_files.read_secure_file, secure_files.write_secure_file
+
+        def counting_read(filename):
+            self.reads.append(filename)
+            return read(filename)
+
+        def counting_write(filename, data):
+            self.writes.append(filename)
+            return write(filename, data)
+
+        secure_files.read_secure_file = counting_read
+        secure_files.write_secure_file = counting_write
+
+
+class TestEntitlementService(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.service = CountingService(self.temp_dir)
+        self.service.save_user_data({"email": "a@example.com", "license_valid": True})
+        self.service.write_file("current_user.json", {"email": "a@example.com"})
+        self.service.reads.clear()
+
+    def tearDown(self):
+        self.service.flush()
+        shutil.rmtree(self.temp_dir)
+
+    def test_files_are_decrypted_once(self):
+        """Les données de l'utilisateur ne sont déchiffrées qu'une fois tant que les fichiers ne changent pas"""
+        for _ in range(10):
+            self.assertTrue(self.service.current_user_data()["license_valid"])
+        self.assertEqual(self.service.reads, [])
+
+        # Modification par un autre composant: le fichier est relu
+        time.sleep(0.01)
+        self.service.secure_files.write_secure_file("users.json", {"a@example.com": {"license_valid": False}})
+        self.assertFalse(self.service.current_user_data()["license_valid"])
+        self.assertEqual(self.service.reads, ["users.json"])
+
+    def test_decisions_are_cached_until_invalidated(self):
+        """Une décision est réutilisée jusqu'à son expiration ou à la modification d'un utilisateur"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return True
+
+        for _ in range(5):
+            self.assertTrue(self.service.decision(("license", "a@example.com", None), compute))
+        self.assertEqual(len(calls), 1)
+
+        self.service.save_user_data({"email": "a@example.com", "license_valid": False})
+        self.service.decision(("license", "a@example.com", None), compute)
+        self.assertEqual(len(calls), 2)
+
+        self.service.decision(("short", None), compute, ttl=0)
+        self.service.decision(("short", None), compute, ttl=0)
+        self.assertEqual(len(calls), 4)
+
+    def test_decision_computed_on_stale_state_is_not_kept(self):
+        """Une décision calculée pendant une invalidation n'est pas conservée"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            if len(calls) == 1:
+                self.service.invalidate()
+            return len(calls)
+
+        self.assertEqual(self.service.decision("key", compute), 1)
+        self.assertEqual(self.service.decision("key", compute), 2)
+        self.assertEqual(self.service.decision("key", compute), 2)
+
+    def test_usage_counter_is_written_behind(self):
+        """Le compteur d'utilisation est écrit une seule fois après une rafale d'incréments"""
+        self.service.writes.clear()
+        for _ in range(50):
+            self.service.increment_usage()
+        self.assertEqual(self.service.usage_count, 50)
+        self.assertEqual(self.service.writes, [])
+
+        self.service.flush()
+        self.assertEqual(self.service.writes, ["usage_count.json"])
+        self.assertEqual(EntitlementService(self.temp_dir).usage_count, 50)
+
+    def test_usage_counter_flushes_after_delay(self):
+        """Sans appel explicite, le compteur est écrit après le délai configuré"""
+        delay = ENTITLEMENT_CONFIG["flush_delay"]
+        ENTITLEMENT_CONFIG["flush_delay"] = 0.05
+        try:
+            self.service.writes.clear()
+            self.service.increment_usage()
+            time.sleep(0.3)
+            self.assertEqual(self.service.writes, ["usage_count.json"])
+        finally:
+            ENTITLEMENT_CONFIG["flush_delay"] = delay
+
+    def test_license_changes_invalidate_decisions(self):
+        """La création d'une licence invalide les décisions de tous les services"""
+        service = get_entitlement_service(self.temp_dir)
+        calls = []
+        service.decision("feature", lambda: calls.append(1))
+        service.decision("feature", lambda: calls.append(1))
+        self.assertEqual(len(calls), 1)
+
+        LicenseModel(self.temp_dir).create_license("a@example.com", "pro")
+        service.decision("feature", lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+
+
+class TestCurrentUserRemoval(unittest.TestCase):
+    def setUp(self):
+        # UsageTracker travaille dans le répertoire "data" du répertoire courant
+        self.previous_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        self.tracker = UsageTracker()
+        self.tracker.entitlements.save_user_data({"email": "a@example.com", "license_valid": True})
+        self.tracker.set_current_user({"email": "a@example.com"})
+        self.tracker.entitlements.write_file("session.json", {"email": "a@example.com", "remember_me": True})
+        self.assertEqual(self.tracker.get_user_data()["email"], "a@example.com")
+
+    def tearDown(self):
+        self.tracker.entitlements.flush()
+        os.chdir(self.previous_cwd)
+        shutil.rmtree(self.temp_dir)
+
+    def assert_no_current_user(self):
+        self.assertEqual(self.tracker.get_user_data(), {})
+        self.assertEqual(EntitlementService("data").current_user_data(), {})
+        self.assertEqual([name for name in os.listdir("data") if "current_user" in name], [])
+
+    def test_logout_removes_current_user(self):
+        """Après la déconnexion, ni le service partagé ni un nouveau service ne voient d'utilisateur"""
+        self.tracker.current_user = "a@example.com"
+        self.assertTrue(self.tracker.logout())
+        self.assert_no_current_user()
+        self.assertEqual(self.tracker.entitlements.read_file("session.json"), {})
+        self.assertNotIn(".session.json", os.listdir("data"))
+
+    def test_clear_current_user(self):
+        """clear_current_user supprime le fichier masqué et oublie son contenu en cache"""
+        self.assertTrue(self.tracker.clear_current_user())
+        self.assert_no_current_user()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du moteur d'extraction en une passe
+"""
+
+import unittest
+import sys
+import os
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_analyzer.config import EXTRACTION_ROUTES
+from doc_analyzer.extractors.engine import ExtractionEngine, PreparedDocument
+from doc_analyzer.extractors.personal_data import PersonalDataExtractor
+
+
+class RecordingExtractor:
+    """Extracteur factice qui enregistre ses appels"""
+
+    def __init__(self):
+        self.calls = []
+
+    def extract(self, text, preprocessed=False):
+        self.calls.append((text, preprocessed))
+        return {"length": len(text)}
+
+
+class TestExtractionEngine(unittest.TestCase):
+    def setUp(self):
+        self.extractors = {name: RecordingExtractor() for name in
+                           ("personal_data", "identity_docs", "business_docs")}
+        self.routes = {
+            "personal_data": {"document_types": None, "sections": None, "view": "raw"},
+            "identity_docs": {"document_types": ["formulaire"], "sections": ["header"],
+                              "view": "processed"},
+            "business_docs": {"document_types": ["facture"], "sections": None,
+                              "view": "collapsed"}
+        }
+        self.engine = ExtractionEngine(
+            {name: (lambda e=e: e) for name, e in self.extractors.items()},
+            routes=self.routes
+        )
+
+    def test_skips_extractors_for_document_type(self):
+        """Une facture ne passe pas par l'extracteur d'identité"""
+        doc = PreparedDocument("FACTURE N° F2024-001\nTotal   HT: 100 €")
+        doc._structure = {"document_type": "facture"}
+
+        results = self.engine.run(doc)
+
+        self.assertEqual(results["_skipped"], ["identity_docs"])
+        self.assertEqual(self.extractors["identity_docs"].calls, [])
+        self.assertEqual(self.extractors["business_docs"].calls,
+                         [("FACTURE N° F2024-001 Total HT: 100 €", True)])
+        self.assertEqual(self.extractors["personal_data"].calls[0][1], False)
+
+    def test_general_documents_run_every_extractor(self):
+        """Un type indéterminé n'écarte aucun extracteur"""
+        doc = PreparedDocument("Texte quelconque")
+        doc._structure = {"document_type": "document_general"}
+
+        results = self.engine.run(doc)
+
+        self.assertEqual(results["_skipped"], [])
+        for extractor in self.extractors.values():
+            self.assertEqual(len(extractor.calls), 1)
+
+    def test_section_routing_only_for_long_documents(self):
+        """Le routage par section ne s'applique qu'aux documents longs"""
+        text = "\n".join(f"ligne {i}" for i in range(40))
+        short_doc = PreparedDocument(text, section_routing_min_chars=len(text) + 1)
+        long_doc = PreparedDocument(text, section_routing_min_chars=1)
+
+        self.assertEqual(short_doc.view("raw", ["header"]), text)
+        self.assertEqual(long_doc.view("raw", ["header"]), long_doc.sections["header"])
+        self.assertIs(long_doc.view("collapsed"), long_doc.view("collapsed"))
+
+    def test_extractor_errors_are_isolated(self):
+        """L'échec d'un extracteur n'empêche pas les autres"""
+        def failing():
+            raise RuntimeError("boom")
+
+        engine = ExtractionEngine(
+            {"identity_docs": failing, "personal_data": lambda: self.extractors["personal_data"]},
+            routes=self.routes
+        )
+        doc = PreparedDocument("CARTE NATIONALE D'IDENTITÉ")
+        doc._structure = {"document_type": "formulaire"}
+
+        results = engine.run(doc)
+
+        self.assertIsNone(results["identity_docs"])
+        self.assertEqual(results["personal_data"], {"length": len(doc.text)})
+
+    def test_contracts_reach_identity_extractor(self):
+        """Les contrats conservent l'extraction des pièces d'identité des parties"""
+        engine = ExtractionEngine({})
+        self.assertTrue(engine.is_applicable("identity_docs", "contrat"))
+
+    def test_personal_data_is_not_renormalized(self):
+        """Les données personnelles reçoivent le texte déjà normalisé"""
+        self.assertEqual(EXTRACTION_ROUTES["personal_data"]["view"], "sanitized")
+        doc = PreparedDocument("M. Jean  «DUPONT»\nTél: 06 12 34 56 78")
+        extractor = PersonalDataExtractor()
+        calls = []
+        extractor._preprocess_text = lambda text: calls.append(text) or text
+
+        engine = ExtractionEngine({"personal_data": lambda: extractor},
+                                  routes={"personal_data": EXTRACTION_ROUTES["personal_data"]})
+        doc._structure = {"document_type": "lettre"}
+        results = engine.run(doc)
+
+        self.assertEqual(calls, [])
+        self.assertEqual(doc.view("sanitized"), "M. Jean DUPONT Tél: 06 12 34 56 78")
+        baseline = PersonalDataExtractor().extract(doc.text)
+        for key in ("identity", "contact", "ids"):
+            self.assertEqual(results["personal_data"][key], baseline[key])
+
+if __name__ == '__main__':
+    unittest.main()
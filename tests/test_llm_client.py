@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du client partagé de l'API Ollama (serveur Ollama simulé en local)
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.llm_client import LLMClient, ConfigFile, api_base_from_url
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Répond comme Ollama et compte les requêtes et les connexions"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path == "/api/version":
+            self._reply(200, {"version": "0.1.test"})
+        elif self.path == "/api/tags":
+            self._reply(200, {"models": [{"name": "llama3:latest"}]})
+        else:
+            self._reply(404, {})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(self.path)
+        if self.path == "/api/show":
+            self._reply(200 if payload["name"] == "llama3" else 404, {"name": payload["name"]})
+        elif self.path == "/api/generate":
+            self._reply(200, {"response": f" écho: {payload['prompt']} "})
+        else:
+            self._reply(404, {})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestLLMClient(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+        self.server.requests = []
+        self.server.connections = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = LLMClient(f"http://127.0.0.1:{self.server.server_port}/api",
+                                cache_path=os.path.join(self.temp_dir, "responses.db"))
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_requests_reuse_one_connection(self):
+        """Les appels successifs passent par la même connexion keep-alive"""
+        for i in range(5):
+            self.assertEqual(self.client.generate(f"question {i}", "llama3"), f"écho: question {i}")
+        self.assertEqual(self.server.connections, 1)
+
+    def test_model_check_is_cached(self):
+        """La disponibilité d'un modèle n'est vérifiée qu'une fois pendant sa durée de validité"""
+        self.assertEqual(self.client.server_version(), "0.1.test")
+        for _ in range(3):
+            self.assertTrue(self.client.model_available("llama3"))
+            self.assertFalse(self.client.model_available("mistral"))
+        self.assertEqual(self.server.requests.count("/api/show"), 2)
+
+        self.client.model_available("llama3", refresh=True)
+        self.assertEqual(self.server.requests.count("/api/show"), 3)
+
+    def test_response_cache_is_persistent_and_exact(self):
+        """Un prompt identique est servi depuis le cache, y compris par un nouveau client"""
+        options = {"temperature": 0.1}
+        self.client.generate("NOM: ?", "llama3", options, cache=True)
+        self.client.generate("NOM: ?", "llama3", options, cache=True)
+        self.assertEqual(self.server.requests.count("/api/generate"), 1)
+
+        # Options différentes: pas de correspondance exacte
+        self.client.generate("NOM: ?", "llama3", {"temperature": 0.5}, cache=True)
+        self.assertEqual(self.server.requests.count("/api/generate"), 2)
+
+        other = LLMClient(self.client.api_base, cache_path=os.path.join(self.temp_dir, "responses.db"))
+        try:
+            self.assertEqual(other.generate("NOM: ?", "llama3", options, cache=True), "écho: NOM: ?")
+        finally:
+            other.close()
+        self.assertEqual(self.server.requests.count("/api/generate"), 2)
+
+        # Taille bornée: seules les entrées les plus récentes sont conservées
+        cache = self.client.response_cache
+        cache.max_entries = 2
+        for i in range(4):
+            self.client.generate(f"prompt {i}", "llama3", cache=True)
+        self.assertEqual(cache.count(), 2)
+
+    def test_config_file_reloads_only_when_changed(self):
+        """La configuration n'est relue que lorsque son fichier est modifié"""
+        path = os.path.join(self.temp_dir, "ai_config.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"model": "llama3"}, f)
+        reads = []
+
+        def loader():
+            reads.append(path)
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        config = ConfigFile(path, loader)
+        for _ in range(3):
+            self.assertEqual(config.get()["model"], "llama3")
+        self.assertEqual(len(reads), 1)
+
+        time.sleep(0.01)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"model": "mistral"}, f)
+        self.assertEqual(config.get()["model"], "mistral")
+        self.assertEqual(len(reads), 2)
+
+    def test_api_base_from_url(self):
+        """La racine de l'API est déduite de l'URL configurée"""
+        self.assertEqual(api_base_from_url("http://localhost:11434/api/generate"), "http://localhost:11434/api")
+        self.assertEqual(api_base_from_url("http://localhost:11434/api/"), "http://localhost:11434/api")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'index de recherche des journaux
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admin.models.admin_db import AdminDatabase
+from admin.models.log_index import LogIndex, DATABASE_ORIGIN, parse_log_line
+
+
+def sqlite3_has_fts5():
+    """Indique si SQLite a été compilé avec FTS5"""
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = AdminDatabase(os.path.join(self.temp_dir, "admin.db"))
+        self.index = LogIndex(self.db)
+        self.log_file = os.path.join(self.temp_dir, "app.log")
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _append(self, text, path=None):
+        with open(path or self.log_file, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_parse_standard_line(self):
+        """Les lignes au format de l'application sont décomposées"""
+        timestamp, level, source = parse_log_line(
+            "2024-05-01 10:00:00,123 - VynalDocsAutomator.Admin - ERROR - Échec de connexion")
+        self.assertEqual(timestamp, "2024-05-01T10:00:00.123000")
+        self.assertEqual(level, "ERROR")
+        self.assertEqual(source, "VynalDocsAutomator.Admin")
+
+    def test_incremental_file_indexing(self):
+        """Seules les lignes complètes ajoutées depuis la dernière lecture sont indexées"""
+        self._append("2024-05-01 10:00:00,000 - App - ERROR - Échec de connexion\n"
+                     "Traceback (most recent call last):\n"
+                     "2024-05-01 10:05:00,000 - App - INFO - Connexion rét")
+        origin_id = self.index.sync_file(self.log_file)
+        self.assertEqual(self.index.facets(origin_id=origin_id)["total"], 2)
+
+        # La ligne de continuation hérite du niveau de l'entrée précédente
+        errors = self.index.search(level="ERROR", origin_id=origin_id)["entries"]
+        self.assertEqual(len(errors), 2)
+
+        self._append("ablie\n")
+        self.assertEqual(self.index.sync_file(self.log_file), origin_id)
+        entries = self.index.search(query="retablie", origin_id=origin_id)["entries"]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["level"], "INFO")
+
+    def test_rotation_keeps_entries(self):
+        """Un fichier renommé par la rotation n'est pas réindexé"""
+        self._append("2024-05-01 10:00:00,000 - App - INFO - ancien\n")
+        first = self.index.sync_file(self.log_file)
+        os.rename(self.log_file, self.log_file + ".1")
+        self._append("2024-05-02 10:00:00,000 - App - INFO - nouveau\n")
+
+        second = self.index.sync_file(self.log_file)
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.index.sync_file(self.log_file + ".1"), first)
+        self.assertEqual(self.index.facets()["total"], 2)
+
+        os.remove(self.log_file + ".1")
+        self.assertEqual(self.index.remove_missing_files(), 1)
+        self.assertEqual(self.index.facets()["total"], 1)
+
+    def test_file_search_facets_and_pagination(self):
+        """Recherche classée, facettes et pagination par clé sur un fichier de log"""
+        for i in range(25):
+            level = "ERROR" if i % 5 == 0 else "INFO"
+            suffix = " disque plein" if i % 5 == 0 else ""
+            self._append(f"2024-05-01 10:{i:02d}:00,000 - module{i % 2} - {level} - Document {i} traité{suffix}\n")
+        origin_id = self.index.sync_file(self.log_file)
+
+        ranked = self.index.search(query="disque", order="rank", origin_id=origin_id)["entries"]
+        self.assertEqual(len(ranked), 5)
+
+        facets = self.index.facets(query="document", level="ERROR")
+        self.assertEqual(facets["level"], {"INFO": 20, "ERROR": 5})
+        self.assertEqual(facets["total"], 5)
+
+        seen, cursor = [], None
+        while True:
+            page = self.index.search(source="module0", limit=4, cursor=cursor)
+            seen.extend(entry["ref"] for entry in page["entries"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 13)
+        self.assertEqual(len(set(seen)), 13)
+
+    @unittest.skipUnless(sqlite3_has_fts5(), "SQLite compilé sans FTS5")
+    def test_database_logs_are_searched_in_place(self):
+        """system_logs est indexé par déclencheurs, sans copie; les mots sont cherchés par préfixe"""
+        self.db.add_log("ERROR", "auth", "Connexion refusée", "mot de passe erroné")
+        self.db.add_log("INFO", "auth", "Déconnexion de l'utilisateur")
+        self.db.add_log("INFO", "docs", "Document généré")
+
+        found = self.index.search_database("connex")["entries"]
+        self.assertEqual([log["message"] for log in found], ["Connexion refusée"])
+        self.assertEqual(len(self.index.search_database("erro", source="auth")["entries"]), 1)
+        self.assertEqual(self.index.search_database("connex", level="INFO")["entries"], [])
+        self.assertEqual(self.db.fetch_value("SELECT COUNT(*) FROM log_entries"), 0)
+
+        # Les journaux supprimés quittent l'index
+        self.db.execute("DELETE FROM system_logs WHERE source = ?", ("auth",))
+        self.assertEqual(self.index.search_database("connex")["entries"], [])
+        self.assertEqual(len(self.index.search_database("document")["entries"]), 1)
+
+    @unittest.skipUnless(sqlite3_has_fts5(), "SQLite compilé sans FTS5")
+    def test_database_rank_facets_and_pagination(self):
+        """system_logs a la même recherche classée, les mêmes facettes et la même pagination que les fichiers"""
+        for i in range(25):
+            level = "ERROR" if i % 5 == 0 else "INFO"
+            details = "disque plein, disque saturé" if i == 10 else ("disque plein" if i % 5 == 0 else None)
+            self.db.add_log(level, f"module{i % 2}", f"Document {i} traité", details)
+
+        ranked = self.index.search_database("disque", order="rank")["entries"]
+        self.assertEqual(len(ranked), 5)
+        self.assertEqual(ranked[0]["message"], "Document 10 traité")
+        self.assertEqual([entry["score"] for entry in ranked], sorted(entry["score"] for entry in ranked))
+
+        facets = self.index.facets_database(query="document", level="ERROR")
+        self.assertEqual(facets["level"], {"INFO": 20, "ERROR": 5})
+        self.assertEqual(facets["source"], {"module0": 3, "module1": 2})
+        self.assertEqual(facets["total"], 5)
+
+        for order in ("rank", "recent"):
+            seen, cursor = [], None
+            while True:
+                page = self.index.search_database("document", source="module0", order=order,
+                                                  limit=4, cursor=cursor)
+                seen.extend(entry["id"] for entry in page["entries"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            self.assertEqual(len(seen), 13)
+            self.assertEqual(len(set(seen)), 13)
+
+    @unittest.skipUnless(sqlite3_has_fts5(), "SQLite compilé sans FTS5")
+    def test_existing_logs_indexed_in_background_batches(self):
+        """Les journaux antérieurs à l'index sont indexés par lots hors du constructeur; l'ancienne copie est supprimée"""
+        db = AdminDatabase(os.path.join(self.temp_dir, "ancienne.db"))
+        self.addCleanup(db.close)
+        for i in range(7):
+            db.add_log("WARNING", "backup", f"Sauvegarde {i} incomplète")
+        db.flush()
+        with db.connection() as conn, conn:
+            conn.execute("CREATE TABLE log_origins (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "fingerprint TEXT NOT NULL UNIQUE, path TEXT, position INTEGER NOT NULL DEFAULT 0, "
+                         "last_timestamp TEXT, last_level TEXT, last_source TEXT, updated_at TEXT)")
+            conn.execute("INSERT INTO log_origins (fingerprint) VALUES (?)", (DATABASE_ORIGIN,))
+
+        index = LogIndex(db)
+        with db.connection() as conn, conn:
+            conn.execute("INSERT INTO log_entries (origin_id, ref, timestamp, message) "
+                         "SELECT id, 1, '2024-05-01', 'copie' FROM log_origins WHERE fingerprint = ?",
+                         (DATABASE_ORIGIN,))
+        self.assertFalse(index.database_index_ready)
+        # Avant l'indexation, la recherche reste complète (LIKE) et les modifications sont sûres
+        self.assertEqual(len(index.search_database("Sauvegarde")["entries"]), 7)
+        db.execute("DELETE FROM system_logs WHERE message = ?", ("Sauvegarde 3 incomplète",))
+        db.add_log("ERROR", "backup", "Sauvegarde échouée")
+
+        self.assertEqual(index.build_database_index(batch_size=2), 6)
+        self.assertTrue(index.database_index_ready)
+        self.assertEqual(len(index.search_database("sauvegarde", order="rank")["entries"]), 7)
+        self.assertEqual(db.fetch_value("SELECT COUNT(*) FROM log_entries"), 0)
+        self.assertIsNone(db.fetch_value("SELECT id FROM log_origins WHERE fingerprint = ?", (DATABASE_ORIGIN,)))
+        db.execute("INSERT INTO system_logs_fts(system_logs_fts) VALUES ('integrity-check')")
+        self.assertEqual(index.build_database_index(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du publipostage (génération de documents par lot)
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import zipfile
+import concurrent.futures
+from unittest.mock import patch
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import mail_merge
+from utils.document_generator import DocumentGenerator
+from utils.mail_merge import generate_batch, rows_from_csv, split_row
+
+
+class StaticConfig:
+    """Configuration minimale (picklable) exposant get() comme ConfigManager"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+class InProcessPool(concurrent.futures.ThreadPoolExecutor):
+    """Remplace le pool de processus en exécutant l'initialiseur dans le processus courant"""
+
+    initargs = None
+
+    def __init__(self, max_workers, initializer, initargs):
+        super().__init__(max_workers=max_workers)
+        InProcessPool.initargs = initargs
+        initializer(*initargs)
+
+
+TEMPLATE = {"id": "tpl-1", "name": "Relance", "type": "relance",
+            "content": "Bonjour {{client_name}}, votre facture {ref} est due."}
+COMPANY = {"name": "Vynal"}
+
+
+class TestMailMerge(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_csv_rows(self):
+        """Le séparateur est détecté et les colonnes client sont reconnues"""
+        csv_path = os.path.join(self.temp_dir, "clients.csv")
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("client_name;email;ref\nJean Dupont;jd@example.com;F-01\n;;\nMarie Martin;mm@example.com;F-02\n")
+
+        rows = list(rows_from_csv(csv_path))
+        self.assertEqual(len(rows), 2)
+
+        client, variables = split_row(rows[0])
+        self.assertEqual(client, {"name": "Jean Dupont", "email": "jd@example.com"})
+        self.assertEqual(variables["ref"], "F-01")
+
+    def test_batch_to_directory_reports_failures(self):
+        """Chaque ligne produit un document; une ligne invalide est reportée sans arrêter le lot"""
+        rows = [{"name": "Jean Dupont", "ref": "F-01"}, None, {"name": "Marie Martin", "ref": "F-02"}]
+        progress = []
+
+        report = generate_batch(TEMPLATE, rows, self.temp_dir, COMPANY, format_type="txt",
+                                backend="thread", max_workers=2, filename_pattern="{index}_{client_name}",
+                                progress_callback=lambda done, total, entry: progress.append((done, total)))
+
+        self.assertEqual((report["total"], report["succeeded"], report["failed"]), (3, 2, 1))
+        self.assertEqual(report["failures"][0]["index"], 2)
+        self.assertEqual([d["file"] for d in report["documents"]], ["1_Jean_Dupont.txt", "3_Marie_Martin.txt"])
+        self.assertEqual(progress[-1], (3, 3))
+
+        with open(os.path.join(self.temp_dir, "3_Marie_Martin.txt"), 'r', encoding='utf-8') as f:
+            self.assertIn("Bonjour Marie Martin, votre facture F-02 est due.", f.read())
+
+    def test_batch_to_zip_with_processes(self):
+        """Les documents générés par le pool de processus sont ajoutés à l'archive"""
+        archive_path = os.path.join(self.temp_dir, "lot.zip")
+        rows = ({"name": f"Client {i}", "ref": f"F-{i}"} for i in range(5))
+
+        report = generate_batch(TEMPLATE, rows, archive_path, COMPANY, format_type="txt",
+                                backend="process", max_workers=2)
+
+        self.assertEqual(report["succeeded"], 5)
+        with zipfile.ZipFile(archive_path) as archive:
+            self.assertEqual(sorted(archive.namelist()), sorted(d["file"] for d in report["documents"]))
+            content = archive.read(report["documents"][3]["file"]).decode("utf-8")
+            self.assertIn("Bonjour Client 3, votre facture F-3 est due.", content)
+
+    def test_process_workers_use_caller_config(self):
+        """Les workers construisent leur générateur avec la configuration de l'appelant"""
+        config = StaticConfig({"document.default_format": "txt"})
+
+        with patch.object(mail_merge.concurrent.futures, "ProcessPoolExecutor", InProcessPool):
+            report = generate_batch(TEMPLATE, [{"name": "Jean Dupont", "ref": "F-01"}], self.temp_dir,
+                                    COMPANY, generator=DocumentGenerator(config), max_workers=1)
+
+        self.assertIs(InProcessPool.initargs[1], config)
+        self.assertIs(mail_merge._worker_state[0].config, config)
+        self.assertTrue(report["documents"][0]["file"].endswith(".txt"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests des agrégats de métriques
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monitoring.rollups import MetricRollups, SQLiteConnection, percentile, _bin
+
+
+class TestMetricRollups(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.connection = SQLiteConnection(os.path.join(self.temp_dir, "metrics.db"))
+        self.rollups = MetricRollups(self.connection, name="test")
+
+    def tearDown(self):
+        self.connection.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_aggregates_per_resolution(self):
+        """Chaque relevé met à jour les agrégats minute, heure et jour"""
+        start = datetime(2024, 5, 1, 10, 0, 0)
+        for i in range(120):
+            self.rollups.add(start + timedelta(seconds=30 * i), {"cpu": float(i), "disk": None})
+
+        minutes = self.rollups.series(["cpu"], "minute", start, start + timedelta(hours=1))
+        self.assertEqual(len(minutes), 60)
+        self.assertEqual(minutes[0]["cpu"], 0.5)
+        self.assertEqual(minutes[0]["cpu_count"], 2)
+
+        hours = self.rollups.series(["cpu", "disk"], "hour", start, start + timedelta(days=1))
+        self.assertEqual(len(hours), 1)
+        self.assertEqual(hours[0]["cpu_min"], 0)
+        self.assertEqual(hours[0]["cpu_max"], 119)
+        self.assertAlmostEqual(hours[0]["cpu"], 59.5)
+        self.assertAlmostEqual(hours[0]["cpu_p95"], 113, delta=113 * 0.02)
+        self.assertNotIn("disk", hours[0])
+
+    def test_batch_matches_incremental(self):
+        """L'agrégation par lot donne le même résultat que relevé par relevé"""
+        start = datetime(2024, 5, 1, 10, 0, 0)
+        samples = [(start + timedelta(minutes=7 * i), {"cpu": (i * 37) % 100}) for i in range(50)]
+        other = MetricRollups(self.connection, name="batch")
+        for timestamp, values in samples:
+            self.rollups.add(timestamp, values)
+        self.assertEqual(other.add_many(samples), 50)
+
+        for resolution in ("minute", "hour", "day"):
+            self.assertEqual(self.rollups.series(["cpu"], resolution, start),
+                             other.series(["cpu"], resolution, start))
+
+    def test_percentile_and_retention(self):
+        """Percentiles approchés et suppression des agrégats expirés"""
+        histogram = {}
+        for value in range(1, 101):
+            key = _bin(float(value))
+            histogram[key] = histogram.get(key, 0) + 1
+        self.assertAlmostEqual(percentile(histogram, 0.95), 95, delta=95 * 0.02)
+
+        now = datetime.now()
+        self.rollups.add(now - timedelta(days=10), {"cpu": 1.0})
+        self.rollups.add(now, {"cpu": 2.0})
+        # Les minutes et heures anciennes expirent, le jour reste
+        self.assertEqual(self.rollups.apply_retention(now), 1)
+        self.assertEqual(len(self.rollups.series(["cpu"], "day", now - timedelta(days=11))), 2)
+
+    def test_backfill_in_batches_skips_expired_buckets(self):
+        """Les relevés antérieurs sont agrégés par lots, sans les minutes expirées, et reprennent après arrêt"""
+        now = datetime.now()
+        samples = [(i + 1, now - timedelta(days=5) + timedelta(hours=i), {"cpu": float(i)}) for i in range(6)]
+        samples += [(7, now, {"cpu": 10.0})]
+
+        self.assertEqual(self.rollups.backfill_range(7), (0, 7))
+        self.assertEqual(self.rollups.backfill([samples[:3]], now=now), 3)
+        self.assertEqual(self.rollups.backfill_range(99), (3, 7))
+        self.rollups.backfill([samples[3:6], samples[6:]], now=now)
+        self.assertIsNone(self.rollups.backfill_range(99))
+
+        minutes = self.rollups.series(["cpu"], "minute", now - timedelta(days=6))
+        self.assertEqual([point["cpu"] for point in minutes], [10.0])
+        hours = self.rollups.series(["cpu"], "hour", now - timedelta(days=6))
+        self.assertEqual(len(hours), 7)
+
+    def test_existing_rollups_are_not_backfilled(self):
+        """Des agrégats déjà présents ne sont pas recalculés à partir des relevés"""
+        self.rollups.add(datetime.now(), {"cpu": 1.0})
+        self.assertIsNone(self.rollups.backfill_range(10))
+
+    def test_trend(self):
+        """La tendance suit l'évolution des moyennes horaires"""
+        now = datetime.now()
+        for hour in range(12):
+            self.rollups.add(now - timedelta(hours=11 - hour), {"memory": 10.0 + 5 * hour, "cpu": 50.0})
+        self.assertEqual(self.rollups.trend("memory")["trend"], "increasing")
+        self.assertEqual(self.rollups.trend("cpu")["trend"], "stable")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du service NLP partagé
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_analyzer.utils import nlp_service
+from doc_analyzer.config import NLP_CONFIG
+
+
+class TestNLPService(unittest.TestCase):
+    def setUp(self):
+        nlp_service._model = None
+
+    def tearDown(self):
+        nlp_service._model = None
+
+    def test_model_loaded_once_and_shared(self):
+        """Le modèle est chargé au premier usage puis partagé par tous les appels"""
+        model = MagicMock()
+        with patch.object(nlp_service, "SPACY_AVAILABLE", True), \
+                patch.object(nlp_service, "_load_model", return_value=model) as load:
+            nlp_service.nlp("Jean Dupont habite à Paris")
+            nlp_service.nlp("Marie Martin")
+            self.assertIs(nlp_service.get_nlp(), model)
+            self.assertEqual(load.call_count, 1)
+            self.assertEqual(model.call_count, 2)
+
+    def test_pipe_uses_configured_batches(self):
+        """Les traitements par lot passent par nlp.pipe avec la configuration"""
+        model = MagicMock()
+        model.pipe.return_value = iter(["doc1", "doc2"])
+        with patch.object(nlp_service, "SPACY_AVAILABLE", True), \
+                patch.object(nlp_service, "_load_model", return_value=model):
+            docs = list(nlp_service.nlp.pipe(["a", "b"]))
+
+        self.assertEqual(docs, ["doc1", "doc2"])
+        model.pipe.assert_called_once_with(["a", "b"], batch_size=NLP_CONFIG["batch_size"],
+                                           n_process=NLP_CONFIG["n_process"])
+
+
+if __name__ == '__main__':
+    unittest.main()
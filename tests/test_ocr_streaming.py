@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'OCR des PDF page par page
+"""
+
+import unittest
+import sys
+import os
+import time
+import tempfile
+import threading
+from unittest.mock import patch
+
+import numpy as np
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_analyzer.utils import ocr
+
+
+class FakeRenderer:
+    """Rendu factice qui enregistre les pages rendues et la concurrence maximale"""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.rendered = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def render(self, pdf_path, page_number, dpi=ocr.PDF_OCR_DPI):
+        with self.lock:
+            self.rendered.append(page_number)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delays.get(page_number, 0.01))
+        with self.lock:
+            self.active -= 1
+        return np.full((4, 4, 3), page_number, dtype=np.uint8)
+
+
+class TestPdfOcrStreaming(unittest.TestCase):
+    def setUp(self):
+        handle, self.pdf_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(handle)
+        self.addCleanup(os.remove, self.pdf_path)
+
+    def run_ocr(self, renderer, page_count, **kwargs):
+        read_page = lambda image, language, preprocessing: f"page {int(image[0, 0, 0])}"
+        with patch.object(ocr, "PDF2IMAGE_AVAILABLE", True), \
+                patch.object(ocr, "get_pdf_page_count", return_value=page_count), \
+                patch.object(ocr, "render_pdf_page", side_effect=renderer.render), \
+                patch.object(ocr, "extract_text_from_array", side_effect=read_page):
+            return list(ocr.iter_pdf_text(self.pdf_path, **kwargs))
+
+    def test_pages_are_yielded_in_order(self):
+        """Les pages sortent dans l'ordre même si elles terminent dans le désordre"""
+        renderer = FakeRenderer(delays={1: 0.2, 2: 0.05})
+        pages = self.run_ocr(renderer, 5, max_workers=3)
+
+        self.assertEqual(pages, [f"page {i}" for i in range(1, 6)])
+
+    def test_page_range_and_bounded_concurrency(self):
+        """Seules les pages demandées sont rendues, par au plus max_workers workers"""
+        renderer = FakeRenderer()
+        pages = self.run_ocr(renderer, 20, max_workers=2, page_range=(3, 12))
+
+        self.assertEqual(pages, [f"page {i}" for i in range(3, 13)])
+        self.assertEqual(sorted(renderer.rendered), list(range(3, 13)))
+        self.assertLessEqual(renderer.max_active, 2)
+
+    def test_generator_renders_lazily(self):
+        """Un consommateur qui s'arrête tôt n'entraîne pas le rendu de tout le document"""
+        renderer = FakeRenderer()
+        with patch.object(ocr, "PDF2IMAGE_AVAILABLE", True), \
+                patch.object(ocr, "get_pdf_page_count", return_value=100), \
+                patch.object(ocr, "render_pdf_page", side_effect=renderer.render), \
+                patch.object(ocr, "extract_text_from_array", return_value="texte"):
+            pages = ocr.iter_pdf_text(self.pdf_path, max_workers=2)
+            self.assertEqual(next(pages), "texte")
+            pages.close()
+
+        self.assertLessEqual(len(renderer.rendered), 2 * 2 + 1)
+
+    def test_pdf_to_text_joins_pages(self):
+        """pdf_to_text assemble les pages du générateur"""
+        with patch.object(ocr, "iter_pdf_text", return_value=iter(["un", "deux"])):
+            self.assertEqual(ocr.pdf_to_text(self.pdf_path), "un\n\ndeux")
+
+    @unittest.skipUnless(ocr.CV2_AVAILABLE, "OpenCV non disponible")
+    def test_enhance_image_array_stays_in_memory(self):
+        """L'amélioration travaille sur le tableau sans modifier l'original"""
+        image = np.random.randint(0, 255, (32, 32, 3), dtype=np.uint8)
+        original = image.copy()
+
+        enhanced = ocr.enhance_image_array(image, "high")
+
+        self.assertEqual(enhanced.shape, (32, 32))
+        self.assertTrue(set(np.unique(enhanced)) <= {0, 255})
+        np.testing.assert_array_equal(image, original)
+
+
+if __name__ == '__main__':
+    unittest.main()
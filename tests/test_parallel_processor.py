@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du processeur parallèle (délais par fichier et remplacement des workers)
+"""
+
+import unittest
+import sys
+import os
+import time
+import threading
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_analyzer.extensions.parallel_processor import ParallelProcessor
+
+
+class BlockingAnalyzer:
+    """Analyseur factice qui reste bloqué sur les fichiers 'stuck'"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def analyze_document(self, file_path):
+        if file_path.startswith("stuck"):
+            self.release.wait(30)
+        return {"file": file_path, "pid": os.getpid()}
+
+
+class SleepingAnalyzer:
+    """Analyseur picklable pour le backend process"""
+
+    def analyze_document(self, file_path):
+        if file_path.startswith("stuck"):
+            time.sleep(30)
+        return {"file": file_path, "pid": os.getpid()}
+
+
+class CrashingAnalyzer:
+    """Analyseur picklable dont le processus meurt sur les fichiers 'crash' et qui échoue sur 'bad'"""
+
+    def analyze_document(self, file_path):
+        if file_path.startswith("crash"):
+            os._exit(1)
+        if file_path.startswith("bad"):
+            raise ValueError("document illisible")
+        return {"file": file_path, "pid": os.getpid()}
+
+
+class TestParallelProcessor(unittest.TestCase):
+    def test_thread_timeout_does_not_block_batch(self):
+        """Un fichier bloqué est abandonné et les suivants sont traités par un nouveau pool"""
+        analyzer = BlockingAnalyzer()
+        self.addCleanup(analyzer.release.set)
+        processor = ParallelProcessor(analyzer, max_workers=1, file_timeout=0.3)
+
+        started = time.monotonic()
+        results = processor.process_batch(["stuck.pdf", "a.pdf", "b.pdf"])
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(results["stuck.pdf"]["status"], "timeout")
+        self.assertEqual(results["a.pdf"]["file"], "a.pdf")
+        self.assertEqual(results["b.pdf"]["file"], "b.pdf")
+
+    def test_queued_files_get_their_own_deadline(self):
+        """Chaque fichier dispose de son délai complet à partir de sa soumission"""
+        analyzer = BlockingAnalyzer()
+        self.addCleanup(analyzer.release.set)
+        processor = ParallelProcessor(analyzer, max_workers=1, max_in_flight=4,
+                                      file_timeout=0.3)
+
+        results = processor.process_batch(["stuck1.pdf", "stuck2.pdf", "c.pdf"])
+
+        self.assertEqual(results["stuck1.pdf"]["status"], "timeout")
+        self.assertEqual(results["stuck2.pdf"]["status"], "timeout")
+        self.assertEqual(results["c.pdf"]["file"], "c.pdf")
+
+    def test_process_workers_are_recycled(self):
+        """Le processus bloqué est arrêté et remplacé pendant le lot"""
+        processor = ParallelProcessor(max_workers=1, backend="process", file_timeout=1.5,
+                                      analyzer_factory=SleepingAnalyzer)
+        seen = []
+        processor.set_result_callback(lambda path, result: seen.append(path))
+
+        started = time.monotonic()
+        results = processor.process_batch(["a.pdf", "stuck.pdf", "b.pdf"])
+
+        self.assertLess(time.monotonic() - started, 15)
+        self.assertEqual(seen, ["a.pdf", "stuck.pdf", "b.pdf"])
+        self.assertEqual(results["stuck.pdf"]["status"], "timeout")
+        self.assertNotEqual(results["a.pdf"]["pid"], results["b.pdf"]["pid"])
+
+    def test_dead_process_worker_breaks_only_its_file(self):
+        """Un worker mort fait échouer son fichier, le pool est recréé pour les suivants"""
+        processor = ParallelProcessor(max_workers=1, max_in_flight=1, backend="process",
+                                      analyzer_factory=CrashingAnalyzer)
+
+        results = processor.process_batch(["a.pdf", "crash.pdf", "b.pdf"])
+
+        self.assertEqual(results["crash.pdf"]["status"], "failed")
+        self.assertEqual(results["a.pdf"]["file"], "a.pdf")
+        self.assertEqual(results["b.pdf"]["file"], "b.pdf")
+
+    def test_dependencies_with_process_backend(self):
+        """Les dépendances passent par les workers et une erreur compte comme traitée"""
+        processor = ParallelProcessor(max_workers=2, backend="process",
+                                      analyzer_factory=CrashingAnalyzer)
+        progress = []
+        processor.set_progress_callback(lambda done, total, path: progress.append(path))
+
+        results = processor.process_with_dependencies(
+            ["a.pdf", "bad.pdf", "c.pdf", "d.pdf"],
+            {"c.pdf": ["a.pdf", "bad.pdf"], "d.pdf": ["d.pdf"]}
+        )
+
+        self.assertEqual(results["bad.pdf"]["status"], "failed")
+        self.assertEqual(results["c.pdf"]["file"], "c.pdf")
+        self.assertEqual(results["d.pdf"]["status"], "failed")
+        self.assertEqual(len(progress), 4)
+        self.assertEqual(progress[-1], "d.pdf")
+
+
+if __name__ == '__main__':
+    unittest.main()
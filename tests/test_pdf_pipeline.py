@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du pipeline de post-traitement des PDF
+"""
+
+import unittest
+import sys
+import os
+import io
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4, landscape
+
+from utils.pdf_pipeline import PDFPipeline, write_file_atomic
+from utils.electronic_signature import ElectronicSignature
+
+
+def build_pdf(path, pages=3, sizes=None):
+    """Crée un PDF de test dont chaque page contient son texte"""
+    c = canvas.Canvas(path)
+    for index in range(pages):
+        c.setPageSize(sizes[index] if sizes else A4)
+        c.drawString(72, 400, f"Contenu {index + 1}")
+        c.showPage()
+    c.save()
+
+
+def page_texts(source, password=None):
+    reader = PyPDF2.PdfReader(source)
+    if password:
+        reader.decrypt(password)
+    return [page.extract_text() for page in reader.pages]
+
+
+class TestPDFPipeline(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.temp_dir, "source.pdf")
+        build_pdf(self.source, sizes=[A4, landscape(A4), A4])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_stages_applied_in_one_pass(self):
+        """Filigrane, numéros de page et métadonnées sont appliqués en une seule lecture"""
+        output = os.path.join(self.temp_dir, "out", "result.pdf")
+        pipeline = PDFPipeline().watermark("CONFIDENTIEL").page_numbers(start_number=5) \
+            .metadata({"Title": "Contrat"})
+
+        with patch.object(PyPDF2, "PdfReader", wraps=PyPDF2.PdfReader) as reader:
+            self.assertTrue(pipeline.run(self.source, output))
+        # Le document, les deux formats de filigrane et le calque des numéros
+        self.assertEqual(reader.call_count, 4)
+
+        texts = page_texts(output)
+        self.assertEqual(len(texts), 3)
+        for index, text in enumerate(texts):
+            self.assertIn(f"Contenu {index + 1}", text)
+            self.assertIn("CONFIDENTIEL", text)
+            self.assertIn(f"Page {index + 5}", text)
+        self.assertEqual(PyPDF2.PdfReader(output).metadata["/Title"], "Contrat")
+
+        # Calques en cache: un second document ne rend plus le filigrane
+        with patch.object(PyPDF2, "PdfReader", wraps=PyPDF2.PdfReader) as reader:
+            pipeline.process(self.source)
+        self.assertEqual(reader.call_count, 2)
+
+    def test_encryption_is_applied_last(self):
+        """Le chiffrement est appliqué après les autres étapes, quel que soit l'ordre d'ajout"""
+        output = os.path.join(self.temp_dir, "encrypted.pdf")
+        pipeline = PDFPipeline().encrypt("secret").page_numbers()
+        self.assertTrue(pipeline.run(self.source, output))
+
+        self.assertTrue(PyPDF2.PdfReader(output).is_encrypted)
+        self.assertIn("Page 1", page_texts(output, "secret")[0])
+
+    def test_encryption_permissions(self):
+        """Les permissions refusées sont retirées des droits du document chiffré"""
+        output = os.path.join(self.temp_dir, "restricted.pdf")
+        self.assertTrue(PDFPipeline().encrypt("secret", "owner", {"copy": False, "print": True})
+                        .run(self.source, output))
+
+        rights = PyPDF2.PdfReader(output).trailer["/Encrypt"]["/P"] & 0xFFFFFFFF
+        self.assertFalse(rights & 16)   # Extraction du contenu
+        self.assertTrue(rights & 4)     # Impression
+        self.assertTrue(rights & 8)     # Modification (non précisée)
+        with self.assertRaises(ValueError):
+            PDFPipeline().encrypt("secret", permissions={"share": False})
+
+    def test_signature_stage(self):
+        """La page de signature est ajoutée et le fichier final est signé"""
+        signer = ElectronicSignature({"data_dir": self.temp_dir})
+        output = os.path.join(self.temp_dir, "signed.pdf")
+        self.assertTrue(PDFPipeline().watermark("COPIE").sign(signer).run(self.source, output))
+
+        self.assertTrue(signer.verify_signature(output))
+        with open(output, "rb") as f:
+            data = f.read()
+        reader = PyPDF2.PdfReader(io.BytesIO(data[:data.rfind(b"\n")]))
+        self.assertEqual(len(reader.pages), 4)
+        self.assertEqual(reader.metadata["/Signed"], "true")
+
+    def test_batch_runs_on_worker_pool(self):
+        """Un lot de PDF est traité par un pool de workers"""
+        jobs = [(self.source, os.path.join(self.temp_dir, "batch", f"{i}.pdf")) for i in range(4)]
+        jobs.append((os.path.join(self.temp_dir, "absent.pdf"), os.path.join(self.temp_dir, "batch", "x.pdf")))
+        pipeline = PDFPipeline().watermark("LOT").page_numbers()
+
+        for backend in ("thread", "process"):
+            results = pipeline.run_batch(jobs, max_workers=2, backend=backend)
+            self.assertEqual(sum(results.values()), 4)
+            self.assertFalse(results[jobs[-1][1]])
+            self.assertIn("LOT", page_texts(jobs[0][1])[2])
+
+    def test_failed_atomic_write_leaves_no_temp_file(self):
+        """Chaque écriture a son propre fichier temporaire, supprimé en cas d'échec"""
+        target = os.path.join(self.temp_dir, "out", "result.pdf")
+        write_file_atomic(target, b"%PDF-1")
+
+        with patch("utils.pdf_pipeline.os.replace", side_effect=OSError("disque plein")):
+            with self.assertRaises(OSError):
+                write_file_atomic(target, b"%PDF-2")
+
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1")
+        self.assertEqual(os.listdir(os.path.dirname(target)), ["result.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du cache de résultats OCR/analyse adressé par contenu
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_analyzer.utils.result_cache import ResultCache, hash_file, KIND_ANALYSIS, KIND_OCR_PAGE
+from doc_analyzer.utils.text_extraction import TextExtractionService
+from doc_analyzer.utils.text_processor import TextProcessor
+from doc_analyzer import analyzer as analyzer_module
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ResultCache(cache_dir=self.temp_dir, max_size_mb=1, analyzer_version="test")
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_identical_content_shares_entries(self):
+        """Deux fichiers au contenu identique partagent la même entrée"""
+        paths = []
+        for name in ("a.txt", "b.txt"):
+            path = os.path.join(self.temp_dir, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("FACTURE N° F2024-001")
+            paths.append(path)
+
+        self.cache.put_analysis(hash_file(paths[0]), {"variables": {"reference": "F2024-001"}})
+
+        cached = self.cache.get_analysis(hash_file(paths[1]))
+        self.assertEqual(cached, {"variables": {"reference": "F2024-001"}})
+
+    def test_settings_and_version_are_part_of_the_key(self):
+        """Les paramètres OCR et la version de l'analyseur distinguent les entrées"""
+        settings = {"language": "fra", "preprocessing": "auto"}
+        self.cache.put_ocr_page("abc", 1, settings, "page 1")
+
+        self.assertEqual(self.cache.get_ocr_page("abc", 1, settings), "page 1")
+        self.assertIsNone(self.cache.get_ocr_page("abc", 2, settings))
+        self.assertIsNone(self.cache.get_ocr_page("abc", 1, {"language": "eng", "preprocessing": "auto"}))
+
+        other_version = ResultCache(cache_dir=self.temp_dir, analyzer_version="other")
+        try:
+            self.assertIsNone(other_version.get_ocr_page("abc", 1, settings))
+        finally:
+            other_version.close()
+
+    def test_lru_eviction_bounds_size(self):
+        """Les entrées les moins récemment utilisées sont évincées au-delà de la limite"""
+        payload = "x" * (200 * 1024)
+        for i in range(4):
+            self.cache.put_ocr_page("file", i, {}, payload)
+        # Rendre la page 0 récemment utilisée
+        self.assertIsNotNone(self.cache.get_ocr_page("file", 0, {}))
+        for i in range(4, 6):
+            self.cache.put_ocr_page("file", i, {}, payload)
+
+        stats = self.cache.stats()
+        self.assertLessEqual(stats["size"], stats["max_size"])
+        self.assertIsNotNone(self.cache.get_ocr_page("file", 0, {}))
+        self.assertIsNone(self.cache.get_ocr_page("file", 1, {}))
+
+    def test_purge_by_kind(self):
+        """La purge peut cibler un type d'entrée"""
+        self.cache.put_ocr_page("file", 1, {}, "texte")
+        self.cache.put_analysis("file", {"variables": {}})
+
+        self.assertEqual(self.cache.purge(kind=KIND_OCR_PAGE), 1)
+        self.assertEqual(self.cache.stats()["by_kind"], {KIND_ANALYSIS: {"entries": 1, "size": 17}})
+
+    def test_analysis_key_includes_ocr_settings(self):
+        """Une analyse faite avec une autre configuration OCR n'est pas réutilisée"""
+        path = os.path.join(self.temp_dir, "scan.pdf")
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4")
+        file_hash = hash_file(path)
+        fra = TextExtractionService(language="fra").ocr_settings()
+        eng = TextExtractionService(language="eng").ocr_settings()
+
+        self.cache.put_analysis(file_hash, {"variables": {}}, fra)
+
+        self.assertNotEqual(fra, eng)
+        self.assertIsNone(self.cache.get_analysis(file_hash, eng))
+        self.assertEqual(self.cache.get_analysis(file_hash, fra), {"variables": {}})
+
+    def test_analyzer_looks_up_with_effective_settings(self):
+        """L'analyseur interroge le cache avec les paramètres OCR du fichier"""
+        path = os.path.join(self.temp_dir, "photo.png")
+        with open(path, "wb") as f:
+            f.write(b"\x89PNG")
+        cache = MagicMock()
+        cache.get_analysis.return_value = {"variables": {}}
+
+        with patch.object(analyzer_module, "get_result_cache", return_value=cache):
+            result = analyzer_module.DocumentAnalyzer().analyze_document(path)
+
+        self.assertEqual(result["file_path"], path)
+        cache.get_analysis.assert_called_once_with(hash_file(path), TextProcessor.ocr_settings(path))
+        self.assertIn("language", TextProcessor.ocr_settings(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'analyse parallèle des sections par AIDocumentProcessor
+(les appels au modèle sont simulés)
+"""
+
+import unittest
+import sys
+import os
+import time
+import threading
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.document_processor import AIDocumentProcessor, SECTION_ANALYSIS_CONFIG
+
+
+class FakeModelProcessor(AIDocumentProcessor):
+    """Processeur dont le modèle répond après un délai fixe"""
+
+    def __init__(self, delay, **settings):
+        super().__init__()
+        self.delay = delay
+        self.settings = settings
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _get_config(self):
+        return {"section_analysis": self.settings}
+
+    def _call_ollama(self, prompt, timeout=10, max_retries=1, fast_mode=True, cache=False):
+        with self._lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        articles = [line.split()[1] for line in prompt.splitlines() if line.startswith("ARTICLE")]
+        return "\n".join(f"PARTIE_{number}: Société {number}" for number in articles)
+
+
+def build_contract(articles):
+    """Contrat dont chaque article désigne une partie à compléter"""
+    parts = []
+    for number in range(1, articles + 1):
+        parts.append(f"ARTICLE {number} OBLIGATIONS\n"
+                     f"La société représentée par ________ s'engage à respecter les clauses "
+                     f"du présent article. " * 3)
+    parts.append("ARTICLE 99 DISPOSITIONS FINALES\nFait le 12/03/2024, contact@example.com")
+    return "\n".join(parts)
+
+
+class TestSectionAnalysis(unittest.TestCase):
+    def test_sections_are_analyzed_concurrently(self):
+        """Toutes les sections ambiguës sont analysées, en parallèle et dans la limite globale"""
+        processor = FakeModelProcessor(delay=0.2, batch_chars=400)
+        start = time.monotonic()
+        result = processor._analyze_document_by_sections(build_contract(8))
+        elapsed = time.monotonic() - start
+
+        for number in range(1, 9):
+            self.assertEqual(result["variables"][f"partie_{number}"], f"Société {number}")
+        meta = result["_meta"]
+        self.assertEqual(meta["model_batches_completed"], meta["model_batches"])
+        self.assertFalse(meta["deadline_reached"])
+        self.assertGreater(processor.peak, 1)
+        self.assertLessEqual(processor.peak, SECTION_ANALYSIS_CONFIG["max_concurrency"])
+        self.assertLess(elapsed, 0.2 * len(processor.prompts))
+
+    def test_configured_concurrency_sizes_global_limit(self):
+        """La limite globale suit max_concurrency de ai_config.json, pas la valeur par défaut"""
+        processor = FakeModelProcessor(delay=0.2, batch_chars=400, max_concurrency=6)
+        processor._analyze_document_by_sections(build_contract(8))
+
+        self.assertGreater(processor.peak, SECTION_ANALYSIS_CONFIG["max_concurrency"])
+        self.assertLessEqual(processor.peak, 6)
+
+        processor = FakeModelProcessor(delay=0.1, batch_chars=400, max_concurrency=1)
+        processor._analyze_document_by_sections(build_contract(4))
+        self.assertEqual(processor.peak, 1)
+
+    def test_unambiguous_sections_stay_with_regex(self):
+        """Les sections que les expressions régulières suffisent à traiter ne sont pas envoyées au modèle"""
+        processor = FakeModelProcessor(delay=0)
+        result = processor._analyze_document_by_sections(build_contract(3))
+
+        self.assertFalse(any("ARTICLE 99" in prompt for prompt in processor.prompts))
+        self.assertIn("email", result["variables"])
+        self.assertIn("date", result["variables"])
+
+    def test_deadline_returns_partial_results(self):
+        """À l'échéance, les résultats déjà obtenus et l'extraction regex sont retournés"""
+        processor = FakeModelProcessor(delay=1.0, deadline=0.3, min_call_seconds=0, batch_chars=400)
+        start = time.monotonic()
+        result = processor._analyze_document_by_sections(build_contract(8))
+
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertTrue(result["_meta"]["deadline_reached"])
+        self.assertIn("email", result["variables"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du service de signature par lots (manifestes détachés)
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import subprocess
+from unittest.mock import patch
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives import serialization
+
+from utils.electronic_signature import ElectronicSignature
+from utils.signing_service import SigningService, file_digest
+
+
+class TestSigningService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.key_dir = tempfile.mkdtemp()
+        cls.signer = ElectronicSignature({"data_dir": cls.key_dir})
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.key_dir)
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(12):
+            path = os.path.join(self.temp_dir, "docs", f"contrat_{i}.pdf")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(os.urandom(1000 + i * 5000))
+            self.paths.append(path)
+        self.manifest_path = os.path.join(self.temp_dir, "signatures.json")
+        self.service = SigningService(self.signer, max_workers=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_streamed_digest_matches_full_read(self):
+        """L'empreinte calculée par blocs est celle du contenu complet (ou de son début)"""
+        import hashlib
+        with open(self.paths[-1], "rb") as f:
+            content = f.read()
+        self.assertEqual(file_digest(self.paths[-1], chunk_size=4096), hashlib.sha256(content).digest())
+        self.assertEqual(file_digest(self.paths[-1], length=1234, chunk_size=500),
+                         hashlib.sha256(content[:1234]).digest())
+
+    def test_import_does_not_load_doc_analyzer(self):
+        """Le service de signature n'importe pas le paquet d'analyse (lourd au démarrage)"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, "-c",
+             "import sys, utils.signing_service; print('doc_analyzer' in sys.modules)"],
+            cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), "False")
+
+    def test_batch_sign_and_verify(self):
+        """Un lot signé est vérifié en masse; les fichiers modifiés ou absents sont signalés"""
+        with patch.object(serialization, "load_pem_private_key",
+                          wraps=serialization.load_pem_private_key) as load_key:
+            manifest = self.service.sign_batch(self.paths, self.manifest_path)
+        # La clé déjà en mémoire n'est jamais relue pendant le lot
+        self.assertLessEqual(load_key.call_count, 1)
+        self.assertEqual(len(manifest["files"]), 12)
+        self.assertIn("docs/contrat_0.pdf", manifest["files"])
+
+        report = self.service.verify_manifest(self.manifest_path)
+        self.assertTrue(report["valid"])
+        self.assertEqual(report["verified"], 12)
+
+        with open(self.paths[1], "r+b") as f:
+            f.write(b"X")
+        os.remove(self.paths[2])
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        data["files"]["docs/contrat_3.pdf"]["signature"] = data["files"]["docs/contrat_4.pdf"]["signature"]
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+        report = self.service.verify_manifest(self.manifest_path)
+        self.assertFalse(report["valid"])
+        self.assertEqual(report["failures"], {"docs/contrat_1.pdf": "modified",
+                                              "docs/contrat_2.pdf": "missing",
+                                              "docs/contrat_3.pdf": "bad_signature"})
+        self.assertEqual(report["verified"], 9)
+
+    def test_failed_manifest_write_leaves_no_temp_file(self):
+        """Une écriture interrompue ne laisse ni manifeste partiel ni fichier temporaire"""
+        with patch("utils.signing_service.json.dump", side_effect=TypeError("non sérialisable")):
+            with self.assertRaises(TypeError):
+                SigningService._write_manifest(self.manifest_path, {"files": {}})
+
+        self.assertFalse(os.path.exists(self.manifest_path))
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if name.endswith(".tmp")], [])
+
+    def test_manifest_from_another_certificate_is_rejected(self):
+        """Un manifeste produit avec un autre certificat n'est pas accepté"""
+        self.service.sign_batch(self.paths[:2], self.manifest_path)
+        other = SigningService(ElectronicSignature({"data_dir": self.temp_dir}))
+        report = other.verify_manifest(self.manifest_path)
+        self.assertFalse(report["valid"])
+        self.assertEqual(set(report["failures"].values()), {"wrong_certificate"})
+
+    def test_appended_signature_verified_from_file_tail(self):
+        """La signature ajoutée en fin de fichier est vérifiée sans relire la clé"""
+        path = os.path.join(self.temp_dir, "signed.bin")
+        with open(path, "wb") as f:
+            f.write(self.signer.sign_bytes(b"contenu\nsur plusieurs lignes" * 1000))
+        self.assertTrue(self.signer.verify_signature(path))
+
+        with open(path, "r+b") as f:
+            f.write(b"C")
+        self.assertFalse(self.signer.verify_signature(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
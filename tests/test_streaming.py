@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du streaming des réponses du modèle (serveur Ollama simulé en local)
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.streaming import iter_ndjson, GenerationStream, ChunkCoalescer
+from ai.llm_client import LLMClient
+
+
+class StubStreamingHandler(BaseHTTPRequestHandler):
+    """Renvoie un mot par ligne NDJSON, avec un délai entre chaque ligne"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        words = payload["prompt"].split()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for word in words:
+                self._write_chunk(json.dumps({"response": word + " ", "done": False}) + "\n")
+                time.sleep(self.server.delay)
+            self._write_chunk(json.dumps({"response": "", "done": True, "eval_count": len(words)}) + "\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.aborted.set()
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeResponse:
+    """Réponse HTTP simulée renvoyant des paquets prédéfinis"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        for chunk in self.chunks:
+            if self.closed:
+                raise ConnectionError("connexion fermée")
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class TestStreaming(unittest.TestCase):
+    def test_ndjson_lines_split_across_packets(self):
+        """Une ligne NDJSON répartie sur plusieurs paquets est reconstituée"""
+        packets = [b'{"response": "Bon', b'jour"}\n{"resp', b'onse": " monde", "done": true}']
+        messages = list(iter_ndjson(packets))
+        self.assertEqual([m["response"] for m in messages], ["Bonjour", " monde"])
+        self.assertTrue(messages[-1]["done"])
+
+    def test_stream_yields_fragments_and_measures_first_token(self):
+        """Les fragments sont transmis dans l'ordre et le délai avant le premier est mesuré"""
+        finished = []
+        response = FakeResponse([b'{"response": "a"}\n{"response": "b"}\n',
+                                 b'{"response": "", "done": true, "eval_count": 2}\n'])
+        stream = GenerationStream(response, on_finish=finished.append)
+        self.assertEqual(list(stream), ["a", "b"])
+        self.assertEqual(stream.text, "ab")
+        self.assertIsNotNone(stream.time_to_first_token)
+        self.assertEqual(stream.server_stats["eval_count"], 2)
+        self.assertEqual(finished, [stream])
+        self.assertTrue(response.closed)
+
+    def test_cancel_stops_the_stream(self):
+        """Une génération annulée s'arrête sans erreur et conserve le texte partiel"""
+        response = FakeResponse([b'{"response": "a"}\n', b'{"response": "b"}\n', b'{"response": "c"}\n'])
+        stream = GenerationStream(response)
+        fragments = []
+        for fragment in stream:
+            fragments.append(fragment)
+            stream.cancel()
+        self.assertEqual(fragments, ["a"])
+        self.assertTrue(stream.cancelled)
+        self.assertTrue(stream.done)
+
+    def test_coalescer_groups_fragments(self):
+        """Les fragments reçus entre deux images sont affichés en une seule fois"""
+        buffer = ChunkCoalescer()
+        self.assertEqual(buffer.drain(), "")
+        for fragment in ("Bon", "jour", " !"):
+            buffer.append(fragment)
+        buffer.finish()
+        self.assertTrue(buffer.finished)
+        self.assertEqual(buffer.drain(), "Bonjour !")
+        self.assertEqual(buffer.drain(), "")
+        self.assertIsNotNone(buffer.time_to_first_fragment)
+
+
+class TestClientStreaming(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubStreamingHandler)
+        self.server.delay = 0.05
+        self.server.aborted = threading.Event()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = LLMClient(f"http://127.0.0.1:{self.server.server_port}/api",
+                                cache_path=os.path.join(self.temp_dir, "responses.db"))
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_fragments_arrive_before_the_end(self):
+        """Le premier fragment est reçu bien avant la fin de la génération"""
+        stream = self.client.stream_generate("un deux trois quatre cinq six", "llama3")
+        fragments = list(stream)
+        self.assertEqual("".join(fragments), "un deux trois quatre cinq six ")
+        self.assertLess(stream.time_to_first_token, stream.duration / 2)
+
+        stats = self.client.stream_statistics()
+        self.assertEqual(stats["count"], 1)
+        self.assertEqual(stats["cancelled"], 0)
+        self.assertIsNotNone(stats["ttft_avg"])
+
+    def test_cancel_closes_the_connection(self):
+        """Annuler une génération ferme la connexion: le serveur cesse d'envoyer"""
+        self.server.delay = 0.2
+        stream = self.client.stream_generate(" ".join(["mot"] * 50), "llama3")
+        for _ in stream:
+            threading.Timer(0.05, stream.cancel).start()
+        self.assertTrue(stream.cancelled)
+        self.assertLess(stream.duration, 2)
+        self.assertTrue(self.server.aborted.wait(5))
+        self.assertEqual(self.client.stream_statistics()["cancelled"], 1)
+
+
+class FakeGeneration:
+    """Génération simulée: un fragment par élément, arrêtée par cancel()"""
+
+    def __init__(self, fragments):
+        self.fragments = fragments
+        self.text = ""
+        self.done = False
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def __iter__(self):
+        try:
+            for fragment in self.fragments:
+                if self.cancelled:
+                    break
+                self.text += fragment
+                yield fragment
+        finally:
+            self.done = True
+
+
+class TestStreamedConversationHistory(unittest.TestCase):
+    def setUp(self):
+        with patch("ai.model.get_client", return_value=MagicMock()):
+            from ai.model import AIModel
+            self.model = AIModel()
+        self.model._verify_model = lambda refresh=False: True
+
+    def test_cancelled_reply_keeps_its_place(self):
+        """Une réponse annulée par un nouveau message reste avant ce message dans l'historique"""
+        first = FakeGeneration(["Bonjour ", "et ", "bienvenue"])
+        second = FakeGeneration(["Suite"])
+        self.model.client.stream_generate.side_effect = [first, second]
+
+        stream = self.model.generate_response("premier", stream=True)
+        self.assertEqual(next(stream), "Bonjour ")
+        answer = self.model.generate_response("second", stream=True)
+        # Le premier flux n'est refermé qu'après l'envoi du second message
+        stream.close()
+        self.assertEqual("".join(answer), "Suite")
+
+        history = [(msg["role"], msg["content"]) for msg in self.model.conversation_history[1:]]
+        self.assertEqual(history, [("user", "premier"), ("assistant", "Bonjour "),
+                                   ("user", "second"), ("assistant", "Suite")])
+
+    def test_empty_reply_is_dropped(self):
+        """Une génération annulée avant le premier fragment ne laisse pas d'entrée vide"""
+        self.model.client.stream_generate.side_effect = [FakeGeneration(["a"]), FakeGeneration([])]
+
+        self.model.generate_response("premier", stream=True)
+        list(self.model.generate_response("second", stream=True))
+
+        roles = [msg["role"] for msg in self.model.conversation_history[1:]]
+        self.assertEqual(roles, ["user", "user"])
+
+
+if __name__ == "__main__":
+    unittest.main()
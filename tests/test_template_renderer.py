@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du moteur de rendu des modèles compilés
+"""
+
+import unittest
+import sys
+import os
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.template_renderer import (
+    TemplateCache, compile_template, render_template, MISSING_KEEP, MISSING_REMOVE
+)
+
+
+class TestTemplateRenderer(unittest.TestCase):
+    def test_both_formats_in_one_pass(self):
+        """Les formats {{variable}} et {variable} sont remplacés en une passe"""
+        template = "Bonjour {{client_name}}, réf. {ref} du {date}."
+        result = render_template(template, {"client_name": "M. Dupont", "ref": "F-01", "date": None})
+
+        self.assertEqual(result, "Bonjour M. Dupont, réf. F-01 du .")
+
+    def test_values_are_inserted_literally(self):
+        """Les valeurs ne sont ni réinterprétées ni analysées à nouveau"""
+        result = render_template("{a} {b}", {"a": "{b}", "b": r"C:\dossier\1"})
+
+        self.assertEqual(result, r"{b} C:\dossier\1")
+
+    def test_missing_variables(self):
+        """Les variables sans valeur sont supprimées ou conservées selon l'option"""
+        template = "{{nom}} {inconnue} {{absente}}"
+        values = {"nom": "Dupont"}
+
+        self.assertEqual(render_template(template, values, missing=MISSING_REMOVE), "Dupont  ")
+        self.assertEqual(render_template(template, values, missing=MISSING_KEEP),
+                         "Dupont {inconnue} {{absente}}")
+        self.assertEqual(render_template(template, values, missing=MISSING_KEEP, single_braces=False),
+                         "Dupont {inconnue} {{absente}}")
+        self.assertEqual(compile_template(template).missing_variables(values), ["inconnue", "absente"])
+
+    def test_cache_by_key_and_mtime(self):
+        """Le modèle compilé est réutilisé tant que la clé, la date et le contenu sont identiques"""
+        cache = TemplateCache(max_entries=2)
+        first = cache.get("Bonjour {nom}", key="tpl-1", mtime=1)
+
+        self.assertIs(cache.get("Bonjour {nom}", key="tpl-1", mtime=1), first)
+        self.assertIsNot(cache.get("Bonjour {nom}", key="tpl-1", mtime=2), first)
+        self.assertEqual(cache.get("Salut {nom}", key="tpl-1", mtime=1).render({"nom": "A"}), "Salut A")
+
+
+if __name__ == '__main__':
+    unittest.main()
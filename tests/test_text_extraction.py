@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du service d'extraction de texte partagé (pages lues à la demande,
+OCR des seules pages numérisées, mémorisation par empreinte)
+"""
+
+import unittest
+import sys
+import os
+import time
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+from reportlab.pdfgen import canvas
+
+from doc_analyzer.utils import text_extraction
+from doc_analyzer.utils.text_extraction import (
+    TextExtractionService, text_layer_usable, read_docx_text, DOCX_AVAILABLE, SOURCE_OCR, SOURCE_TEXT
+)
+from doc_analyzer.utils.text_processor import TextProcessor
+
+BORN_DIGITAL = "Contrat de prestation de services entre les parties"
+
+
+def build_pdf(path, scanned_pages=(2,), pages=3):
+    """Crée un PDF dont les pages « numérisées » n'ont pas de couche texte"""
+    c = canvas.Canvas(path)
+    for number in range(1, pages + 1):
+        if number in scanned_pages:
+            c.rect(72, 400, 300, 200, fill=1)
+        else:
+            c.drawString(72, 700, f"{BORN_DIGITAL} - page {number}")
+        c.showPage()
+    c.save()
+
+
+class FakeOCR:
+    """OCR de test: enregistre les pages reconnues"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, file_path, page_number, file_hash):
+        self.calls.append(page_number)
+        return f"Texte reconnu page {page_number}"
+
+
+class TestTextExtraction(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "document.pdf")
+        build_pdf(self.path)
+        self.ocr = FakeOCR()
+        self.service = TextExtractionService(ocr_page=self.ocr)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_text_layer_detection(self):
+        """Une couche texte absente, trop courte ou illisible n'est pas utilisée"""
+        self.assertTrue(text_layer_usable(BORN_DIGITAL))
+        self.assertFalse(text_layer_usable(""))
+        self.assertFalse(text_layer_usable("  12 \n"))
+        self.assertFalse(text_layer_usable("\ue000" * 30 + "abc"))
+        self.assertFalse(text_layer_usable("\ufffd" * 20 + "Contrat"))
+
+    def test_ocr_only_for_scanned_pages(self):
+        """Seules les pages sans couche texte passent par l'OCR"""
+        pages = self.service.pages(self.path)
+        self.assertEqual([page.source for page in pages], [SOURCE_TEXT, SOURCE_OCR, SOURCE_TEXT])
+        self.assertEqual(self.ocr.calls, [2])
+        text = self.service.extract_text(self.path)
+        self.assertIn("page 1", text)
+        self.assertIn("Texte reconnu page 2", text)
+        self.assertIn("page 3", text)
+
+        # Sans OCR, la page numérisée est vide et ignorée
+        text = self.service.extract_text(self.path, ocr=False)
+        self.assertNotIn("Texte reconnu", text)
+        self.assertEqual(self.ocr.calls, [2])
+
+    def test_pages_are_read_lazily(self):
+        """Seules les pages consommées ou demandées sont analysées"""
+        first = next(self.service.iter_pages(self.path))
+        self.assertEqual(first.number, 1)
+        self.assertEqual(self.ocr.calls, [])
+
+        pages = list(self.service.iter_pages(self.path, pages=[3]))
+        self.assertEqual([page.number for page in pages], [3])
+        self.assertEqual(self.ocr.calls, [])
+
+    def test_requested_page_order_does_not_depend_on_memo(self):
+        """Les pages demandées sont produites dans l'ordre demandé, doublons compris, mémorisées ou non"""
+        requested = [3, 1, 3, 9]
+        cold = [page.number for page in self.service.iter_pages(self.path, pages=requested, ocr=False)]
+        self.service.pages(self.path, ocr=False)
+        memo = [page.number for page in self.service.iter_pages(self.path, pages=requested, ocr=False)]
+
+        self.assertEqual(cold, [3, 1, 3])
+        self.assertEqual(memo, cold)
+
+    def test_documents_are_memoized_by_hash(self):
+        """Un document est analysé une seule fois tant qu'il ne change pas"""
+        with patch.object(PyPDF2, "PdfReader", wraps=PyPDF2.PdfReader) as reader:
+            first = self.service.extract_text(self.path)
+            copy = os.path.join(self.temp_dir, "copie.pdf")
+            shutil.copy(self.path, copy)
+            self.assertEqual(self.service.extract_text(copy), first)
+            self.assertEqual(list(self.service.iter_pages(self.path, pages=[2]))[0].source, SOURCE_OCR)
+        self.assertEqual(reader.call_count, 1)
+        self.assertEqual(self.ocr.calls, [2])
+
+        # Un fichier modifié est analysé de nouveau
+        time.sleep(0.01)
+        build_pdf(self.path, scanned_pages=())
+        self.assertNotIn("Texte reconnu", self.service.extract_text(self.path))
+
+    def test_call_sites_share_the_service(self):
+        """Les composants qui lisent un même PDF partagent une seule analyse"""
+        from utils.pdf_utils import PDFUtils
+        import backend_jobs
+
+        with patch.object(text_extraction, "_text_extractor", self.service), \
+                patch.object(PyPDF2, "PdfReader", wraps=PyPDF2.PdfReader) as reader:
+            text = backend_jobs.extract_text(self.path, "application/pdf")
+            self.assertIn("Texte reconnu page 2", text)
+            self.assertEqual(PDFUtils.extract_text_from_pdf(self.path), text)
+            self.assertIn("--- Page 2 ---", PDFUtils.extract_text_from_pdf(self.path, page_numbers=[2]))
+        self.assertEqual(reader.call_count, 1)
+        self.assertEqual(self.ocr.calls, [2])
+
+
+@unittest.skipUnless(DOCX_AVAILABLE, "python-docx non disponible")
+class TestDocxText(unittest.TestCase):
+    def setUp(self):
+        from docx import Document
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "contrat.docx")
+        document = Document()
+        for text in ("Contrat", "", "Article 1"):
+            document.add_paragraph(text)
+        row = document.add_table(rows=1, cols=3).rows[0]
+        for cell, text in zip(row.cells, ("Nom", "", "Dupont")):
+            cell.text = text
+        document.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_paragraphs_and_table_rows(self):
+        """Les paragraphes vides sont ignorés et les cellules d'une ligne séparées par des tabulations"""
+        self.assertEqual(read_docx_text(self.path), "Contrat\nArticle 1\nNom\tDupont")
+
+    def test_text_processor_keeps_blank_line_separator(self):
+        """TextProcessor conserve son format: une ligne vide entre les paragraphes"""
+        self.assertEqual(TextProcessor().extract_text_from_docx(self.path),
+                         "Contrat\n\nArticle 1\n\nNom\tDupont")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du cache d'analyses et du regroupement des événements du surveillant de documents
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Ajouter le répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_analyzer.utils.watch_cache import WatchCache
+from doc_analyzer.utils.document_watcher import DocumentWatcher
+
+
+class TestWatchCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "analysis_cache.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_entries_persist_and_stat_fast_path(self):
+        """Chaque analyse est conservée par fichier; taille et date évitent de rehacher"""
+        cache = WatchCache(self.db_path)
+        cache.put("a.txt", "h1", 10, 1000, {"montant": "100"})
+        cache.touch("a.txt", 10, 2000)
+        cache.close()
+
+        cache = WatchCache(self.db_path)
+        try:
+            self.assertTrue(cache.stat_matches("a.txt", 10, 2000))
+            self.assertFalse(cache.stat_matches("a.txt", 11, 2000))
+            self.assertEqual(cache.get_hash("a.txt"), "h1")
+            self.assertEqual(cache["a.txt"]["rapport"], {"montant": "100"})
+
+            cache.remove("a.txt")
+            self.assertNotIn("a.txt", cache)
+            self.assertIsNone(cache.get("a.txt"))
+        finally:
+            cache.close()
+
+    def test_legacy_json_is_imported_once(self):
+        """L'ancien cache JSON est importé puis renommé"""
+        legacy = os.path.join(self.temp_dir, "analysis_cache.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump({"b.txt": {"hash": "h2", "last_analysis": "2024-01-01", "rapport": {"x": 1}}}, f)
+
+        cache = WatchCache(self.db_path, legacy_json=legacy)
+        try:
+            self.assertEqual(cache["b.txt"]["rapport"], {"x": 1})
+            # Sans taille ni date, le fichier sera revérifié par empreinte
+            self.assertFalse(cache.stat_matches("b.txt", 0, 0))
+        finally:
+            cache.close()
+        self.assertFalse(os.path.exists(legacy))
+        self.assertTrue(os.path.exists(legacy + ".migrated"))
+
+
+class TestDocumentWatcherDebounce(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.watcher = DocumentWatcher(cache_dir=os.path.join(self.temp_dir, ".cache"),
+                                       quiet_period=0.3, max_workers=2)
+        self.watcher._generate_notification = lambda file_path, rapport: None
+
+    def tearDown(self):
+        self.watcher.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def test_burst_of_events_is_analyzed_once(self):
+        """Une rafale d'enregistrements donne une seule analyse, de la dernière version"""
+        fichier = os.path.join(self.temp_dir, "rafale.txt")
+        contents = []
+
+        def analyse(contenu):
+            contents.append(contenu)
+            return {}
+
+        with patch.object(self.watcher.analyzer, "analyser_document", side_effect=analyse):
+            for i in range(5):
+                with open(fichier, "w", encoding="utf-8") as f:
+                    f.write(f"Montant : {i}00€")
+                self.watcher._schedule(fichier)
+                time.sleep(0.05)
+
+            self.assertTrue(self.watcher.wait_for_analysis(timeout=5))
+            self.assertEqual(contents, ["Montant : 400€"])
+
+            # Un fichier simplement touché n'est pas réanalysé
+            os.utime(fichier, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+            self.watcher._handle_file_event(fichier)
+            self.assertEqual(len(contents), 1)
+            stat = os.stat(fichier)
+            self.assertTrue(self.watcher.cache.stat_matches(fichier, stat.st_size, stat.st_mtime_ns))
+
+    def test_deleted_file_leaves_the_cache(self):
+        """La suppression d'un fichier retire son entrée et son analyse en attente"""
+        fichier = os.path.join(self.temp_dir, "supprime.txt")
+        self.watcher.cache.put(fichier, "h", 1, 1, {})
+
+        class Event:
+            is_directory = False
+            src_path = fichier
+
+        self.watcher._schedule(fichier)
+        self.watcher.on_deleted(Event())
+
+        self.assertNotIn(fichier, self.watcher.cache)
+        self.assertTrue(self.watcher.wait_for_analysis(timeout=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
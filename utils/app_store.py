@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Stockage SQLite des données de l'application Vynal Docs Automator
+Conserve les clients, modèles et documents d'AppModel dans une base SQLite
+transactionnelle (mode WAL) avec des colonnes indexées pour les requêtes
+fréquentes et des écritures incrémentales (seuls les enregistrements modifiés
+sont réécrits). Les anciens fichiers JSON sont migrés une seule fois; les
+exports JSON ne sont faits qu'à la demande (sauvegardes, lecteurs externes).
+"""
+
+import os
+import json
+import shutil
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Callable, Iterable, Tuple
+
+logger = logging.getLogger("VynalDocsAutomator.AppStore")
+
+# Colonnes indexées (extraites des enregistrements) pour chaque table
+INDEXED_COLUMNS = {
+    "clients": ("email",),
+    "templates": ("type", "folder"),
+    "documents": ("client_id", "template_id", "type", "date"),
+}
+
+
+def _serialize(record: Dict[str, Any]) -> str:
+    """Sérialise un enregistrement de façon stable (clés triées)"""
+    return json.dumps(record, ensure_ascii=False, sort_keys=True, default=str)
+
+
+class AppStore:
+    """
+    Base SQLite des clients, modèles et documents.
+
+    Chaque table contient l'identifiant, les colonnes indexées et l'enregistrement
+    complet sérialisé en JSON: les dictionnaires manipulés par AppModel sont donc
+    conservés tels quels, y compris les champs non prévus par le schéma.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialise la base de données
+
+        Args:
+            db_path: Chemin du fichier SQLite
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        # Dernier état écrit de chaque enregistrement, pour les écritures incrémentales
+        self._snapshots: Dict[str, Dict[str, str]] = {table: {} for table in INDEXED_COLUMNS}
+
+        self._create_tables()
+        logger.info(f"AppStore initialisé: {db_path}")
+
+    def _create_tables(self) -> None:
+        """Crée les tables et les index s'ils n'existent pas"""
+        with self._lock:
+            for table, columns in INDEXED_COLUMNS.items():
+                column_defs = "".join(f", {column} TEXT" for column in columns)
+                self.conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        id TEXT PRIMARY KEY{column_defs},
+                        data TEXT NOT NULL,
+                        updated_at TEXT
+                    )
+                """)
+                for column in columns:
+                    self.conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})"
+                    )
+
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+
+    @staticmethod
+    def _check_table(table: str) -> None:
+        if table not in INDEXED_COLUMNS:
+            raise ValueError(f"Table inconnue: {table}")
+
+    def _row_values(self, table: str, record: Dict[str, Any], serialized: str) -> Tuple:
+        """Construit les valeurs d'une ligne à partir d'un enregistrement"""
+        values = [str(record["id"])]
+        for column in INDEXED_COLUMNS[table]:
+            value = record.get(column)
+            values.append(None if value is None else str(value))
+        values.append(serialized)
+        values.append(record.get("updated_at"))
+        return tuple(values)
+
+    def _write(self, table: str, upserts: List[Tuple[Dict[str, Any], str]],
+               deletes: Iterable[str] = (), clear: bool = False) -> None:
+        """Écrit des insertions/mises à jour et des suppressions dans une seule transaction"""
+        columns = ("id",) + INDEXED_COLUMNS[table] + ("data", "updated_at")
+        placeholders = ", ".join("?" for _ in columns)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns[1:])
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+               f"ON CONFLICT(id) DO UPDATE SET {updates}")
+        deletes = [str(d) for d in deletes]
+
+        with self._lock:
+            try:
+                self.conn.execute("BEGIN")
+                if clear:
+                    self.conn.execute(f"DELETE FROM {table}")
+                if upserts:
+                    self.conn.executemany(
+                        sql, [self._row_values(table, record, s) for record, s in upserts]
+                    )
+                if deletes:
+                    self.conn.executemany(f"DELETE FROM {table} WHERE id = ?",
+                                          [(d,) for d in deletes])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+            if clear:
+                self._snapshots[table] = {}
+            snapshot = self._snapshots[table]
+            for record, serialized in upserts:
+                snapshot[str(record["id"])] = serialized
+            for record_id in deletes:
+                snapshot.pop(record_id, None)
+
+    # ---- Lecture ----
+
+    def load(self, table: str) -> List[Dict[str, Any]]:
+        """
+        Charge tous les enregistrements d'une table, dans leur ordre d'insertion
+
+        Args:
+            table: Nom de la table ('clients', 'templates' ou 'documents')
+
+        Returns:
+            list: Enregistrements de la table
+        """
+        self._check_table(table)
+        with self._lock:
+            rows = self.conn.execute(f"SELECT id, data FROM {table} ORDER BY rowid").fetchall()
+
+        records = []
+        snapshot = {}
+        for row in rows:
+            try:
+                records.append(json.loads(row["data"]))
+                snapshot[row["id"]] = row["data"]
+            except json.JSONDecodeError as e:
+                logger.error(f"Enregistrement {table}/{row['id']} illisible ignoré: {e}")
+        self._snapshots[table] = snapshot
+        return records
+
+    def get(self, table: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupère un enregistrement par son ID
+
+        Args:
+            table: Nom de la table
+            record_id: ID de l'enregistrement
+
+        Returns:
+            dict: Enregistrement ou None s'il n'existe pas
+        """
+        self._check_table(table)
+        with self._lock:
+            row = self.conn.execute(f"SELECT data FROM {table} WHERE id = ?",
+                                    (str(record_id),)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def find(self, table: str, order_by: str = None, limit: int = None,
+             date_from: str = None, date_to: str = None, **criteria) -> List[Dict[str, Any]]:
+        """
+        Recherche des enregistrements par colonnes indexées
+
+        Args:
+            table: Nom de la table
+            order_by: Colonne indexée de tri (préfixée de '-' pour un tri décroissant)
+            limit: Nombre maximal de résultats
+            date_from: Date minimale incluse (documents, format YYYY-MM-DD)
+            date_to: Date maximale incluse (documents, format YYYY-MM-DD)
+            **criteria: Égalités sur les colonnes indexées (ex: client_id="...")
+
+        Returns:
+            list: Enregistrements correspondants
+        """
+        self._check_table(table)
+        columns = INDEXED_COLUMNS[table]
+        clauses, params = [], []
+
+        for column, value in criteria.items():
+            if column not in columns:
+                raise ValueError(f"Colonne non indexée pour {table}: {column}")
+            if value is None:
+                clauses.append(f"{column} IS NULL")
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(str(value))
+
+        if date_from or date_to:
+            if "date" not in columns:
+                raise ValueError(f"Pas de colonne date pour {table}")
+            if date_from:
+                clauses.append("date >= ?")
+                params.append(date_from)
+            if date_to:
+                clauses.append("date <= ?")
+                params.append(date_to)
+
+        sql = f"SELECT data FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if order_by:
+            column = order_by.lstrip("-")
+            if column not in columns:
+                raise ValueError(f"Colonne de tri non indexée pour {table}: {column}")
+            sql += f" ORDER BY {column} {'DESC' if order_by.startswith('-') else 'ASC'}"
+        else:
+            sql += " ORDER BY rowid"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def distinct(self, table: str, column: str) -> List[str]:
+        """
+        Retourne les valeurs distinctes non vides d'une colonne indexée
+
+        Args:
+            table: Nom de la table
+            column: Colonne indexée
+
+        Returns:
+            list: Valeurs triées
+        """
+        self._check_table(table)
+        if column not in INDEXED_COLUMNS[table]:
+            raise ValueError(f"Colonne non indexée pour {table}: {column}")
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT DISTINCT {column} FROM {table} "
+                f"WHERE {column} IS NOT NULL AND {column} != '' ORDER BY {column}"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, table: str) -> int:
+        """Retourne le nombre d'enregistrements d'une table"""
+        self._check_table(table)
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    # ---- Écriture ----
+
+    def upsert(self, table: str, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insère ou met à jour des enregistrements
+
+        Args:
+            table: Nom de la table
+            records: Enregistrements (chacun doit avoir un 'id')
+
+        Returns:
+            int: Nombre d'enregistrements écrits
+        """
+        self._check_table(table)
+        upserts = [(record, _serialize(record)) for record in records]
+        self._write(table, upserts)
+        return len(upserts)
+
+    def delete(self, table: str, record_ids: Iterable[str]) -> int:
+        """
+        Supprime des enregistrements
+
+        Args:
+            table: Nom de la table
+            record_ids: IDs des enregistrements à supprimer
+
+        Returns:
+            int: Nombre d'IDs traités
+        """
+        self._check_table(table)
+        record_ids = list(record_ids)
+        self._write(table, [], record_ids)
+        return len(record_ids)
+
+    def sync(self, table: str, records: List[Dict[str, Any]],
+             prepare: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]] = None
+             ) -> List[Dict[str, Any]]:
+        """
+        Synchronise la table avec une liste complète d'enregistrements en n'écrivant
+        que les différences avec le dernier état écrit
+
+        Args:
+            table: Nom de la table
+            records: Liste complète des enregistrements
+            prepare: Fonction de validation appliquée aux seuls enregistrements
+                     nouveaux ou modifiés (retourne None pour écarter l'enregistrement)
+
+        Returns:
+            list: Enregistrements conservés, dans l'ordre de la liste d'origine
+        """
+        self._check_table(table)
+        snapshot = self._snapshots[table]
+        kept, upserts, seen = [], [], set()
+
+        for record in records:
+            record_id = record.get("id") if isinstance(record, dict) else None
+            if record_id is not None and str(record_id) not in seen:
+                serialized = _serialize(record)
+                if snapshot.get(str(record_id)) == serialized:
+                    kept.append(record)
+                    seen.add(str(record_id))
+                    continue
+
+            prepared = prepare(record) if prepare else record
+            if prepared is None or prepared.get("id") is None or str(prepared["id"]) in seen:
+                continue
+
+            kept.append(prepared)
+            seen.add(str(prepared["id"]))
+            upserts.append((prepared, _serialize(prepared)))
+
+        deletes = [record_id for record_id in snapshot if record_id not in seen]
+        if upserts or deletes:
+            self._write(table, upserts, deletes)
+            logger.debug(f"{table}: {len(upserts)} écrit(s), {len(deletes)} supprimé(s)")
+        return kept
+
+    def replace_all(self, table: str, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Remplace tout le contenu d'une table (import, restauration)
+
+        Args:
+            table: Nom de la table
+            records: Nouveaux enregistrements
+
+        Returns:
+            int: Nombre d'enregistrements importés
+        """
+        self._check_table(table)
+        upserts, seen = [], set()
+        for record in records:
+            if not isinstance(record, dict) or record.get("id") is None:
+                continue
+            if str(record["id"]) in seen:
+                continue
+            seen.add(str(record["id"]))
+            upserts.append((record, _serialize(record)))
+
+        self._write(table, upserts, clear=True)
+        return len(upserts)
+
+    # ---- Métadonnées ----
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        """Lit une métadonnée de la base"""
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_meta(self, key: str, value: Any) -> None:
+        """Écrit une métadonnée de la base"""
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, str(value))
+            )
+
+    # ---- Fichiers JSON ----
+
+    def import_json(self, table: str, json_file: str, force: bool = False) -> bool:
+        """
+        Migre un fichier JSON dans la base, une seule fois: une fois la table
+        migrée, le fichier n'est plus relu (les modifications faites depuis dans
+        la base sont conservées) sauf si l'import est forcé (restauration)
+
+        Args:
+            table: Nom de la table
+            json_file: Chemin du fichier JSON (liste d'enregistrements)
+            force: Remplacer le contenu de la table par celui du fichier
+
+        Returns:
+            bool: True si le fichier a été importé
+        """
+        self._check_table(table)
+        meta_key = f"json_migrated:{table}"
+        # Les bases migrées par les versions précédentes n'ont que json_mtime
+        migrated = (self.get_meta(meta_key) is not None
+                    or self.get_meta(f"json_mtime:{table}") is not None)
+        if not force and migrated:
+            return False
+        if not os.path.exists(json_file):
+            if not force:
+                self.set_meta(meta_key, datetime.now().isoformat())
+            return False
+
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, list):
+                raise ValueError("liste attendue")
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Fichier {json_file} invalide, import ignoré: {e}")
+            backup_file = f"{json_file}.corrupted.{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            shutil.copy2(json_file, backup_file)
+            logger.info(f"Sauvegarde du fichier corrompu créée: {backup_file}")
+            if not force:
+                self.set_meta(meta_key, datetime.now().isoformat())
+            return False
+
+        count = self.replace_all(table, data)
+        self.set_meta(meta_key, datetime.now().isoformat())
+        logger.info(f"{count} enregistrement(s) importé(s) dans {table} depuis {json_file}")
+        return True
+
+    def export_json(self, table: str, json_file: str) -> bool:
+        """
+        Exporte une table vers un fichier JSON (sauvegardes, lecteurs externes)
+
+        Args:
+            table: Nom de la table
+            json_file: Chemin du fichier JSON à écrire
+
+        Returns:
+            bool: True si l'export a réussi
+        """
+        self._check_table(table)
+        temp_file = f"{json_file}.tmp"
+        try:
+            with self._lock:
+                rows = self.conn.execute(f"SELECT data FROM {table} ORDER BY rowid").fetchall()
+
+            os.makedirs(os.path.dirname(os.path.abspath(json_file)), exist_ok=True)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write("[\n")
+                f.write(",\n".join(row["data"] for row in rows))
+                f.write("\n]\n" if rows else "]\n")
+            os.replace(temp_file, json_file)
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors de l'export de {table} vers {json_file}: {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            return False
+
+    def close(self) -> None:
+        """Ferme la connexion à la base"""
+        with self._lock:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sauvegardes incrémentales dédupliquées pour Vynal Docs Automator
+Les fichiers sont découpés en blocs adressés par leur empreinte SHA-256 et
+compressés en parallèle; un bloc déjà présent dans le dépôt n'est jamais réécrit.
+Chaque sauvegarde est un manifeste JSON (instantané) listant les blocs de chaque
+fichier: toutes les sauvegardes sont complètes à la restauration, qui peut ne
+porter que sur un fichier. Les bases SQLite sont copiées avec l'API de
+sauvegarde en ligne de SQLite.
+"""
+
+import os
+import json
+import zlib
+import fnmatch
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger("VynalDocsAutomator.BackupStore")
+
+# Taille des blocs (multiple des tailles de page SQLite: les pages inchangées
+# d'une base retombent dans les mêmes blocs d'une sauvegarde à l'autre)
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Fichiers jamais sauvegardés (comparés au nom du fichier)
+DEFAULT_EXCLUDES = ("*.tmp", "*-wal", "*-shm", "*-journal", "*.pyc")
+
+COMPRESSION_LEVEL = 6
+# Un bloc n'est conservé compressé que s'il gagne au moins 10 %
+# (PDF, DOCX et images sont déjà compressés)
+MIN_COMPRESSION_RATIO = 0.9
+
+# En-tête d'un bloc stocké
+_RAW = b"r"
+_ZLIB = b"z"
+
+
+def sqlite_backup(source: Union[str, sqlite3.Connection], target_path: str) -> None:
+    """
+    Copie cohérente d'une base SQLite avec l'API de sauvegarde en ligne
+    (la base reste utilisable pendant la copie)
+
+    Args:
+        source: Chemin de la base ou connexion ouverte
+        target_path: Fichier de destination
+    """
+    src = sqlite3.connect(source) if isinstance(source, str) else source
+    try:
+        dest = sqlite3.connect(target_path)
+        try:
+            src.backup(dest)
+        finally:
+            dest.close()
+    finally:
+        if src is not source:
+            src.close()
+
+
+def _database_path(source: Union[str, sqlite3.Connection]) -> str:
+    """Chemin du fichier d'une base (pour la restauration)"""
+    if isinstance(source, str):
+        return os.path.abspath(source)
+    for row in source.execute("PRAGMA database_list").fetchall():
+        if row[1] == "main":
+            return row[2]
+    return ""
+
+
+class BackupStore:
+    """
+    Dépôt de sauvegardes adressé par contenu
+
+    Organisation du dossier racine:
+        chunks/ab/<empreinte>   blocs (en-tête d'un octet puis données brutes ou zlib)
+        snapshots/<id>.json     manifestes des sauvegardes
+    """
+
+    def __init__(self, root: str, chunk_size: int = CHUNK_SIZE, workers: Optional[int] = None):
+        """
+        Initialise le dépôt
+
+        Args:
+            root: Dossier du dépôt (créé si nécessaire)
+            chunk_size: Taille des blocs
+            workers: Nombre de threads de compression (nombre de processeurs, 8 au plus, par défaut)
+        """
+        self.root = os.path.abspath(root)
+        self.chunks_dir = os.path.join(self.root, "chunks")
+        self.snapshots_dir = os.path.join(self.root, "snapshots")
+        self.chunk_size = chunk_size
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        # Une seule sauvegarde ou purge à la fois
+        self._lock = threading.Lock()
+
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+
+    # ---- Blocs ----
+
+    def _chunk_path(self, digest: str) -> str:
+        """Chemin d'un bloc"""
+        return os.path.join(self.chunks_dir, digest[:2], digest)
+
+    def _put_chunk(self, data: bytes) -> Tuple[str, int]:
+        """
+        Enregistre un bloc s'il est absent du dépôt (exécuté dans les threads de compression)
+
+        Args:
+            data: Contenu du bloc
+
+        Returns:
+            tuple: (empreinte, octets écrits; 0 si le bloc existait déjà)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+
+        compressed = zlib.compress(data, COMPRESSION_LEVEL)
+        if len(compressed) < len(data) * MIN_COMPRESSION_RATIO:
+            payload = _ZLIB + compressed
+        else:
+            payload = _RAW + data
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return digest, len(payload)
+
+    def _get_chunk(self, digest: str) -> bytes:
+        """
+        Lit et vérifie un bloc
+
+        Args:
+            digest: Empreinte du bloc
+
+        Returns:
+            bytes: Contenu du bloc
+
+        Raises:
+            ValueError: Si le bloc est corrompu
+        """
+        with open(self._chunk_path(digest), "rb") as f:
+            payload = f.read()
+        data = zlib.decompress(payload[1:]) if payload[:1] == _ZLIB else payload[1:]
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Bloc corrompu: {digest}")
+        return data
+
+    def _submit_file(self, path: str, executor: ThreadPoolExecutor,
+                     window: threading.BoundedSemaphore) -> Tuple[List[Any], int]:
+        """
+        Découpe un fichier et confie ses blocs aux threads de compression
+
+        Args:
+            path: Fichier à découper
+            executor: Threads de compression
+            window: Limite le nombre de blocs en mémoire en attente de compression
+
+        Returns:
+            tuple: (futures des blocs dans l'ordre, taille lue)
+        """
+        futures = []
+        size = 0
+        with open(path, "rb") as f:
+            for data in iter(lambda: f.read(self.chunk_size), b""):
+                size += len(data)
+                window.acquire()
+                future = executor.submit(self._put_chunk, data)
+                future.add_done_callback(lambda _: window.release())
+                futures.append(future)
+        return futures, size
+
+    # ---- Parcours des sources ----
+
+    def _walk(self, source: str, excludes: Tuple[str, ...]) -> Iterator[Tuple[Optional[str], str, os.stat_result]]:
+        """
+        Parcourt les fichiers d'une source (fichier ou dossier)
+
+        Args:
+            source: Chemin absolu de la source
+            excludes: Chemins absolus à ignorer (fichiers ou dossiers)
+
+        Yields:
+            tuple: (chemin relatif avec des "/", None pour une source fichier;
+            chemin complet; informations du fichier)
+        """
+        if os.path.isfile(source):
+            yield None, source, os.stat(source)
+            return
+
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames[:] = sorted(d for d in dirnames
+                                 if not self._is_excluded(os.path.join(dirpath, d), excludes))
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                if self._is_excluded(path, excludes):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # Fichier supprimé pendant le parcours
+                    continue
+                yield os.path.relpath(path, source).replace(os.sep, "/"), path, stat
+
+    def _is_excluded(self, path: str, excludes: Tuple[str, ...]) -> bool:
+        """Indique si un chemin est exclu de la sauvegarde"""
+        if path == self.root or path.startswith(self.root + os.sep):
+            return True
+        if any(path == excluded or path.startswith(excluded + os.sep) for excluded in excludes):
+            return True
+        name = os.path.basename(path)
+        return any(fnmatch.fnmatch(name, pattern) for pattern in DEFAULT_EXCLUDES)
+
+    # ---- Instantanés ----
+
+    def create_snapshot(self, sources: Dict[str, str],
+                        databases: Optional[Dict[str, Union[str, sqlite3.Connection]]] = None,
+                        full: bool = False, label: Optional[str] = None,
+                        excludes: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Crée une sauvegarde
+
+        Args:
+            sources: Nom dans la sauvegarde -> fichier ou dossier à sauvegarder
+            databases: Nom dans la sauvegarde -> base SQLite (chemin ou connexion),
+                       copiée avec l'API de sauvegarde en ligne
+            full: Relire tous les fichiers; sinon un fichier dont la taille et la date
+                  de modification n'ont pas changé depuis la dernière sauvegarde
+                  reprend ses blocs sans être relu
+            label: Libellé libre enregistré dans le manifeste
+            excludes: Fichiers ou dossiers à ignorer dans les sources
+
+        Returns:
+            Dict[str, Any]: Résumé de la sauvegarde (voir list_snapshots)
+        """
+        databases = databases or {}
+        with self._lock:
+            previous = {} if full else (self.latest_snapshot() or {}).get("files", {})
+            database_paths = {name: _database_path(db) for name, db in databases.items()}
+            excluded = tuple(os.path.abspath(path) for path in excludes) + tuple(
+                path for path in database_paths.values() if path)
+
+            files: Dict[str, Dict[str, Any]] = {}
+            pending: Dict[str, List[Any]] = {}
+            reused = 0
+            temp_dir = tempfile.mkdtemp(dir=self.root, prefix="tmp_")
+            try:
+                with ThreadPoolExecutor(max_workers=self.workers,
+                                        thread_name_prefix="BackupChunk") as executor:
+                    window = threading.BoundedSemaphore(self.workers * 2)
+
+                    # Bases SQLite d'abord: copie cohérente, puis découpage comme un fichier
+                    for name, db in databases.items():
+                        copy_path = os.path.join(temp_dir, "database.db")
+                        sqlite_backup(db, copy_path)
+                        pending[name], size = self._submit_file(copy_path, executor, window)
+                        files[name] = {"size": size, "mtime_ns": os.stat(copy_path).st_mtime_ns,
+                                       "database": True}
+                        os.remove(copy_path)
+
+                    for name, source in sources.items():
+                        source = os.path.abspath(source)
+                        if not os.path.exists(source):
+                            continue
+                        for rel_path, path, stat in self._walk(source, excluded):
+                            key = name if rel_path is None else f"{name}/{rel_path}"
+                            old = previous.get(key)
+                            if (old and not old.get("database") and old["size"] == stat.st_size
+                                    and old["mtime_ns"] == stat.st_mtime_ns):
+                                files[key] = old
+                                reused += 1
+                                continue
+                            try:
+                                pending[key], size = self._submit_file(path, executor, window)
+                            except OSError as e:
+                                logger.warning(f"Fichier ignoré dans la sauvegarde {path}: {e}")
+                                continue
+                            files[key] = {"size": size, "mtime_ns": stat.st_mtime_ns}
+
+                    new_chunks = 0
+                    stored_bytes = 0
+                    for key, futures in pending.items():
+                        chunks = []
+                        for future in futures:
+                            digest, written = future.result()
+                            chunks.append(digest)
+                            if written:
+                                new_chunks += 1
+                                stored_bytes += written
+                        files[key]["chunks"] = chunks
+            finally:
+                for name in os.listdir(temp_dir):
+                    os.remove(os.path.join(temp_dir, name))
+                os.rmdir(temp_dir)
+
+            now = datetime.now()
+            snapshot_id = now.strftime("%Y%m%d_%H%M%S")
+            suffix = 1
+            while os.path.exists(self._snapshot_path(snapshot_id)):
+                snapshot_id = f"{now.strftime('%Y%m%d_%H%M%S')}_{suffix:03d}"
+                suffix += 1
+
+            manifest = {
+                "id": snapshot_id,
+                "created": now.isoformat(),
+                "type": "full" if full else "incremental",
+                "label": label,
+                "sources": {name: os.path.abspath(path) for name, path in sources.items()},
+                "databases": {name: path for name, path in database_paths.items()},
+                "stats": {
+                    "files": len(files),
+                    "size": sum(entry["size"] for entry in files.values()),
+                    "reused_files": reused,
+                    "new_chunks": new_chunks,
+                    "stored_bytes": stored_bytes,
+                },
+                "files": files,
+            }
+            self._write_manifest(manifest)
+
+        logger.info(f"Sauvegarde {snapshot_id}: {len(files)} fichiers ({reused} inchangés), "
+                    f"{new_chunks} nouveaux blocs, {stored_bytes} octets écrits")
+        return self._summary(manifest)
+
+    def _snapshot_path(self, snapshot_id: str) -> str:
+        """Chemin du manifeste d'une sauvegarde"""
+        return os.path.join(self.snapshots_dir, f"{snapshot_id}.json")
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Écrit un manifeste de manière atomique"""
+        fd, temp_path = tempfile.mkstemp(dir=self.snapshots_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, self._snapshot_path(manifest["id"]))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _summary(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """Résumé d'un manifeste (sans la liste des fichiers)"""
+        summary = {key: value for key, value in manifest.items() if key != "files"}
+        summary["path"] = self._snapshot_path(manifest["id"])
+        return summary
+
+    def snapshot_ids(self) -> List[str]:
+        """Identifiants des sauvegardes, de la plus ancienne à la plus récente"""
+        return sorted(name[:-5] for name in os.listdir(self.snapshots_dir) if name.endswith(".json"))
+
+    def load_snapshot(self, snapshot: str) -> Optional[Dict[str, Any]]:
+        """
+        Charge le manifeste d'une sauvegarde
+
+        Args:
+            snapshot: Identifiant de la sauvegarde ou chemin de son manifeste
+
+        Returns:
+            Optional[Dict[str, Any]]: Manifeste, None si la sauvegarde n'existe pas
+        """
+        path = snapshot if snapshot.endswith(".json") else self._snapshot_path(snapshot)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def latest_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Manifeste de la sauvegarde la plus récente"""
+        ids = self.snapshot_ids()
+        return self.load_snapshot(ids[-1]) if ids else None
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """
+        Liste les sauvegardes
+
+        Returns:
+            List[Dict[str, Any]]: Résumés (id, created, type, label, sources,
+            databases, stats, path), du plus récent au plus ancien
+        """
+        summaries = []
+        for snapshot_id in reversed(self.snapshot_ids()):
+            manifest = self.load_snapshot(snapshot_id)
+            if manifest:
+                summaries.append(self._summary(manifest))
+        return summaries
+
+    # ---- Restauration ----
+
+    def restore(self, snapshot: str, destination: Optional[str] = None,
+                paths: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Restaure tout ou partie d'une sauvegarde
+
+        Args:
+            snapshot: Identifiant de la sauvegarde ou chemin de son manifeste
+            destination: Dossier où recréer l'arborescence de la sauvegarde; par
+                         défaut, chaque fichier retrouve son emplacement d'origine
+            paths: Fichiers ou dossiers à restaurer, sous leur nom dans la
+                   sauvegarde (par exemple "documents/contrat.pdf"); tout par défaut
+
+        Returns:
+            List[str]: Chemins des fichiers restaurés
+
+        Raises:
+            ValueError: Si la sauvegarde n'existe pas ou si un bloc est corrompu
+        """
+        manifest = self.load_snapshot(snapshot)
+        if manifest is None:
+            raise ValueError(f"Sauvegarde introuvable: {snapshot}")
+
+        selected = [path.strip("/") for path in paths] if paths is not None else None
+        origins = dict(manifest.get("sources", {}), **manifest.get("databases", {}))
+        restored = []
+        for key, entry in manifest["files"].items():
+            if selected is not None and not any(
+                    key == path or key.startswith(path + "/") for path in selected):
+                continue
+
+            name, _, rel_path = key.partition("/")
+            if destination is not None:
+                base, rel_path = os.path.abspath(destination), key
+            else:
+                base = origins.get(name)
+                if not base:
+                    continue
+            target = os.path.normpath(os.path.join(base, *rel_path.split("/"))) if rel_path else base
+            if target != base and not target.startswith(base + os.sep):
+                logger.warning(f"Chemin ignoré à la restauration: {key}")
+                continue
+
+            self._restore_file(entry, target)
+            restored.append(target)
+
+        logger.info(f"{len(restored)} fichiers restaurés depuis la sauvegarde {manifest['id']}")
+        return restored
+
+    def _restore_file(self, entry: Dict[str, Any], target: str) -> None:
+        """Recompose un fichier à partir de ses blocs (écriture atomique)"""
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for digest in entry["chunks"]:
+                    f.write(self._get_chunk(digest))
+            os.replace(temp_path, target)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        os.utime(target, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+    # ---- Purge ----
+
+    def delete_snapshot(self, snapshot_id: str) -> bool:
+        """
+        Supprime le manifeste d'une sauvegarde (les blocs sont libérés par collect_garbage)
+
+        Returns:
+            bool: True si la sauvegarde existait
+        """
+        try:
+            os.remove(self._snapshot_path(snapshot_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def prune(self, keep: int) -> int:
+        """
+        Conserve les `keep` sauvegardes les plus récentes et libère les blocs orphelins
+
+        Args:
+            keep: Nombre de sauvegardes à conserver
+
+        Returns:
+            int: Nombre de sauvegardes supprimées
+        """
+        with self._lock:
+            ids = self.snapshot_ids()
+            obsolete = ids[:-keep] if keep > 0 else ids
+            for snapshot_id in obsolete:
+                self.delete_snapshot(snapshot_id)
+            if obsolete:
+                self._collect_garbage()
+        return len(obsolete)
+
+    def collect_garbage(self) -> Tuple[int, int]:
+        """
+        Supprime les blocs qui ne sont plus référencés par aucune sauvegarde
+
+        Returns:
+            tuple: (nombre de blocs supprimés, octets libérés)
+        """
+        with self._lock:
+            return self._collect_garbage()
+
+    def _collect_garbage(self) -> Tuple[int, int]:
+        """collect_garbage, verrou déjà acquis"""
+        referenced = set()
+        for snapshot_id in self.snapshot_ids():
+            manifest = self.load_snapshot(snapshot_id) or {}
+            for entry in manifest.get("files", {}).values():
+                referenced.update(entry["chunks"])
+
+        removed = 0
+        freed = 0
+        for dirpath, _, filenames in os.walk(self.chunks_dir):
+            for filename in filenames:
+                if filename in referenced:
+                    continue
+                path = os.path.join(dirpath, filename)
+                freed += os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+
+        if removed:
+            logger.info(f"{removed} blocs orphelins supprimés ({freed} octets)")
+        return removed, freed
@@ -76,7 +76,8 @@ class ConfigManager:
             "document": {
                 "default_format": "pdf",
                 "filename_pattern": "{document_type}_{client_name}_{date}",
-                "date_format": "%Y-%m-%d"
+                "date_format": "%Y-%m-%d",
+                "batch_workers": 0
             },
             "users": [
                 {
@@ -3,6 +3,7 @@ import re
 import logging
 from datetime import datetime
 import io
+import threading
 
 # Pour les documents PDF
 try:
@@ -30,8 +31,106 @@ except ImportError:
     DOCX_AVAILABLE = False
     logging.warning("python-docx n'est pas installé. La génération de DOCX sera limitée.")
 
+from utils.template_renderer import compile_template, MISSING_REMOVE
+
 logger = logging.getLogger("VynalDocsAutomator.DocumentGenerator")
 
+# Chemins possibles pour DejaVuSans.ttf
+FONT_CANDIDATE_PATHS = [
+    os.path.join(os.path.dirname(__file__), 'fonts', 'DejaVuSans.ttf'),  # Dans le dossier fonts/ relatif à ce script
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fonts', 'DejaVuSans.ttf'),  # Dans le dossier fonts/ du projet
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Chemin Linux commun
+    'C:\\Windows\\Fonts\\DejaVuSans.ttf',  # Chemin Windows
+    os.path.expanduser('~/Library/Fonts/DejaVuSans.ttf')  # Chemin macOS
+]
+
+# Taille maximale du logo dans les PDF (en points)
+MAX_LOGO_WIDTH = 150
+MAX_LOGO_HEIGHT = 70
+
+# Ressources partagées par tous les documents générés dans un processus
+_resources_lock = threading.Lock()
+_unicode_font_name = None
+_logo_cache = {}
+
+
+def get_unicode_font():
+    """
+    Enregistre la police DejaVuSans auprès de ReportLab (une seule fois par processus)
+
+    Returns:
+        str: Nom de la police à utiliser ("DejaVuSans" ou "Helvetica" à défaut)
+    """
+    global _unicode_font_name
+
+    if _unicode_font_name is not None:
+        return _unicode_font_name
+
+    with _resources_lock:
+        if _unicode_font_name is None:
+            font_name = "Helvetica"
+            try:
+                dejavu_path = next((path for path in FONT_CANDIDATE_PATHS if os.path.exists(path)), None)
+                if dejavu_path and REPORTLAB_AVAILABLE:
+                    pdfmetrics.registerFont(TTFont('DejaVuSans', dejavu_path))
+                    font_name = "DejaVuSans"
+                    logger.info("Utilisation de la police DejaVuSans pour les PDF")
+            except Exception as font_error:
+                logger.warning(f"Impossible d'utiliser la police DejaVuSans, utilisation de Helvetica: {font_error}")
+            _unicode_font_name = font_name
+
+    return _unicode_font_name
+
+
+def load_logo(logo_path):
+    """
+    Charge et décode le logo de l'entreprise, avec un cache par chemin et date de modification
+
+    Args:
+        logo_path: Chemin du logo
+
+    Returns:
+        dict: Octets du fichier ("data"), image décodée ("image") et taille dans
+              les PDF ("pdf_size"), ou None si le logo est introuvable ou illisible
+    """
+    try:
+        mtime = os.path.getmtime(logo_path)
+    except OSError:
+        return None
+
+    cache_key = (logo_path, mtime)
+    logo = _logo_cache.get(cache_key)
+    if logo is not None:
+        return logo
+
+    try:
+        with open(logo_path, 'rb') as f:
+            data = f.read()
+
+        logo = {"data": data, "image": None, "pdf_size": None}
+        if REPORTLAB_AVAILABLE:
+            image = PILImage.open(io.BytesIO(data))
+            image.load()
+            logo_width, logo_height = image.size
+            # Redimensionner si trop grand
+            if logo_width > MAX_LOGO_WIDTH or logo_height > MAX_LOGO_HEIGHT:
+                ratio = min(MAX_LOGO_WIDTH / logo_width, MAX_LOGO_HEIGHT / logo_height)
+                logo_width, logo_height = int(logo_width * ratio), int(logo_height * ratio)
+            logo["image"] = image
+            logo["pdf_size"] = (logo_width, logo_height)
+    except Exception as e:
+        logger.warning(f"Impossible de charger le logo {logo_path}: {e}")
+        return None
+
+    with _resources_lock:
+        # Ne conserver que la dernière version de chaque logo
+        for key in [k for k in _logo_cache if k[0] == logo_path]:
+            del _logo_cache[key]
+        _logo_cache[cache_key] = logo
+
+    return logo
+
+
 class DocumentGenerator:
     """
     Générateur de documents pour l'application
@@ -256,62 +355,32 @@ class DocumentGenerator:
         
         return html_content.strip(), images
     
-    def replace_variables(self, content, variables):
+    def replace_variables(self, content, variables, template_key=None, template_mtime=None):
         """
         Remplace les variables dans un contenu de manière sécurisée
         Supporte à la fois les formats {variable} et {{variable}}
         
+        Le modèle est compilé une seule fois (cache par identifiant et date de
+        modification) puis rendu en une seule passe; les variables sans valeur
+        sont supprimées.
+        
         Args:
             content: Contenu avec variables
             variables: Dictionnaire des variables et leurs valeurs
+            template_key: Identifiant du modèle pour le cache (optionnel)
+            template_mtime: Date de modification du modèle (optionnel)
             
         Returns:
             str: Contenu avec variables remplacées
         """
-        import re
+        compiled = compile_template(content, template_key, template_mtime)
         
-        # Si le contenu n'est pas une chaîne, le convertir
-        if not isinstance(content, str):
-            content = str(content)
-        
-        # Préparation des valeurs pour éviter les valeurs None
-        safe_variables = {}
-        for key, value in variables.items():
-            if value is None:
-                safe_variables[key] = ""
-            else:
-                safe_variables[key] = str(value)
-        
-        # Remplacer d'abord les variables au format {{variable}}
-        for var_name, var_value in safe_variables.items():
-            # Format {{variable}}
-            pattern = r"{{" + re.escape(var_name) + r"}}"
-            content = re.sub(pattern, var_value, content)
-        
-        # Ensuite remplacer les variables au format {variable}
-        for var_name, var_value in safe_variables.items():
-            # Format {variable} (pour la rétrocompatibilité)
-            # Utiliser une expression régulière pour éviter les faux positifs
-            pattern = r"{" + re.escape(var_name) + r"}"
-            content = re.sub(pattern, var_value, content)
+        # Signaler les variables non remplacées (elles seront supprimées)
+        missing = compiled.missing_variables(variables)
+        if missing:
+            logger.warning(f"Variables non remplacées: {missing}")
         
-        # Rechercher les variables non remplacées au format {{variable}}
-        remaining_vars = re.findall(r'{{([^{}]*?)}}', content)
-        if remaining_vars:
-            logger.warning(f"Variables non remplacées (format {{variable}}): {remaining_vars}")
-            # Remplacer les variables non trouvées par une chaîne vide
-            for var in remaining_vars:
-                content = content.replace(f"{{{{{var}}}}}", "")
-        
-        # Rechercher les variables non remplacées au format {variable}
-        remaining_simple_vars = re.findall(r'{([^{}]*)}', content)
-        if remaining_simple_vars:
-            logger.warning(f"Variables non remplacées (format {variable}): {remaining_simple_vars}")
-            # Remplacer les variables non trouvées par une chaîne vide
-            for var in remaining_simple_vars:
-                content = content.replace(f"{{{var}}}", "")
-        
-        return content
+        return compiled.render(variables, missing=MISSING_REMOVE)
     
     def clean_filename(self, name):
         """
@@ -332,6 +401,127 @@ class DocumentGenerator:
         
         return name
     
+    def resolve_format(self, format_type=None):
+        """
+        Détermine le format de sortie effectivement disponible
+        
+        Args:
+            format_type: Format demandé (pdf, docx ou txt), None pour le format par défaut
+            
+        Returns:
+            str: Format retenu
+        """
+        # Déterminer le format si non spécifié
+        if format_type is None:
+            format_type = "pdf"
+            if self.config:
+                format_type = self.config.get("document.default_format", "pdf")
+        
+        format_type = format_type.lower()
+        
+        # Vérifier la disponibilité des modules nécessaires
+        if format_type == "pdf" and not REPORTLAB_AVAILABLE:
+            logger.warning("ReportLab n'est pas installé, utilisation du format TXT à la place")
+            format_type = "txt"
+        elif format_type == "docx" and not DOCX_AVAILABLE:
+            logger.warning("python-docx n'est pas installé, utilisation du format TXT à la place")
+            format_type = "txt"
+        
+        return format_type
+    
+    def resolve_template(self, template):
+        """
+        Récupère le contenu d'un modèle et sa version (pour le cache de compilation)
+        
+        Le fichier du modèle, s'il existe, a priorité sur le contenu stocké en base.
+        
+        Args:
+            template: Modèle de document (dict)
+            
+        Returns:
+            tuple: (contenu, date de modification)
+        """
+        content = template.get("content", "")
+        template_mtime = template.get("updated_at")
+        
+        # Si le modèle a un chemin de fichier, l'utiliser
+        if "file_path" in template and template["file_path"]:
+            try:
+                template_file = template["file_path"]
+                if not os.path.isabs(template_file):
+                    # Construire le chemin absolu si le chemin est relatif
+                    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                    template_file = os.path.join(base_dir, "data", "templates", template_file)
+                
+                if os.path.exists(template_file):
+                    with open(template_file, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                    template_mtime = os.path.getmtime(template_file)
+            except Exception as e:
+                logger.error(f"Erreur lors de la lecture du fichier modèle: {e}")
+                # Continuer avec le contenu stocké dans la base de données
+        
+        return content, template_mtime
+    
+    def build_variables(self, client, company_info, variables, date=None):
+        """
+        Construit l'ensemble des variables d'un document
+        
+        Args:
+            client: Informations du client (dict)
+            company_info: Informations de l'entreprise (dict)
+            variables: Variables spécifiques pour le document
+            date: Date du document (par défaut la date du jour)
+            
+        Returns:
+            dict: Variables du client, de l'entreprise, spécifiques et date
+        """
+        all_variables = {}
+        
+        # Variables standard du client
+        all_variables.update({
+            "client_name": client.get("name", ""),
+            "client_company": client.get("company", ""),
+            "client_email": client.get("email", ""),
+            "client_phone": client.get("phone", ""),
+            "client_address": client.get("address", "")
+        })
+        
+        # Variables de l'entreprise
+        all_variables.update({
+            "company_name": company_info.get("name", ""),
+            "company_address": company_info.get("address", ""),
+            "company_email": company_info.get("email", ""),
+            "company_phone": company_info.get("phone", ""),
+            "company_website": company_info.get("website", "")
+        })
+        
+        # Variables spécifiques
+        all_variables.update(variables)
+        
+        # Date actuelle
+        all_variables["date"] = date or datetime.now().strftime("%Y-%m-%d")
+        
+        return all_variables
+    
+    def get_logo_path(self):
+        """
+        Retourne le chemin du logo de l'entreprise s'il existe
+        
+        Returns:
+            str: Chemin du logo ou None
+        """
+        logo_path = None
+        if self.config:
+            logo_path = self.config.get("app.company_logo", "")
+            
+            # Vérifier que le logo existe
+            if logo_path and not os.path.exists(logo_path):
+                logger.warning(f"Logo spécifié mais introuvable: {logo_path}")
+                logo_path = None
+        
+        return logo_path or None
+    
     def generate_document(self, file_path, template, client, company_info, variables, format_type=None):
         """
         Génère un document à partir d'un modèle avec gestion d'erreur robuste
@@ -348,21 +538,7 @@ class DocumentGenerator:
             bool: True si le document a été généré avec succès, False sinon
         """
         try:
-            # Déterminer le format si non spécifié
-            if format_type is None:
-                format_type = "pdf"
-                if self.config:
-                    format_type = self.config.get("document.default_format", "pdf")
-            
-            format_type = format_type.lower()
-            
-            # Vérifier la disponibilité des modules nécessaires
-            if format_type == "pdf" and not REPORTLAB_AVAILABLE:
-                logger.warning("ReportLab n'est pas installé, utilisation du format TXT à la place")
-                format_type = "txt"
-            elif format_type == "docx" and not DOCX_AVAILABLE:
-                logger.warning("python-docx n'est pas installé, utilisation du format TXT à la place")
-                format_type = "txt"
+            format_type = self.resolve_format(format_type)
             
             # S'assurer que l'extension correspond au format
             file_ext = os.path.splitext(file_path)[1].lower()
@@ -373,34 +549,10 @@ class DocumentGenerator:
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             
             # Préparer les variables
-            all_variables = {}
+            all_variables = self.build_variables(client, company_info, variables)
             
-            # Variables standard du client
-            all_variables.update({
-                "client_name": client.get("name", ""),
-                "client_company": client.get("company", ""),
-                "client_email": client.get("email", ""),
-                "client_phone": client.get("phone", ""),
-                "client_address": client.get("address", "")
-            })
-            
-            # Variables de l'entreprise
-            all_variables.update({
-                "company_name": company_info.get("name", ""),
-                "company_address": company_info.get("address", ""),
-                "company_email": company_info.get("email", ""),
-                "company_phone": company_info.get("phone", ""),
-                "company_website": company_info.get("website", "")
-            })
-            
-            # Variables spécifiques
-            all_variables.update(variables)
-            
-            # Date actuelle
-            all_variables["date"] = datetime.now().strftime("%Y-%m-%d")
-            
-            # Obtenir le contenu du modèle
-            content = template.get("content", "")
+            # Obtenir le contenu du modèle (et sa version pour le cache de compilation)
+            content, template_mtime = self.resolve_template(template)
             
             # Journaliser la taille du contenu pour le débogage
             content_sample = content[:100] + "..." if len(content) > 100 else content
@@ -408,24 +560,9 @@ class DocumentGenerator:
             logger.info(f"Taille du contenu du modèle: {len(content)} caractères")
             logger.info(f"Le contenu contient des balises img: {'<img' in content}")
             
-            # Si le modèle a un chemin de fichier, l'utiliser
-            if "file_path" in template and template["file_path"]:
-                try:
-                    template_file = template["file_path"]
-                    if not os.path.isabs(template_file):
-                        # Construire le chemin absolu si le chemin est relatif
-                        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                        template_file = os.path.join(base_dir, "data", "templates", template_file)
-                    
-                    if os.path.exists(template_file):
-                        with open(template_file, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                except Exception as e:
-                    logger.error(f"Erreur lors de la lecture du fichier modèle: {e}")
-                    # Continuer avec le contenu stocké dans la base de données
-            
             # Remplacer les variables dans le contenu
-            content = self.replace_variables(content, all_variables)
+            content = self.replace_variables(content, all_variables,
+                                             template.get("id"), template_mtime)
             
             # Vérifier si le contenu après remplacement des variables contient toujours des balises d'image
             logger.info(f"Après remplacement des variables, contient des balises img: {'<img' in content}")
@@ -442,64 +579,9 @@ class DocumentGenerator:
             if "title" in variables:
                 title = variables["title"]
             
-            # Obtenir le chemin du logo
-            logo_path = None
-            if self.config:
-                logo_path = self.config.get("app.company_logo", "")
-                
-                # Vérifier que le logo existe
-                if logo_path and not os.path.exists(logo_path):
-                    logger.warning(f"Logo spécifié mais introuvable: {logo_path}")
-                    logo_path = None
-            
-            # Générer le document selon le format avec gestion d'erreur
-            try:
-                if format_type == "pdf":
-                    success = self.generate_pdf(file_path, content, title, client, company_info, logo_path)
-                elif format_type == "docx":
-                    success = self.generate_docx(file_path, content, title, client, company_info, logo_path)
-                else:
-                    success = self.generate_txt(file_path, content, title, client, company_info)
-                
-                if not success:
-                    raise Exception(f"Échec lors de la génération au format {format_type}")
-                
-                logger.info(f"Document généré avec succès: {file_path}")
-                return True
-            
-            except Exception as format_error:
-                logger.error(f"Erreur lors de la génération au format {format_type}: {format_error}")
-                
-                # Solution de repli: générer un document texte
-                try:
-                    txt_path = os.path.splitext(file_path)[0] + ".txt"
-                    success = self.generate_txt(txt_path, content, title, client, company_info)
-                    
-                    if success:
-                        logger.info(f"Document texte de secours généré: {txt_path}")
-                        return True
-                    else:
-                        raise Exception("Échec de la génération du document texte de secours")
-                
-                except Exception as fallback_error:
-                    logger.error(f"Erreur lors de la génération du document texte de secours: {fallback_error}")
-                    
-                    # Dernière tentative: créer un document texte minimal
-                    try:
-                        minimal_path = os.path.splitext(file_path)[0] + ".txt"
-                        with open(minimal_path, 'w', encoding='utf-8') as f:
-                            f.write(f"Titre: {title}\n")
-                            f.write(f"Date: {datetime.now().strftime('%Y-%m-%d')}\n")
-                            f.write(f"Client: {client.get('name', '')}\n\n")
-                            f.write("Une erreur est survenue lors de la génération du document.\n")
-                            f.write("Ce document est une version de secours minimale.\n")
-                        
-                        logger.info(f"Document texte minimal créé: {minimal_path}")
-                        return True
-                    
-                    except Exception as minimal_error:
-                        logger.error(f"Erreur lors de la création du document minimal: {minimal_error}")
-                        return False
+            output_path = self.write_document(file_path, content, title, client, company_info,
+                                              format_type, self.get_logo_path())
+            return output_path is not None
         
         except Exception as e:
             logger.error(f"Erreur globale lors de la génération du document: {e}")
@@ -517,6 +599,92 @@ class DocumentGenerator:
             except:
                 return False
     
+    def write_document(self, file_path, content, title, client, company_info, format_type, logo_path=None):
+        """
+        Écrit un document déjà rendu, avec repli sur un document texte en cas d'échec
+        
+        Args:
+            file_path: Chemin du fichier à créer (extension conforme au format)
+            content: Contenu du document avec variables remplacées
+            title: Titre du document
+            client: Informations du client
+            company_info: Informations de l'entreprise
+            format_type: Format du document (pdf, docx ou txt)
+            logo_path: Chemin du logo de l'entreprise
+            
+        Returns:
+            str: Chemin du fichier effectivement créé, None en cas d'échec
+        """
+        # Générer le document selon le format avec gestion d'erreur
+        try:
+            if format_type == "pdf":
+                success = self.generate_pdf(file_path, content, title, client, company_info, logo_path)
+            elif format_type == "docx":
+                success = self.generate_docx(file_path, content, title, client, company_info, logo_path)
+            else:
+                success = self.generate_txt(file_path, content, title, client, company_info)
+            
+            if not success:
+                raise Exception(f"Échec lors de la génération au format {format_type}")
+            
+            logger.info(f"Document généré avec succès: {file_path}")
+            return file_path
+        
+        except Exception as format_error:
+            logger.error(f"Erreur lors de la génération au format {format_type}: {format_error}")
+            
+            # Solution de repli: générer un document texte
+            txt_path = os.path.splitext(file_path)[0] + ".txt"
+            try:
+                success = self.generate_txt(txt_path, content, title, client, company_info)
+                
+                if success:
+                    logger.info(f"Document texte de secours généré: {txt_path}")
+                    return txt_path
+                else:
+                    raise Exception("Échec de la génération du document texte de secours")
+            
+            except Exception as fallback_error:
+                logger.error(f"Erreur lors de la génération du document texte de secours: {fallback_error}")
+                
+                # Dernière tentative: créer un document texte minimal
+                try:
+                    with open(txt_path, 'w', encoding='utf-8') as f:
+                        f.write(f"Titre: {title}\n")
+                        f.write(f"Date: {datetime.now().strftime('%Y-%m-%d')}\n")
+                        f.write(f"Client: {client.get('name', '')}\n\n")
+                        f.write("Une erreur est survenue lors de la génération du document.\n")
+                        f.write("Ce document est une version de secours minimale.\n")
+                    
+                    logger.info(f"Document texte minimal créé: {txt_path}")
+                    return txt_path
+                
+                except Exception as minimal_error:
+                    logger.error(f"Erreur lors de la création du document minimal: {minimal_error}")
+                    return None
+    
+    def generate_batch(self, template, rows, output, company_info, format_type=None, **options):
+        """
+        Génère un document par ligne de données (publipostage)
+        
+        Voir utils.mail_merge.generate_batch pour le détail des options
+        (nombre de workers, modèle de nom de fichier, callback de progression...).
+        
+        Args:
+            template: Modèle de document (dict)
+            rows: Lignes de données (dicts), par exemple issues d'un CSV ou de la base
+            output: Dossier de sortie ou chemin d'une archive .zip
+            company_info: Informations de l'entreprise (dict)
+            format_type: Format des documents (pdf, docx ou txt)
+            
+        Returns:
+            dict: Rapport du lot (documents générés, échecs par ligne)
+        """
+        from utils.mail_merge import generate_batch
+        
+        return generate_batch(template, rows, output, company_info, format_type=format_type,
+                              generator=self, **options)
+    
     def generate_txt(self, file_path, content, title, client, company_info):
         """
         Génère un document texte simple en retirant les balises HTML
@@ -583,51 +751,17 @@ class DocumentGenerator:
             c = canvas.Canvas(file_path, pagesize=A4)
             width, height = A4
             
-            # Définir la police à utiliser - Helvetica par défaut
-            font_name = "Helvetica"
-            
-            # Essayer d'utiliser une police qui supporte mieux l'Unicode si disponible
-            try:
-                # Vérifier l'existence de DejaVuSans.ttf
-                dejavu_path = None
-                
-                # Chemins possibles pour DejaVuSans.ttf
-                possible_paths = [
-                    os.path.join(os.path.dirname(__file__), 'fonts', 'DejaVuSans.ttf'),  # Dans le dossier fonts/ relatif à ce script
-                    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fonts', 'DejaVuSans.ttf'),  # Dans le dossier fonts/ du projet
-                    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Chemin Linux commun
-                    'C:\\Windows\\Fonts\\DejaVuSans.ttf',  # Chemin Windows
-                    os.path.expanduser('~/Library/Fonts/DejaVuSans.ttf')  # Chemin macOS
-                ]
-                
-                for path in possible_paths:
-                    if os.path.exists(path):
-                        dejavu_path = path
-                        break
-                
-                if dejavu_path:
-                    pdfmetrics.registerFont(TTFont('DejaVuSans', dejavu_path))
-                    c.setFont("DejaVuSans", 10)
-                    font_name = "DejaVuSans"
-                    logger.info(f"Utilisation de la police DejaVuSans pour le PDF")
-            except Exception as font_error:
-                logger.warning(f"Impossible d'utiliser la police DejaVuSans, utilisation de Helvetica: {font_error}")
+            # Police Unicode (DejaVuSans) enregistrée une seule fois par processus
+            font_name = get_unicode_font()
+            c.setFont(font_name, 10)
             
-            # Ajouter le logo si fourni
-            if logo_path and os.path.exists(logo_path):
+            # Ajouter le logo si fourni (décodé une seule fois par processus)
+            logo = load_logo(logo_path) if logo_path else None
+            if logo:
                 try:
-                    # Tenter de charger le logo
-                    logo_img = PILImage.open(logo_path)
-                    logo_width, logo_height = logo_img.size
-                    # Redimensionner si trop grand
-                    max_logo_width = 150  # Taille maximale en points
-                    max_logo_height = 70
-                    if logo_width > max_logo_width or logo_height > max_logo_height:
-                        ratio = min(max_logo_width / logo_width, max_logo_height / logo_height)
-                        logo_width, logo_height = int(logo_width * ratio), int(logo_height * ratio)
-                    
                     # Positionner le logo en haut à droite
-                    c.drawInlineImage(logo_path, width - logo_width - 50, height - 50 - logo_height, logo_width, logo_height)
+                    logo_width, logo_height = logo["pdf_size"]
+                    c.drawInlineImage(logo["image"], width - logo_width - 50, height - 50 - logo_height, logo_width, logo_height)
                 except Exception as logo_error:
                     logger.warning(f"Impossible d'ajouter le logo: {logo_error}")
             
@@ -911,13 +1045,14 @@ class DocumentGenerator:
                 section.bottom_margin = Inches(1.2)
             
             # Ajouter le logo si fourni
-            if logo_path and os.path.exists(logo_path):
+            logo = load_logo(logo_path) if logo_path else None
+            if logo:
                 try:
                     # Ajouter un paragraphe pour le logo
                     logo_para = doc.add_paragraph()
                     logo_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
                     logo_run = logo_para.add_run()
-                    logo_run.add_picture(logo_path, width=Inches(2.0))
+                    logo_run.add_picture(io.BytesIO(logo["data"]), width=Inches(2.0))
                 except Exception as logo_error:
                     logger.warning(f"Impossible d'ajouter le logo: {logo_error}")
             
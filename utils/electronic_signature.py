@@ -3,19 +3,26 @@ import logging
 import datetime
 import hashlib
 import base64
+import threading
 from typing import Optional, Dict, Any
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives import serialization
 from cryptography.x509 import load_pem_x509_certificate
+from cryptography.x509.oid import NameOID
 from cryptography.fernet import Fernet
 import PyPDF2
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 import io
+from utils.pdf_pipeline import PDFPipeline, write_file_atomic
+from utils.signing_service import file_digest
 
 logger = logging.getLogger(__name__)
 
+# Taille lue en fin de fichier pour trouver une signature (RSA 4096 bits en base64: 684 octets)
+SIGNATURE_TAIL_SIZE = 4096
+
 class ElectronicSignature:
     """Classe pour gérer les signatures électroniques des documents PDF"""
     
@@ -29,8 +36,48 @@ class ElectronicSignature:
         self.config = config
         self.cert_path = os.path.join(config.get("data_dir", ""), "certificates", "signing_cert.pem")
         self.key_path = os.path.join(config.get("data_dir", ""), "certificates", "private_key.pem")
+        
+        # Clé et certificat désérialisés une seule fois (voir private_key et certificate)
+        self._private_key = None
+        self._certificate = None
+        self._key_lock = threading.Lock()
+        
         self._ensure_certificates()
     
+    def __getstate__(self):
+        # Les clés chargées ne sont pas transmises aux processus de travail
+        state = self.__dict__.copy()
+        state.update(_private_key=None, _certificate=None, _key_lock=None)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._key_lock = threading.Lock()
+    
+    @property
+    def private_key(self):
+        """Clé privée de signature, lue et désérialisée au premier usage"""
+        if self._private_key is None:
+            with self._key_lock:
+                if self._private_key is None:
+                    with open(self.key_path, 'rb') as f:
+                        self._private_key = serialization.load_pem_private_key(f.read(), password=None)
+        return self._private_key
+    
+    @property
+    def certificate(self):
+        """Certificat de signature, lu au premier usage"""
+        if self._certificate is None:
+            with self._key_lock:
+                if self._certificate is None:
+                    with open(self.cert_path, 'rb') as f:
+                        self._certificate = load_pem_x509_certificate(f.read())
+        return self._certificate
+    
+    def load_keys(self) -> None:
+        """Charge la clé privée et le certificat s'ils ne le sont pas encore"""
+        _ = self.private_key, self.certificate
+    
     def _ensure_certificates(self) -> None:
         """Vérifie et crée les certificats si nécessaire"""
         try:
@@ -91,6 +138,10 @@ class ElectronicSignature:
                     encryption_algorithm=serialization.NoEncryption()
                 ))
             
+            # Oublier les clés éventuellement chargées auparavant
+            self._private_key = None
+            self._certificate = None
+            
             logger.info("Certificats de signature générés avec succès")
             
         except Exception as e:
@@ -118,28 +169,10 @@ class ElectronicSignature:
                 base, ext = os.path.splitext(pdf_path)
                 output_path = f"{base}_signed{ext}"
             
-            # Lire le PDF original
-            with open(pdf_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                pdf_writer = PyPDF2.PdfWriter()
-                
-                # Copier toutes les pages
-                for page in pdf_reader.pages:
-                    pdf_writer.add_page(page)
-                
-                # Ajouter la page de signature
-                signature_page = self._create_signature_page()
-                pdf_writer.add_page(signature_page)
-                
-                # Ajouter les métadonnées de signature
-                self._add_signature_metadata(pdf_writer)
-                
-                # Sauvegarder le PDF signé
-                with open(output_path, 'wb') as f:
-                    pdf_writer.write(f)
-            
-            # Signer le fichier avec le certificat
-            self._sign_file(output_path)
+            # Page et métadonnées de signature puis signature du contenu, en une
+            # seule lecture et une seule écriture (voir utils.pdf_pipeline)
+            signed_data = PDFPipeline().sign(self).process(pdf_path)
+            write_file_atomic(output_path, signed_data)
             
             logger.info(f"Document signé avec succès: {output_path}")
             return output_path
@@ -148,7 +181,7 @@ class ElectronicSignature:
             logger.error(f"Erreur lors de la signature du document: {e}")
             raise
     
-    def _create_signature_page(self) -> PyPDF2.PageObject:
+    def create_signature_page(self) -> PyPDF2.PageObject:
         """Crée une page de signature"""
         try:
             # Créer un buffer pour la page de signature
@@ -164,10 +197,8 @@ class ElectronicSignature:
             c.drawString(50, height - 150, f"Date de signature: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
             
             # Ajouter les informations du certificat
-            with open(self.cert_path, 'rb') as f:
-                cert = load_pem_x509_certificate(f.read())
-                subject = cert.subject
-                c.drawString(50, height - 200, f"Signé par: {subject.get_attributes_for_oid(NameOID.COMMON_NAME)[0].value}")
+            subject = self.certificate.subject
+            c.drawString(50, height - 200, f"Signé par: {subject.get_attributes_for_oid(NameOID.COMMON_NAME)[0].value}")
             
             c.save()
             
@@ -180,7 +211,7 @@ class ElectronicSignature:
             logger.error(f"Erreur lors de la création de la page de signature: {e}")
             raise
     
-    def _add_signature_metadata(self, pdf_writer: PyPDF2.PdfWriter) -> None:
+    def add_signature_metadata(self, pdf_writer: PyPDF2.PdfWriter) -> None:
         """Ajoute les métadonnées de signature au PDF"""
         try:
             # Créer les métadonnées
@@ -193,39 +224,66 @@ class ElectronicSignature:
             }
             
             # Ajouter les métadonnées au PDF
-            pdf_writer.metadata.update(metadata)
+            pdf_writer.add_metadata(metadata)
             
         except Exception as e:
             logger.error(f"Erreur lors de l'ajout des métadonnées: {e}")
             raise
     
-    def _sign_file(self, file_path: str) -> None:
-        """Signe le fichier avec le certificat"""
-        try:
-            # Lire le fichier
-            with open(file_path, 'rb') as f:
-                file_content = f.read()
-            
-            # Calculer le hash du fichier
-            file_hash = hashlib.sha256(file_content).digest()
+    def sign_digest(self, digest: bytes) -> str:
+        """
+        Signe l'empreinte SHA-256 d'un contenu avec la clé en mémoire
+        
+        Args:
+            digest: Empreinte SHA-256 du contenu
             
-            # Lire la clé privée
-            with open(self.key_path, 'rb') as f:
-                private_key = serialization.load_pem_private_key(f.read(), password=None)
+        Returns:
+            str: Signature encodée en base64
+        """
+        signature = self.private_key.sign(
+            digest,
+            padding.PKCS1v15(),
+            hashes.SHA256()
+        )
+        return base64.b64encode(signature).decode('utf-8')
+    
+    def verify_digest(self, digest: bytes, signature_b64: str) -> bool:
+        """
+        Vérifie la signature d'une empreinte SHA-256 avec le certificat en mémoire
+        
+        Args:
+            digest: Empreinte SHA-256 du contenu
+            signature_b64: Signature encodée en base64
             
-            # Signer le hash
-            signature = private_key.sign(
-                file_hash,
+        Returns:
+            bool: True si la signature est valide, False sinon
+        """
+        try:
+            self.certificate.public_key().verify(
+                base64.b64decode(signature_b64),
+                digest,
                 padding.PKCS1v15(),
                 hashes.SHA256()
             )
+            return True
+        except Exception:
+            return False
+    
+    def sign_bytes(self, file_content: bytes) -> bytes:
+        """
+        Signe le contenu d'un fichier avec le certificat
+        
+        Args:
+            file_content: Contenu du fichier
             
-            # Encoder la signature en base64
-            signature_b64 = base64.b64encode(signature).decode('utf-8')
+        Returns:
+            bytes: Contenu suivi de la signature encodée en base64
+        """
+        try:
+            signature_b64 = self.sign_digest(hashlib.sha256(file_content).digest())
             
-            # Ajouter la signature au fichier
-            with open(file_path, 'ab') as f:
-                f.write(b'\n' + signature_b64.encode('utf-8'))
+            # Ajouter la signature au contenu
+            return file_content + b'\n' + signature_b64.encode('utf-8')
             
         except Exception as e:
             logger.error(f"Erreur lors de la signature du fichier: {e}")
@@ -233,7 +291,7 @@ class ElectronicSignature:
     
     def verify_signature(self, file_path: str) -> bool:
         """
-        Vérifie la signature d'un document
+        Vérifie la signature d'un document (signature ajoutée en fin de fichier)
         
         Args:
             file_path: Chemin du document à vérifier
@@ -242,37 +300,20 @@ class ElectronicSignature:
             bool: True si la signature est valide, False sinon
         """
         try:
-            # Lire le fichier
+            # Seule la fin du fichier est lue pour trouver la signature
+            size = os.path.getsize(file_path)
             with open(file_path, 'rb') as f:
-                content = f.read()
-            
-            # Séparer le contenu et la signature
-            content_parts = content.split(b'\n')
-            file_content = b'\n'.join(content_parts[:-1])
-            signature_b64 = content_parts[-1].decode('utf-8')
-            
-            # Décoder la signature
-            signature = base64.b64decode(signature_b64)
-            
-            # Calculer le hash du contenu
-            file_hash = hashlib.sha256(file_content).digest()
-            
-            # Lire le certificat
-            with open(self.cert_path, 'rb') as f:
-                cert = load_pem_x509_certificate(f.read())
-            
-            # Vérifier la signature
-            try:
-                cert.public_key().verify(
-                    signature,
-                    file_hash,
-                    padding.PKCS1v15(),
-                    hashes.SHA256()
-                )
-                return True
-            except:
+                f.seek(max(0, size - SIGNATURE_TAIL_SIZE))
+                tail = f.read()
+            separator = tail.rfind(b'\n')
+            if separator < 0:
                 return False
+            content_length = size - len(tail) + separator
+            signature_b64 = tail[separator + 1:].decode('utf-8')
+            
+            # Empreinte du contenu calculée par blocs
+            return self.verify_digest(file_digest(file_path, length=content_length), signature_b64)
             
         except Exception as e:
             logger.error(f"Erreur lors de la vérification de la signature: {e}")
-            return False 
\ No newline at end of file
+            return False
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Service de droits d'accès partagé pour l'application Vynal Docs Automator
+Les fichiers sensibles (utilisateurs, session, licences) sont déchiffrés une seule
+fois par processus puis relus uniquement lorsqu'ils changent sur le disque. Les
+décisions d'accès sont mises en cache avec une durée de validité et invalidées
+dès qu'une licence ou un utilisateur est modifié. Le compteur d'utilisation est
+écrit en différé pour ne pas chiffrer un fichier à chaque clic.
+"""
+
+import os
+import copy
+import time
+import atexit
+import logging
+import threading
+from typing import Dict, Any, Callable, Hashable, Optional
+
+logger = logging.getLogger("VynalDocsAutomator.Entitlements")
+
+ENTITLEMENT_CONFIG = {
+    # Durée de validité d'une décision d'accès (secondes)
+    "decision_ttl": 300,
+    # Délai avant l'écriture différée du compteur d'utilisation (secondes)
+    "flush_delay": 2.0,
+}
+
+# Fichiers dont la modification invalide les décisions d'accès
+LICENSE_STATE_FILES = ("users.json", "current_user.json", "licenses.json")
+
+
+class EntitlementService:
+    """
+    État de licence et d'utilisation partagé par toutes les instances de
+    UsageTracker et par les vérifications de licence (voir get_entitlement_service)
+    """
+
+    def __init__(self, data_dir: str = "data"):
+        """
+        Initialise le service
+
+        Args:
+            data_dir: Répertoire des fichiers sensibles
+        """
+        self.data_dir = data_dir
+        self._lock = threading.RLock()
+        self._secure_files = None
+
+        # Fichiers déchiffrés: nom -> (signature, contenu)
+        self._files: Dict[str, Any] = {}
+
+        # Décisions d'accès: clé -> (résultat, date d'expiration)
+        self._decisions: Dict[Hashable, Any] = {}
+        self._generation = 0
+
+        # Compteur d'utilisation (écriture différée)
+        self._usage_count: Optional[int] = None
+        self._usage_dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+
+    @property
+    def secure_files(self):
+        """Gestionnaire de fichiers sécurisés, créé (et les fichiers sécurisés) une seule fois"""
+        if self._secure_files is None:
+            with self._lock:
+                if self._secure_files is None:
+                    from utils.security import SecureFileManager
+                    secure_files = SecureFileManager(self.data_dir)
+                    secure_files.secure_all_files()
+                    self._secure_files = secure_files
+        return self._secure_files
+
+    # ---- Fichiers sensibles ----
+
+    def _signature(self, filename: str):
+        """Signature d'un fichier (None s'il est absent)"""
+        try:
+            stat = os.stat(self.secure_files.resolve_path(filename))
+            return stat.st_size, stat.st_mtime_ns
+        except OSError:
+            return None
+
+    def read_file(self, filename: str) -> Dict[str, Any]:
+        """
+        Lit un fichier sécurisé, déchiffré seulement s'il a changé depuis la dernière lecture
+
+        Args:
+            filename: Nom du fichier
+
+        Returns:
+            Dict[str, Any]: Copie du contenu (vide si le fichier est absent)
+        """
+        signature = self._signature(filename)
+        with self._lock:
+            cached = self._files.get(filename)
+            if cached is None or cached[0] != signature:
+                data = self.secure_files.read_secure_file(filename) if signature else {}
+                if cached is not None and filename in LICENSE_STATE_FILES:
+                    # Modifié hors du service: les décisions ne sont plus fiables
+                    self._invalidate_locked()
+                cached = self._files[filename] = (signature, data)
+            return copy.deepcopy(cached[1])
+
+    def write_file(self, filename: str, data: Dict[str, Any]) -> bool:
+        """
+        Écrit un fichier sécurisé et met à jour le cache
+
+        Args:
+            filename: Nom du fichier
+            data: Contenu à écrire
+
+        Returns:
+            bool: True si l'écriture a réussi
+        """
+        with self._lock:
+            success = self.secure_files.write_secure_file(filename, data)
+            if success:
+                self._files[filename] = (self._signature(filename), copy.deepcopy(data))
+            else:
+                self._files.pop(filename, None)
+            if filename in LICENSE_STATE_FILES:
+                self._invalidate_locked()
+            return success
+
+    def forget_file(self, filename: str):
+        """Oublie le contenu en cache d'un fichier (après sa suppression par exemple)"""
+        with self._lock:
+            self._files.pop(filename, None)
+            if filename in LICENSE_STATE_FILES:
+                self._invalidate_locked()
+
+    def delete_file(self, filename: str) -> bool:
+        """
+        Supprime un fichier sécurisé (sous sa forme masquée comme sous son nom) et oublie son contenu
+
+        Args:
+            filename: Nom du fichier
+
+        Returns:
+            bool: True si un fichier a été supprimé
+        """
+        with self._lock:
+            removed = False
+            path = self.secure_files.resolve_path(filename)
+            while os.path.exists(path):
+                os.remove(path)
+                removed = True
+                path = self.secure_files.resolve_path(filename)
+            self.forget_file(filename)
+            return removed
+
+    def current_user_data(self) -> Dict[str, Any]:
+        """
+        Données de l'utilisateur connecté
+
+        Returns:
+            Dict[str, Any]: Données de l'utilisateur avec son email, vide si personne n'est connecté
+        """
+        current_user = self.read_file("current_user.json")
+        email = current_user.get("email")
+        if not email:
+            return {}
+        users = self.read_file("users.json")
+        if email not in users:
+            return {}
+        user_data = users[email]
+        user_data["email"] = email
+        return user_data
+
+    def save_user_data(self, user_data: Dict[str, Any]) -> bool:
+        """
+        Enregistre les données d'un utilisateur
+
+        Args:
+            user_data: Données de l'utilisateur, avec son email
+
+        Returns:
+            bool: True si l'écriture a réussi
+        """
+        email = user_data.get("email")
+        if not email:
+            logger.error("Email manquant dans les données utilisateur")
+            return False
+        with self._lock:
+            users = self.read_file("users.json")
+            users[email] = {k: v for k, v in user_data.items() if k != "email"}
+            return self.write_file("users.json", users)
+
+    # ---- Décisions d'accès ----
+
+    def decision(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Résultat d'une décision d'accès, recalculé à l'expiration ou après une invalidation
+
+        Args:
+            key: Identifiant de la décision (par exemple ("feature", email, feature))
+            compute: Fonction calculant la décision
+            ttl: Durée de validité (ENTITLEMENT_CONFIG par défaut)
+
+        Returns:
+            Any: Résultat de compute
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._decisions.get(key)
+            if cached is not None and cached[1] > now:
+                return cached[0]
+            generation = self._generation
+
+        result = compute()
+
+        ttl = ENTITLEMENT_CONFIG["decision_ttl"] if ttl is None else ttl
+        with self._lock:
+            # Ne pas conserver une décision calculée sur un état devenu obsolète
+            if generation == self._generation:
+                self._decisions[key] = (result, now + ttl)
+        return result
+
+    def _invalidate_locked(self):
+        self._decisions.clear()
+        self._generation += 1
+
+    def invalidate(self):
+        """Oublie toutes les décisions d'accès (licence ou utilisateur modifié)"""
+        with self._lock:
+            self._invalidate_locked()
+        logger.debug("Décisions d'accès invalidées")
+
+    # ---- Compteur d'utilisation ----
+
+    @property
+    def usage_count(self) -> int:
+        """Nombre d'utilisations (lu sur le disque une seule fois)"""
+        with self._lock:
+            if self._usage_count is None:
+                self._usage_count = self.read_file("usage_count.json").get("count", 0)
+            return self._usage_count
+
+    def set_usage_count(self, count: int):
+        """
+        Modifie le compteur d'utilisation; l'écriture sur le disque est différée
+
+        Args:
+            count: Nouvelle valeur
+        """
+        with self._lock:
+            self._usage_count = count
+            self._usage_dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(ENTITLEMENT_CONFIG["flush_delay"], self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def increment_usage(self) -> int:
+        """
+        Incrémente le compteur d'utilisation
+
+        Returns:
+            int: Nouvelle valeur
+        """
+        with self._lock:
+            count = self.usage_count + 1
+            self.set_usage_count(count)
+            return count
+
+    def flush(self):
+        """Écrit le compteur d'utilisation s'il a été modifié"""
+        with self._lock:
+            timer, self._flush_timer = self._flush_timer, None
+            if timer is not None:
+                timer.cancel()
+            if not self._usage_dirty:
+                return
+            self._usage_dirty = False
+            count = self._usage_count
+            if not self.write_file("usage_count.json", {"count": count}):
+                self._usage_dirty = True
+                logger.error("Erreur lors de la sauvegarde du compteur d'utilisation")
+
+
+_services: Dict[str, EntitlementService] = {}
+_services_lock = threading.Lock()
+
+
+def get_entitlement_service(data_dir: str = "data") -> EntitlementService:
+    """
+    Retourne le service partagé du processus pour un répertoire de données
+
+    Args:
+        data_dir: Répertoire des fichiers sensibles
+
+    Returns:
+        EntitlementService: Service partagé
+    """
+    key = os.path.abspath(data_dir)
+    service = _services.get(key)
+    if service is None:
+        with _services_lock:
+            service = _services.get(key)
+            if service is None:
+                service = _services[key] = EntitlementService(data_dir)
+    return service
+
+
+def invalidate_entitlements():
+    """Invalide les décisions d'accès de tous les services (licence créée, modifiée ou supprimée)"""
+    with _services_lock:
+        services = list(_services.values())
+    for service in services:
+        service.invalidate()
+
+
+@atexit.register
+def _flush_services():
+    """Écrit les compteurs en attente à la fermeture de l'application"""
+    with _services_lock:
+        services = list(_services.values())
+    for service in services:
+        try:
+            service.flush()
+        except Exception as e:
+            logger.error(f"Erreur lors de l'écriture différée du compteur: {e}")
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Publipostage pour Vynal Docs Automator
+Génère un document par ligne de données (fichier CSV, clients de la base...)
+à partir d'un même modèle. Le modèle est lu et compilé une seule fois; chaque
+processus worker enregistre la police et décode le logo à son démarrage puis
+les réutilise pour toutes les lignes qu'il traite. Les documents sont écrits
+au fil de l'eau dans un dossier ou dans une archive zip.
+"""
+
+import os
+import csv
+import time
+import shutil
+import logging
+import tempfile
+import zipfile
+import concurrent.futures
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Iterable, Iterator, Tuple
+
+from utils.document_generator import DocumentGenerator, get_unicode_font, load_logo
+from utils.template_renderer import compile_template, render_template, MISSING_REMOVE
+
+logger = logging.getLogger("VynalDocsAutomator.MailMerge")
+
+# Champs d'une ligne de données décrivant le client
+# (acceptés aussi avec le préfixe "client_", par exemple "client_email")
+CLIENT_FIELDS = ("id", "name", "company", "email", "phone", "address")
+
+DEFAULT_FILENAME_PATTERN = "{document_type}_{client_name}_{date}"
+
+BACKENDS = ("process", "thread")
+
+# État de chaque worker (générateur et lot en cours), initialisé une seule fois
+_worker_state = None
+
+
+def rows_from_csv(csv_path: str, encoding: str = "utf-8-sig",
+                  delimiter: Optional[str] = None) -> Iterator[Dict[str, str]]:
+    """
+    Lit les lignes d'un fichier CSV au fil de l'eau
+
+    Args:
+        csv_path: Chemin du fichier CSV (la première ligne contient les noms de colonnes)
+        encoding: Encodage du fichier
+        delimiter: Séparateur de colonnes (détecté automatiquement si None)
+
+    Yields:
+        Dict[str, str]: Une ligne, indexée par nom de colonne
+    """
+    with open(csv_path, 'r', encoding=encoding, newline='') as f:
+        if delimiter is None:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                delimiter = csv.Sniffer().sniff(sample, delimiters=";,\t|").delimiter
+            except csv.Error:
+                delimiter = ","
+
+        for row in csv.DictReader(f, delimiter=delimiter):
+            # Ignorer les colonnes sans nom et les lignes vides
+            row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+            if any(row.values()):
+                yield row
+
+
+def rows_from_database(db_manager, client_ids: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Fournit les clients de la base comme lignes de publipostage
+
+    Args:
+        db_manager: Gestionnaire de base de données (DatabaseManager)
+        client_ids: Identifiants des clients à retenir (tous si None)
+
+    Yields:
+        Dict[str, Any]: Un client par ligne
+    """
+    wanted = set(client_ids) if client_ids is not None else None
+    for client in db_manager.get_clients():
+        if wanted is None or client.get("id") in wanted:
+            yield client
+
+
+def split_row(row: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Sépare une ligne de données en informations client et variables du document
+
+    Une ligne peut fournir explicitement {"client": {...}, "variables": {...}};
+    sinon les colonnes de CLIENT_FIELDS décrivent le client et toutes les
+    colonnes sont disponibles comme variables du modèle.
+
+    Args:
+        row: Ligne de données
+
+    Returns:
+        tuple: (client, variables)
+    """
+    if isinstance(row.get("client"), dict):
+        return row["client"], dict(row.get("variables") or {})
+
+    client = {}
+    for field in CLIENT_FIELDS:
+        value = row.get(field)
+        if value in (None, ""):
+            value = row.get(f"client_{field}")
+        if value not in (None, ""):
+            client[field] = value
+
+    variables = {key: value for key, value in row.items() if not isinstance(value, (dict, list))}
+    return client, variables
+
+
+def _prepare_job(generator: DocumentGenerator, template: Dict[str, Any], company_info: Dict[str, Any],
+                 format_type: Optional[str], logo_path: Optional[str]) -> Dict[str, Any]:
+    """Résout une seule fois tout ce qui est commun aux documents du lot"""
+    content, template_mtime = generator.resolve_template(template)
+    return {
+        "content": content,
+        "template_key": template.get("id"),
+        "template_mtime": template_mtime,
+        "title": template.get("name", "Document"),
+        "company_info": dict(company_info or {}),
+        "format_type": generator.resolve_format(format_type),
+        "logo_path": logo_path,
+        "date": datetime.now().strftime("%Y-%m-%d"),
+    }
+
+
+def _init_merge_worker(job: Dict[str, Any], config_manager=None,
+                       generator: Optional[DocumentGenerator] = None):
+    """
+    Initialise un worker: compile le modèle, enregistre la police et décode le logo
+
+    Args:
+        job: Paramètres communs du lot
+        config_manager: Configuration de l'appelant, pour le générateur du worker
+        generator: Générateur à utiliser (un nouveau générateur configuré si None)
+    """
+    global _worker_state
+    generator = generator or DocumentGenerator(config_manager)
+
+    compile_template(job["content"], job["template_key"], job["template_mtime"])
+    if job["format_type"] == "pdf":
+        get_unicode_font()
+    if job["logo_path"]:
+        load_logo(job["logo_path"])
+
+    _worker_state = (generator, job)
+
+
+def _merge_row(file_path: str, client: Dict[str, Any], variables: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Génère le document d'une ligne avec l'état du worker
+
+    Args:
+        file_path: Chemin du fichier à créer
+        client: Informations du client
+        variables: Variables spécifiques de la ligne
+
+    Returns:
+        Dict[str, Any]: Chemin créé et variables du modèle restées sans valeur
+    """
+    generator, job = _worker_state
+
+    all_variables = generator.build_variables(client, job["company_info"], variables, job["date"])
+    compiled = compile_template(job["content"], job["template_key"], job["template_mtime"])
+    content = compiled.render(all_variables, missing=MISSING_REMOVE)
+    title = variables.get("title") or job["title"]
+
+    output_path = generator.write_document(file_path, content, title, client, job["company_info"],
+                                           job["format_type"], job["logo_path"])
+    if output_path is None:
+        raise RuntimeError(f"Échec de la génération de {os.path.basename(file_path)}")
+
+    return {"path": output_path, "missing": compiled.missing_variables(all_variables)}
+
+
+def _default_workers(config_manager) -> int:
+    """Nombre de workers par défaut (configuration, sinon nombre de processeurs)"""
+    workers = 0
+    if config_manager:
+        workers = config_manager.get("document.batch_workers", 0) or 0
+    return max(1, workers or min(os.cpu_count() or 1, 8))
+
+
+def generate_batch(template: Dict[str, Any], rows: Iterable[Dict[str, Any]], output: str,
+                   company_info: Dict[str, Any], format_type: Optional[str] = None,
+                   generator: Optional[DocumentGenerator] = None, max_workers: Optional[int] = None,
+                   backend: str = "process", filename_pattern: Optional[str] = None,
+                   progress_callback: Optional[Callable[[int, Optional[int], Dict[str, Any]], None]] = None,
+                   collect_documents: bool = True) -> Dict[str, Any]:
+    """
+    Génère un document par ligne de données à partir d'un même modèle
+
+    Les lignes sont consommées au fil de l'eau (au plus deux par worker en cours),
+    de sorte qu'un CSV volumineux n'est jamais chargé entièrement en mémoire.
+    Un échec sur une ligne n'interrompt pas le lot: il est reporté dans le rapport.
+
+    Args:
+        template: Modèle de document (dict)
+        rows: Lignes de données (voir split_row), par exemple rows_from_csv()
+              ou rows_from_database()
+        output: Dossier de sortie, ou chemin d'une archive .zip
+        company_info: Informations de l'entreprise (dict)
+        format_type: Format des documents (pdf, docx ou txt)
+        generator: Générateur dont la configuration est utilisée (format, logo),
+                   transmise aussi aux processus workers
+        max_workers: Nombre de workers (configuration "document.batch_workers" par défaut)
+        backend: "process" (pool de processus) ou "thread"
+        filename_pattern: Modèle de nom de fichier (configuration "document.filename_pattern"
+                          par défaut), rendu avec les variables de chaque ligne et {index}
+        progress_callback: Fonction appelée avec (traités, total ou None, résultat de la ligne)
+        collect_documents: Conserver la liste des documents générés dans le rapport
+                           (désactiver pour les très gros lots suivis par callback)
+
+    Returns:
+        Dict[str, Any]: Rapport avec les clés total, succeeded, failed, output,
+                        documents, failures et duration
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend inconnu: {backend}")
+
+    started = time.monotonic()
+    generator = generator or DocumentGenerator()
+    config = generator.config
+
+    if filename_pattern is None:
+        filename_pattern = DEFAULT_FILENAME_PATTERN
+        if config:
+            filename_pattern = config.get("document.filename_pattern", DEFAULT_FILENAME_PATTERN)
+
+    job = _prepare_job(generator, template, company_info, format_type, generator.get_logo_path())
+    max_workers = max_workers or _default_workers(config)
+    max_in_flight = max_workers * 2
+    total = len(rows) if hasattr(rows, "__len__") else None
+
+    # Les documents destinés à une archive sont écrits dans un dossier temporaire
+    to_zip = output.lower().endswith(".zip")
+    if to_zip:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix="vynal_merge_")
+        archive = zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED)
+    else:
+        os.makedirs(output, exist_ok=True)
+        work_dir = output
+        archive = None
+
+    report = {
+        "total": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "output": output,
+        "documents": [],
+        "failures": [],
+        "duration": 0.0,
+    }
+    used_names = set()
+
+    def output_path(index: int, client: Dict[str, Any], variables: Dict[str, Any]) -> str:
+        """Chemin unique du document d'une ligne"""
+        values = generator.build_variables(client, job["company_info"], variables, job["date"])
+        values.setdefault("document_type", template.get("type", "document"))
+        values["index"] = index
+        name = generator.clean_filename(render_template(filename_pattern, values)) or "document"
+        if name in used_names:
+            name = f"{name}_{index}"
+        used_names.add(name)
+        return os.path.join(work_dir, f"{name}.{job['format_type']}")
+
+    def finish(index: int, client: Dict[str, Any], result: Optional[Dict[str, Any]], error: Optional[str]):
+        """Enregistre le résultat d'une ligne et le transmet au callback"""
+        if error is None:
+            path = result["path"]
+            if archive is not None:
+                archive.write(path, os.path.basename(path))
+                os.remove(path)
+            entry = {"index": index, "file": os.path.basename(path), "status": "success",
+                     "missing": result["missing"]}
+            report["succeeded"] += 1
+            if collect_documents:
+                report["documents"].append(entry)
+        else:
+            logger.error(f"Échec du publipostage pour la ligne {index}: {error}")
+            entry = {"index": index, "client": client.get("name", ""), "status": "failed", "error": error}
+            report["failed"] += 1
+            report["failures"].append(entry)
+
+        if progress_callback:
+            try:
+                progress_callback(report["succeeded"] + report["failed"], total, entry)
+            except Exception as e:
+                logger.error(f"Erreur dans le callback de progression: {e}")
+
+    if backend == "process":
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_merge_worker, initargs=(job, config)
+        )
+    else:
+        # Les threads partagent le générateur et l'état du processus courant
+        _init_merge_worker(job, config, generator)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    logger.info(f"Publipostage de '{job['title']}' vers {output} ({max_workers} workers, {backend})")
+
+    in_flight: Dict[concurrent.futures.Future, Tuple[int, Dict[str, Any]]] = {}
+    pending_rows = enumerate(rows, start=1)
+    try:
+        while True:
+            # Remplir la fenêtre de lignes en cours
+            while len(in_flight) < max_in_flight:
+                item = next(pending_rows, None)
+                if item is None:
+                    break
+                index, row = item
+                report["total"] += 1
+                try:
+                    client, variables = split_row(row)
+                    future = executor.submit(_merge_row, output_path(index, client, variables), client, variables)
+                except Exception as e:
+                    finish(index, row if isinstance(row, dict) else {}, None, str(e))
+                    continue
+                in_flight[future] = (index, client)
+
+            if not in_flight:
+                break
+
+            done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                index, client = in_flight.pop(future)
+                try:
+                    finish(index, client, future.result(), None)
+                except Exception as e:
+                    finish(index, client, None, str(e))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if archive is not None:
+            archive.close()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report["documents"].sort(key=lambda entry: entry["index"])
+    report["failures"].sort(key=lambda entry: entry["index"])
+    report["duration"] = round(time.monotonic() - started, 3)
+    logger.info(f"Publipostage terminé: {report['succeeded']} document(s), "
+                f"{report['failed']} échec(s) en {report['duration']} s")
+    return report
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pipeline de post-traitement des PDF pour l'application Vynal Docs Automator
+Le document est lu une seule fois, les étapes (filigrane, numéros de page, page de
+signature, métadonnées, chiffrement) sont appliquées dans l'ordre puis le résultat
+est écrit une seule fois. Les calques sont rendus en mémoire et mis en cache par
+format de page.
+"""
+
+import os
+import io
+import logging
+import tempfile
+import threading
+import concurrent.futures
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from reportlab.pdfgen import canvas
+from reportlab.lib import colors
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+logger = logging.getLogger("VynalDocsAutomator.PDFPipeline")
+
+BACKENDS = ("process", "thread")
+
+# Permissions acceptées par EncryptStage et droits PDF (UserAccessPermissions) retirés
+# lorsqu'une permission vaut False
+PERMISSION_FLAGS = {
+    "print": ("PRINT", "PRINT_TO_REPRESENTATION"),
+    "modify": ("MODIFY",),
+    "copy": ("EXTRACT", "EXTRACT_TEXT_AND_GRAPHICS"),
+    "annotate": ("ADD_OR_MODIFY",),
+    "fill_forms": ("FILL_FORM_FIELDS",),
+    "assemble": ("ASSEMBLE_DOC",),
+}
+
+# Tous les droits accordés (valeur par défaut de PdfWriter.encrypt)
+ALL_PERMISSIONS = 0x7FFFFFFC
+
+
+def page_size(page) -> Tuple[float, float]:
+    """Format d'une page PDF (largeur, hauteur en points)"""
+    return float(page.mediabox.width), float(page.mediabox.height)
+
+
+def render_overlay_pages(sizes: List[Tuple[float, float]], draw) -> list:
+    """
+    Rend des calques en mémoire, un par format demandé, en un seul document
+
+    Args:
+        sizes: Formats des pages à rendre
+        draw: Fonction draw(canvas, index, largeur, hauteur) dessinant chaque page
+
+    Returns:
+        list: Pages PDF des calques
+    """
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer)
+    for index, (width, height) in enumerate(sizes):
+        c.setPageSize((width, height))
+        draw(c, index, width, height)
+        c.showPage()
+    c.save()
+    buffer.seek(0)
+    return list(PyPDF2.PdfReader(buffer).pages)
+
+
+def draw_page_number(c, width: float, height: float, text: str, position: str = 'bottom'):
+    """Dessine un numéro de page à la position demandée (bas centré par défaut)"""
+    if position == 'top':
+        c.drawCentredString(width/2, height-20, text)
+    elif position == 'bottom-right':
+        c.drawRightString(width-20, 20, text)
+    elif position == 'bottom-left':
+        c.drawString(20, 20, text)
+    elif position == 'top-right':
+        c.drawRightString(width-20, height-20, text)
+    elif position == 'top-left':
+        c.drawString(20, height-20, text)
+    else:
+        c.drawCentredString(width/2, 20, text)
+
+
+class PipelineStage:
+    """
+    Étape du pipeline. Toutes les méthodes sont facultatives; l'état propre à un
+    document est retourné par prepare et transmis aux autres méthodes.
+    """
+
+    # Les étapes finales (chiffrement) sont appliquées après toutes les autres
+    final = False
+
+    def prepare(self, reader) -> Any:
+        """Prépare le traitement d'un document (lecteur PyPDF2)"""
+        return None
+
+    def process_page(self, page, index: int, state: Any):
+        """Modifie une page du document"""
+
+    def finish(self, writer, state: Any):
+        """Complète le document (ajout de pages, métadonnées, chiffrement)"""
+
+    def finalize(self, data: bytes) -> bytes:
+        """Transforme le fichier sérialisé (signature du contenu)"""
+        return data
+
+
+class OverlayCache:
+    """Calques rendus une seule fois par format de page (et par thread)"""
+
+    def __init__(self, draw):
+        """
+        Args:
+            draw: Fonction draw(canvas, largeur, hauteur) dessinant le calque
+        """
+        self.draw = draw
+        self._local = threading.local()
+
+    def get(self, width: float, height: float):
+        """Calque au format demandé"""
+        pages = getattr(self._local, "pages", None)
+        if pages is None:
+            pages = self._local.pages = {}
+        key = (round(width, 2), round(height, 2))
+        if key not in pages:
+            pages[key] = render_overlay_pages([(width, height)], lambda c, i, w, h: self.draw(c, w, h))[0]
+        return pages[key]
+
+    def __getstate__(self):
+        # Les calques ne sont pas transmis aux processus de travail
+        return {"draw": self.draw}
+
+    def __setstate__(self, state):
+        self.draw = state["draw"]
+        self._local = threading.local()
+
+
+class WatermarkStage(PipelineStage):
+    """Filigrane centré et incliné sur chaque page"""
+
+    def __init__(self, text, font=None, size=60, color=colors.lightgrey, opacity=0.5, angle=45):
+        self.text = text
+        self.font = font or "Helvetica"
+        self.size = size
+        self.color = color
+        self.opacity = opacity
+        self.angle = angle
+        self.overlays = OverlayCache(self._draw)
+
+    def _draw(self, c, width, height):
+        c.setFont(self.font, self.size)
+        c.setFillColor(self.color)
+        c.setFillAlpha(self.opacity)
+        c.saveState()
+        c.translate(width/2, height/2)
+        c.rotate(self.angle)
+        c.drawCentredString(0, 0, self.text)
+        c.restoreState()
+
+    def process_page(self, page, index, state):
+        page.merge_page(self.overlays.get(*page_size(page)))
+
+
+class PageNumberStage(PipelineStage):
+    """Numéros de page, rendus pour tout le document en un seul calque"""
+
+    def __init__(self, position='bottom', font=None, size=10, start_number=1):
+        self.position = position
+        self.font = font or "Helvetica"
+        self.size = size
+        self.start_number = start_number
+
+    def _draw(self, c, index, width, height):
+        c.setFont(self.font, self.size)
+        draw_page_number(c, width, height, f"Page {index + self.start_number}", self.position)
+
+    def prepare(self, reader):
+        return render_overlay_pages([page_size(page) for page in reader.pages], self._draw)
+
+    def process_page(self, page, index, state):
+        page.merge_page(state[index])
+
+
+class SignatureStage(PipelineStage):
+    """Page et métadonnées de signature, puis signature du fichier final"""
+
+    def __init__(self, signer):
+        """
+        Args:
+            signer: Gestionnaire de signatures (utils.electronic_signature.ElectronicSignature)
+        """
+        self.signer = signer
+
+    def finish(self, writer, state):
+        writer.add_page(self.signer.create_signature_page())
+        self.signer.add_signature_metadata(writer)
+
+    def finalize(self, data):
+        return self.signer.sign_bytes(data)
+
+
+class MetadataStage(PipelineStage):
+    """Métadonnées du document (clés avec ou sans '/')"""
+
+    def __init__(self, metadata: Dict[str, Any]):
+        self.metadata = {key if key.startswith('/') else f"/{key}": str(value)
+                         for key, value in metadata.items()}
+
+    def finish(self, writer, state):
+        writer.add_metadata(self.metadata)
+
+
+class EncryptStage(PipelineStage):
+    """Chiffrement du document par mot de passe (toujours appliqué en dernier)"""
+
+    final = True
+
+    def __init__(self, user_password=None, owner_password=None, permissions=None):
+        """
+        Args:
+            user_password: Mot de passe d'ouverture
+            owner_password: Mot de passe propriétaire (le mot de passe utilisateur par défaut)
+            permissions: Permissions accordées au lecteur, par clé de PERMISSION_FLAGS
+                         (par exemple {"print": True, "copy": False}); les clés absentes
+                         restent autorisées
+        """
+        unknown = set(permissions or {}) - set(PERMISSION_FLAGS)
+        if unknown:
+            raise ValueError(f"Permissions inconnues: {', '.join(sorted(unknown))}")
+        self.user_password = user_password
+        self.owner_password = owner_password
+        self.permissions = permissions or {}
+
+    def permissions_flag(self):
+        """Droits PDF (UserAccessPermissions) correspondant aux permissions"""
+        from PyPDF2.constants import UserAccessPermissions
+        flag = ALL_PERMISSIONS
+        for name, allowed in self.permissions.items():
+            if not allowed:
+                for right in PERMISSION_FLAGS[name]:
+                    flag &= ~UserAccessPermissions[right]
+        return UserAccessPermissions(flag)
+
+    def finish(self, writer, state):
+        # Sans permissions, les droits par défaut de PdfWriter.encrypt (tous accordés)
+        options = {"permissions_flag": self.permissions_flag()} if self.permissions else {}
+        writer.encrypt(
+            user_password=self.user_password,
+            owner_password=self.owner_password if self.owner_password else self.user_password,
+            use_128bit=True,
+            **options
+        )
+
+
+class PDFPipeline:
+    """
+    Post-traitement composable d'un PDF: chaque méthode ajoute une étape et retourne
+    le pipeline, par exemple PDFPipeline().watermark("CONFIDENTIEL").page_numbers().run(src, dst)
+    """
+
+    def __init__(self, stages: Optional[Iterable[PipelineStage]] = None):
+        self.stages: List[PipelineStage] = list(stages or [])
+
+    def add(self, stage: PipelineStage) -> "PDFPipeline":
+        """Ajoute une étape"""
+        self.stages.append(stage)
+        return self
+
+    def watermark(self, text, **options) -> "PDFPipeline":
+        """Ajoute un filigrane (voir WatermarkStage)"""
+        return self.add(WatermarkStage(text, **options))
+
+    def page_numbers(self, **options) -> "PDFPipeline":
+        """Ajoute des numéros de page (voir PageNumberStage)"""
+        return self.add(PageNumberStage(**options))
+
+    def sign(self, signer) -> "PDFPipeline":
+        """Ajoute la page de signature et signe le fichier produit"""
+        return self.add(SignatureStage(signer))
+
+    def metadata(self, metadata: Dict[str, Any]) -> "PDFPipeline":
+        """Définit des métadonnées"""
+        return self.add(MetadataStage(metadata))
+
+    def encrypt(self, user_password=None, owner_password=None, permissions=None) -> "PDFPipeline":
+        """Chiffre le document"""
+        return self.add(EncryptStage(user_password, owner_password, permissions))
+
+    def _ordered_stages(self) -> List[PipelineStage]:
+        return [s for s in self.stages if not s.final] + [s for s in self.stages if s.final]
+
+    def process(self, source) -> bytes:
+        """
+        Applique les étapes à un PDF
+
+        Args:
+            source: Chemin, contenu (bytes) ou fichier binaire du PDF d'origine
+
+        Returns:
+            bytes: PDF produit
+
+        Raises:
+            RuntimeError: Si PyPDF2 n'est pas installé
+        """
+        if not PYPDF2_AVAILABLE:
+            raise RuntimeError("PyPDF2 n'est pas installé")
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+
+        reader = PyPDF2.PdfReader(source)
+        stages = self._ordered_stages()
+        states = [stage.prepare(reader) for stage in stages]
+
+        writer = PyPDF2.PdfWriter()
+        for index, page in enumerate(reader.pages):
+            for stage, state in zip(stages, states):
+                stage.process_page(page, index, state)
+            writer.add_page(page)
+
+        for stage, state in zip(stages, states):
+            stage.finish(writer, state)
+
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        data = buffer.getvalue()
+        for stage in stages:
+            data = stage.finalize(data)
+        return data
+
+    def run(self, input_path, output_path) -> bool:
+        """
+        Traite un fichier PDF (le fichier de sortie peut être le fichier d'origine)
+
+        Args:
+            input_path: Chemin du fichier PDF d'origine
+            output_path: Chemin du fichier PDF de sortie
+
+        Returns:
+            bool: True si réussi, False sinon
+        """
+        if not PYPDF2_AVAILABLE:
+            logger.error("Impossible de traiter le PDF : PyPDF2 n'est pas installé")
+            return False
+
+        try:
+            if not os.path.exists(input_path):
+                logger.error(f"Le fichier PDF n'existe pas : {input_path}")
+                return False
+
+            data = self.process(input_path)
+            write_file_atomic(output_path, data)
+            logger.info(f"PDF traité ({len(self.stages)} étape(s)) : {output_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement du PDF {input_path} : {e}")
+            return False
+
+    def run_batch(self, jobs: Iterable[Tuple[str, str]], max_workers: Optional[int] = None,
+                  backend: str = "process") -> Dict[str, bool]:
+        """
+        Traite plusieurs PDF en parallèle avec le même pipeline
+
+        Args:
+            jobs: Couples (fichier d'origine, fichier de sortie)
+            max_workers: Nombre de workers (par défaut: nombre de processeurs)
+            backend: "process" (le traitement des PDF est limité par le GIL) ou "thread"
+
+        Returns:
+            Dict[str, bool]: Résultat par fichier de sortie
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend inconnu: {backend}")
+        jobs = list(jobs)
+        if not jobs:
+            return {}
+        max_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+
+        if backend == "process":
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers, initializer=_init_pipeline_worker, initargs=(self,)
+            )
+            run_job = _run_pipeline_job
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+            run_job = self.run
+
+        results = {}
+        with executor:
+            futures = {executor.submit(run_job, source, target): target for source, target in jobs}
+            for future in concurrent.futures.as_completed(futures):
+                target = futures[future]
+                try:
+                    results[target] = future.result()
+                except Exception as e:
+                    logger.error(f"Erreur lors du traitement de {target} : {e}")
+                    results[target] = False
+
+        logger.info(f"Lot de {len(jobs)} PDF traité : {sum(results.values())} réussi(s)")
+        return results
+
+
+def write_file_atomic(path: str, data: bytes):
+    """Écrit un fichier via un fichier temporaire renommé (jamais de fichier partiel)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_file = tempfile.NamedTemporaryFile('wb', dir=directory, suffix=".tmp", delete=False)
+    try:
+        with temp_file:
+            temp_file.write(data)
+        os.replace(temp_file.name, path)
+    except Exception:
+        os.unlink(temp_file.name)
+        raise
+
+
+# Pipeline du processus de travail (transmis une seule fois par worker)
+_worker_pipeline: Optional[PDFPipeline] = None
+
+
+def _init_pipeline_worker(pipeline: PDFPipeline):
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+
+
+def _run_pipeline_job(input_path: str, output_path: str) -> bool:
+    return _worker_pipeline.run(input_path, output_path)
@@ -9,7 +9,6 @@ Ce module fournit des fonctions pour créer, manipuler et extraire des informati
 import os
 import io
 import logging
-import tempfile
 from datetime import datetime
 
 # Bibliothèques pour la manipulation des PDF
@@ -29,14 +28,7 @@ except ImportError:
     PYPDF2_AVAILABLE = False
     logging.warning("PyPDF2 n'est pas installé. Certaines fonctionnalités PDF seront limitées.")
 
-# Pour extraire du texte des PDF
-try:
-    import pdfminer
-    from pdfminer.high_level import extract_text
-    PDFMINER_AVAILABLE = True
-except ImportError:
-    PDFMINER_AVAILABLE = False
-    logging.warning("pdfminer.six n'est pas installé. L'extraction de texte des PDF sera limitée.")
+from utils.pdf_pipeline import PDFPipeline
 
 logger = logging.getLogger("VynalDocsAutomator.PDFUtils")
 
@@ -200,37 +192,32 @@ class PDFUtils:
     @staticmethod
     def extract_text_from_pdf(file_path, page_numbers=None):
         """
-        Extrait le texte d'un fichier PDF
+        Extrait le texte d'un fichier PDF (service d'extraction partagé)
         
         Args:
             file_path: Chemin du fichier PDF
-            page_numbers: Liste des numéros de page à extraire (None = toutes les pages)
+            page_numbers: Liste des numéros de page à extraire, à partir de 0 (None = toutes les pages)
             
         Returns:
             str: Texte extrait du PDF ou None en cas d'erreur
         """
-        if not PDFMINER_AVAILABLE:
-            logger.error("Impossible d'extraire le texte : pdfminer.six n'est pas installé")
-            return None
-        
         try:
             # Vérifier que le fichier existe
             if not os.path.exists(file_path):
                 logger.error(f"Le fichier PDF n'existe pas : {file_path}")
                 return None
             
+            from doc_analyzer.utils.text_extraction import get_text_extractor
+            extractor = get_text_extractor()
+            
             # Extraire le texte
             if page_numbers is None:
                 # Extraire toutes les pages
-                text = extract_text(file_path)
-            else:
-                # Extraire les pages spécifiées
-                text = ""
-                for page_num in page_numbers:
-                    page_text = extract_text(file_path, page_numbers=[page_num])
-                    text += f"--- Page {page_num} ---\n{page_text}\n\n"
+                return extractor.extract_text(file_path)
             
-            return text
+            # Extraire les pages spécifiées (seules ces pages sont analysées)
+            pages = extractor.iter_pages(file_path, pages=[num + 1 for num in page_numbers])
+            return "".join(f"--- Page {page.number - 1} ---\n{page.text}\n\n" for page in pages)
             
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction du texte du PDF : {e}")
@@ -353,80 +340,9 @@ class PDFUtils:
         Returns:
             bool: True si réussi, False sinon
         """
-        if not PYPDF2_AVAILABLE:
-            logger.error("Impossible d'ajouter un filigrane : PyPDF2 n'est pas installé")
-            return False
-        
-        try:
-            # Vérifier que le fichier existe
-            if not os.path.exists(input_path):
-                logger.error(f"Le fichier PDF n'existe pas : {input_path}")
-                return False
-            
-            # Créer le répertoire parent si nécessaire
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Ouvrir le PDF
-            with open(input_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                total_pages = len(pdf_reader.pages)
-                
-                # Créer un fichier temporaire pour le filigrane
-                with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                    watermark_path = tmp_file.name
-                
-                # Créer le filigrane
-                buffer = io.BytesIO()
-                c = canvas.Canvas(buffer, pagesize=A4)
-                width, height = A4
-                
-                # Configuration de la police
-                if font is None:
-                    font = "Helvetica"
-                
-                c.setFont(font, size)
-                c.setFillColor(color)
-                c.setFillAlpha(opacity)
-                
-                # Placer le texte au centre, en rotation
-                c.saveState()
-                c.translate(width/2, height/2)
-                c.rotate(angle)
-                c.drawCentredString(0, 0, watermark_text)
-                c.restoreState()
-                
-                c.showPage()
-                c.save()
-                
-                # Écrire le filigrane dans le fichier temporaire
-                with open(watermark_path, 'wb') as f:
-                    f.write(buffer.getvalue())
-                
-                # Créer le PDF de sortie
-                pdf_writer = PyPDF2.PdfWriter()
-                
-                # Ajouter chaque page avec le filigrane
-                watermark_reader = PyPDF2.PdfReader(watermark_path)
-                watermark_page = watermark_reader.pages[0]
-                
-                for page_num in range(total_pages):
-                    page = pdf_reader.pages[page_num]
-                    page.merge_page(watermark_page)
-                    pdf_writer.add_page(page)
-                
-                # Écrire le fichier de sortie
-                with open(output_path, 'wb') as f:
-                    pdf_writer.write(f)
-                
-                # Supprimer le fichier temporaire
-                os.unlink(watermark_path)
-            
-            logger.info(f"Filigrane ajouté au PDF : {output_path}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de l'ajout du filigrane : {e}")
-            return False
+        return PDFPipeline().watermark(
+            watermark_text, font=font, size=size, color=color, opacity=opacity, angle=angle
+        ).run(input_path, output_path)
     
     @staticmethod
     def add_page_numbers(input_path, output_path, position='bottom', font=None, size=10, start_number=1):
@@ -444,91 +360,9 @@ class PDFUtils:
         Returns:
             bool: True si réussi, False sinon
         """
-        if not PYPDF2_AVAILABLE:
-            logger.error("Impossible d'ajouter des numéros de page : PyPDF2 n'est pas installé")
-            return False
-        
-        try:
-            # Vérifier que le fichier existe
-            if not os.path.exists(input_path):
-                logger.error(f"Le fichier PDF n'existe pas : {input_path}")
-                return False
-            
-            # Créer le répertoire parent si nécessaire
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Ouvrir le PDF
-            with open(input_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                total_pages = len(pdf_reader.pages)
-                
-                # Créer le PDF de sortie
-                pdf_writer = PyPDF2.PdfWriter()
-                
-                # Configuration de la police
-                if font is None:
-                    font = "Helvetica"
-                
-                # Pour chaque page
-                for page_num in range(total_pages):
-                    # Créer un fichier temporaire pour le numéro de page
-                    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                        page_number_path = tmp_file.name
-                    
-                    # Créer le numéro de page
-                    buffer = io.BytesIO()
-                    c = canvas.Canvas(buffer, pagesize=A4)
-                    width, height = A4
-                    
-                    c.setFont(font, size)
-                    
-                    # Position du numéro
-                    page_text = f"Page {page_num+start_number}"
-                    
-                    if position == 'bottom':
-                        c.drawCentredString(width/2, 20, page_text)
-                    elif position == 'top':
-                        c.drawCentredString(width/2, height-20, page_text)
-                    elif position == 'bottom-right':
-                        c.drawRightString(width-20, 20, page_text)
-                    elif position == 'bottom-left':
-                        c.drawString(20, 20, page_text)
-                    elif position == 'top-right':
-                        c.drawRightString(width-20, height-20, page_text)
-                    elif position == 'top-left':
-                        c.drawString(20, height-20, page_text)
-                    else:
-                        c.drawCentredString(width/2, 20, page_text)
-                    
-                    c.showPage()
-                    c.save()
-                    
-                    # Écrire le numéro de page dans le fichier temporaire
-                    with open(page_number_path, 'wb') as f:
-                        f.write(buffer.getvalue())
-                    
-                    # Fusionner la page avec le numéro de page
-                    page = pdf_reader.pages[page_num]
-                    
-                    number_reader = PyPDF2.PdfReader(page_number_path)
-                    number_page = number_reader.pages[0]
-                    
-                    page.merge_page(number_page)
-                    pdf_writer.add_page(page)
-                    
-                    # Supprimer le fichier temporaire
-                    os.unlink(page_number_path)
-                
-                # Écrire le fichier de sortie
-                with open(output_path, 'wb') as f:
-                    pdf_writer.write(f)
-            
-            logger.info(f"Numéros de page ajoutés au PDF : {output_path}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de l'ajout des numéros de page : {e}")
-            return False
+        return PDFPipeline().page_numbers(
+            position=position, font=font, size=size, start_number=start_number
+        ).run(input_path, output_path)
     
     @staticmethod
     def encrypt_pdf(input_path, output_path, user_password=None, owner_password=None, permissions=None):
@@ -540,56 +374,49 @@ class PDFUtils:
             output_path: Chemin du fichier PDF de sortie
             user_password: Mot de passe utilisateur (pour ouvrir le PDF)
             owner_password: Mot de passe propriétaire (pour les permissions)
-            permissions: Dictionnaire de permissions (print, modify, copy, etc.)
+            permissions: Permissions accordées au lecteur (print, modify, copy, annotate,
+                         fill_forms, assemble), par exemple {"copy": False}; les
+                         permissions absentes restent autorisées
             
         Returns:
             bool: True si réussi, False sinon
         """
-        if not PYPDF2_AVAILABLE:
-            logger.error("Impossible de crypter un PDF : PyPDF2 n'est pas installé")
-            return False
+        return PDFPipeline().encrypt(user_password, owner_password, permissions).run(input_path, output_path)
+    
+    @staticmethod
+    def post_process(input_path, output_path, watermark_text=None, page_numbers=False,
+                     signer=None, metadata=None, user_password=None, owner_password=None,
+                     permissions=None):
+        """
+        Applique plusieurs traitements en une seule lecture et une seule écriture du PDF
+        (dans l'ordre: filigrane, numéros de page, page de signature, métadonnées, chiffrement)
         
-        try:
-            # Vérifier que le fichier existe
-            if not os.path.exists(input_path):
-                logger.error(f"Le fichier PDF n'existe pas : {input_path}")
-                return False
-            
-            # Créer le répertoire parent si nécessaire
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Permissions par défaut
-            if permissions is None:
-                permissions = {}
-            
-            # Ouvrir le PDF
-            with open(input_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                
-                # Créer le PDF de sortie
-                pdf_writer = PyPDF2.PdfWriter()
-                
-                # Copier chaque page
-                for page in pdf_reader.pages:
-                    pdf_writer.add_page(page)
-                
-                # Crypter le PDF
-                pdf_writer.encrypt(
-                    user_password=user_password,
-                    owner_password=owner_password if owner_password else user_password,
-                    use_128bit=True
-                )
-                
-                # Écrire le fichier de sortie
-                with open(output_path, 'wb') as f:
-                    pdf_writer.write(f)
-            
-            logger.info(f"PDF crypté : {output_path}")
-            return True
+        Args:
+            input_path: Chemin du fichier PDF d'origine
+            output_path: Chemin du fichier PDF de sortie
+            watermark_text: Texte du filigrane (aucun si None)
+            page_numbers: Ajouter des numéros de page
+            signer: Gestionnaire de signatures électroniques (aucune signature si None)
+            metadata: Métadonnées à définir
+            user_password: Mot de passe utilisateur (pas de chiffrement si None)
+            owner_password: Mot de passe propriétaire
+            permissions: Permissions accordées au lecteur (voir encrypt_pdf)
             
-        except Exception as e:
-            logger.error(f"Erreur lors du cryptage du PDF : {e}")
-            return False
+        Returns:
+            bool: True si réussi, False sinon
+        """
+        pipeline = PDFPipeline()
+        if watermark_text:
+            pipeline.watermark(watermark_text)
+        if page_numbers:
+            pipeline.page_numbers()
+        if signer is not None:
+            pipeline.sign(signer)
+        if metadata:
+            pipeline.metadata(metadata)
+        if user_password:
+            pipeline.encrypt(user_password, owner_password, permissions)
+        return pipeline.run(input_path, output_path)
     
     @staticmethod
     def get_pdf_info(file_path):
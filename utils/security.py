@@ -338,6 +338,23 @@ class SecureFileManager:
         except Exception as e:
             logger.error(f"Erreur lors du masquage du fichier {filepath}: {e}")
     
+    def resolve_path(self, filename: str) -> str:
+        """
+        Chemin effectif d'un fichier sécurisé (sous Unix, _hide_file le renomme en ".nom")
+        
+        Args:
+            filename: Nom du fichier
+            
+        Returns:
+            str: Chemin du fichier, masqué s'il n'existe que sous cette forme
+        """
+        filepath = os.path.join(self.data_dir, filename)
+        if os.name != 'nt' and not os.path.exists(filepath):
+            hidden_path = os.path.join(self.data_dir, f".{os.path.basename(filename)}")
+            if not os.path.basename(filename).startswith('.') and os.path.exists(hidden_path):
+                return hidden_path
+        return filepath
+    
     def read_secure_file(self, filename: str) -> Dict[str, Any]:
         """
         Lit un fichier sécurisé
@@ -349,7 +366,7 @@ class SecureFileManager:
             Dict: Contenu du fichier déchiffré
         """
         try:
-            filepath = os.path.join(self.data_dir, filename)
+            filepath = self.resolve_path(filename)
             if not os.path.exists(filepath):
                 return {}
             
@@ -8,7 +8,7 @@ Fonctions d'initialisation de l'application
 import os
 import logging
 import asyncio
-from doc_analyzer.analyzer import DocumentAnalyzer
+from doc_analyzer.analyzer_service import get_analyzer_service
 
 def setup_logging():
     """Configure le système de journalisation"""
@@ -32,11 +32,11 @@ def ensure_directories():
         os.makedirs(directory, exist_ok=True)
 
 async def setup_doc_analyzer():
-    """Configure et initialise l'analyseur de documents"""
+    """Configure et initialise l'analyseur de documents partagé (composants préchauffés)"""
     try:
-        analyzer = DocumentAnalyzer()
-        await analyzer.initialize()
-        return analyzer
+        service = get_analyzer_service()
+        await asyncio.to_thread(service.warm_up)
+        return service.get()
     except Exception as e:
         logging.getLogger("VynalDocsAutomator").error(f"Erreur lors de l'initialisation de l'analyseur: {e}")
         return None 
\ No newline at end of file
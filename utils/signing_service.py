@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Service de signature par lots pour l'application Vynal Docs Automator
+La clé privée est désérialisée une seule fois, les fichiers sont hachés par blocs
+(sans être chargés en mémoire) et signés en parallèle. Les signatures sont
+enregistrées dans un manifeste détaché, vérifiable en masse.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import concurrent.futures
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger("VynalDocsAutomator.SigningService")
+
+SIGNING_CONFIG = {
+    # Taille des blocs lus pour le calcul des empreintes (octets)
+    "chunk_size": 1024 * 1024,
+    # Nombre de workers par défaut pour les lots
+    "max_workers": min(8, os.cpu_count() or 1),
+}
+
+MANIFEST_VERSION = 1
+SIGNATURE_ALGORITHM = "SHA256withRSA"
+
+
+def file_digest(path: str, length: Optional[int] = None, chunk_size: Optional[int] = None) -> bytes:
+    """
+    Empreinte SHA-256 d'un fichier, calculée par blocs
+
+    Args:
+        path: Chemin du fichier
+        length: Nombre d'octets à prendre en compte depuis le début (tout le fichier si None)
+        chunk_size: Taille des blocs lus (SIGNING_CONFIG par défaut)
+
+    Returns:
+        bytes: Empreinte SHA-256
+    """
+    chunk_size = chunk_size or SIGNING_CONFIG["chunk_size"]
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, "rb") as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.digest()
+
+
+class SigningService:
+    """
+    Signature et vérification de documents par lots, avec manifestes détachés
+    (les documents signés ne sont pas modifiés)
+    """
+
+    def __init__(self, signer, max_workers: Optional[int] = None):
+        """
+        Initialise le service
+
+        Args:
+            signer: Gestionnaire de signatures (utils.electronic_signature.ElectronicSignature),
+                    dont la clé et le certificat restent en mémoire
+            max_workers: Nombre de workers (SIGNING_CONFIG par défaut)
+        """
+        self.signer = signer
+        self.max_workers = max_workers or SIGNING_CONFIG["max_workers"]
+
+    @property
+    def certificate_fingerprint(self) -> str:
+        """Empreinte SHA-256 du certificat de signature"""
+        from cryptography.hazmat.primitives import hashes
+        return self.signer.certificate.fingerprint(hashes.SHA256()).hex()
+
+    def sign_file(self, path: str) -> Dict[str, Any]:
+        """
+        Signe un fichier sans le modifier
+
+        Args:
+            path: Chemin du fichier
+
+        Returns:
+            Dict[str, Any]: Entrée de manifeste (sha256, size, signature, signed_at)
+        """
+        size = os.path.getsize(path)
+        digest = file_digest(path)
+        return {
+            "sha256": digest.hex(),
+            "size": size,
+            "signature": self.signer.sign_digest(digest),
+            "signed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def verify_entry(self, path: str, entry: Dict[str, Any]) -> Optional[str]:
+        """
+        Vérifie un fichier par rapport à son entrée de manifeste
+
+        Args:
+            path: Chemin du fichier
+            entry: Entrée de manifeste
+
+        Returns:
+            Optional[str]: None si le fichier est intact et la signature valide, sinon la raison de l'échec
+        """
+        if not os.path.exists(path):
+            return "missing"
+        # La taille permet d'écarter un fichier modifié sans le lire
+        if os.path.getsize(path) != entry.get("size"):
+            return "modified"
+        digest = file_digest(path)
+        if digest.hex() != entry.get("sha256"):
+            return "modified"
+        if not self.signer.verify_digest(digest, entry.get("signature", "")):
+            return "bad_signature"
+        return None
+
+    def _map(self, function, items):
+        """Applique function à chaque élément en parallèle; retourne {élément: (résultat, erreur)}"""
+        results = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(function, item): item for item in items}
+            for future in concurrent.futures.as_completed(futures):
+                item = futures[future]
+                try:
+                    results[item] = (future.result(), None)
+                except Exception as e:
+                    results[item] = (None, str(e))
+        return results
+
+    def sign_batch(self, paths: Iterable[str], manifest_path: str) -> Dict[str, Any]:
+        """
+        Signe un lot de fichiers en parallèle et écrit le manifeste détaché
+
+        Args:
+            paths: Fichiers à signer
+            manifest_path: Chemin du manifeste (les fichiers y sont référencés par
+                           un chemin relatif à son répertoire)
+
+        Returns:
+            Dict[str, Any]: Manifeste écrit, avec la liste des échecs ("failures")
+        """
+        base_dir = os.path.dirname(os.path.abspath(manifest_path))
+        paths = [os.path.abspath(path) for path in paths]
+
+        # Charger la clé avant de répartir le travail entre les workers
+        self.signer.load_keys()
+        fingerprint = self.certificate_fingerprint
+
+        results = self._map(self.sign_file, paths)
+
+        files = {}
+        failures = []
+        for path in paths:
+            entry, error = results[path]
+            name = os.path.relpath(path, base_dir).replace(os.sep, "/")
+            if error is None:
+                files[name] = entry
+            else:
+                logger.error(f"Erreur lors de la signature de {path}: {error}")
+                failures.append({"file": name, "error": error})
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "algorithm": SIGNATURE_ALGORITHM,
+            "certificate_sha256": fingerprint,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "files": files,
+            "failures": failures,
+        }
+        self._write_manifest(manifest_path, manifest)
+        logger.info(f"{len(files)} document(s) signé(s), manifeste: {manifest_path}")
+        return manifest
+
+    def verify_manifest(self, manifest_path: str) -> Dict[str, Any]:
+        """
+        Vérifie en parallèle tous les fichiers d'un manifeste
+
+        Args:
+            manifest_path: Chemin du manifeste
+
+        Returns:
+            Dict[str, Any]: "valid" (bool), "verified" (nombre de fichiers valides) et
+            "failures" (fichier -> raison: missing, modified, bad_signature, wrong_certificate)
+        """
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        base_dir = os.path.dirname(os.path.abspath(manifest_path))
+        files = manifest.get("files", {})
+
+        if manifest.get("certificate_sha256") != self.certificate_fingerprint:
+            failures = {name: "wrong_certificate" for name in files}
+            return {"valid": False, "verified": 0, "failures": failures}
+
+        def verify(name):
+            return self.verify_entry(os.path.join(base_dir, *name.split("/")), files[name])
+
+        failures = {}
+        for name, (reason, error) in self._map(verify, list(files)).items():
+            if error is not None:
+                reason = f"error: {error}"
+            if reason is not None:
+                failures[name] = reason
+
+        return {"valid": not failures, "verified": len(files) - len(failures), "failures": failures}
+
+    @staticmethod
+    def _write_manifest(path: str, manifest: Dict[str, Any]):
+        """Écrit le manifeste via un fichier temporaire (jamais de manifeste partiel)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_file = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory,
+                                                suffix=".tmp", delete=False)
+        try:
+            with temp_file:
+                json.dump(manifest, temp_file, indent=2, ensure_ascii=False)
+            os.replace(temp_file.name, path)
+        except Exception:
+            os.unlink(temp_file.name)
+            raise
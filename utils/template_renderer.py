@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Moteur de rendu des modèles de documents pour Vynal Docs Automator
+Un modèle est analysé une seule fois en segments (texte littéral / variable),
+mis en cache par identifiant de modèle et date de modification, puis rendu
+par une simple concaténation, quel que soit le nombre de variables.
+Les variables sont acceptées aux formats {{variable}} et {variable}.
+"""
+
+import re
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List, Tuple, Union
+
+logger = logging.getLogger("VynalDocsAutomator.TemplateRenderer")
+
+# {{variable}} est essayé avant {variable} à chaque position
+PLACEHOLDER_PATTERN = re.compile(r'\{\{([^{}]*?)\}\}|\{([^{}]*)\}')
+
+# Traitement des variables sans valeur
+MISSING_KEEP = "keep"      # Laisser la variable telle quelle dans le texte
+MISSING_REMOVE = "remove"  # Remplacer la variable par une chaîne vide
+
+
+class Placeholder:
+    """Variable d'un modèle compilé"""
+
+    __slots__ = ("name", "raw", "double")
+
+    def __init__(self, name: str, raw: str, double: bool):
+        self.name = name
+        self.raw = raw
+        self.double = double
+
+
+class CompiledTemplate:
+    """
+    Modèle analysé en une liste de segments: chaînes littérales et variables.
+    """
+
+    def __init__(self, source: str):
+        """
+        Analyse le modèle
+
+        Args:
+            source: Contenu du modèle
+        """
+        self.source = source
+        self.segments: List[Union[str, Placeholder]] = []
+
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            if match.start() > position:
+                self.segments.append(source[position:match.start()])
+            double = match.group(1) is not None
+            name = match.group(1) if double else match.group(2)
+            self.segments.append(Placeholder(name, match.group(0), double))
+            position = match.end()
+        if position < len(source):
+            self.segments.append(source[position:])
+
+        # Nombre d'occurrences de chaque variable, dans l'ordre d'apparition
+        self.counts = Counter(s.name for s in self.segments if isinstance(s, Placeholder))
+
+    @property
+    def variables(self) -> List[str]:
+        """Noms des variables du modèle, dans l'ordre d'apparition"""
+        return list(self.counts)
+
+    def missing_variables(self, variables: Dict[str, Any]) -> List[str]:
+        """
+        Liste les variables du modèle sans valeur
+
+        Args:
+            variables: Valeurs disponibles
+
+        Returns:
+            list: Noms des variables manquantes
+        """
+        return [name for name in self.counts if name not in variables]
+
+    def replacement_count(self, variables: Dict[str, Any]) -> int:
+        """Nombre de remplacements effectués par un rendu avec ces valeurs"""
+        return sum(count for name, count in self.counts.items() if name in variables)
+
+    def render(self, variables: Dict[str, Any], missing: str = MISSING_REMOVE,
+               single_braces: bool = True) -> str:
+        """
+        Produit le texte final
+
+        Args:
+            variables: Valeurs des variables (None est rendu comme une chaîne vide)
+            missing: MISSING_REMOVE ou MISSING_KEEP pour les variables sans valeur
+            single_braces: Reconnaître aussi le format {variable}
+
+        Returns:
+            str: Contenu avec variables remplacées
+        """
+        parts = []
+        append = parts.append
+        for segment in self.segments:
+            if segment.__class__ is str:
+                append(segment)
+            elif not single_braces and not segment.double:
+                append(segment.raw)
+            elif segment.name in variables:
+                value = variables[segment.name]
+                append("" if value is None else str(value))
+            elif missing == MISSING_KEEP:
+                append(segment.raw)
+        return "".join(parts)
+
+
+class TemplateCache:
+    """
+    Cache LRU des modèles compilés, indexé par (identifiant, date de modification)
+    ou, à défaut d'identifiant, par le contenu du modèle.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialise le cache
+
+        Args:
+            max_entries: Nombre maximal de modèles conservés
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, CompiledTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, source: str, key: Any = None, mtime: Any = None) -> CompiledTemplate:
+        """
+        Retourne le modèle compilé, en le compilant au premier appel
+
+        Args:
+            source: Contenu du modèle
+            key: Identifiant du modèle (ID, chemin du fichier...)
+            mtime: Date de modification du modèle
+
+        Returns:
+            CompiledTemplate: Modèle compilé
+        """
+        cache_key = (key, mtime) if key is not None else (None, source)
+
+        with self._lock:
+            compiled = self._entries.get(cache_key)
+            # Un contenu différent sous la même clé invalide l'entrée
+            if compiled is not None and (compiled.source is source or compiled.source == source):
+                self._entries.move_to_end(cache_key)
+                return compiled
+
+        compiled = CompiledTemplate(source)
+
+        with self._lock:
+            self._entries[cache_key] = compiled
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        """Vide le cache"""
+        with self._lock:
+            self._entries.clear()
+
+
+_template_cache = TemplateCache()
+
+
+def compile_template(source: str, key: Any = None, mtime: Any = None) -> CompiledTemplate:
+    """
+    Compile un modèle (ou le récupère depuis le cache partagé)
+
+    Args:
+        source: Contenu du modèle
+        key: Identifiant du modèle
+        mtime: Date de modification du modèle
+
+    Returns:
+        CompiledTemplate: Modèle compilé
+    """
+    if not isinstance(source, str):
+        source = str(source)
+    return _template_cache.get(source, key, mtime)
+
+
+def render_template(source: str, variables: Dict[str, Any], key: Any = None, mtime: Any = None,
+                    missing: str = MISSING_REMOVE, single_braces: bool = True) -> str:
+    """
+    Remplace les variables d'un modèle par leurs valeurs
+
+    Args:
+        source: Contenu du modèle
+        variables: Valeurs des variables
+        key: Identifiant du modèle
+        mtime: Date de modification du modèle
+        missing: MISSING_REMOVE ou MISSING_KEEP pour les variables sans valeur
+        single_braces: Reconnaître aussi le format {variable}
+
+    Returns:
+        str: Contenu avec variables remplacées
+    """
+    return compile_template(source, key, mtime).render(variables, missing, single_braces)
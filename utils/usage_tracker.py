@@ -12,7 +12,7 @@ import hashlib
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import time
-from utils.security import SecureFileManager
+from utils.entitlements import get_entitlement_service
 
 # Configuration du logger
 logger = logging.getLogger("VynalDocsAutomator.UsageTracker")
@@ -25,11 +25,12 @@ class UsageTracker:
         self.data_dir = os.path.join("data")
         os.makedirs(self.data_dir, exist_ok=True)
         
-        # Initialiser le gestionnaire de fichiers sécurisés
-        self.secure_files = SecureFileManager(self.data_dir)
+        # État partagé du processus: fichiers sensibles déchiffrés une seule fois,
+        # décisions d'accès en cache et compteur écrit en différé
+        self.entitlements = get_entitlement_service(self.data_dir)
+        self.secure_files = self.entitlements.secure_files
         
         self.usage_file = os.path.join(self.data_dir, "usage_count.json")
-        self.usage_count = self._load_usage_count()
         
         # Limites d'utilisation
         self.max_uses = 10  # Nombre maximum d'utilisations avant demande d'inscription
@@ -49,25 +50,19 @@ class UsageTracker:
         
         # Charger l'utilisateur actif au démarrage
         self._load_current_user()
-        
-        # Sécuriser tous les fichiers existants
-        self.secure_files.secure_all_files()
     
-    def _load_usage_count(self) -> int:
-        """Charge le compteur d'utilisation"""
+    @property
+    def usage_count(self) -> int:
+        """Compteur d'utilisation (partagé par toutes les instances)"""
         try:
-            data = self.secure_files.read_secure_file("usage_count.json")
-            return data.get("count", 0)
+            return self.entitlements.usage_count
         except Exception as e:
             logger.error(f"Erreur lors du chargement du compteur: {e}")
             return 0
     
-    def _save_usage_count(self):
-        """Sauvegarde le compteur d'utilisation"""
-        try:
-            self.secure_files.write_secure_file("usage_count.json", {"count": self.usage_count})
-        except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde du compteur: {e}")
+    @usage_count.setter
+    def usage_count(self, count: int):
+        self.entitlements.set_usage_count(count)
     
     def increment_usage(self) -> Dict[str, Any]:
         """
@@ -76,8 +71,7 @@ class UsageTracker:
         Returns:
             Dict contenant les informations sur l'utilisation
         """
-        self.usage_count += 1
-        self._save_usage_count()
+        self.entitlements.increment_usage()
         
         remaining = max(0, self.max_uses - self.usage_count)
         should_register = self.usage_count >= self.max_uses
@@ -136,7 +130,6 @@ class UsageTracker:
     def reset_usage(self):
         """Réinitialise le compteur d'utilisation"""
         self.usage_count = 0
-        self._save_usage_count()
     
     def is_user_registered(self) -> bool:
         """
@@ -188,17 +181,8 @@ class UsageTracker:
             Dict: Données de l'utilisateur ou un dictionnaire vide si aucun utilisateur n'est connecté
         """
         try:
-            # Vérifier s'il y a un utilisateur actif
-            current_user = self.secure_files.read_secure_file("current_user.json")
-            if current_user and current_user.get("email"):
-                # Récupérer les données complètes de cet utilisateur
-                users = self.secure_files.read_secure_file("users.json")
-                if users and current_user.get("email") in users:
-                    user_data = users[current_user.get("email")]
-                    user_data["email"] = current_user.get("email")
-                    return user_data
-            
-            return {}
+            # Utilisateur actif et ses données complètes (déchiffrés une seule fois)
+            return self.entitlements.current_user_data()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des données utilisateur: {e}")
             return {}
@@ -224,7 +208,7 @@ class UsageTracker:
                 "last_login": datetime.now().isoformat()
             }
             
-            return self.secure_files.write_secure_file("current_user.json", current_user)
+            return self.entitlements.write_file("current_user.json", current_user)
         except Exception as e:
             logger.error(f"Erreur lors de la définition de l'utilisateur actif: {e}")
             return False
@@ -237,12 +221,9 @@ class UsageTracker:
             bool: True si l'opération a réussi, False sinon
         """
         try:
-            current_user_file = os.path.join(self.data_dir, "current_user.json")
-            if os.path.exists(current_user_file):
-                os.remove(current_user_file)
+            if self.entitlements.delete_file("current_user.json"):
                 logger.info("Utilisateur actif supprimé")
-                return True
-            return True  # Aucun utilisateur à supprimer
+            return True
         except Exception as e:
             logger.error(f"Erreur lors de la suppression de l'utilisateur actif: {e}")
             return False
@@ -310,19 +291,9 @@ class UsageTracker:
             bool: True si l'opération a réussi
         """
         try:
-            if not user_data.get("email"):
-                logger.error("Email manquant dans les données utilisateur")
-                return False
-            
-            email = user_data["email"]
-            users = self.secure_files.read_secure_file("users.json") or {}
-            
-            # Mettre à jour les données utilisateur
-            users[email] = {k: v for k, v in user_data.items() if k != "email"}
-            
-            # Sauvegarder les modifications
-            if self.secure_files.write_secure_file("users.json", users):
-                logger.info(f"Données utilisateur sauvegardées pour {email}")
+            # Sauvegarder les modifications (invalide les décisions d'accès)
+            if self.entitlements.save_user_data(user_data):
+                logger.info(f"Données utilisateur sauvegardées pour {user_data['email']}")
                 return True
             return False
         except Exception as e:
@@ -548,22 +519,18 @@ class UsageTracker:
             self.session_start_time = 0
             
             # Supprimer le fichier d'utilisateur actuel
-            current_user_file = os.path.join(self.data_dir, "current_user.json")
-            if os.path.exists(current_user_file):
-                try:
-                    os.remove(current_user_file)
+            try:
+                if self.entitlements.delete_file("current_user.json"):
                     logger.info("Fichier utilisateur actif supprimé")
-                except Exception as e:
-                    logger.error(f"Erreur lors de la suppression du fichier utilisateur: {e}")
+            except Exception as e:
+                logger.error(f"Erreur lors de la suppression du fichier utilisateur: {e}")
             
             # Supprimer le fichier de session "Rester connecté"
-            session_file = os.path.join(self.data_dir, "session.json")
-            if os.path.exists(session_file):
-                try:
-                    os.remove(session_file)
+            try:
+                if self.entitlements.delete_file("session.json"):
                     logger.info("Fichier de session 'Rester connecté' supprimé")
-                except Exception as e:
-                    logger.error(f"Erreur lors de la suppression du fichier de session: {e}")
+            except Exception as e:
+                logger.error(f"Erreur lors de la suppression du fichier de session: {e}")
             
             # Désactiver explicitement l'option "Rester connecté" dans les données utilisateur
             if current_email:
@@ -675,8 +642,7 @@ class UsageTracker:
                 logger.info(f"Utilisateur actif sauvegardé: {self.current_user}")
             else:
                 # Supprimer le fichier s'il existe
-                if os.path.exists(current_user_file):
-                    os.remove(current_user_file)
+                if self.entitlements.delete_file("current_user.json"):
                     logger.info("Fichier utilisateur actif supprimé")
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde de l'utilisateur actif: {e}")
@@ -791,13 +757,12 @@ class UsageTracker:
                     return False
             else:
                 # Supprimer le fichier de session s'il existe
-                if os.path.exists(session_file):
-                    try:
-                        os.remove(session_file)
+                try:
+                    if self.entitlements.delete_file("session.json"):
                         logger.info("Fichier de session supprimé")
-                    except Exception as e:
-                        logger.error(f"Erreur lors de la suppression du fichier de session: {e}")
-                        return False
+                except Exception as e:
+                    logger.error(f"Erreur lors de la suppression du fichier de session: {e}")
+                    return False
             
             return True
         except Exception as e:
@@ -825,7 +790,7 @@ class UsageTracker:
             except json.JSONDecodeError as e:
                 logger.error(f"Format JSON invalide dans le fichier de session: {e}")
                 # Supprimer le fichier corrompu
-                os.remove(session_file)
+                self.entitlements.delete_file("session.json")
                 return {}
             except Exception as e:
                 logger.error(f"Erreur lors de la lecture du fichier de session: {e}")
@@ -834,26 +799,26 @@ class UsageTracker:
             # Vérifier si la session contient les informations nécessaires
             if "email" not in session or "remember_me" not in session:
                 logger.warning("Fichier de session incomplet")
-                os.remove(session_file)
+                self.entitlements.delete_file("session.json")
                 return {}
                 
             # Vérifier explicitement si remember_me est True
             if not session.get("remember_me") == True:  # Comparaison stricte
                 logger.info("Option 'Rester connecté' non activée dans le fichier de session")
-                os.remove(session_file)
+                self.entitlements.delete_file("session.json")
                 return {}
                 
             email = session.get("email")
             if not email:
                 logger.warning("Email manquant dans le fichier de session")
-                os.remove(session_file)
+                self.entitlements.delete_file("session.json")
                 return {}
                 
             # Vérifier si l'utilisateur existe toujours
             users_file = os.path.join(self.data_dir, "users.json")
             if not os.path.exists(users_file):
                 logger.warning("Fichier utilisateurs non trouvé")
-                os.remove(session_file)
+                self.entitlements.delete_file("session.json")
                 return {}
             
             try:    
@@ -866,7 +831,7 @@ class UsageTracker:
             if email not in users:
                 # Supprimer le fichier de session si l'utilisateur n'existe plus
                 logger.warning(f"Utilisateur {email} du fichier de session non trouvé")
-                os.remove(session_file)
+                self.entitlements.delete_file("session.json")
                 return {}
                 
             # Vérifier si l'option "Rester connecté" est toujours activée pour cet utilisateur
@@ -874,7 +839,7 @@ class UsageTracker:
             if not user_settings.get("remember_me") == True:  # Comparaison stricte
                 # Supprimer le fichier de session si l'option n'est plus activée
                 logger.info(f"Option 'Rester connecté' désactivée pour {email} dans les données utilisateur")
-                os.remove(session_file)
+                self.entitlements.delete_file("session.json")
                 return {}
                 
             # Session valide, récupérer les données de l'utilisateur
@@ -1,7 +1,7 @@
 import customtkinter as ctk
 from typing import Optional, Dict, List, Any
 import logging
-from doc_analyzer import DocumentAnalyzer
+from doc_analyzer import acquire_document_analyzer
 from doc_analyzer.ui.analysis_widgets import AnalysisResultWidget
 from utils.ui_components import LoadingSpinner
 import os
@@ -33,9 +33,9 @@ class AnalysisView:
         # Créer le cadre principal
         self.frame = ctk.CTkFrame(parent)
         
-        # Initialiser l'analyseur de documents
+        # Analyseur de documents partagé, rendu à la destruction de la vue
         try:
-            self.doc_analyzer = DocumentAnalyzer()
+            self.doc_analyzer = acquire_document_analyzer(self.frame)
         except Exception as e:
             logger.error(f"Erreur lors de l'initialisation de l'analyseur: {e}")
             self.doc_analyzer = None
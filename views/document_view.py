@@ -180,9 +180,9 @@ class DocumentView:
             if parent_dir not in sys.path:
                 sys.path.insert(0, parent_dir)
             
-            # Importer et initialiser DocumentAnalyzer
-            from doc_analyzer.analyzer import DocumentAnalyzer
-            self.doc_analyzer = DocumentAnalyzer()
+            # Analyseur de documents partagé par l'application
+            from doc_analyzer.analyzer_service import acquire_document_analyzer
+            self.doc_analyzer = acquire_document_analyzer()
             return True
         except ImportError as e:
             logger = logging.getLogger("VynalDocsAutomator")
@@ -1807,7 +1807,7 @@ class DocumentView:
             self.model.documents = [d for d in self.model.documents if d.get("id") not in ids_to_delete]
             
             # 3. Sauvegarder les changements
-            self.model.save_documents()
+            self.model.save_documents(deleted_ids=ids_to_delete)
             
             # 4. Réinitialiser la sélection
             self.selected_documents = []
@@ -2824,8 +2824,8 @@ class DocumentView:
             # Initialiser l'analyseur de documents si nécessaire
             if not hasattr(self, "doc_analyzer") or self.doc_analyzer is None:
                 try:
-                    from doc_analyzer import DocumentAnalyzer
-                    self.doc_analyzer = DocumentAnalyzer()
+                    from doc_analyzer import acquire_document_analyzer
+                    self.doc_analyzer = acquire_document_analyzer(self.frame)
                 except Exception as e:
                     logger.error(f"Erreur lors de l'initialisation de l'analyseur: {e}")
                     self.doc_analyzer = None
@@ -726,14 +726,14 @@ class TemplateView:
         Supprime les modèles du modèle de données
         """
         # Supprimer les modèles sélectionnés
-        for template in self.selected_templates:
-            self.model.templates = [t for t in self.model.templates if t.get("id") != template.get("id")]
+        ids_to_delete = [template.get("id") for template in self.selected_templates]
+        self.model.templates = [t for t in self.model.templates if t.get("id") not in ids_to_delete]
         
         # Réinitialiser la liste des modèles sélectionnés
         self.selected_templates = []
         
         # Sauvegarder les changements
-        self.model.save_templates()
+        self.model.save_templates(deleted_ids=ids_to_delete)
         
         # Mettre à jour la vue avec un léger délai pour une meilleure UX
         self.parent.after(300, self.update_view)
@@ -1197,8 +1197,8 @@ class TemplateView:
             # Initialiser l'analyseur de documents si nécessaire
             if not hasattr(self, "doc_analyzer"):
                 try:
-                    from doc_analyzer import DocumentAnalyzer
-                    self.doc_analyzer = DocumentAnalyzer()
+                    from doc_analyzer import acquire_document_analyzer
+                    self.doc_analyzer = acquire_document_analyzer(self.frame)
                 except Exception as e:
                     logger.error(f"Erreur lors de l'initialisation de l'analyseur: {e}")
                     self.doc_analyzer = None